@@ -0,0 +1,30 @@
+"""User timezone
+
+Revision ID: 5f2b7e9c1a04
+Revises: c3d8a51f0e72
+Create Date: 2026-10-17 22:41:12.330481
+
+IANA časová zóna uživatele (users.timezone), ve které API skládá grid dostupností
+po místních dnech. NULL = UTC.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2b7e9c1a04'
+down_revision: Union[str, None] = 'c3d8a51f0e72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'timezone' not in {column['name'] for column in inspector.get_columns('users')}:
+        op.add_column('users', sa.Column('timezone', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'timezone')
@@ -0,0 +1,49 @@
+"""Keyset pagination indexes
+
+Revision ID: 73f5bb82d0b4
+Revises: 7c1e4a9d2b36
+Create Date: 2026-10-17 14:03:27.118204
+
+Složené indexy (rodič, řadicí klíč, id) pro cursor stránkování seznamů -
+další stránka je pak jen posun v indexu místo čtení a zahazování OFFSET řádků.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73f5bb82d0b4'
+down_revision: Union[str, None] = '7c1e4a9d2b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_characters_world_id_name_id', 'characters', ['world_id', 'name', 'id']),
+    ('ix_locations_world_id_name_id', 'locations', ['world_id', 'name', 'id']),
+    ('ix_organizations_world_id_name_id', 'organizations', ['world_id', 'name', 'id']),
+    ('ix_items_world_id_id', 'items', ['world_id', 'id']),
+    ('ix_journal_entries_journal_id_created_at_id', 'journal_entries', ['journal_id', 'created_at', 'id']),
+    ('ix_sessions_campaign_id_date_time_created_at_id', 'sessions', ['campaign_id', 'date_time', 'created_at', 'id']),
+]
+
+# Sezení se řadí date_time DESC NULLS LAST (SESSION_ORDER) - v Postgresu index ve stejném pořadí
+POSTGRESQL_OPS = {
+    'ix_sessions_campaign_id_date_time_created_at_id': {
+        'date_time': 'DESC NULLS LAST', 'created_at': 'DESC', 'id': 'DESC',
+    },
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name not in {ix['name'] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False, postgresql_ops=POSTGRESQL_OPS.get(name, {}))
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,155 @@
+"""Sync schema with models
+
+Revision ID: 7c1e4a9d2b36
+Revises: 02fd3cabb547
+Create Date: 2026-10-17 09:12:41.503118
+
+Schéma se dosud vytvářelo přes Base.metadata.create_all při importu aplikace,
+takže počáteční migrace zaostala za modely. Tato migrace ji dorovnává a je
+idempotentní - na databázi vytvořené přes create_all nic nemění.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9d2b36'
+down_revision: Union[str, None] = '02fd3cabb547'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(inspector, table: str) -> set:
+    return {c['name'] for c in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+
+    # --- Session slots / user availabilities (nahradily tabulku 'availabilities') ---
+    if 'session_slots' not in tables:
+        op.create_table('session_slots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('slot_from', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('slot_to', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_session_slots_id'), 'session_slots', ['id'], unique=False)
+        op.create_index(op.f('ix_session_slots_session_id'), 'session_slots', ['session_id'], unique=False)
+
+    if 'user_availabilities' not in tables:
+        op.create_table('user_availabilities',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('slot_id', sa.Integer(), nullable=False),
+        sa.Column('available_from', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('available_to', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['slot_id'], ['session_slots.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_user_availabilities_id'), 'user_availabilities', ['id'], unique=False)
+        op.create_index(op.f('ix_user_availabilities_slot_id'), 'user_availabilities', ['slot_id'], unique=False)
+        op.create_index(op.f('ix_user_availabilities_user_id'), 'user_availabilities', ['user_id'], unique=False)
+
+    # --- users: jméno a příjmení ---
+    user_columns = _columns(inspector, 'users')
+    with op.batch_alter_table('users') as batch_op:
+        if 'first_name' not in user_columns:
+            batch_op.add_column(sa.Column('first_name', sa.String(), nullable=True))
+        if 'last_name' not in user_columns:
+            batch_op.add_column(sa.Column('last_name', sa.String(), nullable=True))
+
+    # --- worlds: is_private -> is_public ---
+    world_columns = _columns(inspector, 'worlds')
+    if 'is_public' not in world_columns:
+        with op.batch_alter_table('worlds') as batch_op:
+            batch_op.add_column(sa.Column('is_public', sa.Boolean(), server_default=sa.false(), nullable=False))
+        if 'is_private' in world_columns:
+            op.execute("UPDATE worlds SET is_public = NOT is_private")
+    if 'is_private' in world_columns:
+        with op.batch_alter_table('worlds') as batch_op:
+            batch_op.drop_column('is_private')
+
+    # --- campaigns: is_private už model nemá (NOT NULL bez defaultu by blokoval INSERT) ---
+    if 'is_private' in _columns(inspector, 'campaigns'):
+        with op.batch_alter_table('campaigns') as batch_op:
+            batch_op.drop_column('is_private')
+
+    # --- characters: user_id je volitelné (NPC) ---
+    with op.batch_alter_table('characters') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+
+    # --- items: příslušnost ke světu ---
+    if 'world_id' not in _columns(inspector, 'items'):
+        with op.batch_alter_table('items') as batch_op:
+            batch_op.add_column(sa.Column('world_id', sa.Integer(), nullable=True))
+        # Dopočítání světa přes vlastníka (postava) nebo umístění (lokace)
+        op.execute(
+            "UPDATE items SET world_id = COALESCE("
+            "(SELECT characters.world_id FROM characters WHERE characters.id = items.character_id), "
+            "(SELECT locations.world_id FROM locations WHERE locations.id = items.location_id))"
+        )
+        op.execute("DELETE FROM items WHERE world_id IS NULL")
+        with op.batch_alter_table('items') as batch_op:
+            batch_op.alter_column('world_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_index(op.f('ix_items_world_id'), ['world_id'], unique=False)
+            batch_op.create_foreign_key('items_world_id_fkey', 'worlds', ['world_id'], ['id'], ondelete='CASCADE')
+
+    # --- journal_entries: text -> content ---
+    entry_columns = _columns(inspector, 'journal_entries')
+    if 'content' not in entry_columns:
+        with op.batch_alter_table('journal_entries') as batch_op:
+            batch_op.add_column(sa.Column('content', sa.Text(), server_default='', nullable=False))
+        if 'text' in entry_columns:
+            op.execute("UPDATE journal_entries SET content = COALESCE(text, '')")
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.alter_column('title', existing_type=sa.String(), nullable=True)
+        if 'text' in entry_columns:
+            batch_op.drop_column('text')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.add_column(sa.Column('text', sa.Text(), nullable=True))
+    op.execute("UPDATE journal_entries SET text = content")
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.drop_column('content')
+
+    with op.batch_alter_table('items') as batch_op:
+        batch_op.drop_constraint('items_world_id_fkey', type_='foreignkey')
+        batch_op.drop_index(op.f('ix_items_world_id'))
+        batch_op.drop_column('world_id')
+
+    with op.batch_alter_table('campaigns') as batch_op:
+        batch_op.add_column(sa.Column('is_private', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    with op.batch_alter_table('worlds') as batch_op:
+        batch_op.add_column(sa.Column('is_private', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.execute("UPDATE worlds SET is_private = NOT is_public")
+    with op.batch_alter_table('worlds') as batch_op:
+        batch_op.drop_column('is_public')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('last_name')
+        batch_op.drop_column('first_name')
+
+    op.drop_index(op.f('ix_user_availabilities_user_id'), table_name='user_availabilities')
+    op.drop_index(op.f('ix_user_availabilities_slot_id'), table_name='user_availabilities')
+    op.drop_index(op.f('ix_user_availabilities_id'), table_name='user_availabilities')
+    op.drop_table('user_availabilities')
+    op.drop_index(op.f('ix_session_slots_session_id'), table_name='session_slots')
+    op.drop_index(op.f('ix_session_slots_id'), table_name='session_slots')
+    op.drop_table('session_slots')
@@ -0,0 +1,33 @@
+"""Session slot time range index
+
+Revision ID: 81ed42798b20
+Revises: 9b22109e24b1
+Create Date: 2026-10-17 19:41:08.215933
+
+Index (session_id, slot_from, slot_to) pro hledání slotů sezení, které překrývají
+časové okno (GET /users/me/calendar).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81ed42798b20'
+down_revision: Union[str, None] = '9b22109e24b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ix_session_slots_session_id_slot_from_slot_to'
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if INDEX not in {ix['name'] for ix in inspector.get_indexes('session_slots')}:
+        op.create_index(INDEX, 'session_slots', ['session_id', 'slot_from', 'slot_to'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name='session_slots')
@@ -0,0 +1,53 @@
+"""User availability no-overlap exclusion constraint
+
+Revision ID: 9b22109e24b1
+Revises: e4e6d3935e90
+Create Date: 2026-10-17 19:02:44.871305
+
+Překryv intervalů jednoho uživatele ve slotu dosud hlídal jen Python (čtení a pak
+zápis - dva souběžné požadavky mohly projít oba). Nově to vynucuje GiST exclusion
+constraint nad tstzrange(available_from, available_to, '[)'), jehož index zároveň
+slouží dotazům na překryv. Jen Postgres; v ostatních databázích migrace nic nedělá.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b22109e24b1'
+down_revision: Union[str, None] = 'e4e6d3935e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CONSTRAINT = 'ex_user_availabilities_no_overlap'
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if bind.execute(sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {'name': CONSTRAINT}).scalar():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # Neplatné intervaly a překryvy vzniklé souběžnými zápisy by vytvoření constraintu
+    # zablokovaly - z každé překrývající se dvojice zůstane starší záznam
+    op.execute("DELETE FROM user_availabilities WHERE available_to <= available_from")
+    op.execute(
+        "DELETE FROM user_availabilities a USING user_availabilities b "
+        "WHERE a.user_id = b.user_id AND a.slot_id = b.slot_id AND a.id > b.id "
+        "AND a.available_from < b.available_to AND a.available_to > b.available_from"
+    )
+    op.execute(
+        f"ALTER TABLE user_availabilities ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist "
+        "(user_id WITH =, slot_id WITH =, tstzrange(available_from, available_to, '[)') WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(f"ALTER TABLE user_availabilities DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
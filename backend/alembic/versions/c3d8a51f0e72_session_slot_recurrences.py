@@ -0,0 +1,71 @@
+"""Session slot recurrences
+
+Revision ID: c3d8a51f0e72
+Revises: 81ed42798b20
+Create Date: 2026-10-17 22:04:31.502117
+
+Opakované sloty sezení se ukládají jako pravidlo (session_slot_recurrences) a
+rozvinou se až pro požadované okno. Řádek session_slots vznikne jen pro výskyt,
+ke kterému někdo zadá dostupnost (session_slots.recurrence_id); unikátní
+(recurrence_id, slot_from) zabrání tomu, aby se výskyt zhmotnil dvakrát.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8a51f0e72'
+down_revision: Union[str, None] = '81ed42798b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLE = 'session_slot_recurrences'
+FOREIGN_KEY = 'fk_session_slots_recurrence_id_session_slot_recurrences'
+UNIQUE = 'uq_session_slots_recurrence_id_slot_from'
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        op.create_table(
+            TABLE,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('session_id', sa.Integer(), nullable=False),
+            sa.Column('frequency', sa.Enum('DAILY', 'WEEKLY', name='recurrencefrequencyenum'), nullable=False),
+            sa.Column('interval', sa.Integer(), nullable=False),
+            sa.Column('weekdays', sa.Integer(), nullable=True),
+            sa.Column('first_from', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('duration_minutes', sa.Integer(), nullable=False),
+            sa.Column('timezone', sa.String(), nullable=False),
+            sa.Column('until', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('count', sa.Integer(), nullable=True),
+            sa.Column('exceptions', sa.JSON(), nullable=False),
+            sa.Column('note', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_session_slot_recurrences_id'), TABLE, ['id'], unique=False)
+        op.create_index(op.f('ix_session_slot_recurrences_session_id'), TABLE, ['session_id'], unique=False)
+
+    if 'recurrence_id' not in {column['name'] for column in inspector.get_columns('session_slots')}:
+        # batch_alter_table kvůli SQLite (ALTER TABLE neumí přidat constraint)
+        with op.batch_alter_table('session_slots') as batch_op:
+            batch_op.add_column(sa.Column('recurrence_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(FOREIGN_KEY, TABLE, ['recurrence_id'], ['id'], ondelete='CASCADE')
+            batch_op.create_unique_constraint(UNIQUE, ['recurrence_id', 'slot_from'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('session_slots') as batch_op:
+        batch_op.drop_constraint(UNIQUE, type_='unique')
+        batch_op.drop_constraint(FOREIGN_KEY, type_='foreignkey')
+        batch_op.drop_column('recurrence_id')
+    op.drop_index(op.f('ix_session_slot_recurrences_session_id'), table_name=TABLE)
+    op.drop_index(op.f('ix_session_slot_recurrences_id'), table_name=TABLE)
+    op.drop_table(TABLE)
+    sa.Enum(name='recurrencefrequencyenum').drop(op.get_bind(), checkfirst=True)
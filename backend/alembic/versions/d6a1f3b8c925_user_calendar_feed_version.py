@@ -0,0 +1,33 @@
+"""User calendar feed version
+
+Revision ID: d6a1f3b8c925
+Revises: 5f2b7e9c1a04
+Create Date: 2026-10-17 23:05:48.114207
+
+Verze tokenů kalendářových feedů (users.calendar_feed_version). Token nese verzi
+a po její rotaci přestane platit; dříve vydané tokeny bez verze odpovídají 0.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a1f3b8c925'
+down_revision: Union[str, None] = '5f2b7e9c1a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'calendar_feed_version' not in {column['name'] for column in inspector.get_columns('users')}:
+        op.add_column(
+            'users',
+            sa.Column('calendar_feed_version', sa.Integer(), nullable=False, server_default='0'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'calendar_feed_version')
@@ -0,0 +1,58 @@
+"""Location materialized path
+
+Revision ID: e4e6d3935e90
+Revises: 73f5bb82d0b4
+Create Date: 2026-10-17 16:48:09.530127
+
+Přidá locations.path ("/<kořen>/.../<id>/") a locations.depth, aby dotazy na
+podstrom, hloubku a drobečkovou navigaci byly jen vyhledání v indexu, a dopočítá
+je pro existující data (stejný postup jako ``python -m app.db.location_paths``).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4e6d3935e90'
+down_revision: Union[str, None] = '73f5bb82d0b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c['name'] for c in inspector.get_columns('locations')}
+    with op.batch_alter_table('locations') as batch_op:
+        if 'path' not in columns:
+            batch_op.add_column(sa.Column('path', sa.String(), nullable=True))
+        if 'depth' not in columns:
+            batch_op.add_column(sa.Column('depth', sa.Integer(), nullable=True))
+    if 'ix_locations_path' not in {ix['name'] for ix in inspector.get_indexes('locations')}:
+        op.create_index(
+            'ix_locations_path', 'locations', ['path'], unique=False,
+            postgresql_ops={'path': 'text_pattern_ops'},
+        )
+
+    # Backfill po úrovních stromu - kořeny, pak opakovaně děti lokací, které už cestu mají
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        "UPDATE locations SET path = '/' || CAST(id AS VARCHAR) || '/', depth = 0 "
+        "WHERE parent_location_id IS NULL"
+    ))
+    while bind.execute(sa.text(
+        "UPDATE locations SET "
+        "path = (SELECT p.path FROM locations p WHERE p.id = locations.parent_location_id) "
+        "|| CAST(id AS VARCHAR) || '/', "
+        "depth = (SELECT p.depth + 1 FROM locations p WHERE p.id = locations.parent_location_id) "
+        "WHERE path IS NULL AND parent_location_id IN (SELECT id FROM locations WHERE path IS NOT NULL)"
+    )).rowcount:
+        pass
+
+
+def downgrade() -> None:
+    op.drop_index('ix_locations_path', table_name='locations')
+    with op.batch_alter_table('locations') as batch_op:
+        batch_op.drop_column('depth')
+        batch_op.drop_column('path')
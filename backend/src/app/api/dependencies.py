@@ -1,77 +1,79 @@
-from fastapi import Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from fastapi import Depends, HTTPException, Request, status, Path
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Tuple, Optional
 
 # Use absolute imports from the 'app' package
 from app import crud, models
 from app.db.session import get_db
 from app.auth.auth import get_current_user
-from app.models.user_campaign import CampaignRoleEnum
 # Import pro ověření vlastníka světa
-from app.models.world_user import RoleEnum as WorldRoleEnum, WorldUser 
+from app.models.world_user import RoleEnum as WorldRoleEnum
+from app.services.permission_service import PermissionResolver
+
+# Sjednocený resolver oprávnění - členství se načtou jednou za request, kontroly běží v paměti
+async def get_permissions(
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> PermissionResolver:
+    resolver = PermissionResolver.for_session(db, current_user.id)
+    request.state.permissions = resolver
+    return resolver
+
+async def _get_session_campaign_id(db: AsyncSession, session_id: int) -> int:
+    """Vrátí campaign_id sezení (jen jeden sloupec) nebo 404."""
+    campaign_id = await db.scalar(select(models.Session.campaign_id).where(models.Session.id == session_id))
+    if campaign_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    return campaign_id
 
 # Helper function to check campaign membership/role (GM)
-async def verify_gm_permission(campaign_id: int, current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    membership = crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
-    if not membership or membership.role != CampaignRoleEnum.GM:
+async def verify_gm_permission(campaign_id: int, current_user: models.User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_gm(campaign_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (GM required)")
-    return membership # Můžeme vrátit členství pro případné další použití
 
 # Helper function to check campaign membership (any role)
 async def verify_campaign_membership(
     session_id: int, # We get session_id from the path
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Dependency to verify if the current user is a member of the session's parent campaign."""
-    # 1. Get the session to find the campaign ID
-    db_session = crud.get_session(db, session_id=session_id)
-    if not db_session:
-        # Session existence is implicitly checked here
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    
+    # 1. Get the session's campaign ID (session existence is implicitly checked here)
+    campaign_id = await _get_session_campaign_id(db, session_id)
+
     # 2. Check membership in the parent campaign
-    membership = crud.get_campaign_membership(db, campaign_id=db_session.campaign_id, user_id=current_user.id)
-    if not membership:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_member(campaign_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this session's campaign")
-    # No need to return anything, just raise exception on failure
+    # campaign_id se hodí endpointům, které potřebují členy kampaně
+    return campaign_id
 
 # Dependency to verify GM permission based on session_id (Added)
 async def verify_gm_for_session(
     session_id: int, # Get session_id from path
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Dependency that verifies the current user is GM for the session's campaign."""
-    # 1. Get session
-    db_session = crud.get_session(db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    
+    # 1. Get session's campaign
+    campaign_id = await _get_session_campaign_id(db, session_id)
+
     # 2. Check GM permission for the parent campaign
-    membership = crud.get_campaign_membership(db, campaign_id=db_session.campaign_id, user_id=current_user.id)
-    if not membership or membership.role != CampaignRoleEnum.GM:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_gm(campaign_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (GM required for this session's campaign)")
-    # Return the session? Or membership? Or nothing? Let's return nothing for now.
+    # campaign_id se hodí zápisům, které po commitu označují změnu kampaně
+    return campaign_id
 
 # Závislost pro ověření vlastnictví světa
 async def verify_world_owner(
     world_id: int, # world_id přijde z Path nebo z těla požadavku, ne přímo jako parametr Path() zde
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Dependency to verify if the current user owns the world."""
-    is_owner = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == world_id,
-            WorldUser.user_id == current_user.id,
-            WorldUser.role == WorldRoleEnum.OWNER
-        )
-        .first()
-    )
-    if not is_owner:
-        world = crud.get_world(db, world_id=world_id)
+    if not await PermissionResolver.for_session(db, current_user.id).is_world_owner(world_id):
+        world = await crud.get_world(db, world_id=world_id)
         if not world:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions, must be world owner")
@@ -81,10 +83,10 @@ async def verify_world_owner(
 
 async def get_world_or_404(
     world_id: int = Path(..., description="ID světa"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> models.World:
     """Načte svět podle ID nebo vrátí 404."""
-    db_world = crud.get_world(db, world_id=world_id)
+    db_world = await crud.get_world(db, world_id=world_id)
     if not db_world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
     return db_world
@@ -93,15 +95,14 @@ async def get_world_or_404(
 # Příklad závislosti pro ověření GM kampaně:
 async def get_campaign_and_verify_gm(
     campaign_id: int = Path(..., description="ID kampaně"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Campaign:
-    db_campaign = crud.get_campaign(db, campaign_id=campaign_id)
+    db_campaign = await crud.get_campaign(db, campaign_id=campaign_id)
     if not db_campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
 
-    membership = await crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
-    if not membership or membership.role not in [crud.CampaignRoleEnum.GM]: # TODO: Použít enum správně
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_gm(campaign_id):
          raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="GM permissions required")
 
     return db_campaign
@@ -109,15 +110,14 @@ async def get_campaign_and_verify_gm(
 # Příklad závislosti pro ověření člena kampaně (GM nebo Player):
 async def get_campaign_and_verify_member(
     campaign_id: int = Path(..., description="ID kampaně"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Campaign:
-    db_campaign = crud.get_campaign(db, campaign_id=campaign_id)
+    db_campaign = await crud.get_campaign(db, campaign_id=campaign_id)
     if not db_campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
 
-    membership = await crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
-    if not membership:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_member(campaign_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this campaign")
 
     return db_campaign
@@ -125,10 +125,10 @@ async def get_campaign_and_verify_member(
 # Závislost pro získání session a ověření GM oprávnění (přes kampaň)
 async def get_session_and_verify_gm(
     session_id: int = Path(..., description="ID sezení"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Session:
-    db_session = crud.get_session(db=db, session_id=session_id)
+    db_session = await crud.get_session(db=db, session_id=session_id)
     if not db_session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     
@@ -147,42 +147,35 @@ async def get_session_and_verify_gm(
 
 async def get_journal_and_verify_permission(
     journal_id: int = Path(..., description="ID deníku"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
-) -> Tuple[models.Journal, models.Character, Optional[models.WorldUser]]:
-    """Dependency to get journal, its character, and user's world membership."""
-    db_journal = crud.get_journal(db, journal_id=journal_id)
+) -> Tuple[models.Journal, models.Character, Optional[WorldRoleEnum]]:
+    """Dependency to get journal, its character, and user's world role."""
+    db_journal = await crud.get_journal(db, journal_id=journal_id)
     if not db_journal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal not found")
     
-    db_character = crud.get_character(db, character_id=db_journal.character_id)
+    db_character = await crud.get_character(db, character_id=db_journal.character_id)
     if not db_character:
         # Should not happen if journal exists, but good practice
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character for this journal not found")
 
-    # Get world membership (if any) - replaced function call with direct query
-    world_membership = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == db_character.world_id,
-            WorldUser.user_id == current_user.id
-        )
-        .first()
-    )
+    # Role ve světě (pokud je členem) z resolveru oprávnění
+    world_role = await PermissionResolver.for_session(db, current_user.id).world_role(db_character.world_id)
 
-    return db_journal, db_character, world_membership
+    return db_journal, db_character, world_role
 
 async def verify_journal_read_access(
-    context: Tuple[models.Journal, models.Character, Optional[models.WorldUser]] = Depends(get_journal_and_verify_permission),
+    context: Tuple[models.Journal, models.Character, Optional[WorldRoleEnum]] = Depends(get_journal_and_verify_permission),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Journal:
     """Verifies read access: Assigned user or World Owner/Admin."""
-    db_journal, db_character, world_membership = context
+    db_journal, db_character, world_role = context
     
     # Check if assigned user
     is_assigned_user = db_character.user_id == current_user.id
     # Check if world owner or admin
-    is_world_manager = world_membership and world_membership.role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
+    is_world_manager = world_role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
 
     if not (is_assigned_user or is_world_manager):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this journal")
@@ -190,13 +183,13 @@ async def verify_journal_read_access(
     return db_journal
 
 async def verify_journal_write_access(
-    context: Tuple[models.Journal, models.Character, Optional[models.WorldUser]] = Depends(get_journal_and_verify_permission)
+    context: Tuple[models.Journal, models.Character, Optional[WorldRoleEnum]] = Depends(get_journal_and_verify_permission)
 ) -> models.Journal:
     """Verifies write access: World Owner/Admin only."""
-    db_journal, _, world_membership = context # Character not needed here
+    db_journal, _, world_role = context # Character not needed here
     
     # Check if world owner or admin
-    is_world_manager = world_membership and world_membership.role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
+    is_world_manager = world_role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
 
     if not is_world_manager:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only world Owner or Admin can modify this journal")
@@ -207,17 +200,17 @@ async def verify_journal_write_access(
 
 async def get_journal_entry_and_verify_permission(
     entry_id: int = Path(..., description="ID záznamu v deníku"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
-) -> Tuple[models.JournalEntry, models.Character, Optional[models.WorldUser]]:
-    """Dependency to get entry, its character, and user's world membership."""
-    db_entry = crud.get_journal_entry(db, entry_id=entry_id)
+) -> Tuple[models.JournalEntry, models.Character, Optional[WorldRoleEnum]]:
+    """Dependency to get entry, its character, and user's world role."""
+    db_entry = await crud.get_journal_entry(db, entry_id=entry_id)
     if not db_entry:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal entry not found")
 
     # Get context via the parent journal
     try:
-        _, db_character, world_membership = await get_journal_and_verify_permission(
+        _, db_character, world_role = await get_journal_and_verify_permission(
             journal_id=db_entry.journal_id, db=db, current_user=current_user
         )
     except HTTPException as e:
@@ -226,17 +219,17 @@ async def get_journal_entry_and_verify_permission(
          # Or just let the original exception propagate
          raise e
 
-    return db_entry, db_character, world_membership
+    return db_entry, db_character, world_role
 
 async def verify_journal_entry_read_access(
-    context: Tuple[models.JournalEntry, models.Character, Optional[models.WorldUser]] = Depends(get_journal_entry_and_verify_permission),
+    context: Tuple[models.JournalEntry, models.Character, Optional[WorldRoleEnum]] = Depends(get_journal_entry_and_verify_permission),
     current_user: models.User = Depends(get_current_user)
 ) -> models.JournalEntry:
     """Verifies read access: Assigned user or World Owner/Admin."""
-    db_entry, db_character, world_membership = context
+    db_entry, db_character, world_role = context
     
     is_assigned_user = db_character.user_id == current_user.id
-    is_world_manager = world_membership and world_membership.role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
+    is_world_manager = world_role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
 
     if not (is_assigned_user or is_world_manager):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this journal entry")
@@ -244,16 +237,16 @@ async def verify_journal_entry_read_access(
     return db_entry
 
 async def verify_journal_entry_write_access(
-    context: Tuple[models.JournalEntry, models.Character, Optional[models.WorldUser]] = Depends(get_journal_entry_and_verify_permission),
+    context: Tuple[models.JournalEntry, models.Character, Optional[WorldRoleEnum]] = Depends(get_journal_entry_and_verify_permission),
     current_user: models.User = Depends(get_current_user)
 ) -> models.JournalEntry:
     """Verifies write access: Assigned Character User OR World Owner/Admin."""
-    db_entry, db_character, world_membership = context
+    db_entry, db_character, world_role = context
     
     # Check if assigned user
     is_assigned_user = db_character.user_id == current_user.id
     # Check if world owner or admin
-    is_world_manager = world_membership and world_membership.role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
+    is_world_manager = world_role in [WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN]
 
     # Allow if either condition is met
     if not (is_assigned_user or is_world_manager):
@@ -265,10 +258,10 @@ async def verify_journal_entry_write_access(
 
 async def get_character_or_404(
     character_id: int = Path(..., description="ID charakteru"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> models.Character:
     """Načte charakter podle ID nebo vrátí 404."""
-    db_character = crud.get_character(db, character_id=character_id)
+    db_character = await crud.get_character(db, character_id=character_id)
     if not db_character:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
     return db_character
@@ -276,7 +269,7 @@ async def get_character_or_404(
 async def verify_character_permission(
     character: models.Character = Depends(get_character_or_404), # Získáme charakter
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Dependency to verify if the current user can modify the character (owner or world GM/Owner)."""
     # 1. Check if the current user is the character owner
@@ -284,17 +277,7 @@ async def verify_character_permission(
         return # Owner has permission
 
     # 2. Check if the current user is GM or Owner of the world the character belongs to
-    world_membership = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == character.world_id,
-            WorldUser.user_id == current_user.id,
-            WorldUser.role.in_([WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN])
-        )
-        .first()
-    )
-    
-    if world_membership:
+    if await PermissionResolver.for_session(db, current_user.id).is_world_manager(character.world_id):
         return # World Owner/GM has permission
 
     # If neither condition is met, raise forbidden
@@ -302,14 +285,9 @@ async def verify_character_permission(
 
 # --- New Dependency/Helper Function ---
 
-def check_world_membership(db: Session, world_id: int, user_id: int):
+async def check_world_membership(db: AsyncSession, world_id: int, user_id: int):
     """Checks if a user is a member of a world, raises 403 if not."""
-    membership = db.query(WorldUser).filter(
-        WorldUser.world_id == world_id,
-        WorldUser.user_id == user_id
-    ).first()
-    
-    if not membership:
+    if not await PermissionResolver.for_session(db, user_id).is_world_member(world_id):
         # If world exists but user is not a member, or if world doesn't exist
         # and membership is required anyway, always return 403.
         # The existence of the world itself should be checked by the calling endpoint if needed.
@@ -28,6 +28,9 @@ from . import item_tags
 from . import organization_tag_types
 from . import generation
 from . import session_availability
+from . import calendar_feeds
+from . import slot_recurrences
+from . import metrics
 
 router = APIRouter()
 
@@ -41,6 +44,7 @@ router.include_router(characters.router, prefix="/characters", tags=["characters
 router.include_router(journals.router, prefix="/journals", tags=["journals"])
 router.include_router(journal_entries.router)
 router.include_router(sessions.router, prefix="/sessions", tags=["sessions"])
+router.include_router(calendar_feeds.router, prefix="/calendar", tags=["calendar"])
 router.include_router(locations.router, prefix="/locations", tags=["locations"])
 # Přidání routeru pro itemy
 router.include_router(items.router, prefix="/items", tags=["items"])
@@ -69,6 +73,11 @@ router.include_router(
     prefix="/sessions/{session_id}",
     tags=["session-availability"]
 )
+router.include_router(
+    slot_recurrences.router,
+    prefix="/sessions/{session_id}",
+    tags=["slot-recurrences"]
+)
 
 # Registrace obecného routeru pro pozvánky (přijetí/smazání)
 router.include_router(
@@ -80,6 +89,9 @@ router.include_router(
 # Přidána registrace generation routeru
 router.include_router(generation.router, prefix="/ai", tags=["ai"])
 
+# Provozní metriky (connection pool apod.) - jen s interním tokenem METRICS_TOKEN
+router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+
 # Přidejte další endpointy z původního endpoints.py
 @router.get("/healthcheck")
 async def healthcheck():
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app import crud
+from app.core.config import settings
+from app.core.limiter import limiter
+from app.core.security import decode_calendar_feed_token
+from app.db.session import get_db
+from app.services import calendar_feed
+from app.services.permission_service import PermissionResolver
+
+# iCalendar feedy pro kalendářové klienty (Google, Apple, Thunderbird...) - autorizace
+# tokenem v URL, odkazy vrací GET /users/me/calendar/feeds
+router = APIRouter(tags=["calendar"])
+
+
+async def get_feed_user_id(
+    token: str = Query(..., description="Calendar feed token from /users/me/calendar/feeds"),
+    db: AsyncSession = Depends(get_db),
+) -> int:
+    claims = decode_calendar_feed_token(token)
+    # Token musí nést aktuální verzi uživatele - po rotaci staré odkazy přestanou platit
+    if claims is None or await crud.get_calendar_feed_version(db, user_id=claims[0]) != claims[1]:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid calendar feed token")
+    return claims[0]
+
+
+async def _feed_response(
+    request: Request, db: AsyncSession, scope: str, name: Optional[str],
+    campaign_ids: List[int], user_id: Optional[int] = None,
+) -> Response:
+    """Podmíněná odpověď feedem - 304 se s razítky v Redisu vyřídí jen s ověřením verze tokenu.
+
+    Bez `name` se feed pojmenuje podle kampaně svého prvního sezení.
+    """
+    stamps = await calendar_feed.get_stamps(campaign_ids)
+    if stamps is not None:
+        validators = calendar_feed.validators_from_stamps(scope, stamps)
+        if calendar_feed.is_not_modified(request.headers, validators):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
+
+    sessions = await crud.get_calendar_feed(db, campaign_ids=campaign_ids, user_id=user_id)
+    if stamps is None:
+        stamps = await calendar_feed.seed_stamps(campaign_ids, sessions)
+        if stamps is not None:
+            validators = calendar_feed.validators_from_stamps(scope, stamps)
+        else:
+            validators = calendar_feed.validators_from_rows(scope, sessions)
+        if calendar_feed.is_not_modified(request.headers, validators):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
+
+    if name is None:
+        name = sessions[0]["campaign_name"] if sessions else "Sesplan"
+    return StreamingResponse(
+        calendar_feed.render(name, sessions), media_type=calendar_feed.MEDIA_TYPE, headers=validators.headers()
+    )
+
+
+@router.get("/feed.ics", response_class=StreamingResponse)
+@limiter.limit(settings.GENERIC_READ_LIMIT)
+async def read_user_calendar_feed(
+    request: Request,
+    user_id: int = Depends(get_feed_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Personal feed: sessions and slots of all the user's campaigns plus their own availability."""
+    campaign_ids = sorted(await PermissionResolver.for_session(db, user_id).campaign_roles())
+    return await _feed_response(
+        request, db, scope=f"user:{user_id}", name="Sesplan", campaign_ids=campaign_ids, user_id=user_id
+    )
+
+
+@router.get("/campaigns/{campaign_id}.ics", response_class=StreamingResponse)
+@limiter.limit(settings.GENERIC_READ_LIMIT)
+async def read_campaign_calendar_feed(
+    request: Request,
+    campaign_id: int = Path(..., description="ID kampaně"),
+    user_id: int = Depends(get_feed_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Campaign feed: its sessions and slots. Requires campaign membership."""
+    if not await PermissionResolver.for_session(db, user_id).is_campaign_member(campaign_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this campaign")
+    return await _feed_response(
+        request, db, scope=f"campaign:{campaign_id}", name=None, campaign_ids=[campaign_id],
+    )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ... import crud, models, schemas
@@ -7,8 +8,8 @@ from ...db.session import get_db
 from ...auth.auth import get_current_user
 # Import the dependency
 from ..dependencies import verify_gm_permission
+from ...services.permission_service import PermissionResolver
 # Import enum for manual check fallback if needed
-from ...models.user_campaign import CampaignRoleEnum
 
 # Použijeme samostatný router pro invite operace, které nejsou přímo pod /campaigns/{id}
 # Např. přijetí pozvánky pomocí tokenu
@@ -21,14 +22,14 @@ async def create_campaign_invite(
     *,
     campaign_id: int,
     invite_in: schemas.CampaignInviteCreate,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """
     Create a new invite for a campaign. Requires GM role.
     """
     # Authorization checked by verify_gm_permission dependency
-    invite = crud.create_campaign_invite(db=db, campaign_id=campaign_id, invite_in=invite_in)
+    invite = await crud.create_campaign_invite(db=db, campaign_id=campaign_id, invite_in=invite_in)
     if not invite:
          # Může nastat, pokud kampaň mezitím zmizela (nepravděpodobné)
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
@@ -40,33 +41,33 @@ async def read_campaign_invites(
     campaign_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """
     Retrieve invites for a campaign. Requires GM role.
     """
     # Authorization checked by verify_gm_permission dependency
-    invites = crud.get_invites_by_campaign(db, campaign_id=campaign_id, skip=skip, limit=limit)
+    invites = await crud.get_invites_by_campaign(db, campaign_id=campaign_id, skip=skip, limit=limit)
     return invites
 
 # Tento endpoint bude mít prefix /invites
 @invite_router.post("/{token}/accept", response_model=schemas.CampaignInviteAcceptResponse)
-def accept_invite(
+async def accept_invite(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: str,
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Accept a campaign invite using the token. Adds the current user to the campaign.
     """
-    invite = crud.get_invite_by_token(db, token=token)
+    invite = await crud.get_invite_by_token(db, token=token)
     if not invite:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invite not found")
 
     # Unpack the new return value including character_id
-    success, message, campaign_id, role, character_id = crud.accept_campaign_invite(
+    success, message, campaign_id, role, character_id = await crud.accept_campaign_invite(
         db=db, invite=invite, user_id=current_user.id
     )
 
@@ -88,7 +89,7 @@ def accept_invite(
 @invite_router.delete("/{invite_id}", response_model=schemas.CampaignInvite)
 async def delete_invite(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     invite_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
@@ -96,16 +97,16 @@ async def delete_invite(
     Delete a campaign invite. Requires GM role for the associated campaign.
     """
     # Získáme pozvánku
-    db_invite = db.query(models.CampaignInvite).filter(models.CampaignInvite.id == invite_id).first()
+    result = await db.execute(select(models.CampaignInvite).where(models.CampaignInvite.id == invite_id))
+    db_invite = result.scalars().first()
     if not db_invite:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invite not found")
 
     # Ověříme GM oprávnění pro danou kampaň manuálně
-    gm_membership = crud.get_campaign_membership(db, campaign_id=db_invite.campaign_id, user_id=current_user.id)
-    if not gm_membership or gm_membership.role != CampaignRoleEnum.GM:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_gm(db_invite.campaign_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (GM required)")
 
     # Smažeme pozvánku
-    deleted_invite = crud.delete_campaign_invite(db=db, invite_id=invite_id)
+    deleted_invite = await crud.delete_campaign_invite(db=db, invite_id=invite_id)
     # crud vrací None, pokud nenajde, ale už jsme ověřili
     return deleted_invite 
\ No newline at end of file
@@ -1,32 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 
 from ... import crud, models, schemas
 from ...db.session import get_db
 from ...auth.auth import get_current_user
 from . import campaign_invites # Import the campaign invites endpoints
-from ...models.world_user import RoleEnum as WorldRoleEnum # Enum pro role ve světě
 from ..dependencies import verify_gm_permission
+from ...services import calendar_feed
+from ...services.permission_service import PermissionResolver
 
 router = APIRouter()
 
 # Helper function to check world ownership
-async def verify_world_owner(world_id: int, user_id: int, db: Session = Depends(get_db)):
-    membership = db.query(models.WorldUser).filter(
-        models.WorldUser.world_id == world_id,
-        models.WorldUser.user_id == user_id,
-        models.WorldUser.role == WorldRoleEnum.OWNER
-    ).first()
-    if not membership:
+async def verify_world_owner(world_id: int, user_id: int, db: AsyncSession = Depends(get_db)):
+    if not await PermissionResolver.for_session(db, user_id).is_world_owner(world_id):
         # Svět nenalezen nebo uživatel není vlastník
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="World not found or not owned by user")
-    return membership
 
 @router.post("/", response_model=schemas.Campaign)
 async def create_campaign(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     campaign_in: schemas.CampaignCreate,
     current_user: models.User = Depends(get_current_user)
 ):
@@ -35,7 +32,7 @@ async def create_campaign(
     await verify_world_owner(campaign_in.world_id, current_user.id, db)
 
     # CRUD funkce se postará o vytvoření kampaně a přiřazení GM role
-    campaign = crud.create_campaign(db=db, campaign=campaign_in, creator_id=current_user.id)
+    campaign = await crud.create_campaign(db=db, campaign=campaign_in, creator_id=current_user.id)
     if not campaign:
         # CRUD by neměla vrátit None, pokud prošlo ověření světa, ale pro jistotu
         raise HTTPException(status_code=500, detail="Failed to create campaign")
@@ -43,7 +40,7 @@ async def create_campaign(
 
 @router.get("/", response_model=List[schemas.Campaign])
 async def read_campaigns(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
@@ -52,39 +49,34 @@ async def read_campaigns(
     """Retrieve campaigns. If world_id is provided, user must be member of the world."""
     if world_id:
         # Ověření, zda je uživatel členem světa
-        world_membership = db.query(models.WorldUser).filter(
-            models.WorldUser.world_id == world_id,
-            models.WorldUser.user_id == current_user.id
-        ).first()
-        if not world_membership:
+        if not await PermissionResolver.for_session(db, current_user.id).is_world_member(world_id):
              # Check if world is public first? Assuming private worlds require membership
-             world = crud.get_world(db, world_id=world_id)
+             world = await crud.get_world(db, world_id=world_id)
              if not world or not world.is_public:
                  raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found or access denied")
              # If public, allow fetching campaigns (they might be filtered later by campaign membership)
 
         # Vrátí kampaně daného světa (bez ohledu na členství v kampani zde)
-        campaigns = crud.get_campaigns_by_world(db, world_id=world_id, skip=skip, limit=limit)
+        campaigns = await crud.get_campaigns_by_world(db, world_id=world_id, skip=skip, limit=limit)
     else:
         # Vrátí všechny kampaně, kde je uživatel GM
-        campaigns = crud.get_campaigns_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
+        campaigns = await crud.get_campaigns_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
     return campaigns
 
 @router.get("/{campaign_id}", response_model=schemas.Campaign)
 async def read_campaign(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     campaign_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Get campaign by ID. Requires membership in the campaign."""
-    campaign = crud.get_campaign(db, campaign_id=campaign_id)
+    campaign = await crud.get_campaign(db, campaign_id=campaign_id)
     if not campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
 
     # Ověření členství v kampani
-    membership = crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
-    if not membership:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_member(campaign_id):
         # Mohli bychom zde také zkontrolovat, zda svět kampaně není veřejný,
         # ale pro detail kampaně dává smysl vyžadovat členství.
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions to access this campaign")
@@ -96,33 +88,34 @@ async def update_campaign(
     *,
     campaign_id: int,
     campaign_in: schemas.CampaignUpdate,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """Update a campaign. Requires GM role."""
-    # gm_membership již obsahuje načtenou kampaň (nepřímo), ale pro jistotu načteme znovu
-    db_campaign = crud.get_campaign(db, campaign_id=campaign_id)
+    db_campaign = await crud.get_campaign(db, campaign_id=campaign_id)
     if not db_campaign:
          raise HTTPException(status_code=404, detail="Campaign not found") # Mělo by být ošetřeno už ve verify_gm_permission
 
     # CRUD funkce provede update
-    campaign = crud.update_campaign(db=db, db_campaign=db_campaign, campaign_in=campaign_in)
+    campaign = await crud.update_campaign(db=db, db_campaign=db_campaign, campaign_in=campaign_in)
+    # Název kampaně je součástí iCalendar feedu
+    await calendar_feed.touch(campaign_id)
     return campaign
 
 @router.delete("/{campaign_id}", response_model=schemas.Campaign)
 async def delete_campaign(
     *,
     campaign_id: int,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """Delete a campaign. Requires GM role."""
-    db_campaign = crud.get_campaign(db, campaign_id=campaign_id)
+    db_campaign = await crud.get_campaign(db, campaign_id=campaign_id)
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     # CRUD funkce provede smazání
-    campaign = crud.delete_campaign(db=db, db_campaign=db_campaign)
+    campaign = await crud.delete_campaign(db=db, db_campaign=db_campaign)
     return campaign
 
 # --- Member Management Router ---
@@ -134,11 +127,11 @@ async def read_campaign_members(
     campaign_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """Retrieve members of a campaign. Only GMs can view the full list."""
-    members = crud.get_campaign_members(db, campaign_id=campaign_id, skip=skip, limit=limit)
+    members = await crud.get_campaign_members(db, campaign_id=campaign_id, skip=skip, limit=limit)
     return members
 
 # New endpoint to get current user's membership
@@ -146,7 +139,7 @@ async def read_campaign_members(
 async def read_my_campaign_membership(
     *,
     campaign_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Get the current user's membership details for a specific campaign."""
@@ -154,22 +147,22 @@ async def read_my_campaign_membership(
     # We can use the existing dependency for this
     # await get_campaign_and_verify_member(campaign_id=campaign_id, db=db, current_user=current_user)
     # Or call the CRUD function directly as it's simpler here
-    membership = crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
+    membership = await crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
     if not membership:
         # Check if campaign exists before raising 403? Maybe just 403 is enough.
-        # db_campaign = crud.get_campaign(db, campaign_id=campaign_id)
+        # db_campaign = await crud.get_campaign(db, campaign_id=campaign_id)
         # if not db_campaign:
         #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this campaign")
     
     # Need to reload with user details for the response model
     # (assuming get_campaign_membership doesn't eager load user)
-    reloaded_membership = (
-        db.query(models.UserCampaign)
+    result = await db.execute(
+        select(models.UserCampaign)
         .options(joinedload(models.UserCampaign.user))
-        .filter(models.UserCampaign.id == membership.id)
-        .first()
+        .where(models.UserCampaign.id == membership.id)
     )
+    reloaded_membership = result.scalars().first()
     if not reloaded_membership:
          raise HTTPException(status_code=500, detail="Failed to load membership details")
     return reloaded_membership
@@ -180,11 +173,11 @@ async def update_member_role(
     campaign_id: int,
     user_id: int,
     role_update: schemas.UserCampaignUpdate,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    _=Depends(verify_gm_permission)
 ):
     """Update the role of a campaign member. Only GMs can update roles."""
-    updated_membership = crud.update_campaign_member_role(
+    updated_membership = await crud.update_campaign_member_role(
         db, campaign_id=campaign_id, user_id=user_id, role_update=role_update
     )
     if updated_membership is None:
@@ -193,12 +186,12 @@ async def update_member_role(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=updated_membership)
 
     # Načíst znovu s detaily uživatele pro response_model
-    final_membership = (
-        db.query(models.UserCampaign)
+    result = await db.execute(
+        select(models.UserCampaign)
         .options(joinedload(models.UserCampaign.user))
-        .filter(models.UserCampaign.id == updated_membership.id)
-        .first()
+        .where(models.UserCampaign.id == updated_membership.id)
     )
+    final_membership = result.scalars().first()
     # Handle case where final_membership might be None (shouldn't happen if update worked)
     if not final_membership:
         raise HTTPException(status_code=500, detail="Failed to reload membership after update")
@@ -209,14 +202,15 @@ async def remove_member(
     *,
     campaign_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
-    gm_membership: models.UserCampaign = Depends(verify_gm_permission)
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _=Depends(verify_gm_permission)
 ):
     """Remove a member from a campaign. Only GMs can remove members."""
-    if gm_membership.user_id == user_id:
+    if current_user.id == user_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="GM cannot remove themselves via this endpoint. Delete the campaign instead or assign another GM.")
 
-    result = crud.remove_campaign_member(db, campaign_id=campaign_id, user_id_to_remove=user_id)
+    result = await crud.remove_campaign_member(db, campaign_id=campaign_id, user_id_to_remove=user_id)
 
     if result is False:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ... import crud, models, schemas
@@ -13,9 +13,9 @@ router = APIRouter()
 async def get_character_tag_type_from_world(
     tag_type_id: int = Path(..., description="ID typu tagu charakteru"),
     world: models.World = Depends(get_world_or_404),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.CharacterTagType:
-    db_tag_type = crud.get_character_tag_type(db, tag_type_id=tag_type_id)
+    db_tag_type = await crud.get_character_tag_type(db, tag_type_id=tag_type_id)
     if not db_tag_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character tag type not found")
     if db_tag_type.world_id != world.id:
@@ -35,30 +35,30 @@ async def create_character_tag_type(
     *,
     world_id: int, # Přichází z prefixu
     tag_type_in: schemas.CharacterTagTypeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     _=Depends(verify_world_owner) # Ověření vlastníka světa
 ):
     """Vytvoří nový typ tagu pro charaktery v rámci specifikovaného světa. Vyžaduje vlastnictví světa."""
     # Ověření vlastníka světa je zajištěno závislostí verify_world_owner
     try:
-        db_tag_type = crud.create_character_tag_type(db=db, tag_type_in=tag_type_in, world_id=world_id)
+        db_tag_type = await crud.create_character_tag_type(db=db, tag_type_in=tag_type_in, world_id=world_id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return db_tag_type
 
 @router.get("", response_model=List[schemas.CharacterTagType], summary="Získat typy tagů charakterů světa")
-def read_character_tag_types(
+async def read_character_tag_types(
     *,
     world: models.World = Depends(get_world_or_404), # Ověří existenci světa a získá ho
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     # TODO: Ověřit členství ve světě pro čtení? Nebo stačí být přihlášen?
     current_user: models.User = Depends(get_current_user) # Zatím jen ověření přihlášení
 ):
     """Získá seznam všech typů tagů pro charaktery v rámci specifikovaného světa."""
-    tag_types = crud.get_character_tag_types_by_world(db=db, world_id=world.id, skip=skip, limit=limit)
+    tag_types = await crud.get_character_tag_types_by_world(db=db, world_id=world.id, skip=skip, limit=limit)
     return tag_types
 
 @router.put("/{tag_type_id}", response_model=schemas.CharacterTagType, summary="Aktualizovat typ tagu charakteru")
@@ -67,7 +67,7 @@ async def update_character_tag_type(
     world_id: int, # Přichází z prefixu, potřeba pro ověření vlastníka
     tag_type_id: int = Path(..., description="ID typu tagu charakteru"),
     tag_type_in: schemas.CharacterTagTypeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     _=Depends(verify_world_owner) # Ověření vlastníka světa
 ):
@@ -78,7 +78,7 @@ async def update_character_tag_type(
     db_tag_type = await get_character_tag_type_from_world(tag_type_id=tag_type_id, world=world, db=db)
 
     try:
-        updated_tag_type = crud.update_character_tag_type(db=db, db_tag_type=db_tag_type, tag_type_in=tag_type_in)
+        updated_tag_type = await crud.update_character_tag_type(db=db, db_tag_type=db_tag_type, tag_type_in=tag_type_in)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return updated_tag_type
@@ -88,7 +88,7 @@ async def delete_character_tag_type(
     *,
     world_id: int, # Přichází z prefixu, potřeba pro ověření vlastníka
     tag_type_id: int = Path(..., description="ID typu tagu charakteru"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     _=Depends(verify_world_owner) # Ověření vlastníka světa
 ):
@@ -97,5 +97,5 @@ async def delete_character_tag_type(
     world = await get_world_or_404(world_id=world_id, db=db)
     db_tag_type = await get_character_tag_type_from_world(tag_type_id=tag_type_id, world=world, db=db)
     
-    deleted_tag_type = crud.delete_character_tag_type(db=db, db_tag_type=db_tag_type)
+    deleted_tag_type = await crud.delete_character_tag_type(db=db, db_tag_type=db_tag_type)
     return deleted_tag_type 
\ No newline at end of file
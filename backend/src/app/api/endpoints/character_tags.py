@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy.orm
 from typing import List
 
@@ -23,7 +24,7 @@ async def add_tag_to_character_endpoint(
     *, 
     character_id: int, # Získáno z prefixu nadřazeného routeru
     tag_type_id: int = Path(..., description="ID typu tagu charakteru, který se má přidat"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     # Ověření, že charakter existuje a uživatel má práva ho upravit
     _=Depends(verify_character_permission) # verify_character_permission použije character_id z prefixu
@@ -31,7 +32,7 @@ async def add_tag_to_character_endpoint(
     """Přidá specifický typ tagu k charakteru."""
     try:
         # Samotné CRUD operace by měly ověřit, že tag type patří ke správnému světu
-        db_tag = crud.add_tag_to_character(db=db, character_id=character_id, tag_type_id=tag_type_id)
+        db_tag = await crud.add_tag_to_character(db=db, character_id=character_id, tag_type_id=tag_type_id)
     except ValueError as e:
         # Může nastat, pokud CRUD vyhodí ValueError (např. nekompatibilní svět)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -40,9 +41,12 @@ async def add_tag_to_character_endpoint(
         raise e
         
     # Načteme přiřazení tagu včetně detailů tag_type pro response
-    db_tag_with_details = db.query(models.CharacterTag).options(
-        sqlalchemy.orm.joinedload(models.CharacterTag.tag_type)
-    ).filter(models.CharacterTag.id == db_tag.id).first()
+    result = await db.execute(
+        select(models.CharacterTag).options(
+            sqlalchemy.orm.joinedload(models.CharacterTag.tag_type)
+        ).where(models.CharacterTag.id == db_tag.id)
+    )
+    db_tag_with_details = result.scalars().first()
     
     return db_tag_with_details
 
@@ -55,13 +59,13 @@ async def remove_tag_from_character_endpoint(
     *, 
     character_id: int, # Získáno z prefixu nadřazeného routeru
     tag_type_id: int = Path(..., description="ID typu tagu charakteru, který se má odebrat"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     # Ověření, že charakter existuje a uživatel má práva ho upravit
     _=Depends(verify_character_permission)
 ):
     """Odebere specifický typ tagu z charakteru."""
-    deleted_tag = crud.remove_tag_from_character(db=db, character_id=character_id, tag_type_id=tag_type_id)
+    deleted_tag = await crud.remove_tag_from_character(db=db, character_id=character_id, tag_type_id=tag_type_id)
     if not deleted_tag:
         # CRUD nevrátil nic, protože tag nebyl nalezen/přiřazen
         # Můžeme vrátit 404 nebo nechat 204 (protože výsledný stav je stejný - tag není přiřazen)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import sqlalchemy.orm
 
@@ -7,13 +8,14 @@ from ... import crud, models, schemas
 from ...db.session import get_db
 from ...auth.auth import get_current_user
 # Import helper function and RoleEnum
-from ...models.world_user import RoleEnum, WorldUser
+from ...models.world_user import RoleEnum
+from ...services.permission_service import PermissionResolver
 
 router = APIRouter()
 
 # --- Helper for Permission Check --- Dependency maybe better later
-def check_character_permission(
-    db: Session,
+async def check_character_permission(
+    db: AsyncSession,
     user: models.User,
     character: models.Character,
     allow_assigned: bool = True,
@@ -27,25 +29,16 @@ def check_character_permission(
     if allow_assigned and character.user_id == user.id:
         return True
         
-    # 2. Check world membership and role
-    membership = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == character.world_id,
-            WorldUser.user_id == user.id
-        )
-        .first()
-    )
-    
-    if membership and roles_allowed and membership.role in roles_allowed:
+    # 2. Check world role (resolver oprávnění - bez dalšího dotazu v rámci requestu)
+    if roles_allowed and await PermissionResolver.for_session(db, user.id).has_world_role(character.world_id, *roles_allowed):
         return True
         
     return False
 
 @router.post("/", response_model=schemas.Character)
-def create_character(
+async def create_character(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     character_in: schemas.CharacterCreate,
     current_user: models.User = Depends(get_current_user)
 ):
@@ -53,15 +46,15 @@ def create_character(
     Create new character. User must be a member of the world.
     """
     # CRUD funkce create_character nyní ověřuje členství ve světě
-    character = crud.create_character(db=db, character_in=character_in, user_id=current_user.id)
+    character = await crud.create_character(db=db, character_in=character_in, user_id=current_user.id)
     if not character:
         # CRUD vrátí None, pokud uživatel není členem světa nebo svět neexistuje
         raise HTTPException(status_code=403, detail="World not found or user is not a member")
     return character
 
 @router.get("/", response_model=List[schemas.Character])
-def read_characters(
-    db: Session = Depends(get_db),
+async def read_characters(
+    db: AsyncSession = Depends(get_db),
     world_id: Optional[int] = None, # Allow filtering by world
     skip: int = 0,
     limit: int = 100,
@@ -75,35 +68,28 @@ def read_characters(
         # Zde není potřeba ověřovat členství ve světě explicitně,
         # protože get_characters_by_world vrací jen postavy patřící current_user,
         # které mohou existovat jen ve světě, jehož je členem (ověřeno při create_character).
-        characters = crud.get_characters_by_world(db, world_id=world_id, user_id=current_user.id, skip=skip, limit=limit)
+        characters = await crud.get_characters_by_world(db, world_id=world_id, user_id=current_user.id, skip=skip, limit=limit)
     else:
-        characters = crud.get_characters_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+        characters = await crud.get_characters_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
     return characters
 
 @router.get("/{character_id}", response_model=schemas.Character)
-def read_character(
+async def read_character(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     character_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Get character by ID. Allows assigned user or world OWNER/ADMIN.
     """
-    db_character = (
-        db.query(models.Character)
-        .options(
-            sqlalchemy.orm.selectinload(models.Character.tags)
-            .joinedload(models.CharacterTag.tag_type)
-        )
-        .filter(models.Character.id == character_id)
-        .first()
-    )
+    # crud.get_character načítá tagy i deník (response schéma je potřebuje)
+    db_character = await crud.get_character(db, character_id=character_id)
     if not db_character:
         raise HTTPException(status_code=404, detail="Character not found")
     
     # Check permissions: Assigned user OR Owner/Admin
-    if not check_character_permission(
+    if not await check_character_permission(
         db, current_user, db_character, 
         allow_assigned=True, 
         roles_allowed=[RoleEnum.OWNER, RoleEnum.ADMIN]
@@ -113,9 +99,9 @@ def read_character(
     return db_character
 
 @router.put("/{character_id}", response_model=schemas.Character)
-def update_character(
+async def update_character(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     character_id: int,
     character_in: schemas.CharacterUpdate,
     current_user: models.User = Depends(get_current_user)
@@ -125,12 +111,12 @@ def update_character(
     - Assigned user can update name and description.
     - World OWNER or ADMIN can update name, description, tags, and assigned user.
     """
-    db_character = crud.get_character(db, character_id=character_id)
+    db_character = await crud.get_character(db, character_id=character_id)
     if not db_character:
         raise HTTPException(status_code=404, detail="Character not found")
 
     # Check basic permission: Assigned user OR Owner/Admin
-    if not check_character_permission(
+    if not await check_character_permission(
         db, current_user, db_character, 
         allow_assigned=True, # Allow assigned user
         roles_allowed=[RoleEnum.OWNER, RoleEnum.ADMIN]
@@ -140,15 +126,7 @@ def update_character(
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     # Check if the user is Owner/Admin for full update rights
-    membership = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == db_character.world_id,
-            WorldUser.user_id == current_user.id
-        )
-        .first()
-    )
-    is_world_manager = membership and membership.role in [RoleEnum.OWNER, RoleEnum.ADMIN]
+    is_world_manager = await PermissionResolver.for_session(db, current_user.id).is_world_manager(db_character.world_id)
 
     # Prepare data for update, respecting permissions
     update_data = character_in.dict(exclude_unset=True)
@@ -176,38 +154,38 @@ def update_character(
          raise HTTPException(status_code=400, detail=f"Invalid update data after permission filtering: {e}")
 
     # Perform the update with filtered data
-    character = crud.update_character(db=db, db_character=db_character, character_in=filtered_character_in)
+    character = await crud.update_character(db=db, db_character=db_character, character_in=filtered_character_in)
     return character
 
 @router.delete("/{character_id}", response_model=schemas.Character)
-def delete_character(
+async def delete_character(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     character_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """
     Delete a character. Requires world OWNER or ADMIN role.
     """
-    db_character = crud.get_character(db, character_id=character_id)
+    db_character = await crud.get_character(db, character_id=character_id)
     if not db_character:
         raise HTTPException(status_code=404, detail="Character not found")
 
     # Check permissions: Owner/Admin required for delete
-    if not check_character_permission(
+    if not await check_character_permission(
         db, current_user, db_character, 
         allow_assigned=False, 
         roles_allowed=[RoleEnum.OWNER, RoleEnum.ADMIN]
     ):
         raise HTTPException(status_code=403, detail="Not enough permissions (Owner/Admin required)")
 
-    character = crud.delete_character(db=db, db_character=db_character)
+    character = await crud.delete_character(db=db, db_character=db_character)
     return character
 
 @router.patch("/{character_id}/assign_user", response_model=schemas.Character)
-def assign_user_to_character(
+async def assign_user_to_character(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     character_id: int,
     assignment_in: schemas.CharacterAssignUser,
     current_user: models.User = Depends(get_current_user)
@@ -217,21 +195,13 @@ def assign_user_to_character(
     Requires world OWNER or ADMIN role.
     The target user must be a member of a campaign within the character's world.
     """
-    db_character = crud.get_character(db, character_id=character_id)
+    db_character = await crud.get_character(db, character_id=character_id)
     if not db_character:
         raise HTTPException(status_code=404, detail="Character not found")
 
     # --- Authorization Check --- 
     # Check if the current user is Owner or Admin of the world
-    membership = (
-        db.query(WorldUser)
-        .filter(
-            WorldUser.world_id == db_character.world_id,
-            WorldUser.user_id == current_user.id
-        )
-        .first()
-    )
-    if not membership or membership.role not in [RoleEnum.OWNER, RoleEnum.ADMIN]:
+    if not await PermissionResolver.for_session(db, current_user.id).is_world_manager(db_character.world_id):
         raise HTTPException(status_code=403, detail="Only world Owner or Admin can assign characters")
 
     target_user_id = assignment_in.user_id
@@ -239,22 +209,22 @@ def assign_user_to_character(
     # --- Validation for Assignment (if user_id is not None) ---
     if target_user_id is not None:
         # Check if the target user exists
-        target_user = crud.get_user(db, user_id=target_user_id)
+        target_user = await crud.get_user(db, user_id=target_user_id)
         if not target_user:
             raise HTTPException(status_code=404, detail=f"Target user with id {target_user_id} not found")
 
         # Check if the target user is in any campaign within this world
-        campaigns_in_world = crud.get_campaigns_by_world(db, world_id=db_character.world_id)
+        campaigns_in_world = await crud.get_campaigns_by_world(db, world_id=db_character.world_id)
         campaign_ids_in_world = {campaign.id for campaign in campaigns_in_world}
         
-        is_user_in_relevant_campaign = (
-            db.query(models.UserCampaign)
-            .filter(
+        result = await db.execute(
+            select(models.UserCampaign)
+            .where(
                 models.UserCampaign.user_id == target_user_id,
                 models.UserCampaign.campaign_id.in_(campaign_ids_in_world)
             )
-            .first()
         )
+        is_user_in_relevant_campaign = result.scalars().first()
         
         if not is_user_in_relevant_campaign:
             raise HTTPException(
@@ -263,7 +233,7 @@ def assign_user_to_character(
             )
 
     # --- Perform Assignment --- 
-    updated_character = crud.assign_user_to_character(
+    updated_character = await crud.assign_user_to_character(
         db=db, 
         db_character=db_character, 
         user_id=target_user_id
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Dict, Union
 
 from app.api import dependencies
 from app.core.config import settings # Přidán import settings
 from app.services.langchain_service import langchain_service
+from app.services import ai_jobs, live_updates
 from app.models import User, World
 from app import schemas # Import schemas to use for response_model
 # Import Pydantic schemas if needed later, e.g.:
@@ -23,30 +25,129 @@ ResponseType = Union[schemas.Character, schemas.Location, schemas.Organization,
 
 router = APIRouter()
 
-@router.post("/worlds/{world_id}/generate/{entity_type}", response_model=ResponseType)
-@limiter.limit(settings.AI_REQUEST_LIMITS) # Použití spojených limitů z configu
+# Úlohy i synchronní generování čerpají z jednoho limitu AI_REQUEST_LIMITS na uživatele
+# (bez sdíleného scope by měl každý endpoint vlastní počítadlo)
+GENERATION_LIMIT_SCOPE = "ai-generation"
+
+@router.post(
+    "/worlds/{world_id}/generate/{entity_type}/jobs",
+    response_model=schemas.AIJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    # Generovaná entita se zakládá ve světě - smí jen vlastník (jako POST /locations, /items)
+    dependencies=[Depends(dependencies.verify_world_owner)],
+)
+@limiter.shared_limit(settings.AI_REQUEST_LIMITS, scope=GENERATION_LIMIT_SCOPE)
+async def submit_generation_job(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(dependencies.get_db),
+    current_user: User = Depends(dependencies.get_current_user),
+    world_id: int,
+    entity_type: str,
+    existing_entities: List[Dict[str, Any]] = Body(...),
+    context: str | None = Body(None)
+) -> Any:
+    """
+    Queues generation of a new entity and returns the job immediately (202).
+    Poll GET /ai/jobs/{job_id} or subscribe to /ai/jobs/{job_id}/events for the result.
+    Requires world ownership.
+    """
+    if not ai_jobs.is_supported(entity_type):
+        raise HTTPException(status_code=400, detail=f"Unsupported entity type: {entity_type}")
+    # Spojení do DB úloha nepotřebuje
+    await db.close()
+    job = await ai_jobs.submit(
+        user_id=current_user.id,
+        world_id=world_id,
+        entity_type=entity_type,
+        existing_entities=existing_entities,
+        context=context,
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=429,
+            detail=f"At most {settings.AI_JOB_MAX_ACTIVE_PER_USER} generation jobs can be in progress",
+        )
+    response.headers["Location"] = str(request.url_for("get_generation_job", job_id=job["id"]))
+    return ai_jobs.public_view(job)
+
+
+async def _get_own_job(job_id: str, current_user: User) -> dict:
+    job = await ai_jobs.get_job(job_id)
+    # Cizí úlohy se tváří jako neexistující
+    if job is None or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.AIJob)
+@limiter.limit(settings.GENERIC_READ_LIMIT)
+async def get_generation_job(
+    *,
+    request: Request,
+    current_user: User = Depends(dependencies.get_current_user),
+    job_id: str,
+) -> Any:
+    """Status of a generation job; `entity` holds the created entity once it succeeded."""
+    return ai_jobs.public_view(await _get_own_job(job_id, current_user))
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {live_updates.MEDIA_TYPE: {}}}},
+)
+@limiter.limit(settings.GENERIC_READ_LIMIT)
+async def stream_generation_job(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(dependencies.get_db),
+    current_user: User = Depends(dependencies.get_current_user),
+    job_id: str,
+):
+    """Server-Sent Events for a generation job; the stream ends when the job finishes.
+
+    `status` events have the shape of GET /ai/jobs/{job_id} (the first one includes the text
+    generated so far in `partial`); `delta` events carry newly generated text of `field`
+    (name/description) starting at `offset`.
+    """
+    await _get_own_job(job_id, current_user)
+    # Spojení do DB se během streamu nedrží
+    await db.close()
+    return StreamingResponse(
+        ai_jobs.stream(job_id),
+        media_type=live_updates.MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/worlds/{world_id}/generate/{entity_type}",
+    response_model=ResponseType,
+    deprecated=True,
+    dependencies=[Depends(dependencies.verify_world_owner)],
+)
+@limiter.shared_limit(settings.AI_REQUEST_LIMITS, scope=GENERATION_LIMIT_SCOPE)
 async def generate_new_entity(
     *,
     request: Request, # Přidáno pro přístup k limiteru/request state
-    db: Session = Depends(dependencies.get_db),
+    db: AsyncSession = Depends(dependencies.get_db),
     current_user: User = Depends(dependencies.get_current_user),
     world_id: int, # Added world_id from path
     entity_type: str,
-    # Optional: Add dependency to check if world exists and user has access
-    # world: World = Depends(dependencies.get_world_for_user(required=True)), # Example dependency
     existing_entities: List[Dict[str, Any]] = Body(...),
     context: str | None = Body(None)
 ) -> Any:
     """
     Generates a new game entity within a specific world using LangChain, saves it, and returns the created entity.
-    Requires authentication.
+    Requires world ownership.
+
+    Deprecated: holds the request open for the whole LLM call - use the /jobs variant.
     """
     if not entity_type:
         raise HTTPException(status_code=400, detail="Entity type cannot be empty.")
 
-    # TODO: Add check if user has rights to generate entities in this world_id
-    # This might be part of the get_world_for_user dependency or checked manually.
-
     try:
         created_entity = await langchain_service.generate_entity(
             db=db,
@@ -73,7 +174,7 @@ async def generate_new_entity(
 async def summarize_game_session(
     *,
     request: Request, # Přidáno pro přístup k limiteru/request state
-    # db: Session = Depends(dependencies.get_db),
+    # db: AsyncSession = Depends(dependencies.get_db),
     current_user: User = Depends(dependencies.get_current_user),
     session_data: Dict[str, Any] = Body(...), # Data about the session
     journal_entries: List[Dict[str, Any]] = Body(...) # Related journal entries
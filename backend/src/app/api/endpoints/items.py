@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app import crud, models, schemas
 from app.api import dependencies # Správný import závislostí
+from app.api.pagination import PageParams, set_page_headers
+from app.api.projection import sparse_fields, sparse_response
 from app.db.session import get_db
 from app.auth.auth import get_current_user
 # Explicitní import pro ověření vlastnictví světa
@@ -14,26 +16,26 @@ router = APIRouter()
 
 # --- Helper Functions / Dependencies (pro validaci) ---
 
-def get_item_or_404(db: Session, item_id: int) -> models.Item:
+async def get_item_or_404(db: AsyncSession, item_id: int) -> models.Item:
     """Pomocná funkce pro získání itemu nebo vyvolání 404."""
-    db_item = crud.get_item(db, item_id=item_id)
+    db_item = await crud.get_item(db, item_id=item_id)
     if not db_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
     return db_item
 
 async def validate_item_relations(
-    db: Session,
+    db: AsyncSession,
     world_id: int,
     character_id: Optional[int] = None,
     location_id: Optional[int] = None
 ):
     """Validuje, zda character_id a location_id existují a patří do daného světa."""
     if character_id:
-        character = crud.get_character(db, character_id=character_id)
+        character = await crud.get_character(db, character_id=character_id)
         if not character or character.world_id != world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid character_id {character_id} for world {world_id}")
     if location_id:
-        location = crud.get_location(db, location_id=location_id)
+        location = await crud.get_location(db, location_id=location_id)
         if not location or location.world_id != world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid location_id {location_id} for world {world_id}")
 
@@ -41,7 +43,7 @@ async def validate_item_relations(
 async def verify_item_world_owner(
     item_in: schemas.ItemCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Ověří, zda aktuální uživatel vlastní svět specifikovaný v ItemCreate."""
     await verify_world_owner(world_id=item_in.world_id, current_user=current_user, db=db)
@@ -52,7 +54,7 @@ async def verify_item_world_owner(
 @router.post("/", response_model=schemas.Item, status_code=status.HTTP_201_CREATED)
 async def create_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     item_in: schemas.ItemCreate,
     # Použijeme novou, čistší závislost
     _: None = Depends(verify_item_world_owner)
@@ -66,59 +68,82 @@ async def create_item(
         location_id=item_in.location_id
     )
     
-    item = crud.create_item(db=db, item=item_in)
+    item = await crud.create_item(db=db, item=item_in)
     return item
 
 @router.get("/{item_id}", response_model=schemas.Item)
-def read_item(
+async def read_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     item_id: int,
     # current_user: models.User = Depends(get_current_user) # Zatím není potřeba pro čtení
 ):
     """Získá detail konkrétního itemu."""
-    db_item = get_item_or_404(db, item_id=item_id)
+    db_item = await get_item_or_404(db, item_id=item_id)
     # TODO: Přidat oprávnění pro čtení? (např. člen světa/kampaně)
     return db_item
 
 @router.get("/", response_model=List[schemas.Item])
-def read_items(
+async def read_items(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    response: Response,
     world_id: int = Query(..., description="ID světa pro filtrování itemů"),
     character_id: Optional[int] = Query(None, description="Filtrovat itemy podle ID postavy"),
     location_id: Optional[int] = Query(None, description="Filtrovat itemy podle ID lokace"),
+    include_sublocations: bool = Query(False, description="S location_id vrátí i itemy ve všech podlokacích"),
     skip: int = 0,
     limit: int = 100,
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(models.Item, schemas.Item)),
     # current_user: models.User = Depends(get_current_user) # Zatím není potřeba pro čtení
 ):
-    """Získá seznam itemů pro daný svět, volitelně filtrovaný."""
+    """Získá seznam itemů pro daný svět, volitelně filtrovaný. `fields=` vrátí jen vybrané sloupce."""
     # TODO: Přidat oprávnění pro čtení? (např. člen světa/kampaně)
     # Ověříme alespoň existenci světa
-    world = crud.get_world(db, world_id=world_id)
+    world = await crud.get_world(db, world_id=world_id)
     if not world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
     
-    items = crud.get_items_by_world(
+    within_location = None
+    if include_sublocations and location_id is not None:
+        within_location = await crud.get_location_simple(db, location_id=location_id)
+        if not within_location or within_location.world_id != world_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+
+    after = page.after(crud.ITEM_ORDER)
+    criteria = crud.item_filters(world_id, character_id, location_id, within_location)
+    total = await crud.estimate_count(db, models.Item, *criteria) if page.include_total else None
+    if fields:
+        rows = await crud.get_projection(
+            db, models.Item, fields, crud.ITEM_ORDER, *criteria, skip=skip, limit=limit, after=after
+        )
+        set_page_headers(response, crud.ITEM_ORDER, rows, limit, total)
+        return sparse_response(rows, fields, response)
+
+    items = await crud.get_items_by_world(
         db, 
         world_id=world_id, 
         character_id=character_id, 
         location_id=location_id, 
         skip=skip, 
-        limit=limit
+        limit=limit,
+        after=after,
+        within_location=within_location,
     )
+    set_page_headers(response, crud.ITEM_ORDER, items, limit, total)
     return items
 
 @router.put("/{item_id}", response_model=schemas.Item)
 async def update_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     item_id: int,
     item_in: schemas.ItemUpdate,
     current_user: models.User = Depends(get_current_user),
 ):
     """Aktualizuje item. Vyžaduje vlastnictví světa."""
-    db_item = get_item_or_404(db, item_id=item_id)
+    db_item = await get_item_or_404(db, item_id=item_id)
     
     # Ověření, že uživatel vlastní svět, do kterého item patří
     await verify_world_owner(world_id=db_item.world_id, current_user=current_user, db=db)
@@ -136,21 +161,21 @@ async def update_item(
             location_id=new_location_id if new_location_id is not None else item_in.location_id
         )
 
-    item = crud.update_item(db=db, db_item=db_item, item_in=item_in)
+    item = await crud.update_item(db=db, db_item=db_item, item_in=item_in)
     return item
 
 @router.delete("/{item_id}", response_model=schemas.Item)
 async def delete_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     item_id: int,
     current_user: models.User = Depends(get_current_user),
 ):
     """Smaže item. Vyžaduje vlastnictví světa."""
-    db_item = get_item_or_404(db, item_id=item_id)
+    db_item = await get_item_or_404(db, item_id=item_id)
     
     # Ověření, že uživatel vlastní svět, do kterého item patří
     await verify_world_owner(world_id=db_item.world_id, current_user=current_user, db=db)
     
-    item = crud.delete_item(db=db, db_item=db_item)
+    item = await crud.delete_item(db=db, db_item=db_item)
     return item 
\ No newline at end of file
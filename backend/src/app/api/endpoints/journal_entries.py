@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Tuple, Optional
 
 from ... import crud, models, schemas
@@ -7,6 +7,7 @@ from ... import crud, models, schemas
 from ...models.world_user import RoleEnum 
 from ...db.session import get_db
 from ...auth.auth import get_current_user
+from ..pagination import PageParams, set_page_headers
 # Import new dependencies
 from ..dependencies import (
     verify_journal_read_access, 
@@ -22,22 +23,22 @@ router = APIRouter(prefix="/journal-entries", tags=["journal-entries"])
 @router.post("/", response_model=schemas.JournalEntry, status_code=status.HTTP_201_CREATED)
 async def create_journal_entry(
     *, # Enforce keyword-only arguments
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     entry_in: schemas.JournalEntryCreate,
     current_user: models.User = Depends(get_current_user)
 ):
     """Create a new journal entry. Requires assigned user or world owner/admin."""
     # Verify access based on the parent journal's character
     try:
-        # Get context (journal, character, membership)
-        db_journal, db_character, world_membership = await get_journal_and_verify_permission(
+        # Get context (journal, character, world role)
+        db_journal, db_character, world_role = await get_journal_and_verify_permission(
             journal_id=entry_in.journal_id, db=db, current_user=current_user
         )
         
         # Check permissions: Assigned user OR World Owner/Admin
         is_assigned_user = db_character.user_id == current_user.id
         # Use the correctly imported RoleEnum
-        is_world_manager = world_membership and world_membership.role in [RoleEnum.OWNER, RoleEnum.ADMIN]
+        is_world_manager = world_role in [RoleEnum.OWNER, RoleEnum.ADMIN]
 
         if not (is_assigned_user or is_world_manager):
              raise HTTPException(
@@ -49,23 +50,27 @@ async def create_journal_entry(
         # Propagate potential 404 or other errors from get_journal_and_verify_permission
         raise e 
 
-    entry = crud.create_journal_entry(db=db, entry_in=entry_in)
+    entry = await crud.create_journal_entry(db=db, entry_in=entry_in)
     return entry
 
 # Get entries for a specific journal
 @router.get("/by_journal/{journal_id}", response_model=List[schemas.JournalEntry])
 async def read_entries_by_journal(
     # Use the dependency to verify read access to the parent journal
+    response: Response,
     parent_journal: models.Journal = Depends(verify_journal_read_access),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """Retrieve entries for a specific journal. Requires assigned user or world owner/admin."""
     # We already verified read access via the dependency
-    entries = crud.get_entries_by_journal(
-        db, journal_id=parent_journal.id, skip=skip, limit=limit
+    entries = await crud.get_entries_by_journal(
+        db, journal_id=parent_journal.id, skip=skip, limit=limit, after=page.after(crud.JOURNAL_ENTRY_ORDER)
     )
+    total = await crud.estimate_count(db, models.JournalEntry, journal_id=parent_journal.id) if page.include_total else None
+    set_page_headers(response, crud.JOURNAL_ENTRY_ORDER, entries, limit, total)
     return entries
 
 @router.get("/{entry_id}", response_model=schemas.JournalEntry)
@@ -77,24 +82,24 @@ def read_journal_entry(
     return db_entry
 
 @router.put("/{entry_id}", response_model=schemas.JournalEntry)
-def update_journal_entry(
+async def update_journal_entry(
     *, # Enforce keyword-only arguments
     entry_in: schemas.JournalEntryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Use the new dependency for write access
     db_entry: models.JournalEntry = Depends(verify_journal_entry_write_access) 
 ):
     """Update a journal entry. Requires world owner/admin."""
-    updated_entry = crud.update_journal_entry(db=db, db_entry=db_entry, entry_in=entry_in)
+    updated_entry = await crud.update_journal_entry(db=db, db_entry=db_entry, entry_in=entry_in)
     return updated_entry
 
 @router.delete("/{entry_id}", response_model=schemas.JournalEntry)
-def delete_journal_entry(
+async def delete_journal_entry(
     *, # Enforce keyword-only arguments
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Use the new dependency for write access
     db_entry: models.JournalEntry = Depends(verify_journal_entry_write_access) 
 ):
     """Delete a journal entry. Requires world owner/admin."""
-    deleted_entry = crud.delete_journal_entry(db=db, db_entry=db_entry)
+    deleted_entry = await crud.delete_journal_entry(db=db, db_entry=db_entry)
     return deleted_entry 
\ No newline at end of file
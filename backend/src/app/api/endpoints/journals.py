@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ... import crud, models, schemas
@@ -10,12 +10,12 @@ from ..dependencies import verify_journal_read_access, verify_journal_write_acce
 router = APIRouter(tags=["journals"])
 
 @router.get("/my-journals", response_model=List[schemas.Journal])
-def read_my_journals(
-    db: Session = Depends(get_db),
+async def read_my_journals(
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Retrieve journals for the current user's characters."""
-    journals = crud.get_multi_by_owner(db=db, owner_id=current_user.id)
+    journals = await crud.get_multi_by_owner(db=db, owner_id=current_user.id)
     return journals
 
 @router.get("/{journal_id}", response_model=schemas.Journal)
@@ -27,15 +27,15 @@ def read_journal(
     return db_journal
 
 @router.put("/{journal_id}", response_model=schemas.Journal)
-def update_journal(
+async def update_journal(
     *, # Enforce keyword-only arguments
     journal_in: schemas.JournalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Use the new dependency for write access
     db_journal: models.Journal = Depends(verify_journal_write_access) 
 ):
     """Update a journal (e.g., name, description). Requires world owner/admin."""
-    updated_journal = crud.update_journal(db=db, db_journal=db_journal, journal_in=journal_in)
+    updated_journal = await crud.update_journal(db=db, db_journal=db_journal, journal_in=journal_in)
     return updated_journal
 
 # Removed DELETE /{journal_id} endpoint (delete_journal - handled by cascade) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ... import crud, models, schemas
@@ -14,9 +14,9 @@ router = APIRouter()
 async def get_tag_type_from_world(
     tag_type_id: int = Path(..., description="ID typu tagu lokace"),
     world: models.World = Depends(get_world_or_404),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.LocationTagType:
-    db_tag_type = crud.get_location_tag_type(db, tag_type_id=tag_type_id)
+    db_tag_type = await crud.get_location_tag_type(db, tag_type_id=tag_type_id)
     if not db_tag_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location tag type not found")
     if db_tag_type.world_id != world.id:
@@ -36,13 +36,13 @@ async def create_location_tag_type(
     *,
     world_id: int,
     tag_type_in: schemas.LocationTagTypeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     # Ověření vlastníka světa pomocí závislosti
     # verify_world_owner bere world_id a current_user
     # Poznámka: Ověření vlastníka se teď spoléhá na explicitní volání níže,
     # protože předání world_id z prefixu do závislosti závislosti je komplikované.
-    # _=Depends(lambda world_id=Path(...): verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
+    # _=Depends(lambda world_id=Path(...): await verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
 ):
     """Vytvoří nový typ tagu pro lokace v rámci specifikovaného světa. Vyžaduje vlastnictví světa."""
     # Ověření vlastníka světa (explicitně)
@@ -51,28 +51,28 @@ async def create_location_tag_type(
     # Ověření existence světa je implicitně součástí verify_world_owner
     
     try:
-        db_tag_type = crud.create_location_tag_type(db=db, tag_type_in=tag_type_in, world_id=world_id)
+        db_tag_type = await crud.create_location_tag_type(db=db, tag_type_in=tag_type_in, world_id=world_id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return db_tag_type
 
 @router.get("", response_model=List[schemas.LocationTagType], summary="Získat typy tagů lokací světa")
-def read_location_tag_types(
+async def read_location_tag_types(
     *, 
     world_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(get_current_user)
 ):
     """Získá seznam všech typů tagů pro lokace v rámci specifikovaného světa. Vyžaduje členství ve světě."""
     # Ověříme členství uživatele ve světě
-    check_world_membership(db, world_id, current_user.id)
+    await check_world_membership(db, world_id, current_user.id)
     
     # Poznámka: Existence světa je implicitně ověřena, pokud check_world_membership nevrátí 403
     # (protože world_user záznam bez existujícího světa by neměl existovat díky FK constraints)
     
-    tag_types = crud.get_location_tag_types_by_world(db=db, world_id=world_id, skip=skip, limit=limit)
+    tag_types = await crud.get_location_tag_types_by_world(db=db, world_id=world_id, skip=skip, limit=limit)
     return tag_types
 
 @router.put("/{tag_type_id}", response_model=schemas.LocationTagType, summary="Aktualizovat typ tagu lokace")
@@ -81,10 +81,10 @@ async def update_location_tag_type(
     world_id: int,
     tag_type_id: int = Path(..., description="ID typu tagu lokace"), # tag_type_id je v cestě tohoto endpointu
     tag_type_in: schemas.LocationTagTypeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     # Ověření vlastníka
-    # _=Depends(lambda world_id=Path(...): verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
+    # _=Depends(lambda world_id=Path(...): await verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
 ):
     """Aktualizuje konkrétní typ tagu lokace. Vyžaduje vlastnictví světa."""
     # Ověření vlastníka světa (explicitně)
@@ -96,7 +96,7 @@ async def update_location_tag_type(
     db_tag_type = await get_tag_type_from_world(tag_type_id=tag_type_id, world=await get_world_or_404(world_id=world_id, db=db), db=db)
 
     try:
-        updated_tag_type = crud.update_location_tag_type(db=db, db_tag_type=db_tag_type, tag_type_in=tag_type_in)
+        updated_tag_type = await crud.update_location_tag_type(db=db, db_tag_type=db_tag_type, tag_type_in=tag_type_in)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return updated_tag_type
@@ -106,10 +106,10 @@ async def delete_location_tag_type(
     *,
     world_id: int,
     tag_type_id: int = Path(..., description="ID typu tagu lokace"), # tag_type_id je v cestě tohoto endpointu
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
     # Ověření vlastníka
-    # _=Depends(lambda world_id=Path(...): verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
+    # _=Depends(lambda world_id=Path(...): await verify_world_owner(world_id=world_id, current_user=Depends(get_current_user), db=Depends(get_db)))
 ):
     """Smaže konkrétní typ tagu lokace. Vyžaduje vlastnictví světa."""
     # Ověření vlastníka světa (explicitně)
@@ -120,5 +120,5 @@ async def delete_location_tag_type(
     # Předáme world_id přímo do get_world_or_404
     db_tag_type = await get_tag_type_from_world(tag_type_id=tag_type_id, world=await get_world_or_404(world_id=world_id, db=db), db=db)
     
-    deleted_tag_type = crud.delete_location_tag_type(db=db, db_tag_type=db_tag_type)
+    deleted_tag_type = await crud.delete_location_tag_type(db=db, db_tag_type=db_tag_type)
     return deleted_tag_type 
\ No newline at end of file
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app import crud, models, schemas
 from app.api import dependencies # Use the correct import path
+from app.api.pagination import PageParams, set_page_headers
+from app.api.projection import sparse_fields, sparse_response
 from app.db.session import get_db # Correct import for get_db
 from app.auth.auth import get_current_user # Correct import for get_current_user
 # Import RoleEnum explicitly
@@ -16,7 +18,7 @@ router = APIRouter()
 @router.post("/", response_model=schemas.Location)
 async def create_location(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     location_in: schemas.LocationCreate,
     current_user: models.User = Depends(get_current_user)
 ):
@@ -26,56 +28,117 @@ async def create_location(
 
     # Verify parent_location_id if provided
     if location_in.parent_location_id:
-        parent_location = crud.get_location(db, location_id=location_in.parent_location_id)
+        parent_location = await crud.get_location(db, location_id=location_in.parent_location_id)
         if not parent_location or parent_location.world_id != location_in.world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid parent_location_id")
 
-    location = crud.create_location(db=db, location=location_in)
+    location = await crud.create_location(db=db, location=location_in)
     return location
 
+@router.get("/tree", response_model=List[schemas.LocationTreeNode])
+async def read_location_tree(
+    *,
+    db: AsyncSession = Depends(get_db),
+    world_id: int = Query(..., description="World whose location tree to return"),
+    max_depth: Optional[int] = Query(None, ge=0, description="Maximum depth below root locations (0 = roots only)"),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Whole location hierarchy of a world as nested JSON (one recursive query). Requires world membership."""
+    await dependencies.check_world_membership(db=db, world_id=world_id, user_id=current_user.id)
+    return await crud.get_location_tree(db, world_id=world_id, max_depth=max_depth)
+
+@router.get("/{location_id}/subtree", response_model=schemas.LocationTreeNode)
+async def read_location_subtree(
+    *,
+    db: AsyncSession = Depends(get_db),
+    location_id: int,
+    max_depth: Optional[int] = Query(None, ge=0, description="Maximum depth below the location (0 = the location only)"),
+    current_user: models.User = Depends(get_current_user)
+):
+    """A location with all its descendants as nested JSON (one recursive query). Requires world membership."""
+    db_location = await crud.get_location_simple(db, location_id=location_id)
+    if db_location is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+    await dependencies.check_world_membership(db=db, world_id=db_location.world_id, user_id=current_user.id)
+
+    tree = await crud.get_location_tree(db, world_id=db_location.world_id, root_id=location_id, max_depth=max_depth)
+    return tree[0]
+
+@router.get("/{location_id}/breadcrumb", response_model=List[schemas.LocationBreadcrumb])
+async def read_location_breadcrumb(
+    *,
+    db: AsyncSession = Depends(get_db),
+    location_id: int,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Path from the root location down to this one (inclusive). Requires world membership."""
+    db_location = await crud.get_location_simple(db, location_id=location_id)
+    if db_location is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+    await dependencies.check_world_membership(db=db, world_id=db_location.world_id, user_id=current_user.id)
+
+    ancestors = await crud.get_location_ancestors(db, location_id, path=db_location.path)
+    return [*ancestors, {"id": db_location.id, "name": db_location.name}]
+
 @router.get("/{location_id}", response_model=schemas.Location)
 async def read_location(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     location_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Get a specific location by ID. Requires world membership."""
-    db_location = crud.get_location(db, location_id=location_id)
+    db_location = await crud.get_location(db, location_id=location_id)
     if db_location is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
     
     # Check if the user is a member of the world this location belongs to
-    dependencies.check_world_membership(db=db, world_id=db_location.world_id, user_id=current_user.id)
+    await dependencies.check_world_membership(db=db, world_id=db_location.world_id, user_id=current_user.id)
     
     return db_location
 
 @router.get("/", response_model=List[schemas.Location])
 async def read_locations_by_world(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    response: Response,
     world_id: int = Query(..., description="Filter locations by world ID"),
     skip: int = 0,
     limit: int = 100,
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(models.Location, schemas.Location)),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Retrieve locations belonging to a specific world. Requires world membership."""
+    """Retrieve locations belonging to a specific world. Requires world membership.
+
+    `fields=` returns only the listed columns (sparse fieldset)."""
     # Check if the user is a member of the world they are trying to read locations from
-    dependencies.check_world_membership(db=db, world_id=world_id, user_id=current_user.id)
+    await dependencies.check_world_membership(db=db, world_id=world_id, user_id=current_user.id)
     
-    locations = crud.get_locations_by_world(db, world_id=world_id, skip=skip, limit=limit)
+    after = page.after(crud.LOCATION_ORDER)
+    total = await crud.estimate_count(db, models.Location, world_id=world_id) if page.include_total else None
+    if fields:
+        rows = await crud.get_projection(
+            db, models.Location, fields, crud.LOCATION_ORDER, models.Location.world_id == world_id,
+            skip=skip, limit=limit, after=after,
+        )
+        set_page_headers(response, crud.LOCATION_ORDER, rows, limit, total)
+        return sparse_response(rows, fields, response)
+
+    locations = await crud.get_locations_by_world(db, world_id=world_id, skip=skip, limit=limit, after=after)
+    set_page_headers(response, crud.LOCATION_ORDER, locations, limit, total)
     return locations
 
 @router.put("/{location_id}", response_model=schemas.Location)
 async def update_location(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     location_id: int,
     location_in: schemas.LocationUpdate,
     current_user: models.User = Depends(get_current_user)
 ):
     """Update a location. User must own the world the location belongs to."""
-    db_location = crud.get_location(db, location_id=location_id)
+    db_location = await crud.get_location(db, location_id=location_id)
     if not db_location:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
 
@@ -86,29 +149,29 @@ async def update_location(
     if location_in.parent_location_id is not None:
         if location_in.parent_location_id == db_location.id:
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Location cannot be its own parent")
-        parent_location = crud.get_location(db, location_id=location_in.parent_location_id)
+        parent_location = await crud.get_location(db, location_id=location_in.parent_location_id)
         if not parent_location or parent_location.world_id != db_location.world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid parent_location_id for this world")
 
-    location = crud.update_location(db=db, db_location=db_location, location_in=location_in)
+    location = await crud.update_location(db=db, db_location=db_location, location_in=location_in)
     return location
 
 @router.delete("/{location_id}", response_model=schemas.Location)
 async def delete_location(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     location_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Delete a location. User must own the world the location belongs to."""
-    db_location = crud.get_location(db, location_id=location_id)
+    db_location = await crud.get_location(db, location_id=location_id)
     if not db_location:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
 
     # Verify ownership of the world
     await dependencies.verify_world_owner(world_id=db_location.world_id, current_user=current_user, db=db)
 
-    location = crud.delete_location(db=db, db_location=db_location)
+    location = await crud.delete_location(db=db, db_location=db_location)
     return location
 
 # --- Endpoints for managing location tags ---
@@ -122,12 +185,12 @@ async def delete_location(
 async def add_tag_to_location_endpoint(
     location_id: int = Path(..., description="ID lokace"),
     tag_type_id: int = Path(..., description="ID typu tagu, který se má přiřadit"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Přiřadí existující typ tagu ke konkrétní lokaci. Vyžaduje vlastnictví světa lokace."""
     # 1. Získáme lokaci
-    db_location = crud.get_location(db, location_id=location_id)
+    db_location = await crud.get_location(db, location_id=location_id)
     if not db_location:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
 
@@ -136,7 +199,7 @@ async def add_tag_to_location_endpoint(
 
     # 3. CRUD operace pro přidání tagu (ta obsahuje validaci tag_type_id a world_id)
     try:
-        db_association = crud.add_tag_to_location(db=db, location_id=location_id, tag_type_id=tag_type_id)
+        db_association = await crud.add_tag_to_location(db=db, location_id=location_id, tag_type_id=tag_type_id)
     except ValueError as e:
         # Chyby z CRUD (nenalezeno, jiný svět) převedeme na HTTP chyby
         if "not found" in str(e).lower():
@@ -145,7 +208,7 @@ async def add_tag_to_location_endpoint(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
             
     # Načteme i tag_type pro response_model
-    db.refresh(db_association, attribute_names=["tag_type"])
+    await db.refresh(db_association, attribute_names=["tag_type"])
     return db_association
 
 @router.delete(
@@ -156,12 +219,12 @@ async def add_tag_to_location_endpoint(
 async def remove_tag_from_location_endpoint(
     location_id: int = Path(..., description="ID lokace"),
     tag_type_id: int = Path(..., description="ID typu tagu, který se má odebrat"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Odebere přiřazení typu tagu od konkrétní lokace. Vyžaduje vlastnictví světa lokace."""
     # 1. Získáme lokaci (pro ověření vlastnictví světa)
-    db_location = crud.get_location(db, location_id=location_id)
+    db_location = await crud.get_location(db, location_id=location_id)
     if not db_location:
         # Pokud lokace neexistuje, tag stejně nemůže být přiřazen
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
@@ -170,7 +233,7 @@ async def remove_tag_from_location_endpoint(
     await dependencies.verify_world_owner(world_id=db_location.world_id, current_user=current_user, db=db)
 
     # 3. CRUD operace pro odebrání tagu
-    deleted = crud.remove_tag_from_location(db=db, location_id=location_id, tag_type_id=tag_type_id)
+    deleted = await crud.remove_tag_from_location(db=db, location_id=location_id, tag_type_id=tag_type_id)
     
     if not deleted:
         # Pokud nebylo nic smazáno, znamená to, že tag nebyl k lokaci přiřazen
@@ -0,0 +1,49 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+
+from app.core.config import settings
+from app.db.session import async_engine, engine
+from app.db.pool_metrics import pool_snapshot
+from app.core.password_hashing import password_hasher
+
+
+def verify_metrics_token(
+    x_metrics_token: Optional[str] = Header(None, description="Internal metrics token (METRICS_TOKEN)"),
+) -> None:
+    """Metriky prozrazují dimenzování poolů a bcryptu - jsou jen pro interní scraper.
+
+    Přístup sdíleným tokenem z nastavení METRICS_TOKEN v hlavičce X-Metrics-Token
+    (ne uživatelským JWT). Bez nastaveného tokenu se endpointy tváří jako neexistující.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = (x_metrics_token or "").encode()
+    if not secrets.compare_digest(supplied, settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
+router = APIRouter(dependencies=[Depends(verify_metrics_token)])
+
+
+@router.get("/db-pool")
+async def db_pool_metrics():
+    """Stav connection poolů (checked-out/idle/waiting a histogram latence checkoutu)."""
+    return {
+        "async": pool_snapshot(async_engine.sync_engine),
+        "sync": pool_snapshot(engine),
+    }
+
+
+@router.get("/password-hashing")
+async def password_hashing_metrics():
+    """Stav bcrypt poolu (běžící/čekající úlohy, odmítnuté požadavky, doby čekání a výpočtu)."""
+    return password_hasher.snapshot()
+
+
+@router.get("/startup")
+async def startup_metrics(request: Request):
+    """Doby fází startu aplikace v ms (import, model_registration, router_build, first_db_connect)."""
+    timings = getattr(request.app.state, "startup_timings", {})
+    return {phase: round(ms, 1) for phase, ms in timings.items()}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app import crud, models, schemas
 from app.api import dependencies
+from app.api.pagination import PageParams, set_page_headers
+from app.api.projection import sparse_fields, sparse_response
 from app.db.session import get_db
 from app.auth.auth import get_current_user
 from app.schemas.organization_tag import OrganizationTag
@@ -13,7 +15,7 @@ router = APIRouter()
 @router.post("/", response_model=schemas.Organization, status_code=status.HTTP_201_CREATED)
 async def create_organization(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     organization_in: schemas.OrganizationCreate,
     current_user: models.User = Depends(get_current_user)
 ):
@@ -23,56 +25,72 @@ async def create_organization(
 
     # Verify parent_organization_id if provided
     if organization_in.parent_organization_id:
-        parent_organization = crud.get_organization(db, organization_id=organization_in.parent_organization_id)
+        parent_organization = await crud.get_organization(db, organization_id=organization_in.parent_organization_id)
         if not parent_organization or parent_organization.world_id != organization_in.world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid parent_organization_id for this world")
 
-    organization = crud.create_organization(db=db, organization=organization_in)
+    organization = await crud.create_organization(db=db, organization=organization_in)
     return organization
 
 @router.get("/{organization_id}", response_model=schemas.Organization)
 async def read_organization(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     organization_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Get a specific organization by ID. User must be a member of the world."""
-    db_organization = crud.get_organization(db, organization_id=organization_id)
+    db_organization = await crud.get_organization(db, organization_id=organization_id)
     if db_organization is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
-    # Verify membership (using the existing non-async function)
-    dependencies.check_world_membership(world_id=db_organization.world_id, user_id=current_user.id, db=db)
+    # Verify membership
+    await dependencies.check_world_membership(world_id=db_organization.world_id, user_id=current_user.id, db=db)
 
     return db_organization
 
 @router.get("/", response_model=List[schemas.Organization])
 async def read_organizations_by_world(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    response: Response,
     world_id: int = Query(..., description="Filter organizations by world ID"),
     skip: int = 0,
     limit: int = 100,
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(models.Organization, schemas.Organization)),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Retrieve organizations belonging to a specific world. User must be a member."""
-    # Verify membership (using the existing non-async function)
-    dependencies.check_world_membership(world_id=world_id, user_id=current_user.id, db=db)
-
-    organizations = crud.get_organizations_by_world(db, world_id=world_id, skip=skip, limit=limit)
+    """Retrieve organizations belonging to a specific world. User must be a member.
+
+    `fields=` returns only the listed columns (sparse fieldset)."""
+    # Verify membership
+    await dependencies.check_world_membership(world_id=world_id, user_id=current_user.id, db=db)
+
+    after = page.after(crud.ORGANIZATION_ORDER)
+    total = await crud.estimate_count(db, models.Organization, world_id=world_id) if page.include_total else None
+    if fields:
+        rows = await crud.get_projection(
+            db, models.Organization, fields, crud.ORGANIZATION_ORDER, models.Organization.world_id == world_id,
+            skip=skip, limit=limit, after=after,
+        )
+        set_page_headers(response, crud.ORGANIZATION_ORDER, rows, limit, total)
+        return sparse_response(rows, fields, response)
+
+    organizations = await crud.get_organizations_by_world(db, world_id=world_id, skip=skip, limit=limit, after=after)
+    set_page_headers(response, crud.ORGANIZATION_ORDER, organizations, limit, total)
     return organizations
 
 @router.put("/{organization_id}", response_model=schemas.Organization)
 async def update_organization(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     organization_id: int,
     organization_in: schemas.OrganizationUpdate,
     current_user: models.User = Depends(get_current_user)
 ):
     """Update an organization. User must own the world the organization belongs to."""
-    db_organization = crud.get_organization(db, organization_id=organization_id)
+    db_organization = await crud.get_organization(db, organization_id=organization_id)
     if not db_organization:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
@@ -83,22 +101,22 @@ async def update_organization(
     if organization_in.parent_organization_id is not None:
         if organization_in.parent_organization_id == db_organization.id:
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Organization cannot be its own parent")
-        parent_organization = crud.get_organization(db, organization_id=organization_in.parent_organization_id)
+        parent_organization = await crud.get_organization(db, organization_id=organization_in.parent_organization_id)
         if not parent_organization or parent_organization.world_id != db_organization.world_id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid parent_organization_id for this world")
 
-    organization = crud.update_organization(db=db, db_organization=db_organization, organization_in=organization_in)
+    organization = await crud.update_organization(db=db, db_organization=db_organization, organization_in=organization_in)
     return organization
 
 @router.delete("/{organization_id}", response_model=schemas.Organization)
 async def delete_organization(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     organization_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Delete an organization. User must own the world the organization belongs to."""
-    db_organization = crud.get_organization(db, organization_id=organization_id)
+    db_organization = await crud.get_organization(db, organization_id=organization_id)
     if not db_organization:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
@@ -110,7 +128,7 @@ async def delete_organization(
     # The model currently uses ondelete="SET NULL" for parent_organization_id, so children should be handled by DB.
 
     deleted_organization_data = schemas.Organization.from_orm(db_organization) # Capture data before deletion
-    crud.delete_organization(db=db, db_organization=db_organization)
+    await crud.delete_organization(db=db, db_organization=db_organization)
 
     # Return the data of the deleted object
     return deleted_organization_data
@@ -128,12 +146,12 @@ async def delete_organization(
 async def add_tag_to_organization_endpoint(
     organization_id: int = Path(..., description="ID organizace"),
     tag_type_id: int = Path(..., description="ID typu tagu, který se má přiřadit"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Přiřadí existující typ tagu ke konkrétní organizaci. Vyžaduje vlastnictví světa organizace."""
     # 1. Získáme organizaci (pro ověření vlastnictví světa)
-    db_organization = crud.get_organization(db, organization_id=organization_id)
+    db_organization = await crud.get_organization(db, organization_id=organization_id)
     if not db_organization:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
@@ -143,7 +161,7 @@ async def add_tag_to_organization_endpoint(
     # 3. CRUD operace pro přidání tagu (ta obsahuje validaci tag_type_id a world_id)
     try:
         # Předáme db, organization_id, tag_type_id
-        db_association = crud.add_tag_to_organization(db=db, organization_id=organization_id, tag_type_id=tag_type_id)
+        db_association = await crud.add_tag_to_organization(db=db, organization_id=organization_id, tag_type_id=tag_type_id)
         # Načtení tag_type probíhá uvnitř CRUD funkce, pokud je potřeba pro response model
     except ValueError as e:
         # Chyby z CRUD (nenalezeno, jiný svět) převedeme na HTTP chyby
@@ -162,12 +180,12 @@ async def add_tag_to_organization_endpoint(
 async def remove_tag_from_organization_endpoint(
     organization_id: int = Path(..., description="ID organizace"),
     tag_type_id: int = Path(..., description="ID typu tagu, který se má odebrat"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Odebere přiřazení typu tagu od konkrétní organizace. Vyžaduje vlastnictví světa organizace."""
     # 1. Získáme organizaci (pro ověření vlastnictví světa)
-    db_organization = crud.get_organization(db, organization_id=organization_id)
+    db_organization = await crud.get_organization(db, organization_id=organization_id)
     if not db_organization:
         # Pokud organizace neexistuje, tag stejně nemůže být přiřazen
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
@@ -176,7 +194,7 @@ async def remove_tag_from_organization_endpoint(
     await dependencies.verify_world_owner(world_id=db_organization.world_id, current_user=current_user, db=db)
 
     # 3. CRUD operace pro odebrání tagu
-    deleted = crud.remove_tag_from_organization(db=db, organization_id=organization_id, tag_type_id=tag_type_id)
+    deleted = await crud.remove_tag_from_organization(db=db, organization_id=organization_id, tag_type_id=tag_type_id)
     
     if not deleted:
         # Pokud nebylo nic smazáno, znamená to, že tag nebyl k organizaci přiřazen
@@ -1,22 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Annotated, Optional
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
 
 from ... import crud, models, schemas
 from ...db.session import get_db
 from ...auth.auth import get_current_user
 from ..dependencies import verify_campaign_membership, verify_gm_for_session 
+from .slot_recurrences import check_occurrence_window
+from ...models.user_campaign import CampaignRoleEnum
+from ...core.config import settings
+from ...core.limiter import limiter
+from ...services import calendar_feed, live_updates
+from ...services.availability_overlap import rank_windows, ranges_with_at_least, sweep
+from ...services.time_grid import DEFAULT_TIMEZONE, TimeGrid, check_timezone
 
 # Define router. We will include it under /sessions/{session_id} in the main API router
 router = APIRouter()
 
+# Nejdelší rozsah gridu dostupností v jednom požadavku
+GRID_MAX_DAYS = 62
+
 # --- Dependency to get Session Slot --- 
-def get_session_slot( 
+async def get_session_slot( 
+    slot_id: Annotated[int, Path(description="The ID of the session slot")],
+    db: AsyncSession = Depends(get_db)
+) -> models.SessionSlot:
+    db_slot = await crud.get_slot(db, slot_id=slot_id, with_availabilities=False)
+    if not db_slot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session slot not found")
+    return db_slot
+
+# Slot včetně dostupností - jen pro odpovědi, které je vracejí (smazaný slot)
+async def get_session_slot_with_availabilities(
     slot_id: Annotated[int, Path(description="The ID of the session slot")],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.SessionSlot:
-    db_slot = crud.get_slot(db, slot_id=slot_id)
+    db_slot = await crud.get_slot(db, slot_id=slot_id)
     if not db_slot:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session slot not found")
     return db_slot
@@ -27,47 +50,50 @@ def get_session_slot(
     "/slots", 
     response_model=schemas.SessionSlot, 
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(verify_gm_for_session)] # Use new dependency
 )
-def create_slot(
+async def create_slot(
     session_id: Annotated[int, Path(description="The ID of the session to add the slot to")],
     slot_in: schemas.SessionSlotCreate,
-    db: Session = Depends(get_db),
+    campaign_id: int = Depends(verify_gm_for_session),
+    db: AsyncSession = Depends(get_db),
     # current_user is implicitly checked by verify_gm_for_session
 ):
     """Create a new availability slot for a session. Requires GM permission for the campaign."""
     # Session existence and GM permission checked by dependency
-    # db_session = crud.get_session(db, session_id=session_id) # No longer needed here
+    # db_session = await crud.get_session(db, session_id=session_id) # No longer needed here
     # if not db_session:
     #      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    return crud.create_session_slot(db=db, slot_in=slot_in, session_id=session_id)
+    db_slot = await crud.create_session_slot(db=db, slot_in=slot_in, session_id=session_id)
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(session_id, {"type": "slot.created", "slot": live_updates.slot_payload(db_slot)})
+    return db_slot
 
 @router.get(
     "/slots", 
     response_model=List[schemas.SessionSlot],
     dependencies=[Depends(verify_campaign_membership)] # Membership check - OK
 )
-def read_slots(
+async def read_slots(
     session_id: Annotated[int, Path(description="The ID of the session to get slots from")],
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Retrieve all availability slots for a session. Requires campaign membership."""
     # Permission already checked by dependency
-    slots = crud.get_slots_by_session(db, session_id=session_id, skip=skip, limit=limit)
+    slots = await crud.get_slots_by_session(db, session_id=session_id, skip=skip, limit=limit)
     return slots
 
 @router.put(
     "/slots/{slot_id}", 
     response_model=schemas.SessionSlot,
-    dependencies=[Depends(verify_gm_for_session)] # Use new dependency
 )
-def update_slot(
+async def update_slot(
     session_id: Annotated[int, Path(description="The ID of the session the slot belongs to (for permission check)")],
     slot_in: schemas.SessionSlotUpdate,
+    campaign_id: int = Depends(verify_gm_for_session),
     db_slot: models.SessionSlot = Depends(get_session_slot),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # current_user checked by dependency
 ):
     """Update an availability slot. Requires GM permission."""
@@ -76,37 +102,43 @@ def update_slot(
     # It doesn't guarantee the slot_id belongs to *that* session.
     if db_slot.session_id != session_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slot does not belong to the specified session")
-    return crud.update_session_slot(db=db, db_slot=db_slot, slot_in=slot_in)
+    db_slot = await crud.update_session_slot(db=db, db_slot=db_slot, slot_in=slot_in)
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(session_id, {"type": "slot.updated", "slot": live_updates.slot_payload(db_slot)})
+    return db_slot
 
 @router.delete(
     "/slots/{slot_id}", 
     response_model=schemas.SessionSlot, # Return the deleted slot
-    dependencies=[Depends(verify_gm_for_session)] # Use new dependency
 )
-def delete_slot(
+async def delete_slot(
     session_id: Annotated[int, Path(description="The ID of the session the slot belongs to (for permission check)")],
-    db_slot: models.SessionSlot = Depends(get_session_slot),
-    db: Session = Depends(get_db),
+    campaign_id: int = Depends(verify_gm_for_session),
+    db_slot: models.SessionSlot = Depends(get_session_slot_with_availabilities),
+    db: AsyncSession = Depends(get_db),
     # current_user checked by dependency
 ):
     """Delete an availability slot. Requires GM permission."""
     if db_slot.session_id != session_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slot does not belong to the specified session")
-    return crud.delete_session_slot(db=db, db_slot=db_slot)
+    deleted_slot = await crud.delete_session_slot(db=db, db_slot=db_slot)
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(session_id, {"type": "slot.deleted", "slot_id": deleted_slot.id})
+    return deleted_slot
 
 # --- User Availability Endpoints (Players/Members) ---
 
 @router.put(
     "/slots/{slot_id}/availabilities/me", 
     response_model=schemas.UserAvailability,
-    dependencies=[Depends(verify_campaign_membership)] # Membership check - OK
 )
-def set_my_availability(
+async def set_my_availability(
     session_id: Annotated[int, Path(description="The ID of the session (for permission check)")],
     slot_id: Annotated[int, Path(description="The ID of the slot to set availability for")],
     availability_in: schemas.UserAvailabilityCreateUpdate,
+    campaign_id: int = Depends(verify_campaign_membership), # Membership check - OK
     db_slot: models.SessionSlot = Depends(get_session_slot), # Get the slot to validate against
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """Set or update the current user's availability for a specific slot. Requires campaign membership."""
@@ -117,25 +149,33 @@ def set_my_availability(
     if db_slot.id != slot_id: 
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Path slot ID mismatch")
 
-    return crud.set_user_availability(
+    availability = await crud.set_user_availability(
         db=db, 
         slot=db_slot, 
         user_id=current_user.id, 
         availability_in=availability_in
     )
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(session_id, {
+        "type": "availability.created",
+        "slot_id": slot_id,
+        "user_id": current_user.id,
+        "availability": live_updates.availability_payload(availability),
+    })
+    return availability
 
 @router.delete(
     "/slots/{slot_id}/availabilities/me", 
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(verify_campaign_membership)]
 )
-def delete_my_availability(
+async def delete_my_availability(
     session_id: Annotated[int, Path(description="The ID of the session (for permission check)")],
     slot_id: Annotated[int, Path(description="The ID of the slot to delete availability from")],
     time_from: Optional[datetime] = None,
     time_to: Optional[datetime] = None,
+    campaign_id: int = Depends(verify_campaign_membership),
     db_slot: models.SessionSlot = Depends(get_session_slot), # Ensure slot exists
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """Delete the current user's availability for a specific slot.
@@ -166,13 +206,21 @@ def delete_my_availability(
             )
 
     # Call the updated CRUD function which now supports interval-based deletion
-    deleted = crud.delete_user_availability(
+    deleted_ids = await crud.delete_user_availability(
         db=db, 
         user_id=current_user.id, 
         slot_id=slot_id,
         time_from=time_from,
         time_to=time_to
     )
+    if deleted_ids:
+        await calendar_feed.touch(campaign_id)
+        await live_updates.publish(session_id, {
+            "type": "availability.deleted",
+            "slot_id": slot_id,
+            "user_id": current_user.id,
+            "availability_ids": deleted_ids,
+        })
 
     return None # Return 204 No Content
 
@@ -181,11 +229,11 @@ def delete_my_availability(
     response_model=List[schemas.UserAvailability],
     dependencies=[Depends(verify_campaign_membership)] # Membership check - OK
 )
-def read_slot_availabilities(
+async def read_slot_availabilities(
     session_id: Annotated[int, Path(description="The ID of the session (for permission check)")],
     slot_id: Annotated[int, Path(description="The ID of the slot to get availabilities from")],
     db_slot: models.SessionSlot = Depends(get_session_slot), # Ensure slot exists
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
 ):
@@ -195,7 +243,7 @@ def read_slot_availabilities(
     if db_slot.id != slot_id: 
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Path slot ID mismatch")
     
-    availabilities = crud.get_availabilities_by_slot(db, slot_id=slot_id, skip=skip, limit=limit)
+    availabilities = await crud.get_availabilities_by_slot(db, slot_id=slot_id, skip=skip, limit=limit)
     return availabilities
 
 @router.get(
@@ -203,16 +251,284 @@ def read_slot_availabilities(
     response_model=List[schemas.UserAvailability],
     dependencies=[Depends(verify_campaign_membership)] # Membership check - OK
 )
-def read_all_session_availabilities(
+async def read_all_session_availabilities(
     session_id: Annotated[int, Path(description="The ID of the session to get all availabilities from")],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all user availabilities across all slots for a specific session. Requires campaign membership."""
     # Permission dependency already checked
     # Session existence check is handled by verify_campaign_membership dependency
-    # db_session = crud.get_session(db, session_id=session_id)
+    # db_session = await crud.get_session(db, session_id=session_id)
     # if not db_session:
     #      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
          
-    all_availabilities = crud.get_all_availabilities_by_session(db, session_id=session_id)
-    return all_availabilities 
\ No newline at end of file
+    all_availabilities = await crud.get_all_availabilities_by_session(db, session_id=session_id)
+    return all_availabilities 
+@router.put(
+    "/availabilities/me",
+    response_model=schemas.UserAvailabilitySyncResult,
+)
+async def sync_my_availabilities(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    sync_in: schemas.UserAvailabilitySync,
+    campaign_id: int = Depends(verify_campaign_membership),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Replace the current user's availability in the listed slots with the given intervals.
+
+    Překrývající se a navazující intervaly se sloučí a změny (vložení, smazání, poznámky)
+    se uloží v jedné transakci - grid tak synchronizuje celý výběr jedním požadavkem.
+    Sloty, které v požadavku nejsou, se nemění. Requires campaign membership.
+    """
+    result = await crud.sync_user_availabilities(
+        db=db,
+        session_id=session_id,
+        user_id=current_user.id,
+        slots_in=sync_in.slots,
+    )
+    if result["created"] or result["updated"] or result["deleted"]:
+        await calendar_feed.touch(campaign_id)
+        # Celá nová množina intervalů uživatele v každém synchronizovaném slotu
+        by_slot = {slot_in.slot_id: [] for slot_in in sync_in.slots}
+        for availability in result["availabilities"]:
+            by_slot[availability.slot_id].append(live_updates.availability_payload(availability))
+        await live_updates.publish(session_id, *(
+            {"type": "availability.replaced", "slot_id": slot_id, "user_id": current_user.id, "availabilities": availabilities}
+            for slot_id, availabilities in by_slot.items()
+        ))
+    return result
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {live_updates.MEDIA_TYPE: {}}}},
+)
+@limiter.limit(settings.GENERIC_READ_LIMIT)
+async def stream_session_events(
+    request: Request,
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    campaign_id: int = Depends(verify_campaign_membership),
+    db: AsyncSession = Depends(get_db),
+):
+    """Server-Sent Events se změnami slotů, dostupností a opakování sezení. Requires campaign membership.
+
+    Každá zpráva je JSON s `type` (slot.created/updated/deleted, availability.created/
+    deleted/replaced, recurrence.created/updated/deleted, resync) a změněnými daty,
+    takže klient nemusí /availabilities znovu načítat. Po `resync` (nebo znovupřipojení)
+    si stav načte celý.
+    """
+    # Spojení do DB se během streamu nedrží
+    await db.close()
+    return StreamingResponse(
+        live_updates.stream(session_id),
+        media_type=live_updates.MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _load_session_segments(
+    db: AsyncSession, session_id: int, campaign_id: int,
+    window_from: Optional[datetime] = None, window_to: Optional[datetime] = None,
+):
+    """Role účastníků (hráči a GM) a úseky dostupnosti každého slotu sezení.
+
+    Dva dotazy (členové + intervaly) a dva na sloty a rozvinuté výskyty opakování
+    (crud.get_slot_occurrences); zbytek se počítá v paměti nad seřazenými poli.
+    Nezhmotněné výskyty nemají dostupnosti, jejich úseky jsou prázdné.
+    """
+    roster = await crud.get_campaign_roster(db, campaign_id=campaign_id)
+    participants = {
+        user_id: role for user_id, role in roster.items()
+        if role in (CampaignRoleEnum.GM, CampaignRoleEnum.PLAYER)
+    }
+
+    intervals_by_slot = defaultdict(list)
+    for slot_id, user_id, available_from, available_to in await crud.get_availability_intervals_by_session(db, session_id=session_id):
+        if user_id in participants:
+            intervals_by_slot[slot_id].append((available_from, available_to, user_id))
+
+    slots = [
+        (slot, sweep(intervals_by_slot.get(slot["slot_id"], ()), lower=slot["slot_from"], upper=slot["slot_to"]))
+        for slot in await crud.get_slot_occurrences(db, session_id=session_id, window_from=window_from, window_to=window_to)
+    ]
+    return participants, slots
+
+@router.get(
+    "/availability-overlap",
+    response_model=schemas.SessionAvailabilityOverlap,
+)
+async def read_session_availability_overlap(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    min_available: Annotated[int, Query(ge=1, description="Return only segments with at least this many available members")] = 1,
+    quorum: Annotated[Optional[int], Query(ge=1, description="Members required for a playable range (default: all members)")] = None,
+    window_from: Annotated[Optional[datetime], Query(alias="from", description="Only slots in this window (recurrences default to the next 4 weeks)")] = None,
+    window_to: Annotated[Optional[datetime], Query(alias="to", description="End of the window")] = None,
+    campaign_id: int = Depends(verify_campaign_membership),
+    db: AsyncSession = Depends(get_db),
+):
+    """Předpočítané překryvy dostupností pro všechny sloty sezení. Requires campaign membership.
+
+    Pro každý slot vrátí úseky se stejnou množinou dostupných členů (N z M) a souvislé
+    rozsahy, kde je dostupných alespoň `quorum` členů. Počítají se jen hráči a GM
+    kampaně; grid tak nemusí překryvy skládat z jednotlivých intervalů.
+    """
+    check_occurrence_window(window_from, window_to)
+    participants, slot_segments = await _load_session_segments(db, session_id, campaign_id, window_from, window_to)
+    quorum = quorum if quorum is not None else max(len(participants), 1)
+
+    slots = []
+    for slot, segments in slot_segments:
+        slots.append(schemas.SlotAvailabilityOverlap(
+            slot_id=slot["slot_id"],
+            recurrence_id=slot["recurrence_id"],
+            slot_from=slot["slot_from"],
+            slot_to=slot["slot_to"],
+            max_available=max((segment.count for segment in segments), default=0),
+            segments=[
+                schemas.AvailabilitySegment(
+                    start=segment.start,
+                    end=segment.end,
+                    count=segment.count,
+                    user_ids=sorted(segment.user_ids),
+                    meets_quorum=segment.count >= quorum,
+                )
+                for segment in segments if segment.count >= min_available
+            ],
+            quorum_ranges=[
+                schemas.AvailabilityTimeRange(start=start, end=end)
+                for start, end in ranges_with_at_least(segments, quorum)
+            ],
+        ))
+
+    return schemas.SessionAvailabilityOverlap(
+        session_id=session_id,
+        member_count=len(participants),
+        quorum=quorum,
+        min_available=min_available,
+        slots=slots,
+    )
+
+@router.get(
+    "/recommended-times",
+    response_model=schemas.SessionTimeRecommendations,
+)
+async def read_recommended_session_times(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    duration_minutes: Annotated[int, Query(ge=15, le=24 * 60, description="Length of the planned session")],
+    top_k: Annotated[int, Query(ge=1, le=50, description="Number of options to return")] = 5,
+    gm_required: Annotated[bool, Query(description="Only options where a GM of the campaign can attend")] = True,
+    min_players: Annotated[int, Query(ge=0, description="Minimum number of attending players (GM not counted)")] = 1,
+    window_from: Annotated[Optional[datetime], Query(alias="from", description="Only slots in this window")] = None,
+    window_to: Annotated[Optional[datetime], Query(alias="to", description="End of the window")] = None,
+    campaign_id: int = Depends(verify_campaign_membership),
+    db: AsyncSession = Depends(get_db),
+):
+    """Nejlepší začátky sezení dané délky napříč všemi sloty. Requires campaign membership.
+
+    Kandidáti se hodnotí podle počtu členů dostupných po celou dobu sezení; okna bez
+    GM (pokud je vyžadován) nebo s méně než `min_players` hráči se vyřadí.
+    """
+    check_occurrence_window(window_from, window_to)
+    participants, slot_segments = await _load_session_segments(db, session_id, campaign_id, window_from, window_to)
+    gm_ids = frozenset(user_id for user_id, role in participants.items() if role == CampaignRoleEnum.GM)
+
+    def accept(user_ids) -> bool:
+        if gm_required and not user_ids & gm_ids:
+            return False
+        return len(user_ids - gm_ids) >= min_players
+
+    windows = rank_windows(
+        # Okna vznikají jen z dostupností - nezhmotněné výskyty (bez slot_id) nic nepřidají
+        ((slot["slot_id"], segments) for slot, segments in slot_segments if slot["slot_id"] is not None),
+        duration=timedelta(minutes=duration_minutes),
+        top_k=top_k,
+        accept=accept,
+    )
+    return schemas.SessionTimeRecommendations(
+        session_id=session_id,
+        duration_minutes=duration_minutes,
+        member_count=len(participants),
+        options=[
+            schemas.SessionTimeOption(
+                slot_id=window.slot_id,
+                start=window.start,
+                end=window.end,
+                attendee_count=len(window.user_ids),
+                player_count=len(window.user_ids - gm_ids),
+                gm_attends=bool(window.user_ids & gm_ids),
+                user_ids=sorted(window.user_ids),
+                missing_user_ids=sorted(participants.keys() - window.user_ids),
+            )
+            for window in windows
+        ],
+    )
+
+@router.get(
+    "/availability-grid",
+    response_model=schemas.SessionAvailabilityGrid,
+)
+async def read_session_availability_grid(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    day_from: Annotated[date, Query(alias="from", description="First local day of the grid")],
+    day_to: Annotated[Optional[date], Query(alias="to", description="Local day after the last one (default: 7 days)")] = None,
+    cell_minutes: Annotated[int, Query(ge=5, le=240, description="Cell length, must divide a day")] = 30,
+    tz: Annotated[Optional[str], Query(description="IANA time zone (default: the user's, else UTC)")] = None,
+    campaign_id: int = Depends(verify_campaign_membership),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Dostupnosti sezení rozdělené do buněk po místních dnech v zóně volajícího. Requires campaign membership.
+
+    Pro každou buňku počet hráčů a GM dostupných po celou buňku, zda je v ní dostupný
+    volající a zda leží ve slotu. Grid tak nemusí převádět časy ani procházet
+    intervaly buňku po buňce - jen vykreslí pole.
+    """
+    day_to = day_to or day_from + timedelta(days=7)
+    if day_to <= day_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if (day_to - day_from).days > GRID_MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Grid must not exceed {GRID_MAX_DAYS} days")
+    if (24 * 60) % cell_minutes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cell_minutes must divide a day")
+    try:
+        tz_name = check_timezone(tz or current_user.timezone) or DEFAULT_TIMEZONE
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    grid = TimeGrid(ZoneInfo(tz_name), day_from, day_to, cell_minutes)
+    window_from, window_to = grid.window
+
+    roster = await crud.get_campaign_roster(db, campaign_id=campaign_id)
+    participants = {
+        user_id for user_id, role in roster.items()
+        if role in (CampaignRoleEnum.GM, CampaignRoleEnum.PLAYER)
+    }
+    intervals_by_user = defaultdict(list)
+    for _, user_id, available_from, available_to in await crud.get_availability_intervals_by_session(
+        db, session_id=session_id, window_from=window_from, window_to=window_to
+    ):
+        intervals_by_user[user_id].append((available_from, available_to))
+    slots = await crud.get_slot_occurrences(db, session_id=session_id, window_from=window_from, window_to=window_to)
+
+    counts = grid.counts(intervals for user_id, intervals in intervals_by_user.items() if user_id in participants)
+    mine = grid.counts([intervals_by_user.get(current_user.id, ())])
+    in_slot = grid.counts([[(slot["slot_from"], slot["slot_to"]) for slot in slots]])
+
+    return schemas.SessionAvailabilityGrid(
+        session_id=session_id,
+        timezone=tz_name,
+        cell_minutes=cell_minutes,
+        member_count=len(participants),
+        days=[
+            schemas.AvailabilityGridDay(
+                date=day.day,
+                start=day.start,
+                end=day.end,
+                counts=day_counts,
+                mine=[bool(value) for value in day_mine],
+                in_slot=[bool(value) for value in day_in_slot],
+            )
+            for (day, day_counts), (_, day_mine), (_, day_in_slot)
+            in zip(grid.split(counts), grid.split(mine), grid.split(in_slot))
+        ],
+    )
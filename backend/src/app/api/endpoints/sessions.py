@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ... import crud, models, schemas
@@ -7,21 +7,23 @@ from ...db.session import get_db
 from ...auth.auth import get_current_user
 # Import dependency for checking GM permission
 from ..dependencies import verify_gm_permission 
+from ...services import calendar_feed
+from ...services.permission_service import PermissionResolver
+from ..pagination import PageParams, set_page_headers
 
 router = APIRouter(tags=["sessions"])
 
 # Dependency to get session and verify campaign membership (for read access)
 async def get_session_and_verify_membership(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Session:
-    db_session = crud.get_session(db, session_id=session_id)
+    db_session = await crud.get_session(db, session_id=session_id)
     if not db_session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     # Check if user is member of the parent campaign
-    membership = crud.get_campaign_membership(db, campaign_id=db_session.campaign_id, user_id=current_user.id)
-    if not membership:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_member(db_session.campaign_id):
         # Optionally check if campaign/world is public? Assuming sessions require membership.
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this session's campaign")
     return db_session
@@ -29,10 +31,11 @@ async def get_session_and_verify_membership(
 # Dependency to get session and verify GM permission (for write access)
 async def get_session_and_verify_gm(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ) -> models.Session:
-    db_session = crud.get_session(db, session_id=session_id)
+    # Jen řádek sezení - úprava i mazání si pro odpověď načítají detaily samy
+    db_session = await crud.get_session(db, session_id=session_id, with_details=False)
     if not db_session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     # Use verify_gm_permission for the parent campaign
@@ -42,7 +45,7 @@ async def get_session_and_verify_gm(
 @router.post("/", response_model=schemas.Session, status_code=status.HTTP_201_CREATED)
 async def create_session(
     *, # Enforce keyword-only arguments
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     session_in: schemas.SessionCreate,
     current_user: models.User = Depends(get_current_user)
     # Removed gm_membership dependency from signature
@@ -52,38 +55,42 @@ async def create_session(
     await verify_gm_permission(db=db, current_user=current_user, campaign_id=session_in.campaign_id)
     
     # If permission check passes, create the session
-    session = crud.create_session(db=db, session_in=session_in)
+    session = await crud.create_session(db=db, session_in=session_in)
+    await calendar_feed.touch(session.campaign_id)
     return session
 
 @router.get("/by_campaign/{campaign_id}", response_model=List[schemas.Session])
-def read_sessions_by_campaign(
+async def read_sessions_by_campaign(
     campaign_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    page: PageParams = Depends(),
     current_user: models.User = Depends(get_current_user)
 ):
     """Retrieve sessions for a specific campaign. Requires campaign membership."""
     # Check if user is member of the campaign
-    membership = crud.get_campaign_membership(db, campaign_id=campaign_id, user_id=current_user.id)
-    if not membership:
+    if not await PermissionResolver.for_session(db, current_user.id).is_campaign_member(campaign_id):
         # Optionally check if campaign/world is public?
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this campaign")
     
-    sessions = crud.get_sessions_by_campaign(
-        db, campaign_id=campaign_id, skip=skip, limit=limit
+    sessions = await crud.get_sessions_by_campaign(
+        db, campaign_id=campaign_id, skip=skip, limit=limit, after=page.after(crud.SESSION_ORDER)
     )
+    total = await crud.estimate_count(db, models.Session, campaign_id=campaign_id) if page.include_total else None
+    set_page_headers(response, crud.SESSION_ORDER, sessions, limit, total)
     return sessions
 
 @router.get("/my-sessions", response_model=List[schemas.Session])
-def read_my_sessions(
-    db: Session = Depends(get_db),
+async def read_my_sessions(
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(get_current_user)
 ):
     """Retrieve all sessions across campaigns the current user is a member of."""
-    sessions = crud.get_sessions_for_user(
+    sessions = await crud.get_sessions_for_user(
         db, user_id=current_user.id, skip=skip, limit=limit
     )
     return sessions
@@ -101,23 +108,24 @@ def read_session(
 async def update_session(
     *, # Enforce keyword-only arguments
     session_in: schemas.SessionUpdate, # Now includes optional character_ids
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Dependency is async, endpoint should be async too
     db_session: models.Session = Depends(get_session_and_verify_gm) 
 ):
     """Update a session, including assigning characters. Requires GM role for the parent campaign."""
-    # CRUD function is sync, FastAPI will run it in a thread pool
-    updated_session = crud.update_session(db=db, db_session=db_session, session_in=session_in)
+    updated_session = await crud.update_session(db=db, db_session=db_session, session_in=session_in)
+    await calendar_feed.touch(updated_session.campaign_id)
     return updated_session
 
 @router.delete("/{session_id}", response_model=schemas.Session)
-def delete_session(
+async def delete_session(
     *, # Enforce keyword-only arguments
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Use dependency to get session and verify GM permission
     db_session: models.Session = Depends(get_session_and_verify_gm)
 ):
     """Delete a session. Requires GM role for the parent campaign."""
     # Cascade should handle related SessionCharacter entries
-    deleted_session = crud.delete_session(db=db, db_session=db_session)
+    deleted_session = await crud.delete_session(db=db, db_session=db_session)
+    await calendar_feed.touch(deleted_session.campaign_id)
     return deleted_session 
\ No newline at end of file
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Optional
+
+from ... import crud, models, schemas
+from ...db.session import get_db
+from ..dependencies import verify_campaign_membership, verify_gm_for_session
+from ...services import calendar_feed, live_updates
+from ...services.slot_recurrence import as_utc
+
+# Opakované sloty sezení - připojeno pod /sessions/{session_id}
+router = APIRouter()
+
+# Nejdelší okno, pro které se výskyty rozvinou v jednom požadavku
+OCCURRENCE_MAX_WINDOW = timedelta(days=366)
+
+def check_occurrence_window(window_from: Optional[datetime], window_to: Optional[datetime]) -> None:
+    """400, pokud okno pro rozvinutí výskytů není platné nebo je delší než OCCURRENCE_MAX_WINDOW.
+
+    Chybějící začátek znamená "od teď" (tak okno rozvíjí crud.get_slot_occurrences),
+    chybějící konec výchozí okno rozvinutí.
+    """
+    if window_from is not None and window_to is not None and window_to <= window_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if window_to is None:
+        return
+    start = as_utc(window_from) if window_from is not None else datetime.now(timezone.utc)
+    if as_utc(window_to) - start > OCCURRENCE_MAX_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time window must not exceed {OCCURRENCE_MAX_WINDOW.days} days",
+        )
+
+async def get_session_recurrence(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    recurrence_id: Annotated[int, Path(description="The ID of the slot recurrence")],
+    db: AsyncSession = Depends(get_db),
+) -> models.SessionSlotRecurrence:
+    db_recurrence = await crud.get_recurrence(db, recurrence_id=recurrence_id)
+    if not db_recurrence or db_recurrence.session_id != session_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Slot recurrence not found")
+    return db_recurrence
+
+@router.post(
+    "/slot-recurrences",
+    response_model=schemas.SessionSlotRecurrence,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_slot_recurrence(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    recurrence_in: schemas.SessionSlotRecurrenceCreate,
+    campaign_id: int = Depends(verify_gm_for_session),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a recurring slot (daily/weekly with exceptions). Requires GM permission.
+
+    Výskyty se neukládají - rozvinou se až pro požadované okno.
+    """
+    db_recurrence = await crud.create_recurrence(db=db, recurrence_in=recurrence_in, session_id=session_id)
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(session_id, {"type": "recurrence.created", "recurrence_id": db_recurrence.id})
+    return db_recurrence
+
+@router.get(
+    "/slot-recurrences",
+    response_model=List[schemas.SessionSlotRecurrence],
+    dependencies=[Depends(verify_campaign_membership)],
+)
+async def read_slot_recurrences(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    db: AsyncSession = Depends(get_db),
+):
+    """List recurring slots of a session. Requires campaign membership."""
+    return await crud.get_recurrences_by_session(db, session_id=session_id)
+
+@router.put(
+    "/slot-recurrences/{recurrence_id}",
+    response_model=schemas.SessionSlotRecurrence,
+)
+async def update_slot_recurrence(
+    recurrence_in: schemas.SessionSlotRecurrenceUpdate,
+    campaign_id: int = Depends(verify_gm_for_session),
+    db_recurrence: models.SessionSlotRecurrence = Depends(get_session_recurrence),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update a recurring slot (e.g. add exceptions). Requires GM permission.
+
+    Už zhmotněné výskyty (s dostupnostmi) zůstávají beze změny.
+    """
+    db_recurrence = await crud.update_recurrence(db=db, db_recurrence=db_recurrence, recurrence_in=recurrence_in)
+    await calendar_feed.touch(campaign_id)
+    await live_updates.publish(
+        db_recurrence.session_id, {"type": "recurrence.updated", "recurrence_id": db_recurrence.id}
+    )
+    return db_recurrence
+
+@router.delete(
+    "/slot-recurrences/{recurrence_id}",
+    response_model=schemas.SessionSlotRecurrence,
+)
+async def delete_slot_recurrence(
+    campaign_id: int = Depends(verify_gm_for_session),
+    db_recurrence: models.SessionSlotRecurrence = Depends(get_session_recurrence),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a recurring slot including its materialized occurrences. Requires GM permission."""
+    deleted = await crud.delete_recurrence(db=db, db_recurrence=db_recurrence)
+    await calendar_feed.touch(campaign_id)
+    # Zhmotněné výskyty zmizely s pravidlem - klient odebere sloty s tímto recurrence_id
+    await live_updates.publish(deleted.session_id, {"type": "recurrence.deleted", "recurrence_id": deleted.id})
+    return deleted
+
+@router.post(
+    "/slot-recurrences/{recurrence_id}/occurrences",
+    response_model=schemas.SessionSlot,
+)
+async def materialize_slot_occurrence(
+    occurrence_in: schemas.SlotOccurrenceMaterialize,
+    response: Response,
+    campaign_id: int = Depends(verify_campaign_membership),
+    db_recurrence: models.SessionSlotRecurrence = Depends(get_session_recurrence),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get or create the slot for one occurrence, so availability can be set for it. Requires campaign membership.
+
+    Vrací 201, pokud slot vznikl, jinak 200 s již existujícím slotem.
+    """
+    db_slot, created = await crud.materialize_occurrence(
+        db=db, db_recurrence=db_recurrence, slot_from=occurrence_in.slot_from
+    )
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+        await calendar_feed.touch(campaign_id)
+        await live_updates.publish(
+            db_slot.session_id, {"type": "slot.created", "slot": live_updates.slot_payload(db_slot)}
+        )
+    return db_slot
+
+@router.get(
+    "/slot-occurrences",
+    response_model=List[schemas.SlotOccurrence],
+    dependencies=[Depends(verify_campaign_membership)],
+)
+async def read_slot_occurrences(
+    session_id: Annotated[int, Path(description="The ID of the session")],
+    window_from: datetime = Query(..., alias="from", description="Start of the time window"),
+    window_to: datetime = Query(..., alias="to", description="End of the time window"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Slots and expanded recurring occurrences in a time window. Requires campaign membership.
+
+    Výskyty bez řádku mají slot_id null - dostupnost k nim jde zadat až po zhmotnění
+    (POST .../slot-recurrences/{recurrence_id}/occurrences).
+    """
+    check_occurrence_window(window_from, window_to)
+    return await crud.get_slot_occurrences(db, session_id=session_id, window_from=window_from, window_to=window_to)
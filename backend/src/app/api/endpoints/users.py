@@ -1,36 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.db.session import get_db
 from app.schemas.user import UserCreate, User, UserUpdate
-from app.crud import create_user, get_user, get_users, get_user_by_username, update_user
+from app.schemas.calendar import UserCalendar, CalendarFeedLinks
+from app.crud import (
+    create_user, get_user, get_users, get_user_by_username, update_user, get_calendar_for_user,
+    get_calendar_feed_version, rotate_calendar_feed_version,
+)
 from app.models.user import User as UserModel
-from app.core.security import get_current_active_user
+from app.core.security import create_calendar_feed_token, get_current_active_user
 from app.core.limiter import limiter
 from app.core.config import settings
+from app.services.permission_service import PermissionResolver
 
 # Use prefix but WITHOUT duplicating in the route paths
 router = APIRouter(tags=["users"])
 
+# Nejdelší okno kalendáře v jednom požadavku
+CALENDAR_MAX_WINDOW = timedelta(days=366)
+
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 @limiter.limit(settings.USER_REGISTER_LIMIT)
-def create_user_endpoint(
+async def create_user_endpoint(
     request: Request,
     user: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new user"""
     # Check if username already exists
-    existing_user = get_user_by_username(db, username=user.username)
+    existing_user = await get_user_by_username(db, username=user.username)
     if existing_user:
         raise HTTPException(
             status_code=400,
             detail="Username already registered"
         )
 
-    return create_user(db=db, user=user)
+    return await create_user(db=db, user=user)
 
 
 @router.get("/me", response_model=User)
@@ -39,36 +48,95 @@ def read_users_me(current_user: UserModel = Depends(get_current_active_user)):
     return current_user
 
 
+@router.get("/me/calendar", response_model=UserCalendar)
+async def read_my_calendar(
+    window_from: datetime = Query(..., alias="from", description="Start of the time window"),
+    window_to: datetime = Query(..., alias="to", description="End of the time window"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+):
+    """Sessions, slots and own availability across all of the user's campaigns in one request."""
+    if window_to <= window_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if window_to - window_from > CALENDAR_MAX_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time window must not exceed {CALENDAR_MAX_WINDOW.days} days",
+        )
+    sessions = await get_calendar_for_user(db, user_id=current_user.id, window_from=window_from, window_to=window_to)
+    return UserCalendar(window_from=window_from, window_to=window_to, sessions=sessions)
+
+
+async def _calendar_feed_links(
+    request: Request, db: AsyncSession, user_id: int, version: int
+) -> CalendarFeedLinks:
+    token = create_calendar_feed_token(user_id, version)
+    campaign_ids = sorted(await PermissionResolver.for_session(db, user_id).campaign_roles())
+    return CalendarFeedLinks(
+        user_feed_url=str(request.url_for("read_user_calendar_feed").include_query_params(token=token)),
+        campaign_feed_urls={
+            campaign_id: str(
+                request.url_for("read_campaign_calendar_feed", campaign_id=campaign_id).include_query_params(token=token)
+            )
+            for campaign_id in campaign_ids
+        },
+    )
+
+
+@router.get("/me/calendar/feeds", response_model=CalendarFeedLinks)
+async def read_my_calendar_feeds(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+):
+    """iCalendar feed URLs (personal and per campaign) to subscribe to in a calendar client."""
+    # Verze z DB, ne z cache uživatele - rotace v jiném workeru ji tam nezneplatní
+    version = await get_calendar_feed_version(db, user_id=current_user.id)
+    return await _calendar_feed_links(request, db, current_user.id, version)
+
+
+@router.post("/me/calendar/feeds/rotate", response_model=CalendarFeedLinks)
+async def rotate_my_calendar_feeds(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user),
+):
+    """Revoke all previously issued feed URLs (e.g. after a leaked link) and return new ones."""
+    user_id = current_user.id
+    version = await rotate_calendar_feed_version(db, user_id=user_id)
+    return await _calendar_feed_links(request, db, user_id, version)
+
+
 @router.put("/me", response_model=User)
-def update_user_me(
+async def update_user_me(
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update own user details."""
-    user = update_user(db=db, db_user=current_user, user_in=user_in)
+    user = await update_user(db=db, db_user=current_user, user_in=user_in)
     return user
 
 
 @router.get("/", response_model=List[User])
-def read_users(
+async def read_users(
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """Retrieve users"""
-    return get_users(db, skip=skip, limit=limit)
+    return await get_users(db, skip=skip, limit=limit)
 
 
 @router.get("/{user_id}", response_model=User)
-def read_user(
+async def read_user(
         user_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_active_user)
 ):
     """Get specific user by ID"""
-    user = get_user(db, user_id=user_id)
+    user = await get_user(db, user_id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional, Set
 
 from ... import crud, models, schemas
@@ -8,71 +10,80 @@ from ...auth.auth import get_current_user
 from ...models.world_user import RoleEnum as WorldRoleEnum # Import role enum
 from ...core.limiter import limiter # Import limiteru
 from ...core.config import settings # Import settings
+from ...services.permission_service import PermissionResolver
+from ..pagination import PageParams, set_page_headers
+from ..projection import sparse_fields, sparse_response
 
 router = APIRouter(tags=["worlds"])
 
-# Helper function to check world membership/role
-async def get_world_membership(world_id: int, user_id: int, db: Session = Depends(get_db)) -> models.WorldUser | None:
-    return db.query(models.WorldUser).filter(
-        models.WorldUser.world_id == world_id,
-        models.WorldUser.user_id == user_id
-    ).first()
+# Helper function to check world membership/role (z resolveru oprávnění, bez dotazu navíc)
+async def get_world_role(world_id: int, user_id: int, db: AsyncSession = Depends(get_db)) -> WorldRoleEnum | None:
+    return await PermissionResolver.for_session(db, user_id).world_role(world_id)
+
+# Helper to verify the current user is OWNER of an existing world
+async def verify_world_owner_or_404(world_id: int, user_id: int, db: AsyncSession) -> models.World:
+    world = await crud.get_world(db, world_id=world_id)
+    if not world:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
+    if await get_world_role(world_id, user_id, db) != WorldRoleEnum.OWNER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (Owner required)")
+    return world
 
 # Dependency to verify world membership
 async def verify_world_member(
     world_id: int,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    membership = await get_world_membership(world_id, current_user.id, db)
-    if not membership:
+    role = await get_world_role(world_id, current_user.id, db)
+    if role is None:
         # Optionally check if world is public first
-        world = crud.get_world(db, world_id=world_id)
+        world = await crud.get_world(db, world_id=world_id)
         if not world or not world.is_public:
              raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not a member of this world")
-    return membership # Return membership object if found
+    return role # Return world role if member
 
 @router.post("/", response_model=schemas.World, status_code=status.HTTP_201_CREATED)
 @limiter.limit(settings.GENERIC_WRITE_LIMIT) # Přidán write limit
-def create_world(
+async def create_world(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_in: schemas.WorldCreate,
     current_user: models.User = Depends(get_current_user)
 ):
     """Create new world. Creator becomes OWNER."""
-    world = crud.create_world(db=db, world=world_in, creator_id=current_user.id)
+    world = await crud.create_world(db=db, world=world_in, creator_id=current_user.id)
     return world
 
 @router.get("/public", response_model=List[schemas.World])
 @limiter.limit(settings.GENERIC_READ_LIMIT) # Přidán read limit
-def read_public_worlds(
+async def read_public_worlds(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(get_current_user)
 ):
     """Retrieve worlds where the current user is the OWNER."""
     # Použijeme upravenou CRUD funkci
-    worlds = crud.get_worlds_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
+    worlds = await crud.get_worlds_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
     return worlds
 
 @router.get("/", response_model=List[schemas.World])
 @limiter.limit(settings.GENERIC_READ_LIMIT) # Přidán read limit
-def read_worlds(
+async def read_worlds(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(get_current_user)
 ):
     """Retrieve worlds where the current user is the OWNER."""
     # Použijeme upravenou CRUD funkci
-    worlds = crud.get_worlds_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
+    worlds = await crud.get_worlds_by_owner(db, user_id=current_user.id, skip=skip, limit=limit)
     return worlds
 
 @router.get("/{world_id}", response_model=schemas.World)
@@ -80,18 +91,18 @@ def read_worlds(
 async def read_world(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Get world by ID. Requires membership in the world."""
-    world = crud.get_world(db, world_id=world_id)
+    world = await crud.get_world(db, world_id=world_id)
     if not world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
 
     # Check if the current user is a member of the world
-    membership = await get_world_membership(world_id, current_user.id, db)
-    if not membership and not world.is_public: # Allow access if public
+    role = await get_world_role(world_id, current_user.id, db)
+    if role is None and not world.is_public: # Allow access if public
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions to access this world")
 
     return world
@@ -101,22 +112,21 @@ async def read_world(
 async def update_world(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_id: int,
     world_in: schemas.WorldUpdate,
     current_user: models.User = Depends(get_current_user)
 ):
     """Update a world. Requires OWNER role."""
-    db_world = crud.get_world(db, world_id=world_id)
+    db_world = await crud.get_world(db, world_id=world_id)
     if not db_world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
 
     # Check if the current user is the OWNER
-    membership = await get_world_membership(world_id, current_user.id, db)
-    if not membership or membership.role != WorldRoleEnum.OWNER:
+    if await get_world_role(world_id, current_user.id, db) != WorldRoleEnum.OWNER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (Owner required)")
 
-    world = crud.update_world(db=db, db_world=db_world, world_in=world_in)
+    world = await crud.update_world(db=db, db_world=db_world, world_in=world_in)
     return world
 
 @router.delete("/{world_id}", response_model=schemas.World)
@@ -124,29 +134,28 @@ async def update_world(
 async def delete_world(
     *,
     request: Request, # Přidáno pro limiter
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_id: int,
     current_user: models.User = Depends(get_current_user)
 ):
     """Delete a world. Requires OWNER role."""
-    db_world = crud.get_world(db, world_id=world_id)
+    db_world = await crud.get_world(db, world_id=world_id)
     if not db_world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
 
     # Check if the current user is the OWNER
-    membership = await get_world_membership(world_id, current_user.id, db)
-    if not membership or membership.role != WorldRoleEnum.OWNER:
+    if await get_world_role(world_id, current_user.id, db) != WorldRoleEnum.OWNER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions (Owner required)")
 
     # CRUD funkce provede smazání
-    deleted_world = crud.delete_world(db=db, db_world=db_world)
+    deleted_world = await crud.delete_world(db=db, db_world=db_world)
     return deleted_world
 
 # Endpoint pro získání kampaní v rámci světa
 @router.get("/{world_id}/campaigns/", response_model=List[schemas.Campaign])
-def read_world_campaigns(
+async def read_world_campaigns(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     world_id: int,
     skip: int = 0,
     limit: int = 100,
@@ -155,13 +164,9 @@ def read_world_campaigns(
     """
     Retrieve campaigns within a specific world owned by the current user.
     """
-    world = crud.get_world(db, world_id=world_id)
-    if not world:
-        raise HTTPException(status_code=404, detail="World not found")
-    if world.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await verify_world_owner_or_404(world_id, current_user.id, db)
 
-    campaigns = crud.get_campaigns_by_world(db, world_id=world_id, skip=skip, limit=limit)
+    campaigns = await crud.get_campaigns_by_world(db, world_id=world_id, skip=skip, limit=limit)
     return campaigns
 
 # Endpoint to get all characters within a specific world (PAGINATED, FULL DATA)
@@ -170,16 +175,33 @@ def read_world_campaigns(
 async def read_world_characters(
     *,
     request: Request,
+    response: Response,
     world_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    membership: Optional[models.WorldUser] = Depends(verify_world_member)
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(models.Character, schemas.Character)),
+    db: AsyncSession = Depends(get_db),
+    role: Optional[WorldRoleEnum] = Depends(verify_world_member)
 ):
-    """Retrieve characters belonging to a specific world with pagination. Requires world membership or public world."""
+    """Retrieve characters belonging to a specific world with pagination. Requires world membership or public world.
+
+    Supports cursor pagination alongside skip/limit (see PageParams) and `fields=` for a sparse fieldset."""
     # Dependency verify_world_member already checks access
+    after = page.after(crud.CHARACTER_ORDER)
+    total = await crud.estimate_count(db, models.Character, world_id=world_id) if page.include_total else None
+    if fields:
+        # Jen vybrané sloupce - bez ORM instancí, tagů a deníků
+        rows = await crud.get_projection(
+            db, models.Character, fields, crud.CHARACTER_ORDER, models.Character.world_id == world_id,
+            skip=skip, limit=limit, after=after,
+        )
+        set_page_headers(response, crud.CHARACTER_ORDER, rows, limit, total)
+        return sparse_response(rows, fields, response)
+
     # Use the paginated CRUD function
-    characters = crud.get_characters_by_world(db, world_id=world_id, skip=skip, limit=limit)
+    characters = await crud.get_characters_by_world(db, world_id=world_id, skip=skip, limit=limit, after=after)
+    set_page_headers(response, crud.CHARACTER_ORDER, characters, limit, total)
     return characters
 
 # Endpoint to get all characters within a specific world (SIMPLE LIST)
@@ -189,14 +211,14 @@ async def read_world_characters_simple(
     *,
     request: Request, # Added for limiter
     world_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     # Use dependency to verify membership or public access
-    membership: Optional[models.WorldUser] = Depends(verify_world_member) 
+    role: Optional[WorldRoleEnum] = Depends(verify_world_member) 
 ):
     """Retrieve a simplified list of all characters (id, name) belonging to a specific world. Requires world membership or public world."""
     # Use the CRUD function that fetches all characters without pagination (with limit)
-    characters = crud.get_all_characters_by_world_simple(db, world_id=world_id)
-    # The response_model will automatically convert models.Character to schemas.CharacterSimple
+    characters = await crud.get_all_characters_by_world_simple(db, world_id=world_id)
+    # Řádky (id, name) bez ORM instancí - response_model je jen převede na CharacterSimple
     return characters
 
 @router.get("/{world_id}/members", response_model=List[schemas.WorldUserRead])
@@ -205,19 +227,15 @@ async def read_world_members(
     *,
     request: Request, # Přidáno pro limiter
     world_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     current_user: models.User = Depends(get_current_user)
 ):
-    """Retrieve members of a world."""
-    world = crud.get_world(db, world_id=world_id)
-    if not world:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
-    if world.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    """Retrieve members of a world. Requires OWNER role."""
+    await verify_world_owner_or_404(world_id, current_user.id, db)
 
-    members = crud.get_world_members(db, world_id=world_id, skip=skip, limit=limit)
+    members = await crud.get_world_members(db, world_id=world_id, skip=skip, limit=limit)
     return members
 
 @router.post("/{world_id}/members", response_model=schemas.WorldUserRead)
@@ -227,17 +245,18 @@ async def add_world_member(
     request: Request, # Přidáno pro limiter
     world_id: int,
     user_id: int = Query(...),
-    db: Session = Depends(get_db),
+    role: WorldRoleEnum = Query(WorldRoleEnum.VIEWER),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Add a member to a world."""
-    world = crud.get_world(db, world_id=world_id)
-    if not world:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
-    if world.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
-
-    member = crud.add_world_member(db, world_id=world_id, user_id=user_id)
+    """Add a member to a world. Requires OWNER role."""
+    await verify_world_owner_or_404(world_id, current_user.id, db)
+
+    member = await crud.add_world_member(db, world_id=world_id, user_id=user_id, role=role)
+    if member is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if isinstance(member, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=member)
     return member
 
 @router.put("/{world_id}/members/{user_id}", response_model=schemas.WorldUserRead)
@@ -247,17 +266,18 @@ async def update_world_member_role(
     request: Request, # Přidáno pro limiter
     world_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    role_update: schemas.WorldUserUpdate,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Update the role of a member in a world."""
-    world = crud.get_world(db, world_id=world_id)
-    if not world:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
-    if world.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
-
-    member = crud.update_world_member_role(db, world_id=world_id, user_id=user_id)
+    """Update the role of a member in a world. Requires OWNER role."""
+    await verify_world_owner_or_404(world_id, current_user.id, db)
+
+    member = await crud.update_world_member_role(db, world_id=world_id, user_id=user_id, role_update=role_update)
+    if member is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
+    if isinstance(member, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=member)
     return member
 
 @router.delete("/{world_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -267,17 +287,17 @@ async def remove_world_member(
     request: Request, # Přidáno pro limiter
     world_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Remove a member from a world."""
-    world = crud.get_world(db, world_id=world_id)
-    if not world:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
-    if world.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    """Remove a member from a world. Requires OWNER role."""
+    await verify_world_owner_or_404(world_id, current_user.id, db)
 
-    crud.remove_world_member(db, world_id=world_id, user_id=user_id)
+    result = await crud.remove_world_member(db, world_id=world_id, user_id=user_id)
+    if result is False:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
+    if isinstance(result, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result)
 
 @router.get("/{world_id}/campaign_users", response_model=List[schemas.UserSimple])
 @limiter.limit(settings.GENERIC_READ_LIMIT)
@@ -285,7 +305,7 @@ async def get_campaign_users_in_world(
     *,
     request: Request, # Added for limiter
     world_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
@@ -293,19 +313,19 @@ async def get_campaign_users_in_world(
     Requires the current user to be a member of the world.
     """
     # 1. Check if world exists
-    db_world = crud.get_world(db, world_id=world_id)
+    db_world = await crud.get_world(db, world_id=world_id)
     if not db_world:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found")
 
     # 2. Check if current user is a member of the world
-    membership = await get_world_membership(world_id, current_user.id, db)
+    role = await get_world_role(world_id, current_user.id, db)
     # Allow public access if world is public?
-    # if not membership and not db_world.is_public: 
-    if not membership:
+    # if role is None and not db_world.is_public: 
+    if role is None:
          raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this world")
 
     # 3. Get all campaigns in the world
-    campaigns = crud.get_campaigns_by_world(db, world_id=world_id)
+    campaigns = await crud.get_campaigns_by_world(db, world_id=world_id)
     if not campaigns:
         return [] # No campaigns in this world, so no campaign users
 
@@ -313,18 +333,18 @@ async def get_campaign_users_in_world(
 
     # 4. Get all unique user IDs from CampaignUser for these campaigns
     campaign_user_ids: Set[int] = set()
-    campaign_users_assoc = (
-        db.query(models.UserCampaign.user_id)
-        .filter(models.UserCampaign.campaign_id.in_(campaign_ids))
+    result = await db.execute(
+        select(models.UserCampaign.user_id)
+        .where(models.UserCampaign.campaign_id.in_(campaign_ids))
         .distinct()
-        .all()
     )
+    campaign_users_assoc = result.all()
     campaign_user_ids = {user_id_tuple[0] for user_id_tuple in campaign_users_assoc}
     
     if not campaign_user_ids:
         return [] # No users found in any campaign
 
     # 5. Get user details for these IDs
-    users = crud.get_users_by_ids(db, user_ids=list(campaign_user_ids))
+    users = await crud.get_users_by_ids(db, user_ids=list(campaign_user_ids))
 
     return users 
\ No newline at end of file
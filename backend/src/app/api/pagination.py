@@ -0,0 +1,51 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+
+from app.crud.pagination import InvalidCursor, KeysetOrder
+
+# Hlavičky se stránkováním - tělo odpovědi zůstává prostý seznam kvůli kompatibilitě
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+PAGINATION_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_EXACT_HEADER]
+
+
+class PageParams:
+    """Query parametry pro cursor stránkování, použitelné vedle skip/limit.
+
+    S `cursor` se skip ignoruje a další stránka se hledá přes index (keyset),
+    takže hluboké stránky stojí stejně jako první.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} response header"),
+        include_total: bool = Query(False, description=f"Return (estimated) total count in {TOTAL_COUNT_HEADER}"),
+    ):
+        self.cursor = cursor
+        self.include_total = include_total
+
+    def after(self, order: KeysetOrder) -> Optional[List[Any]]:
+        if self.cursor is None:
+            return None
+        try:
+            return order.decode(self.cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def set_page_headers(
+    response: Response,
+    order: KeysetOrder,
+    items: Sequence[Any],
+    limit: int,
+    total: Optional[Tuple[int, bool]] = None,
+) -> None:
+    next_cursor = order.next_cursor(items, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        count, exact = total
+        response.headers[TOTAL_COUNT_HEADER] = str(count)
+        response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if exact else "false"
@@ -0,0 +1,39 @@
+from typing import Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import RowMapping
+
+from app.crud.projection import projectable_fields
+
+
+def sparse_fields(model, schema) -> Callable[..., Optional[List[str]]]:
+    """Závislost pro `fields=` (sparse fieldset) - vrací seznam sloupců nebo None pro plnou odpověď."""
+    allowed = projectable_fields(model, schema)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of columns to return: {', '.join(allowed)}"
+        ),
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+            )
+        return requested
+
+    return dependency
+
+
+def sparse_response(rows: Sequence[RowMapping], fields: Sequence[str], response: Response) -> JSONResponse:
+    """Serializuje řádky projekce přímo (bez response_model) a přenese hlavičky, např. stránkovací."""
+    keys = list(dict.fromkeys(["id", *fields]))
+    content = jsonable_encoder([{key: row[key] for key in keys} for row in rows])
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return JSONResponse(content=content, headers=headers)
@@ -1,16 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import TokenData
+from app.auth.user_cache import user_cache
+from app.core.password_hashing import password_hasher
 
 from app.core.config import settings
 
@@ -19,21 +21,22 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    # bcrypt běží v poolu mimo event loop; při plné frontě vyletí PasswordHasherBusy (503)
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return False
+    if new_hash is not None:
+        # Hash se starým cost factorem - transparentně přepočítat
+        user.password_hash = new_hash
+        await db.commit()
+        user_cache.invalidate(user.id)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -43,7 +46,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def _load_user(db: AsyncSession, token_data: TokenData) -> Optional[User]:
+    """Načte uživatele pro subjekt tokenu - nejdřív z procesní cache, jinak z DB."""
+    cache_key = ("id", token_data.user_id) if token_data.user_id is not None else ("username", token_data.username)
+    cached = user_cache.get(cache_key)
+    if cached is not None and cached["username"] == token_data.username:
+        return await user_cache.attach(db, cached)
+
+    if token_data.user_id is not None:
+        user = await db.get(User, token_data.user_id)
+        # Token vydaný před změnou username už neplatí (stejně jako u tokenů bez uid)
+        if user is not None and user.username != token_data.username:
+            return None
+    else:
+        result = await db.execute(select(User).where(User.username == token_data.username))
+        user = result.scalars().first()
+    if user is not None:
+        user_cache.set(cache_key, user)
+    return user
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    # Memo v rámci requestu - závislosti (verify_*_membership, endpoint) ho volají opakovaně
+    memo = getattr(request.state, "user", None)
+    if memo is not None:
+        return memo
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -54,11 +81,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = await _load_user(db, token_data)
     if user is None:
         raise credentials_exception
+    # request.state.user čte i klíčová funkce rate limiteru
+    request.state.user = user
     return user
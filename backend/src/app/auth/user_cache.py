@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """Procesní TTL + LRU cache přihlášených uživatelů, klíčem je subjekt tokenu.
+
+    Ukládají se jen hodnoty sloupců, ne ORM instance - ty patří session konkrétního
+    requestu. Při zásahu se uživatel do session připojí přes merge(load=False) bez SQL.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: Hashable, user: User) -> None:
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        loaded = sa_inspect(user).dict
+        columns = [attr.key for attr in sa_inspect(User).column_attrs]
+        # Expirované sloupce (např. updated_at po flush) nelze bez dotazu přečíst - takového uživatele necachujeme
+        if any(column not in loaded for column in columns):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, {c: loaded[c] for c in columns})
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Odstraní všechny záznamy uživatele (pod libovolným klíčem)."""
+        for key in [k for k, (_, data) in self._entries.items() if data["id"] == user_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def attach(self, db: AsyncSession, data: Dict[str, Any]) -> User:
+        """Vrátí persistentní instanci User v dané session bez dotazu do DB."""
+        user = User(**data)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_SIZE)
@@ -1,7 +1,55 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Volitelné - jinak se odvodí z DATABASE_URL (driver postgresql+asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool (platí pro sync i async engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # sekundy čekání na volné spojení
+    DB_POOL_RECYCLE: int = 1800  # sekundy, -1 = vypnuto
+    DB_POOL_PRE_PING: bool = True
+    # Statement timeout na straně Postgresu (ms), None = bez limitu
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+
+    # Schéma spravuje výhradně Alembic; při startu se jen ověří revize
+    ALEMBIC_CONFIG: str = "alembic.ini"
+    # Fast-start: přeskočí kontrolu revize (např. pro autoscalované workery po migraci)
+    SKIP_SCHEMA_CHECK: bool = False
+
+    # Procesní cache přihlášených uživatelů (get_current_user), 0 = vypnuto
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 2048
+
+    # Redis cache rolí ve světech/kampaních (PermissionResolver), 0 = vypnuto
+    PERMISSION_CACHE_TTL_SECONDS: int = 120
+
+    # Hashování hesel (bcrypt) v omezeném thread poolu mimo event loop
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # změna => hashe se přepočítají při přihlášení
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16  # čekajících nad rámec workerů, pak 503
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # iCalendar feedy: razítka změn kampaní v Redisu (ETag bez dotazu do DB), 0 = vypnuto
+    CALENDAR_FEED_STAMP_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Redis index názvů entit světa pro AI generování (services.name_index), 0 = vypnuto
+    NAME_INDEX_TTL_SECONDS: int = 24 * 3600
+
+    # Živé změny sezení (SSE přes Redis pub/sub)
+    LIVE_UPDATES_QUEUE_SIZE: int = 100  # zpráv na klienta, při přetečení dostane "resync"
+    LIVE_UPDATES_HEARTBEAT_SECONDS: int = 15
+
+    # Stránkování: nad tímto odhadem (EXPLAIN) se celkový počet nepočítá přesně
+    PAGINATION_EXACT_COUNT_MAX: int = 10000
+
+    # Provozní metriky (/V1/metrics/*) jen s hlavičkou X-Metrics-Token; None = metriky vypnuté
+    METRICS_TOKEN: Optional[str] = None
+
     SECRET_KEY: str
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
@@ -18,6 +66,23 @@ class Settings(BaseSettings):
     # Spojeno středníkem pro aplikaci více limitů najednou
     AI_REQUEST_LIMITS: str
 
+    # Fronta AI generování (services.ai_jobs)
+    AI_JOB_WORKERS: int = 2  # asyncio workerů na proces API, 0 = proces úlohy nezpracovává
+    AI_JOB_MAX_ACTIVE_PER_USER: int = 2  # čekajících + běžících úloh uživatele, pak 429
+    AI_JOB_TIMEOUT_SECONDS: int = 120
+    AI_JOB_TTL_SECONDS: int = 3600  # jak dlouho je výsledek úlohy k vyzvednutí
+
+    # Cache odpovědí LLM podle promptu (services.llm_cache), TTL 0 = vypnuto
+    LLM_CACHE_TTL_SECONDS: int = 600
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_MAX_ENTRY_BYTES: int = 64 * 1024
+    LLM_INFLIGHT_LOCK_SECONDS: int = 120  # jak dlouho ostatní procesy čekají na stejné volání
+
+    # Tokenové rozpočty sekcí promptu AI generování (services.prompt_budget)
+    AI_PROMPT_CONTEXT_TOKENS: int = 1000
+    AI_PROMPT_EXAMPLE_TOKENS: int = 1500
+    AI_PROMPT_NAME_TOKENS: int = 800
+
     # Obecné Rate Limits (prevence spamu/útoků)
     AUTH_LOGIN_LIMIT: str
     USER_REGISTER_LIMIT: str
@@ -6,8 +6,10 @@ from app.core.config import settings # Import settings pro REDIS_URL
 import redis.asyncio as redis
 
 # Funkce pro získání klíče (uživatelské ID nebo IP)
-async def get_limiter_key(request: Request) -> str:
-    # Pokusíme se získat uživatele z request.state (pokud ho tam auth middleware přidává)
+# slowapi volá key_func synchronně - async funkce by vracela pokaždé nový coroutine objekt
+# a žádný limit by se neuplatnil
+def get_limiter_key(request: Request) -> str:
+    # Uživatele do request.state ukládá get_current_user (závislosti se vyhodnotí před limitem)
     user: User | None = getattr(request.state, "user", None)
     if user:
         return str(user.id)
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Jediný CryptContext aplikace - cost factor z konfigurace; hashe s jiným počtem kol
+# označí verify_and_update jako zastaralé a při přihlášení se přehashují
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Fronta hashovacího poolu je plná - endpoint má odpovědět 503 (viz handler v main.py)."""
+
+
+class PasswordHasher:
+    """Omezený thread pool pro bcrypt hash/verify mimo event loop.
+
+    bcrypt při výpočtu uvolňuje GIL, takže vlákna běží paralelně a nepotřebujeme
+    process pool. Nad `workers` běžícími úlohami čeká nejvýše `max_queue` dalších;
+    další požadavek rovnou dostane PasswordHasherBusy místo čekání ve frontě.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._run_ms_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._in_flight += 1
+            self.submitted += 1
+            self._max_queued = max(self._max_queued, self._in_flight - self.workers)
+        submitted_at = time.perf_counter()
+
+        def timed():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    wait_ms = (started_at - submitted_at) * 1000
+                    self._wait_ms_total += wait_ms
+                    self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+                    self._run_ms_total += (time.perf_counter() - started_at) * 1000
+
+        def release(_future) -> None:
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+
+        # Místo v poolu se uvolní až doběhnutím (nebo zrušením ještě nespuštěné) úlohy
+        # v executoru - zrušený request (klient zavřel spojení) ho tedy neuvolní předčasně
+        future = self._get_executor().submit(timed)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(platné heslo, nový hash nebo None) - nový hash jen pokud je uložený zastaralý."""
+        return await self._run(pwd_context.verify_and_update, password, hashed_password)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "bcrypt_rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - self.workers),
+                "max_queued": self._max_queued,
+                "submitted": self.submitted,
+                "completed": completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_ms_total / completed, 2) if completed else 0.0,
+                "max_wait_ms": round(self._wait_ms_max, 2),
+                "avg_run_ms": round(self._run_ms_total / completed, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
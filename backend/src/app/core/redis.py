@@ -0,0 +1,25 @@
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# Schémata, pro která vytváříme skutečného klienta (REDIS_URL může být i memory:// pro limiter v testech)
+_REDIS_SCHEMES = ("redis://", "rediss://", "unix://")
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Sdílený async Redis klient pro cache. Vrací None, pokud REDIS_URL neukazuje na Redis."""
+    global _client
+    if _client is None and settings.REDIS_URL.startswith(_REDIS_SCHEMES):
+        _client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
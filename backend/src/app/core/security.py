@@ -1,17 +1,15 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.core.config import settings
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context - sdílený s poolem (async varianty jsou v password_hasher)
+from app.core.password_hashing import pwd_context
 
 # JWT settings
 SECRET_KEY = settings.SECRET_KEY
@@ -23,12 +21,12 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/V1/auth/token")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
+    """Verify a password against a hash (blocking - in async code use password_hasher)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password for storing"""
+    """Hash a password for storing (blocking - in async code use password_hasher)"""
     return pwd_context.hash(password)
 
 
@@ -46,38 +44,45 @@ def create_access_token(
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Decode JWT token and return the current user"""
-    # Import here to avoid circular import
-    from app.crud import get_user_by_username
+# Claim tokenu kalendářového feedu - bez "sub", takže jím nejde volat zbytek API
+CALENDAR_FEED_CLAIM = "cal"
+# Verze tokenu (users.calendar_feed_version); tokeny bez ní mají verzi 0
+CALENDAR_FEED_VERSION_CLAIM = "ver"
+
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+def create_calendar_feed_token(user_id: int, version: int) -> str:
+    """Create a non-expiring token for iCalendar feed URLs (calendar clients can't send headers).
+
+    The token stays valid until the user's calendar_feed_version is rotated.
+    """
+    return jwt.encode(
+        {CALENDAR_FEED_CLAIM: user_id, CALENDAR_FEED_VERSION_CLAIM: version}, SECRET_KEY, algorithm=ALGORITHM
     )
 
+
+def decode_calendar_feed_token(token: str) -> Optional[Tuple[int, int]]:
+    """Return (user ID, feed version) from a calendar feed token, or None if it is invalid"""
     try:
-        # Decode token - nyní používá klíč a algoritmus z settings
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        # Není potřeba vytvářet TokenData, pokud ho dále nepoužíváme
-        # token_data = TokenData(username=username)
-    except JWTError as e:
-        print(f"JWT Error: {e}") # Přidáme logování chyby
-        raise credentials_exception
-
-    # Get user from database
-    user = get_user_by_username(db, username=username)
-    if user is None:
-        raise credentials_exception
-
-    return user
-
-
-def get_current_active_user(current_user=Depends(get_current_user)):
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    user_id = claims.get(CALENDAR_FEED_CLAIM)
+    version = claims.get(CALENDAR_FEED_VERSION_CLAIM, 0)
+    if not isinstance(user_id, int) or not isinstance(version, int):
+        return None
+    return user_id, version
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    """Decode JWT token and return the current user"""
+    # Import here to avoid circular import
+    # Jediná implementace (cache + memo v rámci requestu) je v app.auth.auth
+    from app.auth.auth import get_current_user as resolve_current_user
+
+    return await resolve_current_user(request=request, token=token, db=db)
+
+
+async def get_current_active_user(current_user=Depends(get_current_user)):
     """Check if the current user is active"""
     if not getattr(current_user, "is_active", True):  # Default to True if no is_active field
         raise HTTPException(
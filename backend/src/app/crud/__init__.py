@@ -1,4 +1,4 @@
-from .crud_user import get_user, get_user_by_username, get_users, create_user, get_users_by_ids, update_user
+from .crud_user import get_user, get_user_by_username, get_users, create_user, get_users_by_ids, update_user, get_calendar_feed_version, rotate_calendar_feed_version
 from .crud_world import get_world, get_worlds_by_owner, create_world, update_world, delete_world
 from .crud_campaign import get_campaign, get_campaigns_by_world, get_campaigns_by_owner, create_campaign, update_campaign, delete_campaign
 from .crud_character import (
@@ -11,20 +11,23 @@ from .crud_character import (
     get_all_characters_in_world,
     get_all_characters_by_world_simple,
     assign_user_to_character,
-    create_character_for_user
+    create_character_for_user,
+    CHARACTER_ORDER
 )
 from .crud_campaign_invite import get_invite_by_token, get_invites_by_campaign, create_campaign_invite, accept_campaign_invite, delete_campaign_invite
-from .crud_user_campaign import get_campaign_members, update_campaign_member_role, remove_campaign_member, get_campaign_membership
+from .crud_user_campaign import get_campaign_members, get_campaign_roster, update_campaign_member_role, remove_campaign_member, get_campaign_membership, get_campaign_roles_for_user, invalidate_campaign_permissions
+# Import WorldUser CRUD (členství ve světech)
+from .crud_world_user import get_world_roles_for_user, get_world_member, get_world_members, add_world_member, update_world_member_role, remove_world_member, invalidate_world_permissions
 # Import Journal CRUD
 from .crud_journal import get_journal, update_journal, get_multi_by_owner
 # Import JournalEntry CRUD
-from .crud_journal_entry import get_journal_entry, get_entries_by_journal, create_journal_entry, update_journal_entry, delete_journal_entry
+from .crud_journal_entry import JOURNAL_ENTRY_ORDER, get_journal_entry, get_entries_by_journal, create_journal_entry, update_journal_entry, delete_journal_entry
 # Import Session CRUD
-from .crud_session import get_session, get_sessions_by_campaign, create_session, update_session, delete_session, get_sessions_for_user
+from .crud_session import SESSION_ORDER, get_session, get_sessions_by_campaign, create_session, update_session, delete_session, get_sessions_for_user, get_calendar_for_user, get_calendar_feed
 # Import Location CRUD
-from .crud_location import get_location, get_locations_by_world, create_location, update_location, delete_location
+from .crud_location import LOCATION_ORDER, get_location, get_location_simple, get_locations_by_world, get_location_tree, get_location_ancestors, get_descendant_ids, subtree_ids, create_location, update_location, delete_location
 # Import Item CRUD
-from .crud_item import get_item, get_items_by_world, create_item, update_item, delete_item
+from .crud_item import ITEM_ORDER, get_item, get_items_by_world, item_filters, create_item, update_item, delete_item
 # Import Event CRUD
 from .crud_event import get_event, get_events_by_world, create_event, update_event, delete_event
 # Import LocationTagType CRUD
@@ -40,12 +43,17 @@ from .crud_item_tag_type import get_item_tag_type, get_item_tag_types_by_world,
 # Import ItemTag CRUD
 from .crud_item_tag import add_tag_to_item, remove_tag_from_item
 # Import Organization CRUD
-from .crud_organization import get_organization, get_organizations_by_world, create_organization, update_organization, delete_organization
+from .crud_organization import ORGANIZATION_ORDER, get_organization, get_organizations_by_world, create_organization, update_organization, delete_organization
 # Import OrganizationTagType CRUD
 from .crud_organization_tag_type import get_organization_tag_type, get_organization_tag_types_by_world, create_organization_tag_type, update_organization_tag_type, delete_organization_tag_type, get_organization_tag_type_by_name
 # Import OrganizationTag CRUD
 from .crud_organization_tag import add_tag_to_organization, remove_tag_from_organization, get_tags_for_organization, get_organization_tag_association
 # Import SessionSlot CRUD (Added)
-from .crud_session_slot import get_slot, get_slots_by_session, create_session_slot, update_session_slot, delete_session_slot
+from .crud_session_slot import get_slot, get_slots_by_session, get_slot_bounds_by_session, create_session_slot, update_session_slot, delete_session_slot
+# Opakované sloty - pravidla a líně rozvinuté výskyty
+from .crud_session_slot_recurrence import get_recurrence, get_recurrences_by_session, create_recurrence, update_recurrence, delete_recurrence, get_slot_occurrences, materialize_occurrence
 # Import UserAvailability CRUD (Added)
-from .crud_user_availability import get_user_availability, get_availabilities_by_slot, get_all_availabilities_by_session, set_user_availability, delete_user_availability
+from .crud_user_availability import get_user_availability, get_availabilities_by_slot, get_all_availabilities_by_session, get_availability_intervals_by_session, set_user_availability, sync_user_availabilities, delete_user_availability
+# Keyset (cursor) stránkování a odhad počtu řádků
+from .pagination import KeysetOrder, InvalidCursor, estimate_count
+from .projection import get_projection, projectable_fields
@@ -1,44 +1,48 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import World, Campaign, UserCampaign, WorldUser # Přidán WorldUser
 from ..models.user_campaign import CampaignRoleEnum
 from ..models.world_user import RoleEnum as WorldRoleEnum # Enum pro role ve světě
 from ..schemas.campaign import CampaignCreate, CampaignUpdate
+from .crud_user_campaign import invalidate_campaign_permissions
 
-def get_campaign(db: Session, campaign_id: int):
-    return db.query(Campaign).filter(Campaign.id == campaign_id).first()
+async def get_campaign(db: AsyncSession, campaign_id: int):
+    return await db.get(Campaign, campaign_id)
 
-def get_campaigns_by_world(db: Session, world_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Campaign).filter(Campaign.world_id == world_id).offset(skip).limit(limit).all()
+async def get_campaigns_by_world(db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(Campaign).where(Campaign.world_id == world_id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
-def get_campaigns_by_owner(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+async def get_campaigns_by_owner(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
     """Get campaigns where the user has the GM role."""
     # Najdeme asociace, kde je uživatel GM
     gm_associations = (
-        db.query(UserCampaign.campaign_id)
-        .filter(UserCampaign.user_id == user_id, UserCampaign.role == CampaignRoleEnum.GM)
-        .subquery()
+        select(UserCampaign.campaign_id)
+        .where(UserCampaign.user_id == user_id, UserCampaign.role == CampaignRoleEnum.GM)
     )
     # Vrátíme kampaně, jejichž ID jsou v seznamu GM kampaní
-    return (
-        db.query(Campaign)
-        .filter(Campaign.id.in_(gm_associations))
+    result = await db.execute(
+        select(Campaign)
+        .where(Campaign.id.in_(gm_associations))
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
 
-def create_campaign(db: Session, campaign: CampaignCreate, creator_id: int):
+async def create_campaign(db: AsyncSession, campaign: CampaignCreate, creator_id: int):
     """Creates a campaign, assigns creator as GM, and checks world ownership."""
     # Ověření, zda svět existuje A zda je tvůrce kampaně vlastníkem světa
-    world_membership = (
-        db.query(WorldUser)
-        .filter(
+    result = await db.execute(
+        select(WorldUser)
+        .where(
             WorldUser.world_id == campaign.world_id,
             WorldUser.user_id == creator_id,
             WorldUser.role == WorldRoleEnum.OWNER # Ověření role OWNER ve světě
         )
-        .first()
     )
+    world_membership = result.scalars().first()
     if not world_membership:
         # Svět neexistuje nebo uživatel není jeho vlastníkem
         return None # API vrstva vyhodí 403 nebo 404
@@ -56,15 +60,16 @@ def create_campaign(db: Session, campaign: CampaignCreate, creator_id: int):
     db.add(db_campaign)
     db.add(gm_association)
     try:
-        db.commit()
-        db.refresh(db_campaign)
+        await db.commit()
+        await db.refresh(db_campaign)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating campaign or GM association: {e}")
         raise
+    await invalidate_campaign_permissions(db, [creator_id])
     return db_campaign
 
-def update_campaign(db: Session, db_campaign: Campaign, campaign_in: CampaignUpdate):
+async def update_campaign(db: AsyncSession, db_campaign: Campaign, campaign_in: CampaignUpdate):
     """Updates a campaign. Assumes authorization (GM role) check happened in API layer."""
     update_data = campaign_in.dict(exclude_unset=True)
     for key, value in update_data.items():
@@ -73,12 +78,16 @@ def update_campaign(db: Session, db_campaign: Campaign, campaign_in: CampaignUpd
             continue # Ignorujeme pokus o změnu world_id
         setattr(db_campaign, key, value)
     db.add(db_campaign)
-    db.commit()
-    db.refresh(db_campaign)
+    await db.commit()
+    await db.refresh(db_campaign)
     return db_campaign
 
-def delete_campaign(db: Session, db_campaign: Campaign):
+async def delete_campaign(db: AsyncSession, db_campaign: Campaign):
     """Deletes a campaign. Assumes authorization (GM role) check happened in API layer."""
-    db.delete(db_campaign)
-    db.commit()
-    return db_campaign 
\ No newline at end of file
+    member_ids = (await db.scalars(
+        select(UserCampaign.user_id).where(UserCampaign.campaign_id == db_campaign.id)
+    )).all()
+    await db.delete(db_campaign)
+    await db.commit()
+    await invalidate_campaign_permissions(db, member_ids)
+    return db_campaign
@@ -1,6 +1,7 @@
 import secrets
 import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
@@ -11,31 +12,35 @@ from .. import crud
 from .. import schemas
 from ..models.world_user import RoleEnum as WorldRoleEnum
 
-def _generate_unique_token(db: Session):
+async def _generate_unique_token(db: AsyncSession):
     """Generates a unique token for campaign invites."""
     while True:
         token = secrets.token_urlsafe(16)
-        existing_invite = db.query(CampaignInvite).filter(CampaignInvite.token == token).first()
+        existing_invite = await get_invite_by_token(db, token)
         if not existing_invite:
             return token
 
-def get_invite_by_token(db: Session, token: str):
+async def get_invite_by_token(db: AsyncSession, token: str):
     """Gets a campaign invite by its token."""
-    return db.query(CampaignInvite).filter(CampaignInvite.token == token).first()
+    result = await db.execute(select(CampaignInvite).where(CampaignInvite.token == token))
+    return result.scalars().first()
 
-def get_invites_by_campaign(db: Session, campaign_id: int, skip: int = 0, limit: int = 100):
+async def get_invites_by_campaign(db: AsyncSession, campaign_id: int, skip: int = 0, limit: int = 100):
     """Gets all invites for a specific campaign."""
     # Assumes authorization (checking if user owns campaign) happens in API layer
-    return db.query(CampaignInvite).filter(CampaignInvite.campaign_id == campaign_id).offset(skip).limit(limit).all()
+    result = await db.execute(
+        select(CampaignInvite).where(CampaignInvite.campaign_id == campaign_id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
-def create_campaign_invite(db: Session, campaign_id: int, invite_in: CampaignInviteCreate):
+async def create_campaign_invite(db: AsyncSession, campaign_id: int, invite_in: CampaignInviteCreate):
     """Creates a new campaign invite. Returns the invite or None if campaign not found."""
     # Authorization (checking owner) should happen in API layer before calling this
-    db_campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    db_campaign = await db.get(Campaign, campaign_id)
     if not db_campaign:
         return None # Campaign not found
 
-    token = _generate_unique_token(db)
+    token = await _generate_unique_token(db)
     db_invite = CampaignInvite(
         campaign_id=campaign_id,
         token=token,
@@ -44,11 +49,11 @@ def create_campaign_invite(db: Session, campaign_id: int, invite_in: CampaignInv
         uses=0
     )
     db.add(db_invite)
-    db.commit()
-    db.refresh(db_invite)
+    await db.commit()
+    await db.refresh(db_invite)
     return db_invite
 
-def accept_campaign_invite(db: Session, invite: CampaignInvite, user_id: int):
+async def accept_campaign_invite(db: AsyncSession, invite: CampaignInvite, user_id: int):
     """
     Attempts to accept a campaign invite for a user.
     Returns tuple (success: bool, message: str, campaign_id: Optional[int], role: Optional[str], character_id: Optional[int])
@@ -66,21 +71,24 @@ def accept_campaign_invite(db: Session, invite: CampaignInvite, user_id: int):
         return False, "Invite has reached its maximum number of uses.", None, None, None
 
     # Check if user is already in the campaign
-    existing_membership = db.query(UserCampaign).filter(
-        UserCampaign.user_id == user_id,
-        UserCampaign.campaign_id == invite.campaign_id
-    ).first()
+    result = await db.execute(
+        select(UserCampaign).where(
+            UserCampaign.user_id == user_id,
+            UserCampaign.campaign_id == invite.campaign_id
+        )
+    )
+    existing_membership = result.scalars().first()
     if existing_membership:
         return False, "User is already a member of this campaign.", invite.campaign_id, existing_membership.role.value, None
 
     # Fetch campaign (eager load world) and user
-    db_campaign = (
-        db.query(Campaign)
+    result = await db.execute(
+        select(Campaign)
         .options(joinedload(Campaign.world)) # Eager load the world relationship
-        .filter(Campaign.id == invite.campaign_id)
-        .first()
+        .where(Campaign.id == invite.campaign_id)
     )
-    current_user = db.query(User).filter(User.id == user_id).first()
+    db_campaign = result.scalars().first()
+    current_user = await db.get(User, user_id)
 
     if not db_campaign or not db_campaign.world: # Check if world was loaded
         # This should not happen if invite is valid, but check for safety
@@ -106,7 +114,7 @@ def accept_campaign_invite(db: Session, invite: CampaignInvite, user_id: int):
             description=character_description # Add the description
         )
         # Call the new function specific for this use case
-        created_character = crud.create_character_for_user(
+        created_character = await crud.create_character_for_user(
             db=db, 
             character_in=character_data, 
             owner_user_id=user_id
@@ -124,7 +132,8 @@ def accept_campaign_invite(db: Session, invite: CampaignInvite, user_id: int):
         invite.uses += 1
         db.add(invite)
 
-        db.commit()
+        await db.commit()
+        await crud.invalidate_campaign_permissions(db, [user_id])
         # db.refresh(user_campaign_entry) # Not strictly needed here
         # db.refresh(invite) # Not strictly needed here
         # db.refresh(created_character) # Optionally refresh if needed later
@@ -132,21 +141,21 @@ def accept_campaign_invite(db: Session, invite: CampaignInvite, user_id: int):
         # Return success with the new character ID
         return True, "Successfully joined campaign and created default character.", invite.campaign_id, CampaignRoleEnum.PLAYER.value, created_character.id
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         # This might happen in a race condition if user tries to accept twice quickly
         # or if there's another DB constraint issue.
         return False, "Failed to join campaign due to a database error.", None, None, None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # Log the exception e
         return False, f"An unexpected error occurred: {e}", None, None, None
 
-def delete_campaign_invite(db: Session, invite_id: int):
+async def delete_campaign_invite(db: AsyncSession, invite_id: int):
     """Deletes a campaign invite by its ID. Returns the deleted invite or None."""
     # Assumes authorization happens in API layer
-    db_invite = db.query(CampaignInvite).filter(CampaignInvite.id == invite_id).first()
+    db_invite = await db.get(CampaignInvite, invite_id)
     if db_invite:
-        db.delete(db_invite)
-        db.commit()
+        await db.delete(db_invite)
+        await db.commit()
         return db_invite
     return None 
\ No newline at end of file
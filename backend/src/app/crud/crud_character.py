@@ -1,66 +1,88 @@
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from .. import models # Importujeme models pro použití v options
 from ..models import World, WorldUser, Journal # Import Journal model
 from ..schemas import CharacterCreate, CharacterUpdate
 from .. import schemas 
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, List, Optional, Sequence
+from .pagination import KeysetOrder
+from ..services import name_index
 
-def get_character(db: Session, character_id: int) -> Optional[models.Character]:
-    """Get a character by their ID."""
-    return db.query(models.Character).filter(models.Character.id == character_id).first()
-
-def get_characters_by_world(db: Session, world_id: int, skip: int = 0, limit: int = 100) -> List[models.Character]:
-    """Get characters belonging to a specific world (with pagination), including tags."""
+def _character_options():
+    """Eager-load options for relationships used by the Character response schema."""
     return (
-        db.query(models.Character)
-        .options(
-            selectinload(models.Character.tags) # Eagerly load tags
-            .joinedload(models.CharacterTag.tag_type) # Also load the tag type name
-        )
-        .filter(models.Character.world_id == world_id)
-        .order_by(models.Character.name)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        selectinload(models.Character.tags) # Eagerly load tags
+        .joinedload(models.CharacterTag.tag_type), # Also load the tag type name
+        selectinload(models.Character.journal),
+    )
+
+async def get_character(db: AsyncSession, character_id: int) -> Optional[models.Character]:
+    """Get a character by their ID."""
+    result = await db.execute(
+        select(models.Character)
+        .options(*_character_options())
+        .where(models.Character.id == character_id)
+        .execution_options(populate_existing=True)
     )
+    return result.scalars().first()
 
-def get_all_characters_by_world_simple(
-    db: Session, world_id: int, skip: int = 0, limit: int = 1000
+# Řazení seznamu postav ve světě (keyset stránkování přes index world_id, name, id)
+CHARACTER_ORDER = KeysetOrder("characters", (models.Character.name, False), (models.Character.id, False))
+
+async def get_characters_by_world(
+    db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100, after: Optional[Sequence[Any]] = None
 ) -> List[models.Character]:
-    """Get all characters belonging to a specific world (for selection lists)."""
-    return (
-        db.query(models.Character)
-        .filter(models.Character.world_id == world_id)
+    """Get characters belonging to a specific world (with pagination), including tags.
+
+    `after` are decoded cursor values from CHARACTER_ORDER; when given, `skip` is ignored.
+    """
+    stmt = (
+        select(models.Character)
+        .options(*_character_options())
+        .where(models.Character.world_id == world_id)
+    )
+    result = await db.execute(CHARACTER_ORDER.apply(stmt, after=after, skip=skip).limit(limit))
+    return result.scalars().all()
+
+async def get_all_characters_by_world_simple(
+    db: AsyncSession, world_id: int, skip: int = 0, limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """Get id and name of all characters in a specific world (for selection lists), without building ORM instances."""
+    result = await db.execute(
+        select(models.Character.id, models.Character.name)
+        .where(models.Character.world_id == world_id)
         .order_by(models.Character.name)
         .offset(skip)
         .limit(limit) # Apply limit for safety
-        .all()
     )
+    return result.mappings().all()
 
-def get_characters_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Character]:
+async def get_characters_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Character]:
     """Get all characters owned by a specific user."""
-    return (
-        db.query(models.Character)
-        .filter(models.Character.user_id == user_id)
+    result = await db.execute(
+        select(models.Character)
+        .options(*_character_options())
+        .where(models.Character.user_id == user_id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
 
-def create_character(db: Session, character_in: CharacterCreate, user_id: int):
+async def create_character(db: AsyncSession, character_in: CharacterCreate, user_id: int):
     """Create a new character, its associated journal, and assign initial tags.
     The character's user_id will be NULL by default.
     The provided user_id is only used to verify world membership.
     """
     # Check if user (creator) is a member of the world
-    world_membership = (
-        db.query(WorldUser)
-        .filter(
+    result = await db.execute(
+        select(WorldUser)
+        .where(
             WorldUser.world_id == character_in.world_id,
             WorldUser.user_id == user_id
         )
-        .first()
     )
+    world_membership = result.scalars().first()
     if not world_membership:
         return None # Indicate failure: user not in world
 
@@ -97,18 +119,16 @@ def create_character(db: Session, character_in: CharacterCreate, user_id: int):
             # db.add(db_tag) # SQLAlchemy handles adding via cascade with relationship append
     
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback() 
+        await db.rollback() 
         raise e
+    await name_index.set_name(name_index.CHARACTER, db_character.world_id, db_character.id, db_character.name)
 
-    db.refresh(db_character)
-    db.refresh(db_journal)
-    
-    return db_character
+    return await get_character(db, db_character.id)
 
-def update_character(
-    db: Session, db_character: models.Character, character_in: CharacterUpdate
+async def update_character(
+    db: AsyncSession, db_character: models.Character, character_in: CharacterUpdate
 ) -> models.Character:
     """Update an existing character. Handles tag updates and journal renaming."""
     update_data = character_in.dict(exclude_unset=True)
@@ -145,53 +165,55 @@ def update_character(
              # Iterate over a copy of the list when removing items
              for tag_association in list(db_character.tags):
                  if tag_association.character_tag_type_id in ids_to_remove:
-                     db.delete(tag_association) # Mark for deletion
+                     await db.delete(tag_association) # Mark for deletion
                      # Or db_character.tags.remove(tag_association) if cascade works correctly
 
     db.add(db_character) # Add the character itself (updates and new tags)
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
+    if 'name' in update_data:
+        await name_index.set_name(name_index.CHARACTER, db_character.world_id, db_character.id, db_character.name)
         
-    db.refresh(db_character)
-    return db_character
+    return await get_character(db, db_character.id)
 
-def delete_character(db: Session, db_character: models.Character) -> models.Character:
+async def delete_character(db: AsyncSession, db_character: models.Character) -> models.Character:
     """Delete a character. Journal and tags should be deleted via cascade."""
-    db.delete(db_character)
-    db.commit()
+    await db.delete(db_character)
+    await db.commit()
+    await name_index.remove(name_index.CHARACTER, db_character.world_id, [db_character.id])
     return db_character # Return the deleted object (optional)
 
-def get_all_characters_in_world(db: Session, world_id: int) -> List[models.Character]:
+async def get_all_characters_in_world(db: AsyncSession, world_id: int) -> List[models.Character]:
     """Fetches all characters belonging to a specific world without pagination."""
-    return db.query(models.Character).filter(models.Character.world_id == world_id).all()
+    result = await db.execute(select(models.Character).where(models.Character.world_id == world_id))
+    return result.scalars().all()
 
-def assign_user_to_character(db: Session, db_character: models.Character, user_id: Optional[int]) -> models.Character:
+async def assign_user_to_character(db: AsyncSession, db_character: models.Character, user_id: Optional[int]) -> models.Character:
     """Assigns or unassigns a user to a character."""
     db_character.user_id = user_id
     db.add(db_character)
     try:
-        db.commit()
-        db.refresh(db_character)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
-    return db_character 
+    return await get_character(db, db_character.id)
 
-def create_character_for_user(db: Session, character_in: schemas.CharacterCreate, owner_user_id: int) -> Optional[models.Character]:
+async def create_character_for_user(db: AsyncSession, character_in: schemas.CharacterCreate, owner_user_id: int) -> Optional[models.Character]:
     """Creates a new character and assigns it to a specific user, bypassing world membership check.
        Also creates the associated journal.
     """
     # Basic check if world exists (optional but good practice)
-    world_exists = db.query(World).filter(World.id == character_in.world_id).first()
+    world_exists = await db.get(World, character_in.world_id)
     if not world_exists:
         print(f"Attempted to create character in non-existent world: {character_in.world_id}")
         return None
     
     # Basic check if user exists (optional but good practice)
-    owner_exists = db.query(models.User).filter(models.User.id == owner_user_id).first()
+    owner_exists = await db.get(models.User, owner_user_id)
     if not owner_exists:
         print(f"Attempted to assign character to non-existent user: {owner_user_id}")
         return None
@@ -220,14 +242,12 @@ def create_character_for_user(db: Session, character_in: schemas.CharacterCreate
             db_character.tags.append(db_tag)
     
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating character for user {owner_user_id}: {e}")
         # Consider logging the error properly
         return None # Return None on commit error
+    await name_index.set_name(name_index.CHARACTER, db_character.world_id, db_character.id, db_character.name)
 
-    db.refresh(db_character)
-    db.refresh(db_journal) # Refresh journal as well
-    
-    return db_character 
\ No newline at end of file
+    return await get_character(db, db_character.id) 
\ No newline at end of file
@@ -1,16 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
 from sqlalchemy.exc import IntegrityError
 
-def get_character_tag_type(db: Session, tag_type_id: int) -> models.CharacterTagType | None:
+async def get_character_tag_type(db: AsyncSession, tag_type_id: int) -> models.CharacterTagType | None:
     """Získá konkrétní typ tagu charakteru podle ID."""
-    return db.query(models.CharacterTagType).filter(models.CharacterTagType.id == tag_type_id).first()
+    result = await db.execute(select(models.CharacterTagType).where(models.CharacterTagType.id == tag_type_id))
+    return result.scalars().first()
 
-def get_character_tag_types_by_world(db: Session, world_id: int, skip: int = 0, limit: int = 100) -> list[models.CharacterTagType]:
+async def get_character_tag_types_by_world(db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100) -> list[models.CharacterTagType]:
     """Získá seznam typů tagů charakterů pro daný svět."""
-    return db.query(models.CharacterTagType).filter(models.CharacterTagType.world_id == world_id).offset(skip).limit(limit).all()
+    result = await db.execute(select(models.CharacterTagType).where(models.CharacterTagType.world_id == world_id).offset(skip).limit(limit))
+    return result.scalars().all()
 
-def create_character_tag_type(db: Session, tag_type_in: schemas.CharacterTagTypeCreate, world_id: int) -> models.CharacterTagType:
+async def create_character_tag_type(db: AsyncSession, tag_type_in: schemas.CharacterTagTypeCreate, world_id: int) -> models.CharacterTagType:
     """Vytvoří nový typ tagu charakteru pro daný svět."""
     # Ověření unikátnosti jména v rámci světa (pokud je potřeba)
     # existing = db.query(models.CharacterTagType).filter(models.CharacterTagType.world_id == world_id, models.CharacterTagType.name == tag_type_in.name).first()
@@ -19,11 +22,11 @@ def create_character_tag_type(db: Session, tag_type_in: schemas.CharacterTagType
 
     db_tag_type = models.CharacterTagType(**tag_type_in.dict(), world_id=world_id)
     db.add(db_tag_type)
-    db.commit()
-    db.refresh(db_tag_type)
+    await db.commit()
+    await db.refresh(db_tag_type)
     return db_tag_type
 
-def update_character_tag_type(db: Session, db_tag_type: models.CharacterTagType, tag_type_in: schemas.CharacterTagTypeUpdate) -> models.CharacterTagType:
+async def update_character_tag_type(db: AsyncSession, db_tag_type: models.CharacterTagType, tag_type_in: schemas.CharacterTagTypeUpdate) -> models.CharacterTagType:
     """Aktualizuje existující typ tagu charakteru."""
     update_data = tag_type_in.dict(exclude_unset=True)
     for key, value in update_data.items():
@@ -40,12 +43,12 @@ def update_character_tag_type(db: Session, db_tag_type: models.CharacterTagType,
     #         raise ValueError(f"Character tag type with name '{update_data['name']}' already exists in this world.")
             
     db.add(db_tag_type)
-    db.commit()
-    db.refresh(db_tag_type)
+    await db.commit()
+    await db.refresh(db_tag_type)
     return db_tag_type
 
-def delete_character_tag_type(db: Session, db_tag_type: models.CharacterTagType) -> models.CharacterTagType:
+async def delete_character_tag_type(db: AsyncSession, db_tag_type: models.CharacterTagType) -> models.CharacterTagType:
     """Smaže typ tagu charakteru."""
-    db.delete(db_tag_type)
-    db.commit()
+    await db.delete(db_tag_type)
+    await db.commit()
     return db_tag_type 
\ No newline at end of file
@@ -1,44 +1,73 @@
-from sqlalchemy.orm import Session, joinedload, outerjoin
 from sqlalchemy import select, label
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Any, List, Optional, Sequence
 from ..models.item import Item
 from ..models.character import Character
 from ..models.item_tag import ItemTag
+from ..models.location import Location
+from .crud_location import subtree_ids
 from ..schemas.item import ItemCreate, ItemUpdate, Item as ItemSchema
+from .pagination import KeysetOrder
+from ..services import name_index
 
-def get_item(db: Session, item_id: int) -> Optional[Item]:
+# Řazení seznamu itemů ve světě (keyset stránkování přes index world_id, id)
+ITEM_ORDER = KeysetOrder("items", (Item.id, False))
+
+async def get_item(db: AsyncSession, item_id: int) -> Optional[Item]:
     """Získá konkrétní item podle jeho ID."""
-    return db.query(Item).filter(Item.id == item_id).first()
+    result = await db.execute(
+        select(Item)
+        .options(selectinload(Item.tags).joinedload(ItemTag.tag_type))
+        .where(Item.id == item_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
-def get_items_by_world(
-    db: Session,
+def item_filters(
+    world_id: int,
+    character_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    within_location: Optional[Location] = None,
+) -> list:
+    """WHERE podmínky seznamu itemů; `within_location` = itemy kdekoli v podstromu lokace."""
+    criteria = [Item.world_id == world_id]
+    if character_id is not None:
+        criteria.append(Item.character_id == character_id)
+    if within_location is not None:
+        criteria.append(Item.location_id.in_(subtree_ids(within_location)))
+    elif location_id is not None:
+        criteria.append(Item.location_id == location_id)
+    return criteria
+
+async def get_items_by_world(
+    db: AsyncSession,
     world_id: int,
     character_id: Optional[int] = None,
     location_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[Sequence[Any]] = None,
+    within_location: Optional[Location] = None,
 ) -> List[Item]:
-    """Získá seznam itemů patřících ke světu, volitelně filtrovaných podle postavy nebo lokace."""
+    """Získá seznam itemů patřících ke světu, volitelně filtrovaných podle postavy nebo lokace.
+
+    `after` jsou dekódované hodnoty cursoru (ITEM_ORDER); pokud je zadán, skip se ignoruje.
+    `within_location` místo `location_id` vybere itemy v lokaci i ve všech podlokacích.
+    """
     stmt = (
         select(
             Item, 
             label('assigned_character_name', Character.name)
         )
         .outerjoin(Character, Item.character_id == Character.id)
-        .filter(Item.world_id == world_id)
+        .filter(*item_filters(world_id, character_id, location_id, within_location))
         .options(joinedload(Item.tags).joinedload(ItemTag.tag_type))
     )
 
-    if character_id is not None:
-        stmt = stmt.filter(Item.character_id == character_id)
-    if location_id is not None:
-        stmt = stmt.filter(Item.location_id == location_id)
-    
-    stmt = stmt.order_by(Item.id)
-    
-    stmt = stmt.offset(skip).limit(limit)
+    stmt = ITEM_ORDER.apply(stmt, after=after, skip=skip).limit(limit)
     
-    results = db.execute(stmt).unique().all()
+    results = (await db.execute(stmt)).unique().all()
 
     items_with_names = []
     for item_obj, char_name in results:
@@ -48,17 +77,17 @@ def get_items_by_world(
 
     return items_with_names
 
-def create_item(db: Session, item: ItemCreate) -> Item:
+async def create_item(db: AsyncSession, item: ItemCreate) -> Item:
     """Vytvoří nový item v databázi."""
     # Zde můžeme přidat validaci, zda character_id a location_id patří ke stejnému world_id
     # Ale to by mělo být spíše v API vrstvě nebo service vrstvě
     db_item = Item(**item.dict())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+    await db.commit()
+    await name_index.set_name(name_index.ITEM, db_item.world_id, db_item.id, db_item.name)
+    return await get_item(db, db_item.id)
 
-def update_item(db: Session, db_item: Item, item_in: ItemUpdate) -> Item:
+async def update_item(db: AsyncSession, db_item: Item, item_in: ItemUpdate) -> Item:
     """Aktualizuje existující item."""
     update_data = item_in.dict(exclude_unset=True)
     
@@ -72,12 +101,14 @@ def update_item(db: Session, db_item: Item, item_in: ItemUpdate) -> Item:
         setattr(db_item, key, value)
         
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+    await db.commit()
+    if "name" in update_data:
+        await name_index.set_name(name_index.ITEM, db_item.world_id, db_item.id, db_item.name)
+    return await get_item(db, db_item.id)
 
-def delete_item(db: Session, db_item: Item) -> Item:
+async def delete_item(db: AsyncSession, db_item: Item) -> Item:
     """Smaže item z databáze."""
-    db.delete(db_item)
-    db.commit()
+    await db.delete(db_item)
+    await db.commit()
+    await name_index.remove(name_index.ITEM, db_item.world_id, [db_item.id])
     return db_item 
\ No newline at end of file
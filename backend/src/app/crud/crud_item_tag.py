@@ -1,30 +1,35 @@
 """CRUD operations for ItemTag associations."""
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import exists
 from fastapi import HTTPException, status
 
 from .. import models, schemas
 
-def add_tag_to_item(db: Session, item_id: int, tag_type_id: int) -> models.ItemTag:
+async def add_tag_to_item(db: AsyncSession, item_id: int, tag_type_id: int) -> models.ItemTag:
     """Add a tag (by type ID) to an item. Ensures tag type exists and association doesn't already exist."""
     # Check if item exists (optional, could be handled by FK constraint or endpoint logic)
-    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+    db_item = await db.get(models.Item, item_id)
     if not db_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
     # Check if tag type exists and belongs to the same world as the item
-    db_tag_type = db.query(models.ItemTagType).filter(
-        models.ItemTagType.id == tag_type_id,
-        models.ItemTagType.world_id == db_item.world_id # Ensure tag type is valid for the item's world
-    ).first()
+    result = await db.execute(
+        select(models.ItemTagType).where(
+            models.ItemTagType.id == tag_type_id,
+            models.ItemTagType.world_id == db_item.world_id # Ensure tag type is valid for the item's world
+        )
+    )
+    db_tag_type = result.scalars().first()
     if not db_tag_type:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item tag type not found or not valid for this world")
 
     # Check if the tag association already exists
-    already_exists = db.query(exists().where(
+    already_exists = await db.scalar(select(exists().where(
         models.ItemTag.item_id == item_id,
         models.ItemTag.item_tag_type_id == tag_type_id
-    )).scalar()
+    )))
 
     if already_exists:
         # Optionally, return the existing tag or raise a specific error/warning
@@ -34,20 +39,25 @@ def add_tag_to_item(db: Session, item_id: int, tag_type_id: int) -> models.ItemT
     # Create the new tag association
     db_item_tag = models.ItemTag(item_id=item_id, item_tag_type_id=tag_type_id)
     db.add(db_item_tag)
-    db.commit()
-    db.refresh(db_item_tag)
+    await db.commit()
+    await db.refresh(db_item_tag, attribute_names=["id", "created_at", "tag_type"])
     return db_item_tag
 
-def remove_tag_from_item(db: Session, item_id: int, tag_type_id: int) -> models.ItemTag | None:
+async def remove_tag_from_item(db: AsyncSession, item_id: int, tag_type_id: int) -> models.ItemTag | None:
     """Remove a tag (by type ID) from an item."""
-    db_item_tag = db.query(models.ItemTag).filter(
-        models.ItemTag.item_id == item_id,
-        models.ItemTag.item_tag_type_id == tag_type_id
-    ).first()
+    result = await db.execute(
+        select(models.ItemTag)
+        .options(selectinload(models.ItemTag.tag_type))
+        .where(
+            models.ItemTag.item_id == item_id,
+            models.ItemTag.item_tag_type_id == tag_type_id
+        )
+    )
+    db_item_tag = result.scalars().first()
 
     if db_item_tag:
-        db.delete(db_item_tag)
-        db.commit()
+        await db.delete(db_item_tag)
+        await db.commit()
         # Return the deleted object (or its ID) for confirmation
         return db_item_tag
     else:
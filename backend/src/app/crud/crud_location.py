@@ -1,71 +1,190 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from fastapi import HTTPException
-from typing import List, Set
+from typing import Any, Dict, List, Optional, Sequence, Set
 from ..models.location import Location
+from ..models.item import Item
 from ..models.location_tag import LocationTag
 from ..schemas.location import LocationCreate, LocationUpdate
+from .pagination import KeysetOrder
+from ..services import name_index
 
+# Řazení seznamu lokací ve světě (keyset stránkování přes index world_id, name, id)
+LOCATION_ORDER = KeysetOrder("locations", (Location.name, False), (Location.id, False))
 
-def get_location(db: Session, location_id: int):
+
+async def get_location(db: AsyncSession, location_id: int):
     """Gets a specific location by its ID with eager loaded tags."""
-    return db.query(Location).options(joinedload(Location.tags).joinedload(LocationTag.tag_type)).filter(Location.id == location_id).first()
+    result = await db.execute(
+        select(Location)
+        .options(selectinload(Location.tags).joinedload(LocationTag.tag_type))
+        .where(Location.id == location_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 
-def get_location_simple(db: Session, location_id: int):
+async def get_location_simple(db: AsyncSession, location_id: int):
     """Gets a specific location by its ID without relations."""
-    return db.query(Location).filter(Location.id == location_id).first()
-
-
-def get_locations_by_world(db: Session, world_id: int, skip: int = 0, limit: int = 100):
-    """Gets all locations belonging to a specific world."""
-    return (
-        db.query(Location)
-        .filter(Location.world_id == world_id)
-        .options(joinedload(Location.tags).joinedload(LocationTag.tag_type))
-        .order_by(Location.name)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    result = await db.execute(select(Location).where(Location.id == location_id))
+    return result.scalars().first()
+
+
+async def get_locations_by_world(
+    db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100, after: Optional[Sequence[Any]] = None
+):
+    """Gets all locations belonging to a specific world. With `after` (cursor values) skip is ignored."""
+    stmt = (
+        select(Location)
+        .where(Location.world_id == world_id)
+        .options(selectinload(Location.tags).joinedload(LocationTag.tag_type))
     )
+    result = await db.execute(LOCATION_ORDER.apply(stmt, after=after, skip=skip).limit(limit))
+    return result.scalars().all()
 
 
-def get_all_location_ids_in_world(db: Session, world_id: int) -> List[int]:
+async def get_all_location_ids_in_world(db: AsyncSession, world_id: int) -> List[int]:
     """Gets IDs of all locations in a specific world."""
-    return [loc.id for loc in db.query(Location.id).filter(Location.world_id == world_id).all()]
+    result = await db.execute(select(Location.id).where(Location.world_id == world_id))
+    return list(result.scalars().all())
+
+
+# Pojistka rekurze - hlubší hierarchie nečekáme a případný cyklus v datech CTE neutopí
+MAX_TREE_DEPTH = 256
+
+
+def _subtree_cte(world_id: int, root_id: Optional[int] = None, max_depth: Optional[int] = None):
+    """Rekurzivní CTE (id, parent_location_id, name, depth) od kořene dolů.
+
+    Bez `root_id` začíná u všech kořenových lokací světa (parent_location_id IS NULL).
+    """
+    base = select(
+        Location.id, Location.parent_location_id, Location.name, literal(0).label("depth")
+    ).where(Location.world_id == world_id)
+    if root_id is not None:
+        base = base.where(Location.id == root_id)
+    else:
+        base = base.where(Location.parent_location_id.is_(None))
+    tree = base.cte("location_tree", recursive=True)
 
+    depth_limit = MAX_TREE_DEPTH if max_depth is None else min(max_depth, MAX_TREE_DEPTH)
+    child = aliased(Location)
+    return tree.union_all(
+        select(child.id, child.parent_location_id, child.name, tree.c.depth + 1)
+        .where(child.parent_location_id == tree.c.id, child.world_id == world_id, tree.c.depth < depth_limit)
+    )
+
+
+def _path_ids(path: str) -> List[int]:
+    return [int(part) for part in path.strip("/").split("/")]
+
+
+def subtree_ids(db_location: Location, include_self: bool = True):
+    """SELECT id lokací v podstromu - přes materializovanou cestu (index), bez ní přes rekurzivní CTE."""
+    if db_location.path is not None:
+        stmt = select(Location.id).where(Location.path.like(db_location.path + "%"))
+        return stmt if include_self else stmt.where(Location.id != db_location.id)
+    tree = _subtree_cte(db_location.world_id, root_id=db_location.id)
+    stmt = select(tree.c.id)
+    return stmt if include_self else stmt.where(tree.c.depth > 0)
 
-def _get_descendant_ids(db: Session, location_id: int, world_id: int) -> Set[int]:
-    """Helper function to recursively get all descendant location IDs."""
-    descendants = set()
-    children = db.query(Location.id).filter(Location.world_id == world_id, Location.parent_location_id == location_id).all()
-    child_ids = {child.id for child in children}
-    descendants.update(child_ids)
-    for child_id in child_ids:
-        descendants.update(_get_descendant_ids(db, child_id, world_id))
-    return descendants
 
+async def get_descendant_ids(db: AsyncSession, db_location: Location) -> Set[int]:
+    """IDs of all descendants of a location - one query."""
+    result = await db.execute(subtree_ids(db_location, include_self=False))
+    return set(result.scalars().all())
 
-def create_location(db: Session, location: LocationCreate):
+
+async def get_location_ancestors(db: AsyncSession, location_id: int, path: Optional[str] = None) -> List[RowMapping]:
+    """Ancestors of a location (id, name, parent_location_id), root first - one query.
+
+    S materializovanou cestou (`path`) jde o vyhledání podle primárního klíče, jinak rekurzivní CTE.
+    """
+    if path is not None:
+        ancestor_ids = _path_ids(path)[:-1]
+        if not ancestor_ids:
+            return []
+        result = await db.execute(
+            select(Location.id, Location.name, Location.parent_location_id)
+            .where(Location.id.in_(ancestor_ids))
+            .order_by(Location.depth)
+        )
+        return result.mappings().all()
+
+    base = select(
+        Location.id, Location.parent_location_id, Location.name, literal(0).label("depth")
+    ).where(Location.id == location_id)
+    chain = base.cte("location_ancestors", recursive=True)
+    parent = aliased(Location)
+    chain = chain.union_all(
+        select(parent.id, parent.parent_location_id, parent.name, chain.c.depth + 1)
+        .where(parent.id == chain.c.parent_location_id, chain.c.depth < MAX_TREE_DEPTH)
+    )
+    result = await db.execute(
+        select(chain.c.id, chain.c.name, chain.c.parent_location_id)
+        .where(chain.c.depth > 0)
+        .order_by(chain.c.depth.desc())
+    )
+    return result.mappings().all()
+
+
+async def get_location_tree(
+    db: AsyncSession, world_id: int, root_id: Optional[int] = None, max_depth: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Whole location tree of a world (or subtree of `root_id`) as nested dicts, in one query.
+
+    Každý uzel má id, name, parent_location_id, depth a children (seřazené podle jména).
+    `depth` je relativní ke kořeni dotazu.
+    """
+    tree = _subtree_cte(world_id, root_id=root_id, max_depth=max_depth)
+    result = await db.execute(select(tree).order_by(tree.c.depth, tree.c.name, tree.c.id))
+
+    nodes: Dict[int, Dict[str, Any]] = {}
+    roots: List[Dict[str, Any]] = []
+    for row in result.mappings():
+        node = {**row, "children": []}
+        nodes[row["id"]] = node
+        parent = nodes.get(row["parent_location_id"]) if row["depth"] > 0 else None
+        if parent is not None:
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+async def create_location(db: AsyncSession, location: LocationCreate):
     """Creates a new location."""
     # Optional: Validate parent_location_id belongs to the same world
     if location.parent_location_id:
-        parent_location = get_location_simple(db, location.parent_location_id)
+        parent_location = await get_location_simple(db, location.parent_location_id)
         if not parent_location or parent_location.world_id != location.world_id:
             raise HTTPException(status_code=400, detail="Parent location does not exist or belongs to a different world.")
 
+    else:
+        parent_location = None
+
     db_location = Location(**location.dict())
     db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
-    return db_location
+    await db.flush()  # potřebujeme id pro materializovanou cestu
+    if parent_location is None:
+        db_location.path, db_location.depth = f"/{db_location.id}/", 0
+    elif parent_location.path is not None:
+        db_location.path, db_location.depth = f"{parent_location.path}{db_location.id}/", parent_location.depth + 1
+    await db.commit()
+    await name_index.set_name(name_index.LOCATION, db_location.world_id, db_location.id, db_location.name)
+    return await get_location(db, db_location.id)
 
 
-def update_location(db: Session, db_location: Location, location_in: LocationUpdate):
+async def update_location(db: AsyncSession, db_location: Location, location_in: LocationUpdate):
     """Updates a location, preventing circular dependencies."""
     update_data = location_in.dict(exclude_unset=True)
 
     # Check for circular dependency if parent_location_id is being set/changed
-    if "parent_location_id" in update_data:
+    reparent = "parent_location_id" in update_data and update_data["parent_location_id"] != db_location.parent_location_id
+    parent_location = None
+    if reparent:
         new_parent_id = update_data["parent_location_id"]
         if new_parent_id is not None:
             # 1. Cannot set parent to self
@@ -73,30 +192,85 @@ def update_location(db: Session, db_location: Location, location_in: LocationUpd
                 raise HTTPException(status_code=400, detail="Cannot set location's parent to itself.")
 
             # 2. Check if the new parent belongs to the same world
-            parent_location = get_location_simple(db, new_parent_id)
+            parent_location = await get_location_simple(db, new_parent_id)
             if not parent_location or parent_location.world_id != db_location.world_id:
                 raise HTTPException(status_code=400, detail="Parent location does not exist or belongs to a different world.")
 
-            # 3. Cannot set parent to a descendant
-            descendant_ids = _get_descendant_ids(db, db_location.id, db_location.world_id)
-            if new_parent_id in descendant_ids:
+            # 3. Cannot set parent to a descendant (= we are among the new parent's ancestors)
+            if parent_location.path is not None:
+                is_descendant = db_location.id in _path_ids(parent_location.path)
+            else:
+                ancestors = await get_location_ancestors(db, new_parent_id)
+                is_descendant = any(ancestor["id"] == db_location.id for ancestor in ancestors)
+            if is_descendant:
                 raise HTTPException(status_code=400, detail="Cannot set location's parent to one of its descendants.")
 
     # Apply updates
     for key, value in update_data.items():
         setattr(db_location, key, value)
 
+    if reparent:
+        await _move_subtree_paths(db, db_location, parent_location)
+
     db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
+    await db.commit()
+    if "name" in update_data:
+        await name_index.set_name(name_index.LOCATION, db_location.world_id, db_location.id, db_location.name)
     # Return the updated object with potentially loaded relations if needed
-    return get_location(db, db_location.id)
+    return await get_location(db, db_location.id)
 
 
-def delete_location(db: Session, db_location: Location):
-    """Deletes a location. Assumes authorization check happened in the API layer."""
-    # Optional: Handle children (e.g., set their parent_location_id to null or prevent deletion if children exist)
-    # current behavior likely cascades or sets null based on DB constraints
-    db.delete(db_location)
-    db.commit()
+async def _move_subtree_paths(db: AsyncSession, db_location: Location, new_parent: Optional[Location]) -> None:
+    """Přepíše path/depth celého podstromu po přesunu jedním UPDATE (prefix cesty se nahradí)."""
+    old_path = db_location.path
+    if old_path is None:
+        return  # cesty podstromu ještě nejsou spočítané (viz app.db.location_paths)
+    in_subtree = Location.path.like(old_path + "%")
+
+    if new_parent is not None and new_parent.path is None:
+        # Nový rodič nemá cestu - podstrom by měl neplatné cesty, radši je zahodíme
+        await db.execute(update(Location).where(in_subtree).values(path=None, depth=None))
+        db_location.path = db_location.depth = None
+        return
+
+    new_path = f"{new_parent.path}{db_location.id}/" if new_parent is not None else f"/{db_location.id}/"
+    new_depth = new_parent.depth + 1 if new_parent is not None else 0
+    await db.execute(
+        update(Location)
+        .where(in_subtree)
+        .values(
+            path=new_path + func.substr(Location.path, len(old_path) + 1),
+            depth=Location.depth + (new_depth - db_location.depth),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db_location.path, db_location.depth = new_path, new_depth
+
+
+async def delete_location(db: AsyncSession, db_location: Location):
+    """Deletes a location and its whole subtree. Assumes authorization check happened in the API layer."""
+    if db_location.path is None:
+        # Bez materializované cesty - ORM kaskáda (child_locations) prochází podstrom po úrovních
+        await db.delete(db_location)
+        await db.commit()
+        await name_index.invalidate(name_index.LOCATION, db_location.world_id)
+        return db_location
+
+    # Se známou cestou smažeme podstrom hromadně - stejný výsledek jako ORM kaskáda,
+    # ale bez načítání každé úrovně, tagů a itemů zvlášť
+    subtree = subtree_ids(db_location)
+    await db.execute(
+        update(Item).where(Item.location_id.in_(subtree)).values(location_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(LocationTag).where(LocationTag.location_id.in_(subtree))
+        .execution_options(synchronize_session=False)
+    )
+    deleted_ids = (await db.scalars(
+        delete(Location).where(Location.id.in_(subtree)).returning(Location.id)
+        .execution_options(synchronize_session=False)
+    )).all()
+    await db.commit()
+    await name_index.remove(name_index.LOCATION, db_location.world_id, deleted_ids)
     return db_location 
\ No newline at end of file
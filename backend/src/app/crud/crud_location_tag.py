@@ -1,32 +1,37 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 
 from .. import models
 
-def get_location_tag_association(
-    db: Session, location_id: int, tag_type_id: int
+async def get_location_tag_association(
+    db: AsyncSession, location_id: int, tag_type_id: int
 ) -> Optional[models.LocationTag]:
     """Získá záznam o přiřazení tagu k lokaci, pokud existuje."""
-    return (
-        db.query(models.LocationTag)
-        .filter(
+    result = await db.execute(
+        select(models.LocationTag)
+        .options(joinedload(models.LocationTag.tag_type))
+        .where(
             models.LocationTag.location_id == location_id,
             models.LocationTag.location_tag_type_id == tag_type_id
         )
-        .first()
     )
+    return result.scalars().first()
 
-def add_tag_to_location(
-    db: Session, location_id: int, tag_type_id: int
+async def add_tag_to_location(
+    db: AsyncSession, location_id: int, tag_type_id: int
 ) -> models.LocationTag:
     """Přiřadí typ tagu k lokaci. Ověří, že tag i lokace existují a patří ke stejnému světu."""
     # 1. Získáme lokaci
-    db_location = db.query(models.Location).filter(models.Location.id == location_id).first()
+    result = await db.execute(select(models.Location).where(models.Location.id == location_id))
+    db_location = result.scalars().first()
     if not db_location:
         raise ValueError("Location not found")
 
     # 2. Získáme typ tagu
-    db_tag_type = db.query(models.LocationTagType).filter(models.LocationTagType.id == tag_type_id).first()
+    result = await db.execute(select(models.LocationTagType).where(models.LocationTagType.id == tag_type_id))
+    db_tag_type = result.scalars().first()
     if not db_tag_type:
         raise ValueError("Location tag type not found")
 
@@ -35,32 +40,32 @@ def add_tag_to_location(
         raise ValueError("Location and Tag Type do not belong to the same world")
 
     # 4. Ověříme, zda už přiřazení neexistuje
-    existing_association = get_location_tag_association(db, location_id=location_id, tag_type_id=tag_type_id)
+    existing_association = await get_location_tag_association(db, location_id=location_id, tag_type_id=tag_type_id)
     if existing_association:
         return existing_association # Pokud už existuje, vrátíme ho
 
     # 5. Vytvoříme nové přiřazení
     db_association = models.LocationTag(location_id=location_id, location_tag_type_id=tag_type_id)
     db.add(db_association)
-    db.commit()
-    db.refresh(db_association)
+    await db.commit()
+    await db.refresh(db_association, attribute_names=["id", "created_at", "tag_type"])
     return db_association
 
-def remove_tag_from_location(db: Session, location_id: int, tag_type_id: int) -> bool:
+async def remove_tag_from_location(db: AsyncSession, location_id: int, tag_type_id: int) -> bool:
     """Odebere přiřazení typu tagu od lokace. Vrací True, pokud bylo něco smazáno."""
-    db_association = get_location_tag_association(db, location_id=location_id, tag_type_id=tag_type_id)
+    db_association = await get_location_tag_association(db, location_id=location_id, tag_type_id=tag_type_id)
     if db_association:
-        db.delete(db_association)
-        db.commit()
+        await db.delete(db_association)
+        await db.commit()
         return True
     return False
 
-def get_tags_for_location(db: Session, location_id: int) -> List[models.LocationTag]:
+async def get_tags_for_location(db: AsyncSession, location_id: int) -> List[models.LocationTag]:
     """Získá všechny tagy (LocationTag záznamy) přiřazené k lokaci."""
     # Použijeme joinedload pro efektivní načtení tag_type
-    return (
-        db.query(models.LocationTag)
+    result = await db.execute(
+        select(models.LocationTag)
         .options(joinedload(models.LocationTag.tag_type))
-        .filter(models.LocationTag.location_id == location_id)
-        .all()
-    ) 
\ No newline at end of file
+        .where(models.LocationTag.location_id == location_id)
+    )
+    return result.scalars().all() 
\ No newline at end of file
@@ -1,54 +1,68 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from ..models.organization import Organization
 from ..models.organization_tag import OrganizationTag
+from typing import Any, Optional, Sequence
 from ..schemas.organization import OrganizationCreate, OrganizationUpdate
+from .pagination import KeysetOrder
+from ..services import name_index
 
+# Řazení seznamu organizací ve světě (keyset stránkování přes index world_id, name, id)
+ORGANIZATION_ORDER = KeysetOrder("organizations", (Organization.name, False), (Organization.id, False))
 
-def get_organization(db: Session, organization_id: int):
+
+async def get_organization(db: AsyncSession, organization_id: int):
     """Gets a specific organization by its ID, including its tags and tag types."""
-    return (
-        db.query(Organization)
-        .options(joinedload(Organization.tags).joinedload(OrganizationTag.tag_type))
-        .filter(Organization.id == organization_id)
-        .first()
+    result = await db.execute(
+        select(Organization)
+        .options(selectinload(Organization.tags).joinedload(OrganizationTag.tag_type))
+        .where(Organization.id == organization_id)
+        .execution_options(populate_existing=True)
     )
+    return result.scalars().first()
 
 
-def get_organizations_by_world(db: Session, world_id: int, skip: int = 0, limit: int = 100):
-    """Gets all organizations belonging to a specific world."""
-    return (
-        db.query(Organization)
-        .filter(Organization.world_id == world_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+async def get_organizations_by_world(
+    db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100, after: Optional[Sequence[Any]] = None
+):
+    """Gets all organizations belonging to a specific world. With `after` (cursor values) skip is ignored."""
+    stmt = (
+        select(Organization)
+        .options(selectinload(Organization.tags).joinedload(OrganizationTag.tag_type))
+        .where(Organization.world_id == world_id)
     )
+    result = await db.execute(ORGANIZATION_ORDER.apply(stmt, after=after, skip=skip).limit(limit))
+    return result.scalars().all()
 
 
-def create_organization(db: Session, organization: OrganizationCreate):
+async def create_organization(db: AsyncSession, organization: OrganizationCreate):
     """Creates a new organization."""
     db_organization = Organization(**organization.dict())
     db.add(db_organization)
-    db.commit()
-    db.refresh(db_organization)
-    return db_organization
+    await db.commit()
+    await name_index.set_name(name_index.ORGANIZATION, db_organization.world_id, db_organization.id, db_organization.name)
+    return await get_organization(db, db_organization.id)
 
 
-def update_organization(db: Session, db_organization: Organization, organization_in: OrganizationUpdate):
+async def update_organization(db: AsyncSession, db_organization: Organization, organization_in: OrganizationUpdate):
     """Updates an organization. Assumes authorization check happened in the API layer."""
     update_data = organization_in.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_organization, key, value)
     db.add(db_organization)
-    db.commit()
-    db.refresh(db_organization)
-    return db_organization
+    await db.commit()
+    if "name" in update_data:
+        await name_index.set_name(name_index.ORGANIZATION, db_organization.world_id, db_organization.id, db_organization.name)
+    return await get_organization(db, db_organization.id)
 
 
-def delete_organization(db: Session, db_organization: Organization):
+async def delete_organization(db: AsyncSession, db_organization: Organization):
     """Deletes an organization. Assumes authorization check happened in the API layer."""
-    db.delete(db_organization)
-    db.commit()
+    await db.delete(db_organization)
+    await db.commit()
+    # Podřízené organizace zanikají kaskádou - index se načte znovu
+    await name_index.invalidate(name_index.ORGANIZATION, db_organization.world_id)
     # Return the deleted object data before the session is closed/invalidated
     # If relationships were loaded, they might become invalid after commit,
     # depending on cascade settings and session state.
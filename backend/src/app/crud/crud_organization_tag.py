@@ -1,44 +1,49 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from ..models.organization import Organization
 from ..models.organization_tag import OrganizationTag
 from ..models.organization_tag_type import OrganizationTagType
 
-def get_organization_tag_association(db: Session, organization_id: int, tag_type_id: int):
+async def get_organization_tag_association(db: AsyncSession, organization_id: int, tag_type_id: int):
     """Gets a specific tag association for an organization."""
-    return (
-        db.query(OrganizationTag)
-        .filter(
+    result = await db.execute(
+        select(OrganizationTag)
+        .options(joinedload(OrganizationTag.tag_type))
+        .where(
             OrganizationTag.organization_id == organization_id,
             OrganizationTag.organization_tag_type_id == tag_type_id
         )
-        .first()
     )
+    return result.scalars().first()
 
-def get_tags_for_organization(db: Session, organization_id: int):
+async def get_tags_for_organization(db: AsyncSession, organization_id: int):
     """Gets all tags associated with a specific organization, loading the tag type details."""
-    return (
-        db.query(OrganizationTag)
+    result = await db.execute(
+        select(OrganizationTag)
         .options(joinedload(OrganizationTag.tag_type))
-        .filter(OrganizationTag.organization_id == organization_id)
-        .all()
+        .where(OrganizationTag.organization_id == organization_id)
     )
+    return result.scalars().all()
 
-def add_tag_to_organization(db: Session, organization_id: int, tag_type_id: int) -> OrganizationTag:
+async def add_tag_to_organization(db: AsyncSession, organization_id: int, tag_type_id: int) -> OrganizationTag:
     """Adds a tag type to an organization. Raises ValueError on issues."""
     # 1. Check if organization exists
-    db_organization = db.query(Organization).filter(Organization.id == organization_id).first()
+    result = await db.execute(select(Organization).where(Organization.id == organization_id))
+    db_organization = result.scalars().first()
     if not db_organization:
         raise ValueError("Organization not found")
 
     # 2. Check if tag type exists and belongs to the same world
-    db_tag_type = db.query(OrganizationTagType).filter(OrganizationTagType.id == tag_type_id).first()
+    result = await db.execute(select(OrganizationTagType).where(OrganizationTagType.id == tag_type_id))
+    db_tag_type = result.scalars().first()
     if not db_tag_type:
         raise ValueError("Tag type not found")
     if db_tag_type.world_id != db_organization.world_id:
         raise ValueError("Tag type belongs to a different world")
 
     # 3. Check if association already exists
-    db_existing_association = get_organization_tag_association(db, organization_id, tag_type_id)
+    db_existing_association = await get_organization_tag_association(db, organization_id, tag_type_id)
     if db_existing_association:
         return db_existing_association # Or raise an error/return None if preferred
 
@@ -48,17 +53,17 @@ def add_tag_to_organization(db: Session, organization_id: int, tag_type_id: int)
         organization_tag_type_id=tag_type_id
     )
     db.add(db_association)
-    db.commit()
-    db.refresh(db_association)
+    await db.commit()
+    await db.refresh(db_association)
     # Eager load the tag_type for the response
-    db.refresh(db_association, attribute_names=["tag_type"])
+    await db.refresh(db_association, attribute_names=["tag_type"])
     return db_association
 
-def remove_tag_from_organization(db: Session, organization_id: int, tag_type_id: int) -> bool:
+async def remove_tag_from_organization(db: AsyncSession, organization_id: int, tag_type_id: int) -> bool:
     """Removes a tag association from an organization. Returns True if deleted, False otherwise."""
-    db_association = get_organization_tag_association(db, organization_id, tag_type_id)
+    db_association = await get_organization_tag_association(db, organization_id, tag_type_id)
     if db_association:
-        db.delete(db_association)
-        db.commit()
+        await db.delete(db_association)
+        await db.commit()
         return True
     return False 
\ No newline at end of file
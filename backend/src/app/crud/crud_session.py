@@ -1,77 +1,263 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from datetime import datetime
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Any, List, Optional, Sequence
 
 from .. import models, schemas
+from .pagination import KeysetOrder
+
+# Nejnovější termíny první, sezení bez termínu na konci (NULLS LAST). Index
+# (campaign_id, date_time DESC NULLS LAST, created_at DESC, id DESC) má stejné pořadí,
+# stránka se tak čte přímo z indexu bez řazení
+SESSION_ORDER = KeysetOrder(
+    "sessions",
+    (models.Session.date_time, True, True),
+    (models.Session.created_at, True),
+    (models.Session.id, True),
+)
 
-def get_session(db: Session, session_id: int) -> Optional[models.Session]:
-    """Get a session by its ID, including associated characters."""
+def _session_options():
+    """Eager-load options for relationships used by the Session response schema."""
     return (
-        db.query(models.Session)
-        .options(
-            joinedload(models.Session.character_associations).joinedload(
-                models.SessionCharacter.character
-            )
-        )
-        .filter(models.Session.id == session_id)
-        .first()
+        joinedload(models.Session.campaign), # Eager load campaign details
+        selectinload(models.Session.character_associations).joinedload( # Eager load characters
+            models.SessionCharacter.character
+        ),
     )
 
-def get_sessions_by_campaign(
-    db: Session, campaign_id: int, skip: int = 0, limit: int = 100
+async def get_session(db: AsyncSession, session_id: int, with_details: bool = True) -> Optional[models.Session]:
+    """Get a session by its ID, including associated characters.
+
+    S `with_details=False` jen samotný řádek sezení (bez kampaně a postav) - pro úpravy,
+    po kterých se sezení stejně načítá znovu.
+    """
+    stmt = select(models.Session).where(models.Session.id == session_id)
+    if with_details:
+        stmt = stmt.options(*_session_options()).execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+async def get_sessions_by_campaign(
+    db: AsyncSession, campaign_id: int, skip: int = 0, limit: int = 100, after: Optional[Sequence[Any]] = None
 ) -> List[models.Session]:
-    """Get all sessions belonging to a specific campaign, including associated characters."""
-    return (
-        db.query(models.Session)
-        .options(
-            joinedload(models.Session.character_associations).joinedload(
-                models.SessionCharacter.character
-            )
-        )
-        .filter(models.Session.campaign_id == campaign_id)
-        .order_by(models.Session.date_time.desc().nullslast(), models.Session.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    """Get all sessions belonging to a specific campaign, including associated characters.
+
+    `after` are decoded cursor values from SESSION_ORDER; when given, `skip` is ignored.
+    """
+    stmt = (
+        select(models.Session)
+        .options(*_session_options())
+        .where(models.Session.campaign_id == campaign_id)
     )
+    result = await db.execute(SESSION_ORDER.apply(stmt, after=after, skip=skip).limit(limit))
+    return result.scalars().all()
 
-def get_sessions_for_user(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100
+async def get_sessions_for_user(
+    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
 ) -> List[models.Session]:
     """Get all sessions for campaigns the user is a member of, including campaign details."""
     # Find campaign IDs the user is a member of
     user_campaign_ids = (
-        db.query(models.UserCampaign.campaign_id)
-        .filter(models.UserCampaign.user_id == user_id)
-        .subquery()
+        select(models.UserCampaign.campaign_id)
+        .where(models.UserCampaign.user_id == user_id)
     )
 
     # Query sessions belonging to those campaigns
-    return (
-        db.query(models.Session)
-        .options(
-            joinedload(models.Session.campaign), # Eager load campaign details
-            joinedload(models.Session.character_associations).joinedload( # Eager load characters
-                models.SessionCharacter.character
-            )
-        )
-        .filter(models.Session.campaign_id.in_(user_campaign_ids))
+    result = await db.execute(
+        select(models.Session)
+        .options(*_session_options())
+        .where(models.Session.campaign_id.in_(user_campaign_ids))
         .order_by(models.Session.date_time.desc().nullslast(), models.Session.created_at.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
+
+async def get_calendar_for_user(
+    db: AsyncSession, user_id: int, window_from: datetime, window_to: datetime
+) -> List[dict]:
+    """Sezení uživatele v časovém okně se sloty a jeho vlastními dostupnostmi.
 
-def create_session(db: Session, session_in: schemas.SessionCreate) -> models.Session:
+    Jeden dotaz: kampaně uživatele -> sezení -> sloty překrývající okno (index
+    session_id, slot_from, slot_to) -> dostupnosti uživatele v nich. Sezení bez
+    slotů v okně se vrátí, pokud jejich termín (date_time) do okna spadá.
+    """
+    Slot = models.SessionSlot
+    Availability = models.UserAvailability
+    stmt = (
+        select(
+            models.Session.id.label("session_id"),
+            models.Session.title,
+            models.Session.campaign_id,
+            models.Campaign.name.label("campaign_name"),
+            models.Session.date_time,
+            Slot.id.label("slot_id"),
+            Slot.slot_from,
+            Slot.slot_to,
+            Slot.note.label("slot_note"),
+            Availability.id.label("availability_id"),
+            Availability.available_from,
+            Availability.available_to,
+            Availability.note.label("availability_note"),
+        )
+        .join(models.UserCampaign, and_(
+            models.UserCampaign.campaign_id == models.Session.campaign_id,
+            models.UserCampaign.user_id == user_id,
+        ))
+        .join(models.Campaign, models.Campaign.id == models.Session.campaign_id)
+        .outerjoin(Slot, and_(
+            Slot.session_id == models.Session.id,
+            Slot.slot_from < window_to,
+            Slot.slot_to > window_from,
+        ))
+        .outerjoin(Availability, and_(
+            Availability.slot_id == Slot.id,
+            Availability.user_id == user_id,
+        ))
+        .where(or_(
+            Slot.id.is_not(None),
+            and_(models.Session.date_time >= window_from, models.Session.date_time < window_to),
+        ))
+        .order_by(
+            models.Session.date_time.asc().nullslast(),
+            models.Session.id,
+            Slot.slot_from,
+            Slot.id,
+            Availability.available_from,
+        )
+    )
+
+    sessions = {}
+    slots = {}
+    for row in (await db.execute(stmt)).mappings():
+        session = sessions.get(row["session_id"])
+        if session is None:
+            session = sessions[row["session_id"]] = {
+                "id": row["session_id"],
+                "title": row["title"],
+                "campaign_id": row["campaign_id"],
+                "campaign_name": row["campaign_name"],
+                "date_time": row["date_time"],
+                "slots": [],
+            }
+        if row["slot_id"] is None:
+            continue
+        slot = slots.get(row["slot_id"])
+        if slot is None:
+            slot = slots[row["slot_id"]] = {
+                "id": row["slot_id"],
+                "slot_from": row["slot_from"],
+                "slot_to": row["slot_to"],
+                "note": row["slot_note"],
+                "my_availability": [],
+            }
+            session["slots"].append(slot)
+        if row["availability_id"] is not None:
+            slot["my_availability"].append({
+                "id": row["availability_id"],
+                "available_from": row["available_from"],
+                "available_to": row["available_to"],
+                "note": row["availability_note"],
+            })
+    return list(sessions.values())
+
+async def get_calendar_feed(
+    db: AsyncSession, campaign_ids: Sequence[int], user_id: Optional[int] = None
+) -> List[dict]:
+    """Sezení kampaní se všemi sloty pro iCalendar feed (jeden dotaz).
+
+    S `user_id` se ke slotům připojí i dostupnosti tohoto uživatele (osobní feed).
+    Vrací i updated_at všech řádků - z nich se odvozuje ETag/Last-Modified.
+    """
+    if not campaign_ids:
+        return []
+    Slot = models.SessionSlot
+    Availability = models.UserAvailability
+    columns = [
+        models.Session.id.label("session_id"),
+        models.Session.title,
+        models.Session.description,
+        models.Session.campaign_id,
+        models.Campaign.name.label("campaign_name"),
+        models.Session.date_time,
+        models.Session.updated_at.label("session_updated_at"),
+        Slot.id.label("slot_id"),
+        Slot.slot_from,
+        Slot.slot_to,
+        Slot.note.label("slot_note"),
+        Slot.updated_at.label("slot_updated_at"),
+    ]
+    if user_id is not None:
+        columns += [
+            Availability.id.label("availability_id"),
+            Availability.available_from,
+            Availability.available_to,
+            Availability.note.label("availability_note"),
+            Availability.updated_at.label("availability_updated_at"),
+        ]
+    stmt = (
+        select(*columns)
+        .join(models.Campaign, models.Campaign.id == models.Session.campaign_id)
+        .outerjoin(Slot, Slot.session_id == models.Session.id)
+        .where(models.Session.campaign_id.in_(campaign_ids))
+        .order_by(models.Session.id, Slot.slot_from, Slot.id)
+    )
+    if user_id is not None:
+        stmt = stmt.outerjoin(Availability, and_(
+            Availability.slot_id == Slot.id,
+            Availability.user_id == user_id,
+        )).order_by(Availability.available_from)
+
+    sessions = {}
+    slots = {}
+    for row in (await db.execute(stmt)).mappings():
+        session = sessions.get(row["session_id"])
+        if session is None:
+            session = sessions[row["session_id"]] = {
+                "id": row["session_id"],
+                "title": row["title"],
+                "description": row["description"],
+                "campaign_id": row["campaign_id"],
+                "campaign_name": row["campaign_name"],
+                "date_time": row["date_time"],
+                "updated_at": row["session_updated_at"],
+                "slots": [],
+            }
+        if row["slot_id"] is None:
+            continue
+        slot = slots.get(row["slot_id"])
+        if slot is None:
+            slot = slots[row["slot_id"]] = {
+                "id": row["slot_id"],
+                "slot_from": row["slot_from"],
+                "slot_to": row["slot_to"],
+                "note": row["slot_note"],
+                "updated_at": row["slot_updated_at"],
+                "my_availability": [],
+            }
+            session["slots"].append(slot)
+        if user_id is not None and row["availability_id"] is not None:
+            slot["my_availability"].append({
+                "id": row["availability_id"],
+                "available_from": row["available_from"],
+                "available_to": row["available_to"],
+                "note": row["availability_note"],
+                "updated_at": row["availability_updated_at"],
+            })
+    return list(sessions.values())
+
+async def create_session(db: AsyncSession, session_in: schemas.SessionCreate) -> models.Session:
     """Create a new session. Assumes campaign_id is valid and ownership check happened elsewhere."""
     # TODO: Check if campaign_id exists?
     db_session = models.Session(**session_in.dict())
     db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
-    return db_session
+    await db.commit()
+    return await get_session(db, db_session.id)
 
-def update_session(
-    db: Session, db_session: models.Session, session_in: schemas.SessionUpdate
+async def update_session(
+    db: AsyncSession, db_session: models.Session, session_in: schemas.SessionUpdate
 ) -> models.Session:
     """Update an existing session, including associated characters."""
     update_data = session_in.dict(exclude_unset=True)
@@ -81,9 +267,12 @@ def update_session(
         character_ids = set(update_data.pop("character_ids")) # Use set for efficient lookup
         
         # Fetch existing character associations for this session
-        current_associations = db.query(models.SessionCharacter).filter(
-            models.SessionCharacter.session_id == db_session.id
-        ).all()
+        result = await db.execute(
+            select(models.SessionCharacter).where(
+                models.SessionCharacter.session_id == db_session.id
+            )
+        )
+        current_associations = result.scalars().all()
         current_character_ids = {assoc.character_id for assoc in current_associations}
 
         # Determine which characters to add and which associations to remove
@@ -92,10 +281,14 @@ def update_session(
 
         # Remove associations no longer needed
         if ids_to_remove:
-            db.query(models.SessionCharacter).filter(
-                models.SessionCharacter.session_id == db_session.id,
-                models.SessionCharacter.character_id.in_(ids_to_remove)
-            ).delete(synchronize_session=False) # Use False for bulk deletes
+            await db.execute(
+                delete(models.SessionCharacter)
+                .where(
+                    models.SessionCharacter.session_id == db_session.id,
+                    models.SessionCharacter.character_id.in_(ids_to_remove)
+                )
+                .execution_options(synchronize_session=False) # Use False for bulk deletes
+            )
 
         # Add new character associations
         for char_id in ids_to_add:
@@ -108,29 +301,42 @@ def update_session(
         setattr(db_session, key, value)
         
     db.add(db_session) # Add the session itself to the session context if changed
-    db.commit()
-    db.refresh(db_session)
-    
-    # Eagerly load characters again after update for the returned object
-    db.refresh(db_session, attribute_names=['character_associations'])
-    # We might need to explicitly load the nested characters if refresh doesn't handle it
-    # This can be complex; ensure the returned object has the updated characters.
-    # A simple approach is to re-fetch the session, but refresh is generally preferred.
+    await db.commit()
     
     # Re-query to ensure nested characters are loaded correctly in the returned object
-    # This is less efficient but guarantees correctness after modifications
-    updated_session_with_chars = get_session(db, db_session.id)
+    # (async session cannot lazy load them during serialization)
+    updated_session_with_chars = await get_session(db, db_session.id)
     if updated_session_with_chars:
         return updated_session_with_chars
     else:
          # Fallback or raise error, though it should exist
-         db.refresh(db_session)
+         await db.refresh(db_session)
          return db_session
 
-def delete_session(db: Session, db_session: models.Session) -> models.Session:
+async def delete_session(db: AsyncSession, db_session: models.Session) -> models.Session:
     """Delete a session. Assumes ownership check happened elsewhere."""
+    # Odpověď vrací smazané sezení s kampaní a postavami - načíst je ještě před smazáním
+    db_session = await get_session(db, db_session.id) or db_session
     # Note: Relationships like SessionCharacter might need handling depending on cascade settings
     # The current model uses cascade="all, delete-orphan" for character_associations
-    db.delete(db_session)
-    db.commit()
+    # Sloty a dostupnosti se nenačítají (passive_deletes) - smažou se hromadně, aby to
+    # nezáviselo na ON DELETE CASCADE (SQLite bez foreign_keys ho nevynucuje)
+    slot_ids = select(models.SessionSlot.id).where(models.SessionSlot.session_id == db_session.id)
+    await db.execute(
+        delete(models.UserAvailability)
+        .where(models.UserAvailability.slot_id.in_(slot_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(models.SessionSlot)
+        .where(models.SessionSlot.session_id == db_session.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(models.SessionSlotRecurrence)
+        .where(models.SessionSlotRecurrence.session_id == db_session.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.delete(db_session)
+    await db.commit()
     return db_session 
\ No newline at end of file
@@ -1,28 +1,72 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
 from .. import models, schemas
 from fastapi import HTTPException, status
 
-def get_slot(db: Session, slot_id: int) -> Optional[models.SessionSlot]:
-    """Get a session slot by its ID."""
-    return db.query(models.SessionSlot).options(joinedload(models.SessionSlot.user_availabilities)).filter(models.SessionSlot.id == slot_id).first()
+def _slot_options():
+    """Eager-load options for availabilities (and their users) embedded in the SessionSlot schema."""
+    return (
+        selectinload(models.SessionSlot.user_availabilities).selectinload(models.UserAvailability.user),
+    )
+
+async def get_slot(
+    db: AsyncSession, slot_id: int, with_availabilities: bool = True
+) -> Optional[models.SessionSlot]:
+    """Get a session slot by its ID.
+
+    S `with_availabilities=False` se načte jen samotný slot (kontroly a validace hranic),
+    dostupnosti s uživateli jen pro odpovědi, které je vykreslují.
+    """
+    stmt = select(models.SessionSlot).where(models.SessionSlot.id == slot_id)
+    if with_availabilities:
+        stmt = stmt.options(*_slot_options()).execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.scalars().first()
 
-def get_slots_by_session(
-    db: Session, session_id: int, skip: int = 0, limit: int = 100
+async def get_slots_by_session(
+    db: AsyncSession, session_id: int, skip: int = 0, limit: int = 100
 ) -> List[models.SessionSlot]:
     """Get all session slots for a specific session."""
-    return (
-        db.query(models.SessionSlot)
-        .filter(models.SessionSlot.session_id == session_id)
+    result = await db.execute(
+        select(models.SessionSlot)
+        .options(*_slot_options())
+        .where(models.SessionSlot.session_id == session_id)
         .order_by(models.SessionSlot.slot_from)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
+
+async def get_slot_bounds_by_session(
+    db: AsyncSession, session_id: int,
+    window_from: Optional[datetime] = None, window_to: Optional[datetime] = None,
+):
+    """(id, slot_from, slot_to, note, recurrence_id) slotů sezení - bez načítání dostupností.
+
+    S `window_from`/`window_to` jen sloty, které do okna zasahují.
+    """
+    stmt = (
+        select(
+            models.SessionSlot.id, models.SessionSlot.slot_from, models.SessionSlot.slot_to,
+            models.SessionSlot.note, models.SessionSlot.recurrence_id,
+        )
+        .where(models.SessionSlot.session_id == session_id)
+        .order_by(models.SessionSlot.slot_from, models.SessionSlot.id)
+    )
+    if window_from is not None:
+        stmt = stmt.where(models.SessionSlot.slot_to > window_from)
+    if window_to is not None:
+        stmt = stmt.where(models.SessionSlot.slot_from < window_to)
+    result = await db.execute(stmt)
+    return result.all()
 
-def create_session_slot(
-    db: Session, slot_in: schemas.SessionSlotCreate, session_id: int
+async def create_session_slot(
+    db: AsyncSession, slot_in: schemas.SessionSlotCreate, session_id: int
 ) -> models.SessionSlot:
     """Create a new session slot."""
     # Basic validation
@@ -37,12 +81,11 @@ def create_session_slot(
         session_id=session_id
     )
     db.add(db_slot)
-    db.commit()
-    db.refresh(db_slot)
-    return db_slot
+    await db.commit()
+    return await get_slot(db, db_slot.id)
 
-def update_session_slot(
-    db: Session, db_slot: models.SessionSlot, slot_in: schemas.SessionSlotUpdate
+async def update_session_slot(
+    db: AsyncSession, db_slot: models.SessionSlot, slot_in: schemas.SessionSlotUpdate
 ) -> models.SessionSlot:
     """Update an existing session slot."""
     update_data = slot_in.model_dump(exclude_unset=True)
@@ -60,13 +103,12 @@ def update_session_slot(
         setattr(db_slot, field, value)
 
     db.add(db_slot)
-    db.commit()
-    db.refresh(db_slot)
-    return db_slot
+    await db.commit()
+    return await get_slot(db, db_slot.id)
 
-def delete_session_slot(db: Session, db_slot: models.SessionSlot) -> models.SessionSlot:
+async def delete_session_slot(db: AsyncSession, db_slot: models.SessionSlot) -> models.SessionSlot:
     """Delete a session slot."""
     # Cascade should handle deleting related UserAvailability entries
-    db.delete(db_slot)
-    db.commit()
+    await db.delete(db_slot)
+    await db.commit()
     return db_slot 
\ No newline at end of file
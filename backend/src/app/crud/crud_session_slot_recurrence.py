@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models, schemas
+from ..models.session_slot_recurrence import RecurrenceFrequencyEnum
+from ..services.slot_recurrence import as_utc, expand, find_occurrence, weekdays_to_mask
+from .crud_session_slot import get_slot, get_slot_bounds_by_session
+from fastapi import HTTPException, status
+
+# Výchozí okno pro rozvinutí opakování, když ho volající nezadá (od teď)
+DEFAULT_EXPANSION_WINDOW = timedelta(days=28)
+
+def _apply(db_recurrence: models.SessionSlotRecurrence, data: dict) -> None:
+    """Zapíše vstupní data do modelu (dny v týdnu jako maska, výjimky jako ISO data) a ověří pravidlo."""
+    if "weekdays" in data:
+        weekdays = data.pop("weekdays")
+        db_recurrence.weekdays = weekdays_to_mask(weekdays) if weekdays is not None else None
+    if "exceptions" in data:
+        db_recurrence.exceptions = sorted({day.isoformat() for day in data.pop("exceptions") or ()})
+    for field, value in data.items():
+        setattr(db_recurrence, field, value)
+
+    if db_recurrence.frequency == RecurrenceFrequencyEnum.DAILY and db_recurrence.weekdays is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="weekdays can only be set for weekly recurrences",
+        )
+    if db_recurrence.until is not None and as_utc(db_recurrence.until) <= as_utc(db_recurrence.first_from):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="until must be after first_from",
+        )
+
+async def get_recurrence(db: AsyncSession, recurrence_id: int) -> Optional[models.SessionSlotRecurrence]:
+    """Get a slot recurrence by its ID."""
+    return await db.get(models.SessionSlotRecurrence, recurrence_id)
+
+async def get_recurrences_by_session(db: AsyncSession, session_id: int) -> List[models.SessionSlotRecurrence]:
+    """Get all slot recurrences of a session."""
+    result = await db.execute(
+        select(models.SessionSlotRecurrence)
+        .where(models.SessionSlotRecurrence.session_id == session_id)
+        .order_by(models.SessionSlotRecurrence.first_from, models.SessionSlotRecurrence.id)
+    )
+    return result.scalars().all()
+
+async def create_recurrence(
+    db: AsyncSession, recurrence_in: schemas.SessionSlotRecurrenceCreate, session_id: int
+) -> models.SessionSlotRecurrence:
+    """Create a new slot recurrence (no slots are materialized)."""
+    db_recurrence = models.SessionSlotRecurrence(session_id=session_id)
+    _apply(db_recurrence, recurrence_in.model_dump())
+    db.add(db_recurrence)
+    await db.commit()
+    await db.refresh(db_recurrence)
+    return db_recurrence
+
+async def update_recurrence(
+    db: AsyncSession, db_recurrence: models.SessionSlotRecurrence, recurrence_in: schemas.SessionSlotRecurrenceUpdate
+) -> models.SessionSlotRecurrence:
+    """Update a slot recurrence. Already materialized occurrences stay as they are."""
+    _apply(db_recurrence, recurrence_in.model_dump(exclude_unset=True))
+    db.add(db_recurrence)
+    await db.commit()
+    await db.refresh(db_recurrence)
+    return db_recurrence
+
+async def delete_recurrence(
+    db: AsyncSession, db_recurrence: models.SessionSlotRecurrence
+) -> models.SessionSlotRecurrence:
+    """Delete a slot recurrence including its materialized slots and their availabilities."""
+    slot_ids = select(models.SessionSlot.id).where(models.SessionSlot.recurrence_id == db_recurrence.id)
+    await db.execute(
+        delete(models.UserAvailability)
+        .where(models.UserAvailability.slot_id.in_(slot_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(models.SessionSlot)
+        .where(models.SessionSlot.recurrence_id == db_recurrence.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.delete(db_recurrence)
+    await db.commit()
+    return db_recurrence
+
+async def get_slot_occurrences(
+    db: AsyncSession, session_id: int,
+    window_from: Optional[datetime] = None, window_to: Optional[datetime] = None,
+) -> List[dict]:
+    """Sloty sezení v okně: skutečné řádky a rozvinuté výskyty opakování, seřazené podle začátku.
+
+    Dva dotazy (sloty, pravidla); výskyty se počítají v paměti a nic se nezapisuje.
+    Výskyty, které už mají řádek (zhmotněné), se vrátí jen jednou - jako slot.
+    Bez okna se vrátí všechny skutečné sloty a opakování se rozvine na
+    DEFAULT_EXPANSION_WINDOW od teď.
+    """
+    slots = [
+        {"slot_id": slot_id, "recurrence_id": recurrence_id, "slot_from": slot_from, "slot_to": slot_to, "note": note}
+        for slot_id, slot_from, slot_to, note, recurrence_id
+        in await get_slot_bounds_by_session(db, session_id, window_from=window_from, window_to=window_to)
+    ]
+    recurrences = await get_recurrences_by_session(db, session_id)
+    if not recurrences:
+        return slots
+
+    materialized = {
+        (slot["recurrence_id"], as_utc(slot["slot_from"])) for slot in slots if slot["recurrence_id"] is not None
+    }
+    expand_from = window_from if window_from is not None else datetime.now(timezone.utc)
+    expand_to = window_to if window_to is not None else as_utc(expand_from) + DEFAULT_EXPANSION_WINDOW
+    for recurrence in recurrences:
+        for occurrence in expand(recurrence, expand_from, expand_to):
+            if (recurrence.id, occurrence.start) in materialized:
+                continue
+            slots.append({
+                "slot_id": None,
+                "recurrence_id": recurrence.id,
+                "slot_from": occurrence.start,
+                "slot_to": occurrence.end,
+                "note": recurrence.note,
+            })
+    slots.sort(key=lambda slot: (as_utc(slot["slot_from"]), slot["slot_id"] is None, slot["slot_id"] or 0))
+    return slots
+
+async def materialize_occurrence(
+    db: AsyncSession, db_recurrence: models.SessionSlotRecurrence, slot_from: datetime
+) -> Tuple[models.SessionSlot, bool]:
+    """Vrátí slot pro výskyt opakování (vytvoří ho, pokud ještě neexistuje) a zda vznikl.
+
+    Zhmotňuje se jen výskyt, ke kterému se zadává dostupnost - ostatní zůstávají
+    jen v pravidle.
+    """
+    occurrence = find_occurrence(db_recurrence, slot_from)
+    if occurrence is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="slot_from is not an occurrence of this recurrence",
+        )
+
+    recurrence_id = db_recurrence.id  # po rollbacku je instance expirovaná
+
+    async def existing() -> Optional[int]:
+        return await db.scalar(
+            select(models.SessionSlot.id).where(
+                models.SessionSlot.recurrence_id == recurrence_id,
+                models.SessionSlot.slot_from == occurrence.start,
+            )
+        )
+
+    slot_id = await existing()
+    if slot_id is not None:
+        return await get_slot(db, slot_id), False
+
+    db_slot = models.SessionSlot(
+        session_id=db_recurrence.session_id,
+        recurrence_id=recurrence_id,
+        slot_from=occurrence.start,
+        slot_to=occurrence.end,
+        note=db_recurrence.note,
+    )
+    db.add(db_slot)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Souběžný požadavek výskyt zhmotnil dřív (uq_session_slots_recurrence_id_slot_from)
+        await db.rollback()
+        slot_id = await existing()
+        if slot_id is None:
+            raise
+        return await get_slot(db, slot_id), False
+    return await get_slot(db, db_slot.id), True
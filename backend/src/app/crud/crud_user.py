@@ -1,49 +1,54 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.password_hashing import password_hasher
 from app.schemas.user import UserUpdate
+from app.auth.user_cache import user_cache
 
 
-def get_user(db: Session, user_id: int):
+async def get_user(db: AsyncSession, user_id: int):
     """Get a user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id)
 
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """Get a user by username"""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
     """Get a list of users with pagination"""
-    return db.query(User).offset(skip).limit(limit).all()
+    result = await db.execute(select(User).offset(skip).limit(limit))
+    return result.scalars().all()
 
 
-def get_users_by_ids(db: Session, user_ids: List[int]) -> List[User]:
+async def get_users_by_ids(db: AsyncSession, user_ids: List[int]) -> List[User]:
     """Get multiple users by their IDs."""
     if not user_ids:
         return []
-    return db.query(User).filter(User.id.in_(user_ids)).all()
+    result = await db.execute(select(User).where(User.id.in_(user_ids)))
+    return result.scalars().all()
 
 
-def create_user(db: Session, user: UserCreate):
+async def create_user(db: AsyncSession, user: UserCreate):
     """Create a new user"""
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         password_hash=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
-def update_user(db: Session, db_user: User, user_in: UserUpdate) -> User:
+async def update_user(db: AsyncSession, db_user: User, user_in: UserUpdate) -> User:
     """Update a user."""
     update_data = user_in.model_dump(exclude_unset=True)
 
@@ -51,6 +56,25 @@ def update_user(db: Session, db_user: User, user_in: UserUpdate) -> User:
         setattr(db_user, key, value)
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    await db.commit()
+    user_cache.invalidate(db_user.id)
+    await db.refresh(db_user)
+    return db_user
+
+
+async def get_calendar_feed_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    """Current calendar feed token version of a user (None if the user does not exist)"""
+    return await db.scalar(select(User.calendar_feed_version).where(User.id == user_id))
+
+
+async def rotate_calendar_feed_version(db: AsyncSession, user_id: int) -> int:
+    """Bump the calendar feed token version, revoking all earlier feed links. Returns the new version"""
+    version = await db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(calendar_feed_version=User.calendar_feed_version + 1)
+        .returning(User.calendar_feed_version)
+    )
+    await db.commit()
+    user_cache.invalidate(user_id)
+    return version
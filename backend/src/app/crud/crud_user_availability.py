@@ -1,49 +1,102 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from datetime import datetime
 
 from .. import models, schemas
+from ..models.user_availability import availability_range
 from fastapi import HTTPException, status
 
-def get_user_availability(
-    db: Session, user_id: int, slot_id: int
+# SQLSTATE exclusion_violation - překryv zachycený ex_user_availabilities_no_overlap
+EXCLUSION_VIOLATION = "23P01"
+
+def _is_overlap_violation(error: IntegrityError) -> bool:
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return code == EXCLUSION_VIOLATION
+
+def _overlapping(db: AsyncSession, time_from: datetime, time_to: datetime):
+    """Podmínka na záznamy, které se překrývají s [time_from, time_to).
+
+    V Postgresu přes tstzrange && (GiST index exclusion constraintu), jinde porovnáním konců.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return availability_range(
+            models.UserAvailability.available_from, models.UserAvailability.available_to
+        ).op("&&")(availability_range(time_from, time_to))
+    return and_(
+        models.UserAvailability.available_from < time_to,
+        models.UserAvailability.available_to > time_from,
+    )
+
+async def get_user_availability(
+    db: AsyncSession, user_id: int, slot_id: int
 ) -> Optional[models.UserAvailability]:
     """Get a specific user's availability for a specific slot."""
-    return (
-        db.query(models.UserAvailability)
-        .filter(
+    result = await db.execute(
+        select(models.UserAvailability)
+        .where(
             models.UserAvailability.user_id == user_id,
             models.UserAvailability.slot_id == slot_id,
         )
-        .first()
     )
+    return result.scalars().first()
 
-def get_availabilities_by_slot(
-    db: Session, slot_id: int, skip: int = 0, limit: int = 100
+async def get_availabilities_by_slot(
+    db: AsyncSession, slot_id: int, skip: int = 0, limit: int = 100
 ) -> List[models.UserAvailability]:
     """Get all user availabilities for a specific slot."""
-    return (
-        db.query(models.UserAvailability)
-        .filter(models.UserAvailability.slot_id == slot_id)
+    result = await db.execute(
+        select(models.UserAvailability)
+        .options(selectinload(models.UserAvailability.user))
+        .where(models.UserAvailability.slot_id == slot_id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
 
-def get_all_availabilities_by_session(
-    db: Session, session_id: int
+async def get_all_availabilities_by_session(
+    db: AsyncSession, session_id: int
 ) -> List[models.UserAvailability]:
     """Get all user availabilities across all slots for a specific session."""
-    return (
-        db.query(models.UserAvailability)
+    result = await db.execute(
+        select(models.UserAvailability)
+        .options(selectinload(models.UserAvailability.user))
         .join(models.SessionSlot)
-        .filter(models.SessionSlot.session_id == session_id)
-        .all()
+        .where(models.SessionSlot.session_id == session_id)
     )
+    return result.scalars().all()
+
+async def get_availability_intervals_by_session(
+    db: AsyncSession, session_id: int,
+    window_from: Optional[datetime] = None, window_to: Optional[datetime] = None,
+):
+    """(slot_id, user_id, available_from, available_to) všech dostupností sezení.
 
-def set_user_availability(
-    db: Session, 
+    Jen sloupce potřebné pro výpočet překryvů, seřazené podle slotu a začátku.
+    S oknem jen intervaly, které do něj zasahují.
+    """
+    stmt = (
+        select(
+            models.UserAvailability.slot_id,
+            models.UserAvailability.user_id,
+            models.UserAvailability.available_from,
+            models.UserAvailability.available_to,
+        )
+        .join(models.SessionSlot)
+        .where(models.SessionSlot.session_id == session_id)
+        .order_by(models.UserAvailability.slot_id, models.UserAvailability.available_from)
+    )
+    if window_from is not None:
+        stmt = stmt.where(models.UserAvailability.available_to > window_from)
+    if window_to is not None:
+        stmt = stmt.where(models.UserAvailability.available_from < window_to)
+    result = await db.execute(stmt)
+    return result.all()
+
+async def set_user_availability(
+    db: AsyncSession, 
     slot: models.SessionSlot, 
     user_id: int, 
     availability_in: schemas.UserAvailabilityCreateUpdate
@@ -63,28 +116,21 @@ def set_user_availability(
             detail="Availability times must be within the session slot boundaries and valid."
         )
 
-    # Get all existing availability for this user/slot
-    existing_availabilities = (
-        db.query(models.UserAvailability)
-        .filter(
-            models.UserAvailability.user_id == user_id,
-            models.UserAvailability.slot_id == slot.id
-        )
-        .all()
-    )
-    
-    # Check for overlap with existing intervals
     new_start = availability_in.available_from
     new_end = availability_in.available_to
-    for existing in existing_availabilities:
-        # Overlap condition: (StartA < EndB) and (EndA > StartB)
-        if new_start < existing.available_to and new_end > existing.available_from:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"New availability interval from {new_start} to {new_end} overlaps with existing interval from {existing.available_from} to {existing.available_to}."
-            )
+    overlap_detail = f"New availability interval from {new_start} to {new_end} overlaps with an existing interval."
+
+    # Postgres překryv odmítne sám (exclusion constraint, bez závodu mezi kontrolou a zápisem);
+    # ostatní databáze (SQLite v testech) se ověří jedním EXISTS dotazem
+    if db.bind.dialect.name != "postgresql":
+        overlaps = await db.scalar(select(exists().where(
+            models.UserAvailability.user_id == user_id,
+            models.UserAvailability.slot_id == slot.id,
+            _overlapping(db, new_start, new_end),
+        )))
+        if overlaps:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=overlap_detail)
 
-    # No overlap found, create the new availability record
     new_availability = models.UserAvailability(
         **availability_in.model_dump(),
         user_id=user_id,
@@ -93,17 +139,137 @@ def set_user_availability(
     
     db.add(new_availability)
     try:
-        db.commit()
-        db.refresh(new_availability)
+        await db.commit()
+        await db.refresh(new_availability, attribute_names=["id", "created_at", "updated_at", "user"])
         return new_availability
-    except IntegrityError: # Should not happen often now, but keep for safety
-        db.rollback()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_overlap_violation(e):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=overlap_detail)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, # Changed from 409 as unique constraint is gone
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to save availability record due to an unexpected database error."
         )
 
-def delete_user_availability(db: Session, user_id: int, slot_id: int, time_from: Optional[datetime] = None, time_to: Optional[datetime] = None) -> bool:
+def normalize_intervals(
+    intervals: Iterable[schemas.UserAvailabilityCreateUpdate],
+) -> List[Tuple[datetime, datetime, Optional[str]]]:
+    """Seřadí intervaly a sloučí překrývající se i navazující do (od, do, poznámka).
+
+    Sloučený interval převezme první neprázdnou poznámku.
+    """
+    merged: List[Tuple[datetime, datetime, Optional[str]]] = []
+    for interval in sorted(intervals, key=lambda i: (i.available_from, i.available_to)):
+        if merged and interval.available_from <= merged[-1][1]:
+            start, end, note = merged[-1]
+            merged[-1] = (start, max(end, interval.available_to), note or interval.note)
+        else:
+            merged.append((interval.available_from, interval.available_to, interval.note))
+    return merged
+
+async def sync_user_availabilities(
+    db: AsyncSession,
+    session_id: int,
+    user_id: int,
+    slots_in: List[schemas.SlotAvailabilitySet],
+) -> dict:
+    """Nastaví uživateli přesně zadanou množinu intervalů pro vybrané sloty sezení.
+
+    Intervaly se normalizují (seřazení, sloučení překryvů a navazujících), porovnají
+    se s uloženými a rozdíl (smazání, vložení, změna poznámky) se zapíše v jedné
+    transakci. Sloty, které v požadavku nejsou, zůstanou beze změny; prázdný seznam
+    intervalů slot vyčistí.
+    """
+    result = await db.execute(
+        select(models.SessionSlot.id, models.SessionSlot.slot_from, models.SessionSlot.slot_to)
+        .where(models.SessionSlot.session_id == session_id)
+    )
+    bounds = {slot_id: (slot_from, slot_to) for slot_id, slot_from, slot_to in result.all()}
+
+    desired = {}
+    for slot_in in slots_in:
+        if slot_in.slot_id in desired:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Slot {slot_in.slot_id} is listed more than once."
+            )
+        if slot_in.slot_id not in bounds:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Slot {slot_in.slot_id} does not belong to the specified session."
+            )
+        slot_from, slot_to = bounds[slot_in.slot_id]
+        merged = normalize_intervals(slot_in.intervals)
+        if merged and (merged[0][0] < slot_from or max(end for _, end, _ in merged) > slot_to):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Availability times must be within the session slot boundaries and valid."
+            )
+        desired[slot_in.slot_id] = {(start, end): note for start, end, note in merged}
+
+    created = updated = 0
+    stale_ids = []
+    if desired:
+        result = await db.execute(
+            select(models.UserAvailability)
+            .where(
+                models.UserAvailability.user_id == user_id,
+                models.UserAvailability.slot_id.in_(desired.keys()),
+            )
+        )
+        for existing in result.scalars().all():
+            wanted = desired[existing.slot_id]
+            key = (existing.available_from, existing.available_to)
+            if key not in wanted:
+                stale_ids.append(existing.id)
+                continue
+            note = wanted.pop(key)
+            if existing.note != note:
+                existing.note = note
+                updated += 1
+
+        if stale_ids:
+            await db.execute(
+                delete(models.UserAvailability)
+                .where(models.UserAvailability.id.in_(stale_ids))
+                .execution_options(synchronize_session=False)
+            )
+        new_rows = [
+            models.UserAvailability(
+                user_id=user_id, slot_id=slot_id, available_from=start, available_to=end, note=note
+            )
+            for slot_id, wanted in desired.items()
+            for (start, end), note in wanted.items()
+        ]
+        db.add_all(new_rows)
+        created = len(new_rows)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Availability changed concurrently, please reload and try again."
+            )
+
+    result = await db.execute(
+        select(models.UserAvailability)
+        .options(selectinload(models.UserAvailability.user))
+        .where(
+            models.UserAvailability.user_id == user_id,
+            models.UserAvailability.slot_id.in_(desired.keys()),
+        )
+        .order_by(models.UserAvailability.slot_id, models.UserAvailability.available_from)
+        .execution_options(populate_existing=True)
+    )
+    return {
+        "created": created,
+        "updated": updated,
+        "deleted": len(stale_ids),
+        "availabilities": result.scalars().all(),
+    }
+
+async def delete_user_availability(db: AsyncSession, user_id: int, slot_id: int, time_from: Optional[datetime] = None, time_to: Optional[datetime] = None) -> List[int]:
     """Delete a specific user's availability for a specific slot.
     
     Args:
@@ -117,34 +283,31 @@ def delete_user_availability(db: Session, user_id: int, slot_id: int, time_from:
     které se s tímto intervalem překrývají. Jinak bude smazán jeden konkrétní záznam.
     
     Returns:
-        True pokud byl alespoň jeden záznam smazán, jinak False
+        ID smazaných záznamů (prázdný seznam, pokud se nic nesmazalo)
     """
     if time_from is not None and time_to is not None:
-        # Smazání podle časového intervalu
-        overlapping_records = (
-            db.query(models.UserAvailability)
-            .filter(
+        # Smazání podle časového intervalu - jeden DELETE přes index překryvů
+        result = await db.execute(
+            delete(models.UserAvailability)
+            .where(
                 models.UserAvailability.user_id == user_id,
                 models.UserAvailability.slot_id == slot_id,
-                models.UserAvailability.available_from < time_to,  # Začátek záznamu je před koncem intervalu
-                models.UserAvailability.available_to > time_from,  # Konec záznamu je po začátku intervalu
+                _overlapping(db, time_from, time_to),
             )
-            .all()
+            .returning(models.UserAvailability.id)
+            .execution_options(synchronize_session=False)
         )
-        
-        if not overlapping_records:
-            return False
-            
-        for record in overlapping_records:
-            db.delete(record)
-        
-        db.commit()
-        return True
+        deleted_ids = result.scalars().all()
+        if not deleted_ids:
+            return []
+        await db.commit()
+        return deleted_ids
     else:
         # Původní implementace - smazání jednoho záznamu
-        db_availability = get_user_availability(db, user_id=user_id, slot_id=slot_id)
+        db_availability = await get_user_availability(db, user_id=user_id, slot_id=slot_id)
         if db_availability:
-            db.delete(db_availability)
-            db.commit()
-            return True
-        return False 
\ No newline at end of file
+            deleted_id = db_availability.id
+            await db.delete(db_availability)
+            await db.commit()
+            return [deleted_id]
+        return []
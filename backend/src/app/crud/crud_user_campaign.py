@@ -1,44 +1,59 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from ..models import UserCampaign, Campaign
 from ..models.user_campaign import CampaignRoleEnum
 from ..schemas import UserCampaignUpdate
+from ..services import permission_cache
 
-def get_campaign_members(db: Session, campaign_id: int, skip: int = 0, limit: int = 100):
+async def get_campaign_roles_for_user(db: AsyncSession, user_id: int):
+    """Všechna členství uživatele v kampaních jedním dotazem: {campaign_id: role}."""
+    result = await db.execute(
+        select(UserCampaign.campaign_id, UserCampaign.role).where(UserCampaign.user_id == user_id)
+    )
+    return {campaign_id: role for campaign_id, role in result.all()}
+
+async def get_campaign_roster(db: AsyncSession, campaign_id: int):
+    """Všichni členové kampaně jedním dotazem bez načítání uživatelů: {user_id: role}."""
+    result = await db.execute(
+        select(UserCampaign.user_id, UserCampaign.role).where(UserCampaign.campaign_id == campaign_id)
+    )
+    return {user_id: role for user_id, role in result.all()}
+
+async def get_campaign_members(db: AsyncSession, campaign_id: int, skip: int = 0, limit: int = 100):
     """Gets all members (UserCampaign associations) for a specific campaign, including user details."""
-    return (
-        db.query(UserCampaign)
+    result = await db.execute(
+        select(UserCampaign)
         .options(joinedload(UserCampaign.user)) # Eager load user details
-        .filter(UserCampaign.campaign_id == campaign_id)
+        .where(UserCampaign.campaign_id == campaign_id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
 
-def get_campaign_membership(db: Session, campaign_id: int, user_id: int):
+async def get_campaign_membership(db: AsyncSession, campaign_id: int, user_id: int):
     """Gets a specific UserCampaign association."""
-    return (
-        db.query(UserCampaign)
-        .filter(UserCampaign.campaign_id == campaign_id, UserCampaign.user_id == user_id)
-        .first()
+    result = await db.execute(
+        select(UserCampaign)
+        .where(UserCampaign.campaign_id == campaign_id, UserCampaign.user_id == user_id)
     )
+    return result.scalars().first()
 
-def update_campaign_member_role(db: Session, campaign_id: int, user_id: int, role_update: UserCampaignUpdate):
+async def update_campaign_member_role(db: AsyncSession, campaign_id: int, user_id: int, role_update: UserCampaignUpdate):
     """Updates the role of a campaign member. Returns the updated association or None."""
-    db_membership = get_campaign_membership(db, campaign_id, user_id)
+    db_membership = await get_campaign_membership(db, campaign_id, user_id)
     if not db_membership:
         return None # Membership not found
 
     # Prevent changing the role of the last GM
     if db_membership.role == CampaignRoleEnum.GM:
-        gm_count = (
-            db.query(func.count(UserCampaign.id))
-            .filter(
+        gm_count = await db.scalar(
+            select(func.count(UserCampaign.id))
+            .where(
                 UserCampaign.campaign_id == campaign_id,
                 UserCampaign.role == CampaignRoleEnum.GM
             )
-            .scalar()
         )
         if gm_count <= 1 and role_update.role != CampaignRoleEnum.GM:
             # Cannot change role of the last GM to something else
@@ -46,29 +61,35 @@ def update_campaign_member_role(db: Session, campaign_id: int, user_id: int, rol
 
     db_membership.role = role_update.role
     db.add(db_membership)
-    db.commit()
-    db.refresh(db_membership)
+    await db.commit()
+    await permission_cache.invalidate(db, [user_id], permission_cache.CAMPAIGN)
+    # Uživatel je součástí response schématu (UserCampaignRead)
+    await db.refresh(db_membership, attribute_names=["role", "updated_at", "user"])
     return db_membership
 
-def remove_campaign_member(db: Session, campaign_id: int, user_id_to_remove: int):
+async def remove_campaign_member(db: AsyncSession, campaign_id: int, user_id_to_remove: int):
     """Removes a user from a campaign. Returns True on success, False if not found, or string message on error."""
-    db_membership = get_campaign_membership(db, campaign_id, user_id_to_remove)
+    db_membership = await get_campaign_membership(db, campaign_id, user_id_to_remove)
     if not db_membership:
         return False # Membership not found
 
     # Prevent removing the last GM
     if db_membership.role == CampaignRoleEnum.GM:
-        gm_count = (
-            db.query(func.count(UserCampaign.id))
-            .filter(
+        gm_count = await db.scalar(
+            select(func.count(UserCampaign.id))
+            .where(
                 UserCampaign.campaign_id == campaign_id,
                 UserCampaign.role == CampaignRoleEnum.GM
             )
-            .scalar()
         )
         if gm_count <= 1:
             return "Cannot remove the last GM from the campaign."
 
-    db.delete(db_membership)
-    db.commit()
-    return True 
\ No newline at end of file
+    await db.delete(db_membership)
+    await db.commit()
+    await permission_cache.invalidate(db, [user_id_to_remove], permission_cache.CAMPAIGN)
+    return True
+
+async def invalidate_campaign_permissions(db: AsyncSession, user_ids) -> None:
+    """Zneplatní cache rolí v kampaních - pro místa, která UserCampaign mění mimo tento modul."""
+    await permission_cache.invalidate(db, user_ids, permission_cache.CAMPAIGN) 
\ No newline at end of file
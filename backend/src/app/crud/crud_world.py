@@ -1,29 +1,43 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from ..models.world import World
 from ..models.world_user import WorldUser, RoleEnum
+from ..models.campaign import Campaign
+from ..models.user_campaign import UserCampaign
 from ..schemas.world import WorldCreate, WorldUpdate
+from .crud_world_user import invalidate_world_permissions
+from .crud_user_campaign import invalidate_campaign_permissions
+from ..services import name_index
 
-def get_world(db: Session, world_id: int):
-    return db.query(World).filter(World.id == world_id).first()
+async def get_world(db: AsyncSession, world_id: int):
+    # Kampaně jsou součástí response schématu, musí být načteny předem (async session nemá lazy load)
+    result = await db.execute(
+        select(World)
+        .options(selectinload(World.campaigns))
+        .where(World.id == world_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
-def get_worlds_by_owner(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+async def get_worlds_by_owner(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
     """Get worlds where the user has the OWNER role."""
     # Najdeme asociace, kde je uživatel vlastníkem
     owner_associations = (
-        db.query(WorldUser.world_id)
-        .filter(WorldUser.user_id == user_id, WorldUser.role == RoleEnum.OWNER)
-        .subquery()
+        select(WorldUser.world_id)
+        .where(WorldUser.user_id == user_id, WorldUser.role == RoleEnum.OWNER)
     )
     # Vrátíme světy, jejichž ID jsou v seznamu vlastněných světů
-    return (
-        db.query(World)
-        .filter(World.id.in_(owner_associations))
+    result = await db.execute(
+        select(World)
+        .options(selectinload(World.campaigns))
+        .where(World.id.in_(owner_associations))
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
 
-def create_world(db: Session, world: WorldCreate, creator_id: int):
+async def create_world(db: AsyncSession, world: WorldCreate, creator_id: int):
     """Creates a new world and assigns the creator as OWNER."""
     # Vytvoříme svět bez owner_id
     db_world = World(**world.dict())
@@ -36,27 +50,38 @@ def create_world(db: Session, world: WorldCreate, creator_id: int):
     db.add(db_world)
     db.add(owner_association)
     try:
-        db.commit()
-        db.refresh(db_world)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating world or owner association: {e}")
         raise
-    return db_world
+    await invalidate_world_permissions(db, [creator_id])
+    return await get_world(db, db_world.id)
 
-def update_world(db: Session, db_world: World, world_in: WorldUpdate):
+async def update_world(db: AsyncSession, db_world: World, world_in: WorldUpdate):
     """Updates a world. Assumes authorization check happened in the API layer."""
     update_data = world_in.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_world, key, value)
     db.add(db_world)
-    db.commit()
-    db.refresh(db_world)
-    return db_world
+    await db.commit()
+    return await get_world(db, db_world.id)
 
-def delete_world(db: Session, db_world: World):
+async def delete_world(db: AsyncSession, db_world: World):
     """Deletes a world. Assumes authorization check happened in the API layer."""
-    db.delete(db_world)
-    db.commit()
+    # Členství zaniknou kaskádou - poznamenáme si dotčené uživatele kvůli cache oprávnění
+    world_member_ids = (await db.scalars(
+        select(WorldUser.user_id).where(WorldUser.world_id == db_world.id)
+    )).all()
+    campaign_member_ids = (await db.scalars(
+        select(UserCampaign.user_id)
+        .join(Campaign, Campaign.id == UserCampaign.campaign_id)
+        .where(Campaign.world_id == db_world.id)
+    )).all()
+    await db.delete(db_world)
+    await db.commit()
+    await invalidate_world_permissions(db, world_member_ids)
+    await invalidate_campaign_permissions(db, campaign_member_ids)
+    await name_index.invalidate(None, db_world.id)
     # Vracíme smazaný objekt, i když už v DB není (pro response_model v API)
-    return db_world
\ No newline at end of file
+    return db_world
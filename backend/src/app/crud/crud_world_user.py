@@ -1,13 +1,109 @@
-from sqlalchemy.orm import Session
-from typing import Optional
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional, Union
 
 # Importuj modely relativně k aktuálnímu adresáři (crud)
-from ..models.world_user import WorldUser 
+from ..models.world_user import WorldUser
 # RoleEnum může být potřeba, pokud bychom přidávali další funkce sem
-from ..models.world_user import RoleEnum 
+from ..models.world_user import RoleEnum
 # Potřebujeme User a World pro kontroly
 from ..models import User, World
+from ..schemas.world_user import WorldUserUpdate
+from ..services import permission_cache
 
-# Zde mohou být v budoucnu další CRUD funkce pro WorldUser
-# např. add_world_member, remove_world_member, update_world_member_role 
\ No newline at end of file
+
+async def get_world_roles_for_user(db: AsyncSession, user_id: int) -> Dict[int, RoleEnum]:
+    """Všechna členství uživatele ve světech jedním dotazem: {world_id: role}."""
+    result = await db.execute(
+        select(WorldUser.world_id, WorldUser.role).where(WorldUser.user_id == user_id)
+    )
+    return {world_id: role for world_id, role in result.all()}
+
+
+async def get_world_member(db: AsyncSession, world_id: int, user_id: int) -> Optional[WorldUser]:
+    """Gets a specific WorldUser association including user details."""
+    result = await db.execute(
+        select(WorldUser)
+        .options(selectinload(WorldUser.user))
+        .where(WorldUser.world_id == world_id, WorldUser.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def get_world_members(db: AsyncSession, world_id: int, skip: int = 0, limit: int = 100) -> List[WorldUser]:
+    """Gets all members of a world, including user details."""
+    result = await db.execute(
+        select(WorldUser)
+        .options(selectinload(WorldUser.user))
+        .where(WorldUser.world_id == world_id)
+        .order_by(WorldUser.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def add_world_member(
+    db: AsyncSession, world_id: int, user_id: int, role: RoleEnum = RoleEnum.VIEWER
+) -> Union[WorldUser, str, None]:
+    """Adds a user to a world. Returns the association, None if the user does not exist, or an error message."""
+    if await db.get(User, user_id) is None:
+        return None
+    if await get_world_member(db, world_id, user_id):
+        return "User is already a member of this world."
+
+    db_member = WorldUser(world_id=world_id, user_id=user_id, role=role)
+    db.add(db_member)
+    await db.commit()
+    await permission_cache.invalidate(db, [user_id], permission_cache.WORLD)
+    return await get_world_member(db, world_id, user_id)
+
+
+async def update_world_member_role(
+    db: AsyncSession, world_id: int, user_id: int, role_update: WorldUserUpdate
+) -> Union[WorldUser, str, None]:
+    """Updates the role of a world member. Returns the updated association, None if not found, or an error message."""
+    db_member = await get_world_member(db, world_id, user_id)
+    if not db_member:
+        return None
+
+    # Svět musí mít vždy alespoň jednoho vlastníka
+    if db_member.role == RoleEnum.OWNER and role_update.role != RoleEnum.OWNER:
+        owner_count = await db.scalar(
+            select(func.count(WorldUser.id))
+            .where(WorldUser.world_id == world_id, WorldUser.role == RoleEnum.OWNER)
+        )
+        if owner_count <= 1:
+            return "Cannot change role of the last owner."
+
+    db_member.role = role_update.role
+    await db.commit()
+    await permission_cache.invalidate(db, [user_id], permission_cache.WORLD)
+    return await get_world_member(db, world_id, user_id)
+
+
+async def remove_world_member(db: AsyncSession, world_id: int, user_id: int) -> Union[bool, str]:
+    """Removes a user from a world. Returns True on success, False if not found, or an error message."""
+    db_member = await get_world_member(db, world_id, user_id)
+    if not db_member:
+        return False
+
+    if db_member.role == RoleEnum.OWNER:
+        owner_count = await db.scalar(
+            select(func.count(WorldUser.id))
+            .where(WorldUser.world_id == world_id, WorldUser.role == RoleEnum.OWNER)
+        )
+        if owner_count <= 1:
+            return "Cannot remove the last owner from the world."
+
+    await db.delete(db_member)
+    await db.commit()
+    await permission_cache.invalidate(db, [user_id], permission_cache.WORLD)
+    return True
+
+
+async def invalidate_world_permissions(db: AsyncSession, user_ids) -> None:
+    """Zneplatní cache rolí ve světech - pro místa, která WorldUser mění mimo tento modul (create/delete world)."""
+    await permission_cache.invalidate(db, user_ids, permission_cache.WORLD)
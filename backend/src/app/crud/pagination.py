@@ -0,0 +1,140 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, func, or_, select, text, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+
+
+class InvalidCursor(ValueError):
+    """Cursor nejde dekódovat nebo patří k jinému řazení."""
+
+
+def _nullable(col) -> bool:
+    # Instrumentovaný atribut modelu -> Column; u výrazů bez informace raději počítáme s NULL
+    return getattr(getattr(col, "expression", col), "nullable", True)
+
+
+class KeysetOrder:
+    """Řazení seznamu pro keyset (cursor) stránkování.
+
+    `columns` jsou n-tice (sloupec, sestupně?[, nulls_last]) a poslední sloupec musí být
+    unikátní (typicky id), aby bylo pořadí úplné. NULL se bere jako největší hodnota
+    (stejně jako btree index v Postgresu), takže ORDER BY odpovídá obyčejnému indexu
+    procházenému kterýmkoli směrem; `nulls_last` to u sloupce může přebít. Umístění
+    NULL se vždy uvádí explicitně, aby se řazení chovalo stejně i v SQLite.
+    """
+
+    def __init__(self, name: str, *columns: tuple) -> None:
+        self.name = name
+        self.columns = [
+            (col, desc, spec[0] if spec else not desc)  # (sloupec, sestupně, NULL na konci)
+            for col, desc, *spec in columns
+        ]
+
+    def order_by(self) -> list:
+        clauses = []
+        for col, desc, nulls_last in self.columns:
+            clause = col.desc() if desc else col.asc()
+            clauses.append(clause.nullslast() if nulls_last else clause.nullsfirst())
+        return clauses
+
+    def after(self, values: Sequence[Any]):
+        """WHERE podmínka pro řádky, které v tomto řazení leží za `values`.
+
+        Koncové sloupce se stejným směrem, u kterých za cursorem neleží žádný NULL
+        (NOT NULL sloupec, nebo NULL řazené před hodnotou cursoru), se porovnají jako
+        n-tice `(a, b) > (:a, :b)` - index je na ní schopný začít přímo na pozici
+        cursoru. Předchozí sloupce dostanou navíc hranici `a >= :a`, takže index
+        má vždy kde začít a hluboké stránky nestojí víc než první.
+        """
+        group = len(self.columns)
+        direction = self.columns[-1][1]
+        while group > 0:
+            col, desc, nulls_last = self.columns[group - 1]
+            if desc != direction or values[group - 1] is None or (nulls_last and _nullable(col)):
+                break
+            group -= 1
+
+        rest = false()
+        if group < len(self.columns):
+            cols = [col for col, _, _ in self.columns[group:]]
+            key = cols[0] if len(cols) == 1 else tuple_(*cols)
+            bound = values[group] if len(cols) == 1 else tuple(values[group:])
+            rest = key < bound if direction else key > bound
+
+        # Zbylé sloupce zepředu obalují podmínku pro shodu v nich
+        for (col, desc, nulls_last), value in reversed(list(zip(self.columns[:group], values[:group]))):
+            if value is None:
+                # NULL na konci => za cursorem jen další NULL, jinak ještě všechny hodnoty
+                rest = and_(col.is_(None), rest) if nulls_last else or_(col.is_not(None), and_(col.is_(None), rest))
+                continue
+            beyond = col < value if desc else col > value
+            tie = and_(col == value, rest)
+            if nulls_last and _nullable(col):
+                rest = or_(beyond, col.is_(None), tie)
+            else:
+                rest = and_(col <= value if desc else col >= value, or_(beyond, tie))
+        return rest
+
+    def apply(self, stmt, after: Optional[Sequence[Any]] = None, skip: int = 0):
+        """Přidá řazení a buď keyset podmínku (cursor), nebo klasický offset."""
+        stmt = stmt.order_by(*self.order_by())
+        if after is not None:
+            return stmt.where(self.after(after))
+        return stmt.offset(skip) if skip else stmt
+
+    def values_of(self, obj: Any) -> List[Any]:
+        # ORM objekt nebo řádek z projekce (RowMapping)
+        if isinstance(obj, Mapping):
+            return [obj[col.key] for col, _, _ in self.columns]
+        return [getattr(obj, col.key) for col, _, _ in self.columns]
+
+    def encode(self, obj: Any) -> str:
+        values = [{"$dt": v.isoformat()} if isinstance(v, datetime) else v for v in self.values_of(obj)]
+        raw = json.dumps({"o": self.name, "v": values}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            data = json.loads(raw)
+            values = data["v"]
+            if data["o"] != self.name or len(values) != len(self.columns):
+                raise InvalidCursor("Cursor does not belong to this list")
+            return [datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) else v for v in values]
+        except (binascii.Error, ValueError, KeyError, TypeError) as e:
+            if isinstance(e, InvalidCursor):
+                raise
+            raise InvalidCursor("Malformed cursor") from e
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor na další stránku - jen pokud je stránka plná."""
+        if not items or len(items) < limit:
+            return None
+        return self.encode(items[-1])
+
+
+async def estimate_count(db: AsyncSession, model, *criteria, **filters) -> Tuple[int, bool]:
+    """Počet řádků modelu pro dané podmínky/filtry (sloupec=hodnota) jako (počet, přesný?).
+
+    V Postgresu se nejdřív vezme odhad plánovače (EXPLAIN, bez čtení tabulky); přesný
+    COUNT se spustí jen pokud je odhad pod PAGINATION_EXACT_COUNT_MAX.
+    """
+    criteria = [*criteria, *(getattr(model, key) == value for key, value in filters.items() if value is not None)]
+    where = and_(true(), *criteria)
+    if db.bind.dialect.name == "postgresql":
+        probe = select(model.id).where(where)
+        compiled = probe.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > settings.PAGINATION_EXACT_COUNT_MAX:
+            return estimate, False
+    count = await db.scalar(select(func.count()).select_from(model).where(where))
+    return count, True
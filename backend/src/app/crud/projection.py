@@ -0,0 +1,34 @@
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .pagination import KeysetOrder
+
+
+def projectable_fields(model, schema) -> List[str]:
+    """Sloupce modelu, které jsou i v response schématu - jen ty jde vybrat přes `fields=`."""
+    columns = model.__table__.columns.keys()
+    return [name for name in columns if name in schema.model_fields]
+
+
+async def get_projection(
+    db: AsyncSession,
+    model,
+    fields: Sequence[str],
+    order: KeysetOrder,
+    *criteria,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Sequence[Any]] = None,
+) -> List[RowMapping]:
+    """Vybere jen zadané sloupce (bez ORM instancí a relací) se stejným řazením a stránkováním.
+
+    Řádky obsahují i sloupce řazení, aby z nich šel sestavit cursor; co se vrátí
+    klientovi, určuje až API vrstva.
+    """
+    names = dict.fromkeys(["id", *fields, *(col.key for col, _, _ in order.columns)])
+    stmt = select(*(getattr(model, name) for name in names)).where(*criteria)
+    result = await db.execute(order.apply(stmt, after=after, skip=skip).limit(limit))
+    return result.mappings().all()
@@ -0,0 +1,70 @@
+"""Obnova materializovaných cest lokací (``Location.path`` / ``Location.depth``).
+
+Cesty udržuje ``crud_location`` při vytvoření a přesunu lokace; tento modul je
+dopočítá pro existující data nebo po ručních zásazích do databáze::
+
+    python -m app.db.location_paths [--world-id ID]
+"""
+import argparse
+import logging
+import sys
+from typing import Optional
+
+from sqlalchemy import String, cast, select, update
+from sqlalchemy.engine import Connection
+
+from app.db.session import engine
+from app.models.location import Location
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_location_paths(connection: Connection, world_id: Optional[int] = None) -> int:
+    """Přepočítá path/depth po úrovních (jeden UPDATE na úroveň stromu). Vrací počet lokací s cestou.
+
+    Lokace v cyklu (nemají kořen) zůstanou s NULL cestou a dotazy pro ně použijí rekurzivní CTE.
+    """
+    locations = Location.__table__
+    parent = locations.alias("parent")
+    scope = [locations.c.world_id == world_id] if world_id is not None else []
+
+    connection.execute(update(locations).where(*scope).values(path=None, depth=None))
+    total = connection.execute(
+        update(locations)
+        .where(locations.c.parent_location_id.is_(None), *scope)
+        .values(path="/" + cast(locations.c.id, String) + "/", depth=0)
+    ).rowcount
+
+    while True:
+        parent_row = parent.c.id == locations.c.parent_location_id
+        updated = connection.execute(
+            update(locations)
+            .where(
+                locations.c.path.is_(None),
+                locations.c.parent_location_id.in_(select(parent.c.id).where(parent.c.path.is_not(None))),
+                *scope,
+            )
+            .values(
+                path=select(parent.c.path).where(parent_row).scalar_subquery() + cast(locations.c.id, String) + "/",
+                depth=select(parent.c.depth + 1).where(parent_row).scalar_subquery(),
+            )
+        ).rowcount
+        if not updated:
+            return total
+        total += updated
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild materialized location paths.")
+    parser.add_argument("--world-id", type=int, default=None, help="Only rebuild locations of this world")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    with engine.begin() as connection:
+        count = rebuild_location_paths(connection, world_id=args.world_id)
+    logger.info("Rebuilt paths for %d locations", count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
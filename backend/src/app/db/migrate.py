@@ -0,0 +1,94 @@
+"""Správa schématu přes Alembic.
+
+Spouští se z entrypoint.sh před startem serveru (``python -m app.db.migrate``):
+počká na databázi, databázi vytvořenou dřív přes ``create_all`` označí
+(``stamp``) výchozí revizí a pak aplikuje migrace. Aplikace sama schéma nevytváří, při startu
+jen ověří, že revize v databázi odpovídá head (viz ``check_schema_revision``).
+"""
+import logging
+import os
+import sys
+import time
+
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Revize, kterou se označí databáze vytvořená přes create_all (před zavedením Alembicu)
+LEGACY_BASELINE_REVISION = "02fd3cabb547"
+
+
+def alembic_config() -> Config:
+    config = Config(settings.ALEMBIC_CONFIG)
+    # script_location v alembic.ini je relativní - vztahujeme ho k adresáři ini souboru, ne k CWD
+    ini_dir = os.path.dirname(os.path.abspath(settings.ALEMBIC_CONFIG))
+    config.set_main_option("script_location", os.path.join(ini_dir, "alembic"))
+    return config
+
+
+def head_revisions() -> set:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def check_schema_revision(connection: Connection) -> None:
+    """Ověří, že databáze je na head revizi. Volá se přes ``AsyncConnection.run_sync``."""
+    if not os.path.exists(settings.ALEMBIC_CONFIG):
+        logger.warning("Schema check skipped: %s not found", settings.ALEMBIC_CONFIG)
+        return
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    expected = head_revisions()
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {sorted(current) or 'none'}, expected {sorted(expected)}. "
+            "Run 'alembic upgrade head' (or 'python -m app.db.migrate')."
+        )
+
+
+def wait_for_database(max_wait: float = 60.0, interval: float = 0.5) -> None:
+    deadline = time.monotonic() + max_wait
+    while True:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(interval)
+
+
+def upgrade_to_head() -> None:
+    config = alembic_config()
+    with engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+    if "alembic_version" not in tables and "users" in tables:
+        # Databáze vytvořená dřív přes Base.metadata.create_all odpovídá modelům z doby
+        # před migracemi, tedy výchozí revizi. Další migrace jsou idempotentní
+        # (7c1e4a9d2b36 dorovná rozdíly proti create_all), upgrade je doplní.
+        logger.warning("Legacy database without alembic_version detected, stamping %s", LEGACY_BASELINE_REVISION)
+        command.stamp(config, LEGACY_BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        wait_for_database()
+    except OperationalError as exc:
+        logger.error("Database not ready: %s", exc)
+        return 1
+    upgrade_to_head()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
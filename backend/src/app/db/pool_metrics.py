@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Horní hranice bucketů histogramu latence checkoutu (ms), poslední bucket je +Inf
+CHECKOUT_LATENCY_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class PoolStats:
+    """Počítadla pro jeden connection pool - počet čekajících a histogram latence checkoutu."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.checkouts = 0
+        self.failures = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.bucket_counts = [0] * (len(CHECKOUT_LATENCY_BUCKETS_MS) + 1)
+
+    def start_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, elapsed_ms: float, failed: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if failed:
+                # timeout poolu nebo chyba při navazování spojení
+                self.failures += 1
+                return
+            self.checkouts += 1
+            self.latency_sum_ms += elapsed_ms
+            self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+            for i, bound in enumerate(CHECKOUT_LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+            else:
+                self.bucket_counts[-1] += 1
+
+    def histogram(self) -> Dict[str, Any]:
+        # Kumulativní buckety ve stylu Prometheus (le = "less or equal")
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(CHECKOUT_LATENCY_BUCKETS_MS + [float("inf")], self.bucket_counts):
+            cumulative += count
+            buckets.append({"le": "+Inf" if bound == float("inf") else bound, "count": cumulative})
+        return {
+            "count": self.checkouts,
+            "sum_ms": round(self.latency_sum_ms, 3),
+            "max_ms": round(self.latency_max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Měří dobu získání spojení z poolu (včetně čekání ve frontě a případného connectu)."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        self.stats.start_wait()
+        start = time.perf_counter()
+        failed = True
+        try:
+            conn = super()._do_get()
+            failed = False
+            return conn
+        finally:
+            self.stats.end_wait((time.perf_counter() - start) * 1000, failed)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_snapshot(engine: Engine) -> Dict[str, Any]:
+    """Aktuální stav poolu daného enginu (checked-out/idle/waiting + histogram latence)."""
+    pool = engine.pool
+    snapshot: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # QueuePool vrací záporný overflow, dokud není pool zaplněný
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        snapshot.update(
+            waiting=stats.waiting,
+            checkout_failures=stats.failures,
+            checkout_latency_ms=stats.histogram(),
+        )
+    return snapshot
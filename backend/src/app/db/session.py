@@ -1,16 +1,66 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
 
-engine = create_engine(settings.DATABASE_URL)
+
+def _async_database_url() -> str:
+    """Vrátí URL pro async engine (asyncpg), pokud není explicitně nastavena ASYNC_DATABASE_URL."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def _pool_kwargs() -> dict:
+    """Společné nastavení poolu pro oba enginy (viz DB_POOL_* v Settings)."""
+    return dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def _statement_timeout_connect_args(url: str, is_async: bool) -> dict:
+    """connect_args nastavující statement_timeout pro Postgres (asyncpg vs. psycopg)."""
+    if settings.DB_STATEMENT_TIMEOUT_MS is None or make_url(url).get_backend_name() != "postgresql":
+        return {}
+    timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if is_async:
+        return {"server_settings": {"statement_timeout": timeout}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+# Synchronní engine - používá jen create_all při startu a nástroje mimo request cyklus
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    connect_args=_statement_timeout_connect_args(settings.DATABASE_URL, is_async=False),
+    **_pool_kwargs(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Asynchronní engine pro API vrstvu
+_ASYNC_URL = _async_database_url()
+async_engine = create_async_engine(
+    _ASYNC_URL,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    connect_args=_statement_timeout_connect_args(_ASYNC_URL, is_async=True),
+    **_pool_kwargs(),
+)
+# expire_on_commit=False - objekty vrácené z CRUD po commitu se serializují bez dalších dotazů
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
 
-# Add this function
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,9 +1,21 @@
+import time
+_IMPORT_START = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
 from app.api.endpoints import router as api_router
 from app.core.config import settings
-# from app.db.session import Base, engine
-from app.db.session import engine, Base # Zajistíme import Base
+from app.db.session import async_engine
+from app.core.redis import close_redis
+from app.services.live_updates import hub as live_updates_hub
+from app.services.ai_jobs import workers as ai_job_workers
+from app.core.password_hashing import PasswordHasherBusy, password_hasher
 from app import models  # Import the models package
 
 # --- Rate Limiting Imports ---
@@ -12,21 +24,56 @@ from slowapi.errors import RateLimitExceeded # Import výjimky
 from slowapi.middleware import SlowAPIMiddleware # Import middleware
 # Importujeme pouze limiter, ne startup/shutdown funkce
 from app.core.limiter import limiter # Import z nového modulu
+from app.api.pagination import PAGINATION_HEADERS
 
 # --- End Rate Limiting Imports ---
 
+# uvicorn.error logger je vidět ve výstupu uvicornu bez další konfigurace logování
+logger = logging.getLogger("uvicorn.error")
+
+# Doby jednotlivých fází startu (ms) - vypisují se v lifespan a jsou na /V1/metrics/startup
+startup_timings: dict = {"import": (time.perf_counter() - _IMPORT_START) * 1000}
+
+# Schéma vytváří a migruje výhradně Alembic (entrypoint.sh -> python -m app.db.migrate),
+# zde se jen explicitně zkonfigurují mappery, aby chyby v modelech vyskočily při startu
+_phase_start = time.perf_counter()
+configure_mappers()
+startup_timings["model_registration"] = (time.perf_counter() - _phase_start) * 1000
+
 
-#print("Importované modely:", models.__all__)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    phase_start = time.perf_counter()
+    async with async_engine.connect() as conn:
+        if settings.SKIP_SCHEMA_CHECK:
+            await conn.execute(text("SELECT 1"))
+        else:
+            # Alembic se importuje jen pro kontrolu revize - fast-start ho vůbec nenačítá
+            from app.db.migrate import check_schema_revision
 
-# Ensure all models are imported before creating tables
-#print("Dostupné tabulky před vytvořením:", Base.metadata.tables.keys())
-Base.metadata.create_all(bind=engine) # Odkomentováno pro synchronizaci DB
-#print("DB sync: Tables created/checked based on models.") # Přidáme log pro potvrzení
-#print("Dostupné tabulky po vytvoření:", Base.metadata.tables.keys())
+            await conn.run_sync(check_schema_revision)
+    startup_timings["first_db_connect"] = (time.perf_counter() - phase_start) * 1000
+    startup_timings["total"] = (time.perf_counter() - _IMPORT_START) * 1000
+    logger.info(
+        "Startup timings (ms): %s%s",
+        ", ".join(f"{phase}={ms:.1f}" for phase, ms in startup_timings.items()),
+        " [schema check skipped]" if settings.SKIP_SCHEMA_CHECK else "",
+    )
+    ai_job_workers.start()
+    yield
+    await ai_job_workers.close()
+    await async_engine.dispose()
+    await live_updates_hub.close()
+    await close_redis()
+    password_hasher.shutdown()
+
+
+_phase_start = time.perf_counter()
 
 app = FastAPI(
     title="Sesplan API",
     redirect_slashes=False,
+    lifespan=lifespan,
     # Přidání lifecycle events pro limiter z app.core.limiter <-- ODSTRANĚNO
     # on_startup=[startup_limiter],
     # on_shutdown=[shutdown_limiter]
@@ -35,6 +82,16 @@ app = FastAPI(
 # Nastavení handleru pro výjimku RateLimitExceeded (používáme importovaný handler)
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+# Backpressure hashovacího poolu - plná fronta = rychlá 503 místo čekání
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
 # Přidání SlowAPI middleware (používáme importovaný middleware)
 app.add_middleware(SlowAPIMiddleware) # <-- ZNOVU POVOLENO
 
@@ -51,12 +108,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["Authorization", "Content-Type"],
+    # Stránkovací hlavičky musí být čitelné i z frontendu
+    expose_headers=PAGINATION_HEADERS,
 )
 
 # Inject limiter instance into the app state for dependency injection
 app.state.limiter = limiter # <-- TOTO JE POTŘEBA ODKOMENTOVAT
+# Sdílený dict - lifespan do něj ještě doplní first_db_connect/total
+app.state.startup_timings = startup_timings
 
 app.include_router(api_router, prefix="/V1")
+startup_timings["router_build"] = (time.perf_counter() - _phase_start) * 1000
 
 @app.get("/")
 async def root():
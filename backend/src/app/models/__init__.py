@@ -21,6 +21,7 @@ from .organization_tag_type import OrganizationTagType
 from .session import Session
 from .session_character import SessionCharacter
 from .session_slot import SessionSlot
+from .session_slot_recurrence import SessionSlotRecurrence
 from .user import User
 from .user_availability import UserAvailability
 from .user_campaign import UserCampaign
@@ -52,6 +53,7 @@ __all__ = [
     "Session",
     "SessionCharacter",
     "SessionSlot",
+    "SessionSlotRecurrence",
     "User",
     "UserAvailability",
     "UserCampaign",
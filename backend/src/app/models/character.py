@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
 class Character(Base):
     __tablename__ = "characters"
+    # Keyset stránkování seznamů (viz crud.pagination)
+    __table_args__ = (Index("ix_characters_world_id_name_id", "world_id", "name", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.session import Base
 
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
+    # Keyset stránkování seznamů (viz crud.pagination)
+    __table_args__ = (Index("ix_journal_entries_journal_id_created_at_id", "journal_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     journal_id = Column(Integer, ForeignKey("journals.id"), nullable=False)
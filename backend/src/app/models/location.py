@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
 class Location(Base):
     __tablename__ = "locations"
+    # Keyset stránkování seznamů (viz crud.pagination)
+    __table_args__ = (
+        Index("ix_locations_world_id_name_id", "world_id", "name", "id"),
+        # Prefixové LIKE dotazy na podstrom (text_pattern_ops kvůli ne-C collation v Postgresu)
+        Index("ix_locations_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     world_id = Column(Integer, ForeignKey("worlds.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -12,6 +18,10 @@ class Location(Base):
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    # Materializovaná cesta "/<kořen>/.../<id>/" a hloubka (0 = kořen) - udržuje crud_location,
+    # pro existující data je obnoví `python -m app.db.location_paths`; NULL = zatím nespočítáno
+    path = Column(String, nullable=True)
+    depth = Column(Integer, nullable=True)
 
     # Relationships
     world = relationship("World", back_populates="locations")
@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 
 class Session(Base):
     __tablename__ = "sessions"
+    # Keyset stránkování seznamů (viz crud.pagination)
+    # Směr sloupců odpovídá SESSION_ORDER (jen Postgres; SQLite index projde pozpátku)
+    __table_args__ = (
+        Index(
+            "ix_sessions_campaign_id_date_time_created_at_id", "campaign_id", "date_time", "created_at", "id",
+            postgresql_ops={"date_time": "DESC NULLS LAST", "created_at": "DESC", "id": "DESC"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -20,9 +28,20 @@ class Session(Base):
     journal_entries = relationship("JournalEntry", back_populates="session") # ondelete="SET NULL" handled in JournalEntry 
     
     # New relationship for availability slots
+    # Nenačítá se automaticky - dotazy, které sloty potřebují, si je načtou explicitně
+    # (selectinload); mazání řeší ON DELETE CASCADE v databázi
     availability_slots = relationship(
         "SessionSlot",
         back_populates="session",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
+    # Opakované sloty - výskyty se rozvíjejí až pro požadované okno
+    slot_recurrences = relationship(
+        "SessionSlotRecurrence",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
     ) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 from typing import TYPE_CHECKING
@@ -9,12 +9,20 @@ if TYPE_CHECKING:
 
 class SessionSlot(Base):
     __tablename__ = "session_slots"
+    # Sloty sezení překrývající časové okno (kalendář uživatele)
+    __table_args__ = (
+        Index("ix_session_slots_session_id_slot_from_slot_to", "session_id", "slot_from", "slot_to"),
+        # Výskyt opakovaného slotu se zhmotní nejvýše jednou
+        UniqueConstraint("recurrence_id", "slot_from", name="uq_session_slots_recurrence_id_slot_from"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
     slot_from = Column(DateTime(timezone=True), nullable=False)
     slot_to = Column(DateTime(timezone=True), nullable=False)
     note = Column(Text)
+    # Zhmotněný výskyt opakovaného slotu (jinak NULL)
+    recurrence_id = Column(Integer, ForeignKey("session_slot_recurrences.id", ondelete="CASCADE"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -24,5 +32,6 @@ class SessionSlot(Base):
         "UserAvailability", 
         back_populates="slot", 
         cascade="all, delete-orphan",
-        lazy="selectin" # Efficient loading of related availabilities
+        passive_deletes=True,
+        lazy="raise_on_sql" # Načítá se explicitně jen tam, kde se dostupnosti vykreslují (crud_session_slot)
     ) 
\ No newline at end of file
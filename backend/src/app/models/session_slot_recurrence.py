@@ -0,0 +1,41 @@
+import enum
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from ..db.session import Base
+
+
+class RecurrenceFrequencyEnum(enum.Enum):
+    DAILY = "daily"    # každých `interval` dní
+    WEEKLY = "weekly"  # každých `interval` týdnů ve dnech `weekdays`
+
+
+class SessionSlotRecurrence(Base):
+    """Opakovaný slot sezení - pravidlo místo stovek řádků SessionSlot.
+
+    Výskyty se rozvinou až pro požadované okno (services.slot_recurrence). Řádek
+    SessionSlot (s recurrence_id) vznikne jen pro výskyt, ke kterému někdo zadá
+    dostupnost.
+    """
+    __tablename__ = "session_slot_recurrences"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    frequency = Column(SQLEnum(RecurrenceFrequencyEnum), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    # Bitová maska dnů v týdnu (Po = 1, Út = 2, ... Ne = 64), jen pro WEEKLY
+    weekdays = Column(Integer)
+    # Začátek prvního výskytu; čas dne se drží v `timezone` (i přes změnu letního času)
+    first_from = Column(DateTime(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    timezone = Column(String, nullable=False, default="UTC")
+    # Konec opakování - výskyty začínající před `until`, nejvýše `count` výskytů
+    until = Column(DateTime(timezone=True))
+    count = Column(Integer)
+    # Vynechané výskyty - lokální data ("YYYY-MM-DD") v `timezone`
+    exceptions = Column(JSON, nullable=False, default=list)
+    note = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+
+    session = relationship("Session", back_populates="slot_recurrences")
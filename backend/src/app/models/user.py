@@ -11,6 +11,10 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
+    # IANA časová zóna (např. "Europe/Prague"), ve které se uživateli skládá grid; NULL = UTC
+    timezone = Column(String, nullable=True)
+    # Verze tokenů kalendářových feedů - zvýšením se zneplatní všechny dříve vydané odkazy
+    calendar_feed_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
 
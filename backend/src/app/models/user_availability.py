@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, Text, DateTime, func, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DDL, Integer, Text, DateTime, event, func, ForeignKey, UniqueConstraint, literal_column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from ..db.session import Base
 from typing import TYPE_CHECKING
@@ -7,6 +8,14 @@ if TYPE_CHECKING:
     from .user import User  # noqa: F401
     from .session_slot import SessionSlot # noqa: F401
 
+def availability_range(available_from, available_to):
+    """tstzrange [od, do) - navazující intervaly se nepřekrývají.
+
+    Hranice '[)' je literál (ne parametr), aby výraz v dotazu odpovídal výrazu
+    v GiST indexu a plánovač index použil.
+    """
+    return func.tstzrange(available_from, available_to, literal_column("'[)'"))
+
 class UserAvailability(Base):
     __tablename__ = "user_availabilities"
 
@@ -24,4 +33,24 @@ class UserAvailability(Base):
     slot = relationship("SessionSlot", back_populates="user_availabilities")
 
     # Constraint: A user can only have one availability record per slot - REMOVED
-    # __table_args__ = (UniqueConstraint('user_id', 'slot_id', name='uq_user_slot_availability'),) 
\ No newline at end of file
+    # __table_args__ = (UniqueConstraint('user_id', 'slot_id', name='uq_user_slot_availability'),) 
+
+    # Intervaly jednoho uživatele v jednom slotu se nesmí překrývat - hlídá to databáze
+    # (GiST exclusion nad tstzrange, jen Postgres), takže dva souběžné zápisy nemůžou
+    # projít oba; GiST index zároveň slouží dotazům na překryv (operátor &&).
+    __table_args__ = (
+        ExcludeConstraint(
+            (user_id, "="),
+            (slot_id, "="),
+            (availability_range(available_from, available_to), "&&"),
+            name="ex_user_availabilities_no_overlap",
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+# Rovnost nad integer sloupci v GiST indexu potřebuje rozšíření btree_gist
+event.listen(
+    UserAvailability.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -11,7 +11,7 @@ from .journal_entry import JournalEntry, JournalEntryCreate, JournalEntryUpdate
 # Import Session schemas
 from .session import Session, SessionCreate, SessionUpdate
 # Import Location schemas
-from .location import Location, LocationCreate, LocationUpdate
+from .location import Location, LocationCreate, LocationUpdate, LocationTreeNode, LocationBreadcrumb
 # Import Item schemas
 from .item import Item, ItemCreate, ItemUpdate
 # Import Event schemas
@@ -38,5 +38,10 @@ from .organization_tag import OrganizationTag
 from .world_user import WorldUserRead, WorldUserCreate, WorldUserUpdate
 # Import SessionSlot schemas
 from .session_slot import SessionSlot, SessionSlotCreate, SessionSlotUpdate
+from .session_slot_recurrence import SessionSlotRecurrence, SessionSlotRecurrenceCreate, SessionSlotRecurrenceUpdate, SlotOccurrence, SlotOccurrenceMaterialize
 # Import UserAvailability schemas
-from .user_availability import UserAvailability, UserAvailabilityCreateUpdate
+from .user_availability import UserAvailability, UserAvailabilityCreateUpdate, SlotAvailabilitySet, UserAvailabilitySync, UserAvailabilitySyncResult, AvailabilityTimeRange, AvailabilitySegment, SlotAvailabilityOverlap, SessionAvailabilityOverlap, SessionTimeOption, SessionTimeRecommendations, AvailabilityGridDay, SessionAvailabilityGrid
+# Kalendář uživatele napříč kampaněmi
+from .calendar import CalendarAvailability, CalendarSlot, CalendarSession, UserCalendar, CalendarFeedLinks
+# Úlohy AI generování
+from .ai_job import AIJob
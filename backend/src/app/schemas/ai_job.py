@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+
+# Úloha AI generování entity (services.ai_jobs) - klient se dotazuje nebo odebírá /ai/jobs/{id}/events
+class AIJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    world_id: int
+    entity_type: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Průběžně vygenerovaný text (name/description), dokud úloha běží
+    partial: Optional[Dict[str, str]] = None
+    # Vytvořená entita ve tvaru odpovědi synchronního endpointu (Character/Location/...)
+    entity: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# Kalendář uživatele - sezení ze všech jeho kampaní v časovém okně
+
+class CalendarAvailability(BaseModel):
+    id: int
+    available_from: datetime
+    available_to: datetime
+    note: Optional[str] = None
+
+class CalendarSlot(BaseModel):
+    id: int
+    slot_from: datetime
+    slot_to: datetime
+    note: Optional[str] = None
+    my_availability: List[CalendarAvailability]
+
+class CalendarSession(BaseModel):
+    id: int
+    title: str
+    campaign_id: int
+    campaign_name: str
+    date_time: Optional[datetime] = None
+    slots: List[CalendarSlot]
+
+class UserCalendar(BaseModel):
+    window_from: datetime
+    window_to: datetime
+    sessions: List[CalendarSession]
+
+# Odkazy na iCalendar feedy (token je součástí URL)
+class CalendarFeedLinks(BaseModel):
+    user_feed_url: str
+    campaign_feed_urls: Dict[int, str]
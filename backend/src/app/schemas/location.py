@@ -27,6 +27,7 @@ class LocationUpdate(LocationBase):
 class LocationInDBBase(LocationBase):
     id: int
     world_id: int
+    depth: Optional[int] = None  # 0 = kořenová lokace (materializovaná cesta)
     created_at: datetime
     updated_at: datetime
 
@@ -41,4 +42,22 @@ class Location(LocationInDBBase):
 
 # Properties properties stored in DB
 class LocationInDB(LocationInDBBase):
-    pass 
\ No newline at end of file
+    pass 
+
+
+# Uzel stromu lokací (GET /locations/tree, /locations/{id}/subtree) - jen to, co potřebují stromové/mapové pohledy
+class LocationTreeNode(BaseModel):
+    id: int
+    name: str
+    parent_location_id: Optional[int] = None
+    depth: int
+    children: List["LocationTreeNode"] = []
+
+
+LocationTreeNode.model_rebuild()
+
+
+# Položka drobečkové navigace (GET /locations/{id}/breadcrumb), od kořene
+class LocationBreadcrumb(BaseModel):
+    id: int
+    name: str
@@ -27,6 +27,7 @@ class SessionSlotUpdate(SessionSlotBase):
 class SessionSlot(SessionSlotBase):
     id: int
     session_id: int
+    recurrence_id: Optional[int] = None # Zhmotněný výskyt opakovaného slotu
     created_at: datetime
     updated_at: datetime
     # Include user availabilities when reading a slot
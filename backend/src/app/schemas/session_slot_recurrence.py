@@ -0,0 +1,71 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import date, datetime
+from typing import List, Optional
+
+from ..models.session_slot_recurrence import RecurrenceFrequencyEnum
+from ..services.slot_recurrence import weekdays_from_mask
+from ..services.time_grid import check_timezone
+
+
+def _check_weekdays(v: Optional[List[int]]) -> Optional[List[int]]:
+    if v is not None:
+        if not v or any(day < 0 or day > 6 for day in v):
+            raise ValueError('weekdays must be a non-empty list of days 0 (Monday) to 6 (Sunday)')
+        v = sorted(set(v))
+    return v
+
+
+# Opakovaný slot sezení - pravidlo (denně/týdně, s výjimkami) místo jednotlivých slotů
+class SessionSlotRecurrenceBase(BaseModel):
+    frequency: RecurrenceFrequencyEnum
+    interval: int = Field(1, ge=1, le=52, description="Every N days (daily) or weeks (weekly)")
+    weekdays: Optional[List[int]] = Field(None, description="Weekly only: 0 = Monday ... 6 = Sunday (default: day of first_from)")
+    first_from: datetime = Field(..., description="Start of the first occurrence")
+    duration_minutes: int = Field(..., ge=15, le=7 * 24 * 60)
+    timezone: str = Field("UTC", description="IANA time zone the time of day is kept in")
+    until: Optional[datetime] = None
+    count: Optional[int] = Field(None, ge=1, le=1000)
+    exceptions: List[date] = Field([], description="Local dates of skipped occurrences")
+    note: Optional[str] = None
+
+    _timezone = field_validator('timezone')(check_timezone)
+    _weekdays = field_validator('weekdays')(_check_weekdays)
+
+class SessionSlotRecurrenceCreate(SessionSlotRecurrenceBase):
+    pass
+
+class SessionSlotRecurrenceUpdate(SessionSlotRecurrenceBase):
+    # All fields are optional for update
+    frequency: Optional[RecurrenceFrequencyEnum] = None
+    interval: Optional[int] = Field(None, ge=1, le=52)
+    first_from: Optional[datetime] = None
+    duration_minutes: Optional[int] = Field(None, ge=15, le=7 * 24 * 60)
+    timezone: Optional[str] = None
+    exceptions: Optional[List[date]] = None
+
+class SessionSlotRecurrence(SessionSlotRecurrenceBase):
+    id: int
+    session_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('weekdays', mode='before')
+    def weekdays_from_mask(cls, v):
+        # V DB bitová maska
+        return weekdays_from_mask(v) if isinstance(v, int) else v
+
+
+# Výskyt slotu v časovém okně - skutečný slot (slot_id) nebo rozvinutý výskyt
+# opakování, který zatím nemá řádek (slot_id je None)
+class SlotOccurrence(BaseModel):
+    slot_id: Optional[int] = None
+    recurrence_id: Optional[int] = None
+    slot_from: datetime
+    slot_to: datetime
+    note: Optional[str] = None
+
+# Zhmotnění výskytu (aby k němu šla zadat dostupnost)
+class SlotOccurrenceMaterialize(BaseModel):
+    slot_from: datetime
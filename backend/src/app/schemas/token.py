@@ -6,4 +6,6 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+    # Starší tokeny claim 'uid' nemají
+    user_id: Optional[int] = None
\ No newline at end of file
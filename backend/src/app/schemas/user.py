@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 
+from ..services.time_grid import check_timezone
+
 class UserBase(BaseModel):
     email: EmailStr
     username: str
@@ -12,6 +14,7 @@ class User(UserBase):
     id: int
     first_name: Optional[str] = None
     last_name: Optional[str] = None
+    timezone: Optional[str] = None  # IANA zóna pro grid dostupností (None = UTC)
 
     class Config:
         orm_mode = True
@@ -29,6 +32,9 @@ class UserSimple(BaseModel):
 class UserUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
+    timezone: Optional[str] = None
+
+    _timezone = field_validator('timezone')(check_timezone)
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, field_validator
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 # Import UserSimple for embedding user info
 from .user import UserSimple 
@@ -36,4 +36,83 @@ class UserAvailability(UserAvailabilityBase):
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) 
+# Celá požadovaná množina intervalů uživatele pro jeden slot (hromadná synchronizace)
+class SlotAvailabilitySet(BaseModel):
+    slot_id: int
+    intervals: List[UserAvailabilityCreateUpdate]
+
+class UserAvailabilitySync(BaseModel):
+    slots: List[SlotAvailabilitySet]
+
+class UserAvailabilitySyncResult(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    availabilities: List[UserAvailability]
+
+
+# --- Překryvy dostupností (předpočítané na serveru) ---
+
+class AvailabilityTimeRange(BaseModel):
+    start: datetime
+    end: datetime
+
+class AvailabilitySegment(AvailabilityTimeRange):
+    """Úsek slotu se stejnou množinou dostupných členů."""
+    count: int
+    user_ids: List[int]
+    meets_quorum: bool
+
+class SlotAvailabilityOverlap(BaseModel):
+    # Rozvinutý výskyt opakovaného slotu bez řádku nemá slot_id (ani dostupnosti)
+    slot_id: Optional[int] = None
+    recurrence_id: Optional[int] = None
+    slot_from: datetime
+    slot_to: datetime
+    max_available: int
+    segments: List[AvailabilitySegment]
+    # Souvislé rozsahy, kde je dostupných alespoň `quorum` členů
+    quorum_ranges: List[AvailabilityTimeRange]
+
+class SessionAvailabilityOverlap(BaseModel):
+    session_id: int
+    member_count: int  # M - hráči a GM kampaně (bez diváků)
+    quorum: int
+    min_available: int
+    slots: List[SlotAvailabilityOverlap]
+
+# --- Doporučené časy sezení ---
+
+class SessionTimeOption(AvailabilityTimeRange):
+    slot_id: int
+    attendee_count: int
+    player_count: int
+    gm_attends: bool
+    user_ids: List[int]
+    missing_user_ids: List[int]
+
+class SessionTimeRecommendations(BaseModel):
+    session_id: int
+    duration_minutes: int
+    member_count: int
+    options: List[SessionTimeOption]
+
+# --- Grid dostupností v zóně uživatele ---
+
+class AvailabilityGridDay(BaseModel):
+    """Buňky jednoho místního dne (od místní půlnoci, po cell_minutes v reálném čase)."""
+    date: date
+    start: datetime
+    end: datetime
+    # Na indexu i je buňka start + i * cell_minutes; dny změny času mají o hodinu méně/více buněk
+    counts: List[int]  # hráči a GM dostupní po celou buňku
+    mine: List[bool]  # buňka je celá v dostupnosti volajícího
+    in_slot: List[bool]  # buňka je celá ve slotu (i nezhmotněném výskytu opakování)
+
+class SessionAvailabilityGrid(BaseModel):
+    session_id: int
+    timezone: str
+    cell_minutes: int
+    member_count: int
+    days: List[AvailabilityGridDay]
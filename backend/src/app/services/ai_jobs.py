@@ -0,0 +1,330 @@
+"""Fronta úloh AI generování entit.
+
+Odeslání úlohy jen zapíše její záznam a vrátí id; volání LLM běží ve workerech
+(asyncio úlohy spuštěné v lifespan každého procesu API). S Redisem je fronta
+seznam `ai:v1:jobs:queue` sdílený všemi procesy a záznamy úloh jsou klíče s TTL,
+takže výsledek najde kterýkoli worker. Bez Redisu (REDIS_URL memory://) zůstává
+fronta i záznamy v paměti procesu.
+
+Worker drží spojení do DB jen na načtení existujících názvů a na uložení
+výsledku, ne po dobu volání LLM. Změny stavu se publikují přes live_updates
+(téma `ai-job:{id}`), klient se tak může místo dotazování přihlásit k odběru.
+
+Výstup LLM se čte streamem: text name/description chodí odběratelům jako
+události `delta` (`offset` = délka hodnoty před tímto kusem) a průběžná hodnota
+se ukládá do záznamu úlohy (`partial`) dřív, než se delta publikuje - kdo se
+přihlásí později, dostane v prvním stavu vše, co už jako deltu nedostane.
+Entita se uloží až po validaci celého výstupu.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app import schemas
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.services import live_updates
+from app.services.langchain_service import ENTITY_CRUD_MAP, langchain_service
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+_QUEUE_KEY = "ai:v1:jobs:queue"
+
+# Schéma odpovědi vytvořené entity podle typu (jako response_model synchronního endpointu)
+ENTITY_SCHEMAS = {
+    "character": schemas.Character,
+    "location": schemas.Location,
+    "organization": schemas.Organization,
+    "item": schemas.Item,
+}
+
+
+def _job_key(job_id: str) -> str:
+    return f"ai:v1:job:{job_id}"
+
+
+def _active_key(user_id: int) -> str:
+    return f"ai:v1:jobs:active:{user_id}"
+
+
+def job_topic(job_id: str) -> str:
+    return f"ai-job:{job_id}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def public_view(job: dict) -> dict:
+    """Záznam úlohy bez vstupů a vlastníka - tvar schemas.AIJob."""
+    return {key: job.get(key) for key in (
+        "id", "status", "world_id", "entity_type", "created_at", "started_at", "finished_at",
+        "partial", "entity", "error",
+    )}
+
+
+def _status_event(job: dict) -> dict:
+    return {"type": "status", **public_view(job)}
+
+
+def _message(job: dict) -> str:
+    return json.dumps(_status_event(job), separators=(",", ":"))
+
+
+# --- Úložiště úloh (Redis, jinak paměť procesu) ---
+
+_local_jobs: Dict[str, dict] = {}
+_local_queue: Deque[str] = deque()
+# user_id -> {job_id: deadline (monotonic)}
+_local_active: Dict[int, Dict[str, float]] = {}
+
+
+async def submit(
+    user_id: int, world_id: int, entity_type: str, existing_entities: List[dict], context: Optional[str],
+) -> Optional[dict]:
+    """Zařadí úlohu do fronty; None, pokud má uživatel rozpracováno už AI_JOB_MAX_ACTIVE_PER_USER úloh."""
+    job = {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "user_id": user_id,
+        "world_id": world_id,
+        "entity_type": entity_type,
+        "existing_entities": existing_entities,
+        "context": context,
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+        "partial": None,
+        "entity": None,
+        "error": None,
+    }
+    # Záznam v sadě aktivních úloh vyprší nejpozději s timeoutem (i když worker spadne)
+    timeout = settings.AI_JOB_TIMEOUT_SECONDS
+    client = get_redis()
+    if client is None:
+        now = time.monotonic()
+        active = {
+            job_id: deadline for job_id, deadline in _local_active.get(user_id, {}).items() if deadline > now
+        }
+        if len(active) >= settings.AI_JOB_MAX_ACTIVE_PER_USER:
+            _local_active[user_id] = active
+            return None
+        active[job["id"]] = now + timeout
+        _local_active[user_id] = active
+        _local_jobs[job["id"]] = job
+        _local_queue.appendleft(job["id"])
+        return job
+
+    # Nejdřív přidat, pak spočítat - souběžná odeslání tak limit nepřekročí
+    now = time.time()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(_active_key(user_id), "-inf", now)
+        pipe.zadd(_active_key(user_id), {job["id"]: now + timeout})
+        pipe.zcard(_active_key(user_id))
+        pipe.expire(_active_key(user_id), timeout)
+        _, _, active_count, _ = await pipe.execute()
+    if active_count > settings.AI_JOB_MAX_ACTIVE_PER_USER:
+        await client.zrem(_active_key(user_id), job["id"])
+        return None
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(_job_key(job["id"]), json.dumps(job), ex=settings.AI_JOB_TTL_SECONDS)
+        pipe.lpush(_QUEUE_KEY, job["id"])
+        await pipe.execute()
+    return job
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    client = get_redis()
+    if client is None:
+        job = _local_jobs.get(job_id)
+        return dict(job) if job is not None else None
+    raw = await client.get(_job_key(job_id))
+    return json.loads(raw) if raw is not None else None
+
+
+async def _save(job: dict) -> None:
+    client = get_redis()
+    if client is None:
+        _local_jobs[job["id"]] = dict(job)
+        return
+    await client.set(_job_key(job["id"]), json.dumps(job), ex=settings.AI_JOB_TTL_SECONDS)
+
+
+async def _release(job: dict) -> None:
+    """Úloha už nezabírá místo v limitu rozpracovaných úloh uživatele."""
+    client = get_redis()
+    if client is None:
+        _local_active.get(job["user_id"], {}).pop(job["id"], None)
+        return
+    await client.zrem(_active_key(job["user_id"]), job["id"])
+
+
+async def _requeue(job: dict) -> None:
+    job.update(status=QUEUED, started_at=None, partial=None)
+    await _save(job)
+    # Přerušená úloha nesmí uživateli blokovat limit až do vypršení své rezervace
+    await _release(job)
+    client = get_redis()
+    if client is None:
+        _local_queue.append(job["id"])
+        return
+    await client.rpush(_QUEUE_KEY, job["id"])
+
+
+async def _pop(timeout: float) -> Optional[str]:
+    client = get_redis()
+    if client is None:
+        if _local_queue:
+            return _local_queue.pop()
+        await asyncio.sleep(min(timeout, 0.2))
+        return None
+    item = await client.brpop([_QUEUE_KEY], timeout=timeout)
+    return item[1] if item is not None else None
+
+
+# --- Zpracování ---
+
+async def _generate(job: dict) -> dict:
+    async def on_delta(field: str, text: str) -> None:
+        # Sdílené volání LLM může běžet i po timeoutu/zrušení úlohy - hotový nebo vrácený
+        # záznam se už nepřepisuje a po konečném stavu nechodí další delta události
+        if job["status"] != RUNNING:
+            return
+        partial = job["partial"] = job.get("partial") or {}
+        offset = len(partial.get(field, ""))
+        partial[field] = partial.get(field, "") + text
+        try:
+            await _save(job)
+        except RedisError as e:
+            # Náhled je jen doplněk - generování kvůli němu nepadá
+            logger.warning("AI job progress save failed: %s", e)
+        await live_updates.hub.publish(
+            job_topic(job["id"]), {"type": "delta", "field": field, "offset": offset, "text": text}
+        )
+
+    # Spojení do DB se vrací do poolu před voláním LLM a znovu se bere až pro uložení
+    async with AsyncSessionLocal() as db:
+        existing_names = await langchain_service.load_existing_names(
+            db, world_id=job["world_id"], entity_type=job["entity_type"]
+        )
+    generated = await langchain_service.generate_entity_data(
+        entity_type=job["entity_type"],
+        existing_entities=job["existing_entities"],
+        existing_names=existing_names,
+        context=job["context"],
+        on_delta=on_delta,
+    )
+    async with AsyncSessionLocal() as db:
+        entity = await langchain_service.save_entity(
+            db,
+            user_id=job["user_id"],
+            world_id=job["world_id"],
+            entity_type=job["entity_type"],
+            generated_data_dict=generated,
+        )
+        schema = ENTITY_SCHEMAS[job["entity_type"]]
+        return schema.model_validate(entity, from_attributes=True).model_dump(mode="json")
+
+
+async def run_job(job_id: str) -> None:
+    """Zpracuje jednu úlohu z fronty a uloží její výsledek nebo chybu."""
+    job = await get_job(job_id)
+    if job is None or job["status"] != QUEUED:
+        return
+    job.update(status=RUNNING, started_at=_now())
+    await _save(job)
+    await live_updates.hub.publish(job_topic(job_id), _status_event(job))
+    try:
+        job["entity"] = await asyncio.wait_for(_generate(job), timeout=settings.AI_JOB_TIMEOUT_SECONDS)
+        # Výsledek je v `entity`, průběžný náhled už není potřeba
+        job.update(status=SUCCEEDED, partial=None)
+    except asyncio.CancelledError:
+        # Vypínání workeru - úlohu dokončí jiný (nebo tento po restartu)
+        await _requeue(job)
+        raise
+    except asyncio.TimeoutError:
+        job.update(status=FAILED, error="Generation timed out")
+    except ValueError as e:
+        # Chyby parsování/validace výstupu LLM (synchronní endpoint na ně vrací 400)
+        job.update(status=FAILED, error=str(e))
+    except Exception:
+        logger.exception("AI generation job %s failed", job_id)
+        job.update(status=FAILED, error="Failed to generate and save entity")
+    job["finished_at"] = _now()
+    await _save(job)
+    await _release(job)
+    await live_updates.hub.publish(job_topic(job_id), _status_event(job))
+
+
+class JobWorkers:
+    """Pool asyncio workerů, které v tomto procesu odebírají úlohy z fronty."""
+
+    def __init__(self) -> None:
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, count: Optional[int] = None) -> None:
+        count = settings.AI_JOB_WORKERS if count is None else count
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(count)]
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job_id = await _pop(timeout=1.0)
+                if job_id is not None:
+                    await run_job(job_id)
+            except RedisError as e:
+                logger.warning("AI job queue unavailable: %s", e)
+                await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+workers = JobWorkers()
+
+
+def is_supported(entity_type: str) -> bool:
+    return entity_type in ENTITY_CRUD_MAP
+
+
+async def stream(job_id: str) -> AsyncIterator[str]:
+    """Server-Sent Events se stavem úlohy (`status`) a průběžným textem (`delta`); končí s hotovou úlohou."""
+    async with live_updates.hub.subscribe(job_topic(job_id)) as queue:
+        yield "retry: 5000\n\n"
+        # Stav se čte až po přihlášení k odběru, aby se nepropásla změna mezi tím
+        job = await get_job(job_id)
+        if job is None:
+            return
+        yield f"data: {_message(job)}\n\n"
+        while job["status"] not in FINISHED:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_UPDATES_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            event = json.loads(message)
+            if event["type"] == "resync":
+                job = await get_job(job_id)
+                if job is None:
+                    return
+                message = _message(job)
+            elif event["type"] == "status":
+                job = event
+            yield f"data: {message}\n\n"
@@ -0,0 +1,150 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# (od, do, user_id) - polouzavřený interval [od, do)
+Interval = Tuple[datetime, datetime, int]
+
+
+class Segment(NamedTuple):
+    """Úsek času se stejnou množinou dostupných uživatelů."""
+
+    start: datetime
+    end: datetime
+    user_ids: FrozenSet[int]
+
+    @property
+    def count(self) -> int:
+        return len(self.user_ids)
+
+
+def sweep(
+    intervals: Iterable[Interval],
+    lower: Optional[datetime] = None,
+    upper: Optional[datetime] = None,
+) -> List[Segment]:
+    """Rozdělí čas na úseky podle toho, kdo je v nich dostupný (sweep-line).
+
+    Konce intervalů se seřadí a projdou jednou; mezi dvěma sousedními časy je
+    množina aktivních uživatelů konstantní. Intervaly se ořežou na [lower, upper),
+    prázdné úseky se vynechají a sousední úseky se stejnými uživateli se sloučí,
+    takže i dva navazující intervaly jednoho hráče dají jeden úsek.
+    Složitost O(n log n) pro n intervalů.
+    """
+    events: List[Tuple[datetime, int, int]] = []
+    for start, end, user_id in intervals:
+        if lower is not None and start < lower:
+            start = lower
+        if upper is not None and end > upper:
+            end = upper
+        if start < end:
+            events.append((start, 1, user_id))
+            events.append((end, -1, user_id))
+    events.sort(key=lambda event: event[0])
+
+    segments: List[Segment] = []
+    active: Dict[int, int] = {}  # user_id -> počet otevřených intervalů (tolerujeme i překryvy)
+    previous: Optional[datetime] = None
+    i = 0
+    while i < len(events):
+        moment = events[i][0]
+        if active and previous is not None and previous < moment:
+            members = frozenset(active)
+            if segments and segments[-1].end == previous and segments[-1].user_ids == members:
+                segments[-1] = segments[-1]._replace(end=moment)
+            else:
+                segments.append(Segment(previous, moment, members))
+        # Všechny události ve stejném okamžiku najednou - konec a začátek se nepřekrývají
+        while i < len(events) and events[i][0] == moment:
+            _, delta, user_id = events[i]
+            remaining = active.get(user_id, 0) + delta
+            if remaining:
+                active[user_id] = remaining
+            else:
+                active.pop(user_id, None)
+            i += 1
+        previous = moment
+    return segments
+
+
+def ranges_with_at_least(segments: Iterable[Segment], n: int) -> List[Tuple[datetime, datetime]]:
+    """Souvislé časové rozsahy, ve kterých je dostupných alespoň `n` uživatelů."""
+    ranges: List[Tuple[datetime, datetime]] = []
+    for segment in segments:
+        if segment.count < n:
+            continue
+        if ranges and ranges[-1][1] == segment.start:
+            ranges[-1] = (ranges[-1][0], segment.end)
+        else:
+            ranges.append((segment.start, segment.end))
+    return ranges
+
+
+class Window(NamedTuple):
+    """Kandidát na začátek sezení - uživatelé dostupní po celou dobu okna."""
+
+    slot_id: int
+    start: datetime
+    end: datetime
+    user_ids: FrozenSet[int]
+
+
+def availability_runs(segments: Sequence[Segment]) -> List[Dict[int, datetime]]:
+    """Pro každý úsek {user_id: do kdy je uživatel od tohoto úseku nepřetržitě dostupný}.
+
+    Počítá se odzadu v jednom průchodu (součet velikostí úseků), takže dotaz "kdo
+    vydrží celé okno" je pak jen bisect na úsek a porovnání konců.
+    """
+    runs: List[Dict[int, datetime]] = [{} for _ in segments]
+    for i in range(len(segments) - 1, -1, -1):
+        segment = segments[i]
+        # Mezera mezi úseky = v ní není dostupný nikdo, běh končí
+        following = runs[i + 1] if i + 1 < len(segments) and segments[i + 1].start == segment.end else {}
+        runs[i] = {user_id: following.get(user_id, segment.end) for user_id in segment.user_ids}
+    return runs
+
+
+def rank_windows(
+    slot_segments: Iterable[Tuple[int, Sequence[Segment]]],
+    duration: timedelta,
+    top_k: int,
+    accept: Callable[[FrozenSet[int]], bool] = bool,
+) -> List[Window]:
+    """Nejlepší začátky sezení délky `duration` napříč sloty (podle počtu účastníků).
+
+    Množina účastníků se mění jen na hranicích úseků, takže optimální okno lze vždy
+    posunout tak, aby začínalo nebo končilo na hranici - kandidátů je O(úseků) a každý
+    se vyhodnotí bisectem nad seřazeným polem úseků, bez dalších dotazů. `accept` filtruje
+    okna podle omezení (GM, minimum hráčů). Z oken se stejnými účastníky, která se
+    překrývají, se vrátí jen nejlepší (nejdřívější), aby se výsledky neopakovaly.
+    """
+    candidates: List[Window] = []
+    for slot_id, segments in slot_segments:
+        if not segments:
+            continue
+        starts = [segment.start for segment in segments]
+        runs = availability_runs(segments)
+        moments = set(starts)
+        moments.update(segment.end - duration for segment in segments)
+        for start in moments:
+            i = bisect_right(starts, start) - 1
+            if i < 0 or segments[i].end <= start:
+                continue
+            end = start + duration
+            members = frozenset(user_id for user_id, until in runs[i].items() if until >= end)
+            if members and accept(members):
+                candidates.append(Window(slot_id, start, end, members))
+
+    candidates.sort(key=lambda window: (-len(window.user_ids), window.start, window.slot_id))
+    picked: List[Window] = []
+    for window in candidates:
+        if any(
+            other.slot_id == window.slot_id and other.user_ids == window.user_ids
+            and other.start < window.end and window.start < other.end
+            for other in picked
+        ):
+            continue
+        picked.append(window)
+        if len(picked) >= top_k:
+            break
+    return picked
@@ -0,0 +1,271 @@
+"""iCalendar (RFC 5545) feedy sezení, slotů a dostupností.
+
+Kalendářoví klienti feed stahují každých pár minut, proto se na podmíněný GET
+odpovídá 304 co nejlevněji. Validátory (ETag, Last-Modified):
+
+- s Redisem z razítek změn kampaní - zápisy je obnovují přes `touch`, chybějící
+  se založí z updated_at při dalším načtení feedu; 304 pak nejde do DB vůbec,
+- bez Redisu z obsahu načtených řádků - 304 ušetří aspoň vykreslení.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+PRODID = "-//sesplan//Calendar feed//CS"
+# Změna formátu feedu => jiné ETagy, klienti si feed stáhnou znovu
+FORMAT_VERSION = "1"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# RFC 5545: řádky nad 75 oktetů se lámou, pokračování začíná mezerou
+_MAX_LINE_OCTETS = 75
+
+
+class Stamp(NamedTuple):
+    """Razítko změny kampaně: náhodná verze (pro ETag) a čas změny (pro Last-Modified)."""
+    version: str
+    modified: datetime
+
+
+class FeedValidators(NamedTuple):
+    etag: str
+    last_modified: datetime
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Klient si feed může uložit, ale před použitím ho musí revalidovat
+            "Cache-Control": "private, no-cache",
+        }
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite vrací naivní časy - v DB jsou vždy UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+# --- Razítka změn v Redisu ---
+
+def _client():
+    client = get_redis()
+    if client is None or settings.CALENDAR_FEED_STAMP_TTL_SECONDS <= 0:
+        return None
+    return client
+
+
+def _key(campaign_id: int) -> str:
+    return f"ics:v1:campaign:{campaign_id}"
+
+
+def _dump(modified: datetime) -> str:
+    return json.dumps({"v": uuid.uuid4().hex, "m": modified.timestamp()})
+
+
+def _load(raw: str) -> Stamp:
+    data = json.loads(raw)
+    return Stamp(data["v"], datetime.fromtimestamp(data["m"], tz=timezone.utc))
+
+
+async def touch(*campaign_ids: int) -> None:
+    """Označí feedy kampaní za změněné. Volá se po commitu zápisů, které mění jejich obsah."""
+    client = _client()
+    if client is None or not campaign_ids:
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for campaign_id in set(campaign_ids):
+                pipe.set(_key(campaign_id), _dump(now), ex=settings.CALENDAR_FEED_STAMP_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Calendar feed stamp update failed: %s", e)
+
+
+async def get_stamps(campaign_ids: Iterable[int]) -> Optional[Dict[int, Stamp]]:
+    """Razítka všech kampaní, nebo None (Redis vypnutý/nedostupný nebo některé razítko chybí)."""
+    client = _client()
+    if client is None:
+        return None
+    campaign_ids = sorted(set(campaign_ids))
+    if not campaign_ids:
+        return {}
+    try:
+        raw = await client.mget([_key(campaign_id) for campaign_id in campaign_ids])
+    except RedisError as e:
+        logger.warning("Calendar feed stamp read failed: %s", e)
+        return None
+    if any(value is None for value in raw):
+        return None
+    return {campaign_id: _load(value) for campaign_id, value in zip(campaign_ids, raw)}
+
+
+async def seed_stamps(campaign_ids: Iterable[int], sessions: List[dict]) -> Optional[Dict[int, Stamp]]:
+    """Založí chybějící razítka z updated_at načtených řádků a vrátí aktuální razítka.
+
+    Verze razítka je vždy nová - po vypršení razítka tak nemůže vzniknout ETag, který
+    by odpovídal starší podobě feedu (smazané řádky se v updated_at neprojeví).
+    """
+    client = _client()
+    if client is None:
+        return None
+    modified = {campaign_id: _EPOCH for campaign_id in campaign_ids}
+    for session in sessions:
+        campaign_id = session["campaign_id"]
+        modified[campaign_id] = max(modified.get(campaign_id, _EPOCH), _last_modified_of(session))
+    if not modified:
+        return {}
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for campaign_id, value in modified.items():
+                pipe.set(_key(campaign_id), _dump(value), nx=True, ex=settings.CALENDAR_FEED_STAMP_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Calendar feed stamp seed failed: %s", e)
+        return None
+    return await get_stamps(modified)
+
+
+# --- Validátory a podmíněné požadavky ---
+
+def _rows_of(session: dict) -> Iterator[tuple]:
+    yield "session", session["id"], session["updated_at"]
+    for slot in session["slots"]:
+        yield "slot", slot["id"], slot["updated_at"]
+        for availability in slot["my_availability"]:
+            yield "availability", availability["id"], availability["updated_at"]
+
+
+def _last_modified_of(session: dict) -> datetime:
+    return max(_utc(updated_at) for _, _, updated_at in _rows_of(session))
+
+
+def validators_from_stamps(scope: str, stamps: Mapping[int, Stamp]) -> FeedValidators:
+    digest = hashlib.sha1(f"{FORMAT_VERSION}:{scope}".encode())
+    for campaign_id in sorted(stamps):
+        digest.update(f";{campaign_id}:{stamps[campaign_id].version}".encode())
+    last_modified = max((stamp.modified for stamp in stamps.values()), default=_EPOCH)
+    return FeedValidators(f'"{digest.hexdigest()}"', last_modified)
+
+
+def validators_from_rows(scope: str, sessions: List[dict]) -> FeedValidators:
+    # Otisk obsahu, ne jen updated_at - název kampaně nemá vlastní řádek a časová
+    # razítka mohou mít hrubé rozlišení (SQLite CURRENT_TIMESTAMP po sekundách)
+    digest = hashlib.sha1(f"{FORMAT_VERSION}:{scope}:".encode())
+    digest.update(json.dumps(sessions, default=str).encode())
+    last_modified = max((_last_modified_of(session) for session in sessions), default=_EPOCH)
+    return FeedValidators(f'"{digest.hexdigest()}"', last_modified)
+
+
+def is_not_modified(headers: Mapping[str, str], validators: FeedValidators) -> bool:
+    """Vyhodnotí If-None-Match, případně If-Modified-Since (RFC 7232 - ETag má přednost)."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators.etag in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validators.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+# --- Vykreslení ---
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _time(value: datetime) -> str:
+    return _utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _fold(line: str) -> str:
+    encoded = line.encode()
+    parts = []
+    limit = _MAX_LINE_OCTETS
+    while len(encoded) > limit:
+        cut = limit
+        # Nedělit vícebajtové znaky UTF-8
+        while cut > 0 and encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = _MAX_LINE_OCTETS - 1  # pokračovací řádek začíná mezerou
+    parts.append(encoded)
+    return "\r\n ".join(part.decode() for part in parts) + "\r\n"
+
+
+def _event(
+    uid: str, updated_at: datetime, start: datetime, end: Optional[datetime],
+    summary: str, description: Optional[str] = None, *properties: str,
+) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_time(updated_at)}",
+        f"LAST-MODIFIED:{_time(updated_at)}",
+        f"DTSTART:{_time(start)}",
+    ]
+    if end is not None:
+        lines.append(f"DTEND:{_time(end)}")
+    lines.append(f"SUMMARY:{_escape(summary)}")
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.extend(properties)
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def render(name: str, sessions: List[dict]) -> Iterator[str]:
+    """Vykreslí feed po sezeních - StreamingResponse ho posílá po částech."""
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ))
+    domain = settings.DOMAIN
+    for session in sessions:
+        title = f"{session['title']} ({session['campaign_name']})"
+        events = []
+        if session["date_time"] is not None:
+            events.append(_event(
+                f"session-{session['id']}@{domain}", session["updated_at"], session["date_time"], None,
+                title, session["description"], "STATUS:CONFIRMED",
+            ))
+        for slot in session["slots"]:
+            events.append(_event(
+                f"session-slot-{slot['id']}@{domain}", slot["updated_at"], slot["slot_from"], slot["slot_to"],
+                f"Možný termín: {title}", slot["note"], "STATUS:TENTATIVE", "TRANSP:TRANSPARENT",
+            ))
+            for availability in slot["my_availability"]:
+                events.append(_event(
+                    f"availability-{availability['id']}@{domain}", availability["updated_at"],
+                    availability["available_from"], availability["available_to"],
+                    f"Mám čas: {title}", availability["note"], "TRANSP:TRANSPARENT",
+                ))
+        if events:
+            yield "".join(events)
+    yield _fold("END:VCALENDAR")
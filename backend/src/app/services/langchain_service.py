@@ -1,27 +1,28 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import json # For parsing potential JSON responses
-from langchain_core.exceptions import OutputParserException
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import PromptTemplate
-from typing import List, Dict, Optional, Any, Tuple, Callable # Přidána Callable
+from typing import List, Dict, Optional, Any, Tuple, Callable, Awaitable # Přidána Callable
 import re # Přidán import pro regulární výrazy
 
 from app.core.config import settings
 from app import crud, schemas # Import main crud and schemas modules
 from app.models import User # Assuming CRUD functions might need the user
+from app.services import llm_cache, name_index, prompt_budget
+from app.services.partial_json import PartialObjectParser
 
-# Mapování typů entit na CRUD funkce (vytvoření a získání všech)
+# Mapování typů entit na CRUD funkce (vytvoření)
 # Typ klíče: str (entity_type)
-# Typ hodnoty: Tuple[Callable, Type[BaseModel], Callable]
-# (create_function, CreateSchema, get_all_by_world_function)
-ENTITY_CRUD_MAP: Dict[str, Tuple[Callable, Any, Callable]] = {
-    "character": (crud.create_character, schemas.CharacterCreate, crud.get_all_characters_in_world),
-    "location": (crud.create_location, schemas.LocationCreate, crud.get_locations_by_world),
-    "organization": (crud.create_organization, schemas.OrganizationCreate, crud.get_organizations_by_world),
-    "item": (crud.create_item, schemas.ItemCreate, crud.get_items_by_world),
+# Typ hodnoty: Tuple[Callable, Type[BaseModel]]
+# (create_function, CreateSchema) - existující názvy poskytuje services.name_index
+ENTITY_CRUD_MAP: Dict[str, Tuple[Callable, Any]] = {
+    name_index.CHARACTER: (crud.create_character, schemas.CharacterCreate),
+    name_index.LOCATION: (crud.create_location, schemas.LocationCreate),
+    name_index.ORGANIZATION: (crud.create_organization, schemas.OrganizationCreate),
+    name_index.ITEM: (crud.create_item, schemas.ItemCreate),
 }
 
+# Teplota modelu - je součástí klíče cache odpovědí
+LLM_TEMPERATURE = 0.7
+
 class LangChainService:
     def __init__(self):
         """Initializes the LangChain service with the configured LLM."""
@@ -29,16 +30,25 @@ class LangChainService:
         if not settings.GOOGLE_API_KEY:
             raise ValueError("GOOGLE_API_KEY not found in settings.")
 
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.GEMINI_MODEL_NAME,
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.7 # Add some creativity
-        )
-        print(f"LangChainService initialized with model: {settings.GEMINI_MODEL_NAME}") # For debugging
+        self._llm = None
+
+    @property
+    def llm(self):
+        """LLM klient se vytváří líně - import langchain_google_genai trvá ~1 s a zdržoval start workerů."""
+        if self._llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            self._llm = ChatGoogleGenerativeAI(
+                model=settings.GEMINI_MODEL_NAME,
+                google_api_key=settings.GOOGLE_API_KEY,
+                temperature=LLM_TEMPERATURE # Add some creativity
+            )
+            print(f"LangChainService initialized with model: {settings.GEMINI_MODEL_NAME}") # For debugging
+        return self._llm
 
     async def generate_entity(
         self,
-        db: Session,
+        db: AsyncSession,
         current_user: User,
         world_id: int, # Added world_id
         entity_type: str,
@@ -47,25 +57,55 @@ class LangChainService:
     ) -> Any: # Return type will depend on the created entity schema
         """
         Generates a new game entity using LLM, saves it to the database.
+
+        Spojení do DB drží po celou dobu volání LLM - úlohy (services.ai_jobs) proto
+        volají jednotlivé kroky zvlášť a DB session mezi nimi zavírají.
         """
         print(f"[LangChainService] Generating {entity_type} for user {current_user.id} in world {world_id}...")
+        existing_names = await self.load_existing_names(db, world_id=world_id, entity_type=entity_type)
+        generated_data_dict = await self.generate_entity_data(
+            entity_type=entity_type,
+            existing_entities=existing_entities,
+            existing_names=existing_names,
+            context=context,
+        )
+        return await self.save_entity(
+            db,
+            user_id=current_user.id,
+            world_id=world_id,
+            entity_type=entity_type,
+            generated_data_dict=generated_data_dict,
+        )
 
-        # Získání CRUD funkcí z mapy
+    async def load_existing_names(self, db: AsyncSession, world_id: int, entity_type: str) -> list[str]:
+        """Názvy všech existujících entit daného typu ve světě (LLM je nesmí použít)."""
         if entity_type not in ENTITY_CRUD_MAP:
             raise ValueError(f"Unsupported entity type: {entity_type}")
-        crud_function, create_schema, get_all_function = ENTITY_CRUD_MAP[entity_type]
 
-        # Načtení VŠECH existujících entit daného typu v tomto světě pro získání názvů
+        # Jen názvy z indexu (Redis, jinak dotaz na id/name) - bez načítání celých entit
         try:
             print(f"[LangChainService] Fetching all existing {entity_type} names for world {world_id}...")
-            all_existing_entities_in_world = get_all_function(db=db, world_id=world_id, limit=1000) # Zvýšený limit pro jistotu
-            existing_names = [entity.name for entity in all_existing_entities_in_world]
+            existing_names = await name_index.get_names(db, entity_type, world_id)
             print(f"[LangChainService] Found {len(existing_names)} existing names.")
         except Exception as e:
             # Pokračujeme i v případě chyby, ale zalogujeme ji
             print(f"[LangChainService] Warning: Failed to fetch existing names for {entity_type}: {e}")
             existing_names = []
+        return existing_names
 
+    async def generate_entity_data(
+        self,
+        entity_type: str,
+        existing_entities: list[dict],
+        existing_names: list[str],
+        context: str | None = None,
+        on_delta: Optional[Callable[[str, str], Awaitable[None]]] = None,
+    ) -> dict:
+        """Zavolá LLM a vrátí vygenerovaný slovník (name, description) - bez přístupu do DB.
+
+        Výstup se čte streamem (`chain.astream`); `on_delta(klíč, text)` dostává průběžně
+        dekódovaný text hodnot name/description, ještě než je JSON celý.
+        """
         # Define the prompt template
         prompt_template_str = """
 You are an assistant helping design content for a role-playing game.
@@ -92,67 +132,60 @@ Example JSON format:
 
 Valid JSON Output:
 """
+        # langchain_core se importuje až při prvním použití (zrychluje start workerů)
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+
         prompt = PromptTemplate(
             template=prompt_template_str,
             input_variables=["entity_type", "context", "examples", "existing_names_list"],
         )
 
-        # Prepare chain s StrOutputParser
-        chain = prompt | self.llm | StrOutputParser()
-
         try:
             print(f"[LangChainService] Invoking LLM for {entity_type}...")
-            # Format examples for the prompt
-            formatted_examples = "\n".join([f"- {json.dumps(ex)}" for ex in existing_entities])
-            # Format existing names for the prompt
-            formatted_existing_names = "\n".join([f"- {name}" for name in existing_names]) if existing_names else "(No existing names found or provided)"
-
-            llm_raw_output: str = await chain.ainvoke({
-                "entity_type": entity_type,
-                "context": context or "No additional context provided.",
-                "examples": formatted_examples,
-                "existing_names_list": formatted_existing_names
-            })
-            print(f"[LangChainService] Raw LLM output received:\n{llm_raw_output}")
-
-            # Extrakce JSON - vylepšená logika
-            json_string = None
-            # 1. Pokus: Najít blok ```json ... ``` nebo ``` ... ```
-            match = re.search(r"```(?:json)?\s*({.*?})\s*```", llm_raw_output, re.DOTALL | re.IGNORECASE)
-            if match:
-                json_string = match.group(1) # Skupina 1 obsahuje obsah mezi {}              
+            # Příklady a existující názvy jen v rámci tokenového rozpočtu, nejrelevantnější ke kontextu
+            sections = prompt_budget.build_sections(context, existing_entities, existing_names)
+            formatted_examples = sections.examples
+            formatted_existing_names = sections.existing_names or "(No existing names found or provided)"
+            rendered_prompt = prompt.format(
+                entity_type=entity_type,
+                context=sections.context or "No additional context provided.",
+                examples=formatted_examples,
+                existing_names_list=formatted_existing_names,
+            )
+
+            parsed: Dict[str, dict] = {}
+
+            async def call_llm() -> str:
+                # Prepare chain s StrOutputParser
+                chain = self.llm | StrOutputParser()
+                chunks: List[str] = []
+                partial_parser = PartialObjectParser(("name", "description"))
+                async for chunk in chain.astream(rendered_prompt):
+                    chunks.append(chunk)
+                    if on_delta is not None:
+                        for field, text in partial_parser.feed(chunk):
+                            await on_delta(field, text)
+                llm_raw_output = "".join(chunks)
+                print(f"[LangChainService] Raw LLM output received:\n{llm_raw_output}")
+                # Nečitelná odpověď se do cache neuloží
+                parsed["response"] = self._parse_llm_output(llm_raw_output)
+                return llm_raw_output
+
+            # Stejný prompt (dvojklik, opakování) se vezme z cache nebo se počká na běžící volání
+            cache_key = llm_cache.cache_key(
+                rendered_prompt, model=settings.GEMINI_MODEL_NAME, temperature=LLM_TEMPERATURE
+            )
+            llm_raw_output, fresh = await llm_cache.get_or_call(cache_key, call_llm)
+            if fresh:
+                llm_response_dict = parsed["response"]
             else:
-                # 2. Pokus: Najít první platný JSON objekt (začínající { končící })
-                # Toto je méně spolehlivé, ale může zachytit případy bez značek
-                match = re.search(r"({.*?})", llm_raw_output, re.DOTALL)
-                if match:
-                    # Zkusíme parsovat, zda je to validní JSON, abychom se vyhnuli chycení neúplných {} bloků
-                    potential_json = match.group(1)
-                    try:
-                        json.loads(potential_json, strict=False)
-                        json_string = potential_json
-                        print("[LangChainService] Warning: Extracted JSON without ``` markers.")
-                    except json.JSONDecodeError:
-                        print("[LangChainService] Warning: Found {} block, but it's not valid JSON.")
-                        pass # Necháme json_string None
-
-            # Pokud se nepodařilo extrahovat JSON ani jedním způsobem
-            if json_string is None:
-                 print(f"[LangChainService] FATAL: Could not extract JSON block from LLM output.\n>>>\n{llm_raw_output}\n<<<")
-                 raise ValueError("Could not extract JSON block from LLM response.")
-            
-            print(f"[LangChainService] Extracted JSON string:\n{json_string}")
-
-            # Parsování JSON stringu
-            try:
-                # Použití strict=False pro větší toleranci k formátování
-                llm_response_dict = json.loads(json_string, strict=False)
-            except json.JSONDecodeError as jde:
-                # Log the exact string that failed parsing for easier debugging
-                print(f"[LangChainService] FATAL: Failed to decode JSON string. Error: {jde}. String content was:\\n>>>\\n{json_string}\\n<<<")
-                raise ValueError(f"Failed to decode JSON from LLM response (see logs for full string). Error: {jde}")
-
-            print(f"[LangChainService] Parsed LLM response dict: {llm_response_dict}")
+                print(f"[LangChainService] Reusing cached/in-flight LLM output for {entity_type}.")
+                llm_response_dict = self._parse_llm_output(llm_raw_output)
+                if on_delta is not None:
+                    # Náhled dostane celý text najednou
+                    for field, text in PartialObjectParser(("name", "description")).feed(llm_raw_output):
+                        await on_delta(field, text)
 
         except Exception as e:
             # Zde již nechytáme OutputParserException, protože ho nepoužíváme
@@ -162,20 +195,84 @@ Valid JSON Output:
             # Re-raise as a different error or handle appropriately
             raise RuntimeError(f"Failed during LLM interaction or response processing: {e}")
 
+        return llm_response_dict
+
+    def _parse_llm_output(self, llm_raw_output: str) -> dict:
+        """Vytáhne a naparsuje JSON objekt z textové odpovědi LLM (ValueError, když to nejde)."""
+        # Extrakce JSON - vylepšená logika
+        json_string = None
+        # 1. Pokus: Najít blok ```json ... ``` nebo ``` ... ```
+        match = re.search(r"```(?:json)?\s*({.*?})\s*```", llm_raw_output, re.DOTALL | re.IGNORECASE)
+        if match:
+            json_string = match.group(1) # Skupina 1 obsahuje obsah mezi {}              
+        else:
+            # 2. Pokus: Najít první platný JSON objekt (začínající { končící })
+            # Toto je méně spolehlivé, ale může zachytit případy bez značek
+            match = re.search(r"({.*?})", llm_raw_output, re.DOTALL)
+            if match:
+                # Zkusíme parsovat, zda je to validní JSON, abychom se vyhnuli chycení neúplných {} bloků
+                potential_json = match.group(1)
+                try:
+                    json.loads(potential_json, strict=False)
+                    json_string = potential_json
+                    print("[LangChainService] Warning: Extracted JSON without ``` markers.")
+                except json.JSONDecodeError:
+                    print("[LangChainService] Warning: Found {} block, but it's not valid JSON.")
+                    pass # Necháme json_string None
+
+        # Pokud se nepodařilo extrahovat JSON ani jedním způsobem
+        if json_string is None:
+             print(f"[LangChainService] FATAL: Could not extract JSON block from LLM output.\n>>>\n{llm_raw_output}\n<<<")
+             raise ValueError("Could not extract JSON block from LLM response.")
+
+        print(f"[LangChainService] Extracted JSON string:\n{json_string}")
+
+        # Parsování JSON stringu
+        try:
+            # Použití strict=False pro větší toleranci k formátování
+            llm_response_dict = json.loads(json_string, strict=False)
+        except json.JSONDecodeError as jde:
+            # Log the exact string that failed parsing for easier debugging
+            print(f"[LangChainService] FATAL: Failed to decode JSON string. Error: {jde}. String content was:\\n>>>\\n{json_string}\\n<<<")
+            raise ValueError(f"Failed to decode JSON from LLM response (see logs for full string). Error: {jde}")
+
+        print(f"[LangChainService] Parsed LLM response dict: {llm_response_dict}")
+        return llm_response_dict
+
+    async def save_entity(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        world_id: int,
+        entity_type: str,
+        generated_data_dict: dict,
+    ) -> Any:
+        """Ověří vygenerovaná data proti schématu typu entity a uloží entitu."""
+        if entity_type not in ENTITY_CRUD_MAP:
+            raise ValueError(f"Unsupported entity type: {entity_type}")
+        crud_function, create_schema = ENTITY_CRUD_MAP[entity_type]
+
         # --- Data Preparation & Validation ---
-        generated_data_dict = llm_response_dict # Nyní používáme náš parsovaný slovník
+        generated_data_dict = dict(generated_data_dict)
 
-        # Zkontrolujeme, zda vygenerovaný název není v seznamu existujících (pro jistotu)
+        # Zkontrolujeme, zda vygenerovaný název není mezi existujícími (pro jistotu) - názvy
+        # se čtou znovu z indexu, během volání LLM mohla vzniknout entita se stejným názvem
+        existing_names = set(await name_index.get_names(db, entity_type, world_id))
         if generated_data_dict.get('name') in existing_names:
             print(f"[LangChainService] Warning: LLM generated a duplicate name '{generated_data_dict.get('name')}'. Attempting to add suffix.")
-            generated_data_dict['name'] = f"{generated_data_dict.get('name')} (AI Gen)"
+            base_name = generated_data_dict.get('name')
+            generated_data_dict['name'] = f"{base_name} (AI Gen)"
+            suffix = 2
+            while generated_data_dict['name'] in existing_names:
+                generated_data_dict['name'] = f"{base_name} (AI Gen {suffix})"
+                suffix += 1
             # TODO: Možná lepší strategie - požádat LLM znovu?
 
         # Inject required fields not generated by LLM
         generated_data_dict['world_id'] = world_id
         # Add user_id if the schema requires it (adjust based on your actual schemas)
         # if 'user_id' in create_schema.model_fields:
-        #    generated_data_dict['user_id'] = current_user.id # REMOVED - Do not assign creator user_id by default
+        #    generated_data_dict['user_id'] = user_id # REMOVED - Do not assign creator user_id by default
 
         # Validate and create the Pydantic schema object
         try:
@@ -213,10 +310,10 @@ Valid JSON Output:
         
         # Add user_id specifically for create_character - needed for world membership check inside CRUD
         if entity_type == 'character':
-             crud_kwargs['user_id'] = current_user.id
+             crud_kwargs['user_id'] = user_id
 
         # Volání CRUD funkce s dynamickými argumenty
-        created_entity = crud_function(**crud_kwargs)
+        created_entity = await crud_function(**crud_kwargs)
 
         print(f"[LangChainService] Successfully created {entity_type} with ID: {created_entity.id}")
         return created_entity
@@ -0,0 +1,200 @@
+"""Živé změny sezení (sloty, dostupnosti, opakování) pro připojené klienty (SSE).
+
+Hub je obecný - témata (`topic`) jsou řetězce; sezení používají `session:{id}`,
+stav AI úloh (services.ai_jobs) `ai-job:{id}`.
+
+Zápisy po commitu volají `publish`. S Redisem jde zpráva přes pub/sub kanál
+sezení, takže ji dostanou posluchači na všech workerech; bez Redisu (REDIS_URL
+memory://) se doručí jen posluchačům v tomto procesu.
+
+Každý worker drží jediné pub/sub spojení (`LiveHub`) a odebírá jen kanály sezení,
+která mají v procesu aspoň jednoho posluchače. Zprávy z něj rozdává do front
+posluchačů, takže počet spojení do Redisu nezávisí na počtu klientů. Pomalý
+klient, jehož fronta se zaplní, dostane místo zahozených změn `resync` (má si
+stav načíst znovu) a ostatní nezdržuje.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "text/event-stream"
+_CHANNEL_PREFIX = "live:v1:"
+
+
+def _channel(topic: str) -> str:
+    return f"{_CHANNEL_PREFIX}{topic}"
+
+
+def session_topic(session_id: int) -> str:
+    return f"session:{session_id}"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# --- Obsah událostí ---
+
+def slot_payload(slot) -> dict:
+    """Slot bez dostupností (SessionSlot nebo řádek se stejnými atributy)."""
+    return {
+        "id": slot.id,
+        "slot_from": slot.slot_from,
+        "slot_to": slot.slot_to,
+        "note": slot.note,
+        "recurrence_id": slot.recurrence_id,
+    }
+
+
+def availability_payload(availability) -> dict:
+    return {
+        "id": availability.id,
+        "available_from": availability.available_from,
+        "available_to": availability.available_to,
+        "note": availability.note,
+    }
+
+
+# --- Rozesílání ---
+
+class LiveHub:
+    """Posluchači témat v tomto procesu a jejich společné pub/sub spojení."""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._channels: Set[str] = set()
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[asyncio.Queue]:
+        """Fronta zpráv (JSON řetězců) tématu po dobu bloku `async with`."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_UPDATES_QUEUE_SIZE)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            await self._sync_channel(topic)
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[topic]
+            await self._sync_channel(topic)
+
+    async def publish(self, topic: str, *events: dict) -> None:
+        """Rozešle události posluchačům tématu (na všech workerech, pokud je Redis)."""
+        messages = [json.dumps(event, default=_json_default, separators=(",", ":")) for event in events]
+        client = get_redis()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for message in messages:
+                        pipe.publish(_channel(topic), message)
+                    await pipe.execute()
+                return
+            except RedisError as e:
+                # Aspoň posluchači tohoto workeru
+                logger.warning("Live update publish failed: %s", e)
+        for message in messages:
+            self._dispatch(topic, message)
+
+    def _dispatch(self, topic: str, message: str) -> None:
+        for queue in self._subscribers.get(topic, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Zahozené změny nejdou doplnit - klient si stav načte znovu
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(json.dumps({"type": "resync"}))
+
+    async def _sync_channel(self, topic: str) -> None:
+        """Odebírá kanál tématu právě tehdy, když má v procesu posluchače."""
+        client = get_redis()
+        if client is None:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            wanted = bool(self._subscribers.get(topic))
+            if wanted == (topic in self._channels):
+                return
+            try:
+                if self._pubsub is None:
+                    self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+                if wanted:
+                    await self._pubsub.subscribe(_channel(topic))
+                    self._channels.add(topic)
+                else:
+                    self._channels.discard(topic)
+                    await self._pubsub.unsubscribe(_channel(topic))
+            except RedisError as e:
+                logger.warning("Live update subscription change failed: %s", e)
+                return
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except RedisError as e:
+                # PubSub se při dalším čtení znovu připojí a obnoví odběry
+                logger.warning("Live update channel read failed: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            if channel.startswith(_CHANNEL_PREFIX):
+                self._dispatch(channel[len(_CHANNEL_PREFIX):], message["data"])
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except RedisError:
+                pass
+            self._pubsub = None
+        self._channels.clear()
+        self._lock = None
+
+
+hub = LiveHub()
+
+
+async def publish(session_id: int, *events: dict) -> None:
+    """Zkratka pro `hub.publish` - volá se po commitu zápisů slotů a dostupností."""
+    if events:
+        await hub.publish(session_topic(session_id), *({**event, "session_id": session_id} for event in events))
+
+
+async def stream(session_id: int) -> AsyncIterator[str]:
+    """Server-Sent Events se změnami sezení; prázdný komentář drží spojení otevřené."""
+    async with hub.subscribe(session_topic(session_id)) as queue:
+        # Prohlížeč se po výpadku připojí znovu za 5 s
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.LIVE_UPDATES_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"data: {message}\n\n"
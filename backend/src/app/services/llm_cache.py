@@ -0,0 +1,177 @@
+"""Cache odpovědí LLM podle obsahu promptu a sdílení souběžných stejných volání.
+
+Klíč je sha256 z modelu, jeho nastavení a vyrenderovaného promptu - shodné
+požadavky (dvojklik, opakování po chybě) tak Gemini nevolají znovu. Odpověď
+se ukládá do Redisu `llm:v1:resp:{hash}` s TTL (LLM_CACHE_TTL_SECONDS);
+větší odpovědi než LLM_CACHE_MAX_ENTRY_BYTES se neukládají a nejstarší
+záznamy nad LLM_CACHE_MAX_ENTRIES se mažou (pořadí drží sorted set). Bez
+Redisu slouží malá LRU cache v paměti procesu. Do cache jde jen odpověď, kterou
+`call` vrátí - nepoužitelnou odpověď má `call` odmítnout výjimkou, jinak by
+opakování vracelo stejnou chybu.
+
+Souběžná stejná volání v procesu čekají na jednu úlohu (ta doběhne, i když
+volající mezitím odejde, a výsledek uloží); volání LLM v ní má stejný časový
+limit jako zámek (LLM_INFLIGHT_LOCK_SECONDS), zaseknuté volání tak čekající
+nedrží donekonečna. Mezi procesy je koordinuje zámek
+`llm:v1:lock:{hash}`: kdo ho nezíská, čeká na odpověď v cache, a pokud zámek
+vyprší bez výsledku, zavolá LLM sám.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_INDEX_KEY = "llm:v1:resp-index"
+_WAIT_INTERVAL_SECONDS = 0.25
+
+
+def _response_key(key: str) -> str:
+    return f"llm:v1:resp:{key}"
+
+
+def _lock_key(key: str) -> str:
+    return f"llm:v1:lock:{key}"
+
+
+def cache_key(prompt: str, **model_settings) -> str:
+    """Hash vyrenderovaného promptu a nastavení modelu (název, teplota...)."""
+    payload = json.dumps({"prompt": prompt, "model": model_settings}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _enabled() -> bool:
+    return settings.LLM_CACHE_TTL_SECONDS > 0
+
+
+# --- Uložené odpovědi (Redis, jinak paměť procesu) ---
+
+# key -> (expirace (monotonic), odpověď)
+_local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+
+async def get(key: str) -> Optional[str]:
+    if not _enabled():
+        return None
+    client = get_redis()
+    if client is None:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _local[key]
+            return None
+        _local.move_to_end(key)
+        return entry[1]
+    try:
+        return await client.get(_response_key(key))
+    except RedisError as e:
+        logger.warning("LLM cache read failed: %s", e)
+        return None
+
+
+async def put(key: str, response: str) -> None:
+    if not _enabled() or len(response.encode("utf-8")) > settings.LLM_CACHE_MAX_ENTRY_BYTES:
+        return
+    client = get_redis()
+    if client is None:
+        _local[key] = (time.monotonic() + settings.LLM_CACHE_TTL_SECONDS, response)
+        _local.move_to_end(key)
+        while len(_local) > settings.LLM_CACHE_MAX_ENTRIES:
+            _local.popitem(last=False)
+        return
+    now = time.time()
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.set(_response_key(key), response, ex=settings.LLM_CACHE_TTL_SECONDS)
+            # Index podle času uložení - vypršelé záznamy z něj vypadnou, nejstarší nad limit se smažou
+            pipe.zadd(_INDEX_KEY, {key: now})
+            pipe.zremrangebyscore(_INDEX_KEY, "-inf", now - settings.LLM_CACHE_TTL_SECONDS)
+            pipe.zcard(_INDEX_KEY)
+            *_, size = await pipe.execute()
+        excess = size - settings.LLM_CACHE_MAX_ENTRIES
+        if excess > 0:
+            evicted = [member for member, _ in await client.zpopmin(_INDEX_KEY, excess)]
+            if evicted:
+                await client.delete(*(_response_key(member) for member in evicted))
+    except RedisError as e:
+        logger.warning("LLM cache write failed: %s", e)
+
+
+# --- Sdílení souběžných volání ---
+
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+async def get_or_call(key: str, call: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+    """Odpověď z cache, ze souběžného stejného volání, nebo z `call()`.
+
+    Vrací (odpověď, zda ji vytvořilo právě toto volání `call`). Výjimka z `call`
+    se předá všem, kdo na stejné volání čekali.
+    """
+    cached = await get(key)
+    if cached is not None:
+        return cached, False
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_call_once(key, call))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _call_done(key, done))
+        return await asyncio.shield(task)
+    response, _ = await asyncio.shield(task)
+    return response, False
+
+
+def _call_done(key: str, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    # Chybu si vyzvednou čekající; když odešli všichni, nemá se hlásit jako nevyzvednutá
+    if not task.cancelled():
+        task.exception()
+
+
+async def _call_once(key: str, call: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+    client = get_redis() if _enabled() else None
+    locked = False
+    if client is not None:
+        try:
+            locked = bool(await client.set(_lock_key(key), "1", nx=True, ex=settings.LLM_INFLIGHT_LOCK_SECONDS))
+            if not locked:
+                # Stejný prompt už počítá jiný proces - počkáme na jeho odpověď
+                response = await _wait_for_other(client, key)
+                if response is not None:
+                    return response, False
+        except RedisError as e:
+            logger.warning("LLM in-flight lock failed: %s", e)
+    try:
+        # Sdílená úloha přežije své volající - bez limitu by se k zaseknutému volání připojoval každý další
+        response = await asyncio.wait_for(call(), timeout=settings.LLM_INFLIGHT_LOCK_SECONDS)
+        await put(key, response)
+        return response, True
+    finally:
+        if locked:
+            try:
+                await client.delete(_lock_key(key))
+            except RedisError as e:
+                logger.warning("LLM in-flight lock release failed: %s", e)
+
+
+async def _wait_for_other(client, key: str) -> Optional[str]:
+    deadline = time.monotonic() + settings.LLM_INFLIGHT_LOCK_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_WAIT_INTERVAL_SECONDS)
+        response = await get(key)
+        if response is not None:
+            return response
+        if not await client.exists(_lock_key(key)):
+            # Druhé volání skončilo bez uložené odpovědi (chyba) - zkusíme to samo
+            return await get(key)
+    return None
@@ -0,0 +1,121 @@
+"""Index názvů entit světa (postavy, lokace, organizace, itemy) pro AI generování.
+
+Pro každý svět a typ entity je v Redisu hash `names:v1:{typ}:{world_id}` s páry
+id -> název. Načte se líně jedním dotazem jen na (id, name) - bez ORM objektů
+a tagů - a pak ho CRUD funkce po commitu průběžně upravují (vytvoření,
+přejmenování, smazání). Kaskádová mazání (podstromy organizací, celý svět)
+klíč jen zahodí a index se při dalším čtení načte znovu.
+
+Úplný index poznáme podle pole `_loaded`; hash bez něj (např. zápis do klíče,
+kterému mezitím vypršel TTL) se bere jako miss. TTL je jen pojistka proti
+rozjetí při souběhu zápisu s načítáním. Bez Redisu se názvy čtou vždy z DB.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHARACTER = "character"
+LOCATION = "location"
+ORGANIZATION = "organization"
+ITEM = "item"
+
+_MODELS = {
+    CHARACTER: models.Character,
+    LOCATION: models.Location,
+    ORGANIZATION: models.Organization,
+    ITEM: models.Item,
+}
+
+# Pole označující úplný index (id entit jsou čísla, nekoliduje s nimi)
+_LOADED = "_loaded"
+
+
+def _key(entity_type: str, world_id: int) -> str:
+    return f"names:v1:{entity_type}:{world_id}"
+
+
+def _client():
+    if settings.NAME_INDEX_TTL_SECONDS <= 0:
+        return None
+    return get_redis()
+
+
+async def _load(db: AsyncSession, entity_type: str, world_id: int) -> Dict[str, str]:
+    model = _MODELS[entity_type]
+    rows = await db.execute(select(model.id, model.name).where(model.world_id == world_id).order_by(model.id))
+    return {str(entity_id): name for entity_id, name in rows}
+
+
+async def get_names(db: AsyncSession, entity_type: str, world_id: int) -> List[str]:
+    """Názvy všech entit daného typu ve světě (v pořadí vytvoření)."""
+    client = _client()
+    key = _key(entity_type, world_id)
+    if client is not None:
+        try:
+            index = await client.hgetall(key)
+        except RedisError as e:
+            logger.warning("Name index read failed: %s", e)
+            index = {}
+        if index.pop(_LOADED, None) is not None:
+            return [name for _, name in sorted(index.items(), key=lambda item: int(item[0]))]
+
+    names = await _load(db, entity_type, world_id)
+    if client is not None:
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={**names, _LOADED: "1"})
+                pipe.expire(key, settings.NAME_INDEX_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Name index write failed: %s", e)
+    return list(names.values())
+
+
+async def set_name(entity_type: str, world_id: int, entity_id: int, name: str) -> None:
+    """Zapíše název nové nebo přejmenované entity (volá se po commitu)."""
+    client = _client()
+    if client is None:
+        return
+    key = _key(entity_type, world_id)
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, str(entity_id), name)
+            pipe.expire(key, settings.NAME_INDEX_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Name index write failed: %s", e)
+        await invalidate(entity_type, world_id)
+
+
+async def remove(entity_type: str, world_id: int, entity_ids: Iterable[int]) -> None:
+    """Odebere smazané entity (volá se po commitu)."""
+    client = _client()
+    fields = [str(entity_id) for entity_id in entity_ids]
+    if client is None or not fields:
+        return
+    try:
+        await client.hdel(_key(entity_type, world_id), *fields)
+    except RedisError as e:
+        logger.warning("Name index write failed: %s", e)
+        await invalidate(entity_type, world_id)
+
+
+async def invalidate(entity_type: Optional[str], world_id: int) -> None:
+    """Zahodí index typu (None = všech typů) ve světě, při dalším čtení se načte z DB."""
+    client = _client()
+    if client is None:
+        return
+    entity_types = [entity_type] if entity_type else list(_MODELS)
+    try:
+        await client.delete(*(_key(kind, world_id) for kind in entity_types))
+    except RedisError as e:
+        logger.warning("Name index invalidation failed: %s", e)
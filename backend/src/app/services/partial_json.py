@@ -0,0 +1,156 @@
+"""Průběžné čtení textových hodnot z JSON objektu, který LLM teprve generuje.
+
+`PartialObjectParser` dostává výstup po kouscích (tak, jak chodí z `chain.astream`)
+a vrací nově dekódovaný text řetězcových hodnot vybraných klíčů nejvyšší úrovně,
+ještě než je objekt celý. Text před `{` (např. ```json) a vše za koncem objektu
+se ignoruje, ostatní hodnoty (čísla, vnořené objekty) se přeskočí. Konečný
+výsledek se přesto parsuje a validuje až z celého výstupu - parser slouží jen
+pro náhled.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Stavy automatu
+_BEFORE_OBJECT = 0
+_BEFORE_KEY = 1  # uvnitř objektu - čeká se klíč, čárka nebo konec
+_KEY = 2
+_BEFORE_COLON = 3
+_BEFORE_VALUE = 4
+_STRING_VALUE = 5
+_OTHER_VALUE = 6
+_DONE = 7
+
+
+class PartialObjectParser:
+    """Inkrementální parser řetězcových hodnot `fields` plochého JSON objektu."""
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        self.fields = set(fields)
+        self.values: Dict[str, str] = {}
+        self._state = _BEFORE_OBJECT
+        self._key: List[str] = []
+        self._field: Optional[str] = None
+        self._escape: Optional[str] = None  # rozpracovaná escape sekvence (bez zpětného lomítka)
+        self._high_surrogate: Optional[int] = None
+        # Přeskakovaná hodnota jiného typu: hloubka závorek a zda jsme v řetězci
+        self._depth = 0
+        self._in_string = False
+        self._string_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Zpracuje další kus výstupu; vrací (klíč, nový text) v pořadí, v jakém text přibyl."""
+        deltas: List[Tuple[str, str]] = []
+        for char in chunk:
+            text = self._step(char)
+            if text:
+                if deltas and deltas[-1][0] == self._field:
+                    deltas[-1] = (self._field, deltas[-1][1] + text)
+                else:
+                    deltas.append((self._field, text))
+                self.values[self._field] = self.values.get(self._field, "") + text
+        return deltas
+
+    def _step(self, char: str) -> Optional[str]:
+        state = self._state
+        if state == _BEFORE_OBJECT:
+            if char == "{":
+                self._state = _BEFORE_KEY
+        elif state == _BEFORE_KEY:
+            if char == '"':
+                self._key = []
+                self._escape = None
+                self._state = _KEY
+            elif char == "}":
+                self._state = _DONE
+        elif state == _KEY:
+            decoded = self._string_char(char)
+            if decoded is None:
+                self._state = _BEFORE_COLON
+            else:
+                self._key.append(decoded)
+        elif state == _BEFORE_COLON:
+            if char == ":":
+                self._state = _BEFORE_VALUE
+        elif state == _BEFORE_VALUE:
+            if char == '"':
+                key = "".join(self._key)
+                self._field = key if key in self.fields else None
+                self._escape = None
+                self._high_surrogate = None
+                self._state = _STRING_VALUE
+                if self._field is not None:
+                    self.values.setdefault(self._field, "")
+            elif not char.isspace():
+                self._depth = 1 if char in "{[" else 0
+                self._in_string = False
+                self._string_escape = False
+                self._state = _OTHER_VALUE
+        elif state == _STRING_VALUE:
+            decoded = self._string_char(char)
+            if decoded is None:
+                self._state = _BEFORE_KEY
+                return None
+            return decoded if self._field is not None else None
+        elif state == _OTHER_VALUE:
+            self._skip_value_char(char)
+        return None
+
+    def _string_char(self, char: str) -> Optional[str]:
+        """Jeden znak uvnitř řetězce; None = konec řetězce, "" = zatím nic (escape)."""
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[0] == "u":
+                if len(self._escape) < 5:
+                    return ""
+                code = int(self._escape[1:], 16) if _is_hex(self._escape[1:]) else 0xFFFD
+                self._escape = None
+                if 0xD800 <= code < 0xDC00:
+                    self._high_surrogate = code
+                    return ""
+                if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                    code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                self._high_surrogate = None
+                return chr(code)
+            decoded = _ESCAPES.get(self._escape, self._escape)
+            self._escape = None
+            return decoded
+        if char == "\\":
+            self._escape = ""
+            return ""
+        if char == '"':
+            return None
+        return char
+
+    def _skip_value_char(self, char: str) -> None:
+        if self._in_string:
+            if self._string_escape:
+                self._string_escape = False
+            elif char == "\\":
+                self._string_escape = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            if self._depth == 0:
+                # Konec celého objektu hned za hodnotou
+                self._state = _DONE
+            else:
+                self._depth -= 1
+        elif char == "," and self._depth == 0:
+            self._state = _BEFORE_KEY
+
+
+def _is_hex(value: str) -> bool:
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,72 @@
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Druhy členství uložené v cache - role ve světech a v kampaních
+WORLD = "world"
+CAMPAIGN = "campaign"
+
+# Klíč v AsyncSession.info, pod kterým žijí resolvery pro aktuální request (jedna session = jeden request)
+SESSION_INFO_KEY = "permission_resolvers"
+
+
+def _key(user_id: int, kind: str) -> str:
+    return f"perm:v1:{kind}:{user_id}"
+
+
+async def get_roles(user_id: int, kind: str) -> Optional[Dict[int, str]]:
+    """Vrátí {id: role} z Redisu, nebo None při miss/nedostupném Redisu."""
+    client = get_redis()
+    if client is None or settings.PERMISSION_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        raw = await client.get(_key(user_id, kind))
+    except RedisError as e:
+        logger.warning("Permission cache read failed: %s", e)
+        return None
+    if raw is None:
+        return None
+    return {int(k): v for k, v in json.loads(raw).items()}
+
+
+async def set_roles(user_id: int, kind: str, roles: Dict[int, str]) -> None:
+    client = get_redis()
+    if client is None or settings.PERMISSION_CACHE_TTL_SECONDS <= 0:
+        return
+    try:
+        await client.set(_key(user_id, kind), json.dumps(roles), ex=settings.PERMISSION_CACHE_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning("Permission cache write failed: %s", e)
+
+
+async def invalidate(db: AsyncSession, user_ids: Iterable[int], kind: Optional[str] = None) -> None:
+    """Zneplatní cache členství daných uživatelů - v Redisu i v resolverech aktuální session.
+
+    Volá se po commitu z CRUD funkcí, které mění WorldUser/UserCampaign.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    kinds = [kind] if kind else [WORLD, CAMPAIGN]
+
+    resolvers = db.info.get(SESSION_INFO_KEY, {})
+    for user_id in user_ids:
+        resolver = resolvers.get(user_id)
+        if resolver is not None:
+            resolver.reset(kinds)
+
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(*[_key(user_id, k) for user_id in user_ids for k in kinds])
+    except RedisError as e:
+        logger.warning("Permission cache invalidation failed: %s", e)
@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.models.user_campaign import CampaignRoleEnum
+from app.models.world_user import RoleEnum as WorldRoleEnum
+from app.services import permission_cache
+
+
+class PermissionResolver:
+    """Role aktuálního uživatele ve světech a kampaních pro jeden request.
+
+    Členství se načtou líně a nejvýše jednou (Redis cache, jinak jeden dotaz na druh),
+    všechny další kontroly v rámci requestu se vyhodnotí v paměti. Instance žije
+    v AsyncSession.info - get_db vytváří jednu session na request, takže ji sdílí
+    závislosti i pomocné funkce, které dostávají jen `db`.
+    """
+
+    def __init__(self, db: AsyncSession, user_id: int) -> None:
+        self.db = db
+        self.user_id = user_id
+        self._world_roles: Optional[Dict[int, WorldRoleEnum]] = None
+        self._campaign_roles: Optional[Dict[int, CampaignRoleEnum]] = None
+
+    @classmethod
+    def for_session(cls, db: AsyncSession, user_id: int) -> "PermissionResolver":
+        resolvers = db.info.setdefault(permission_cache.SESSION_INFO_KEY, {})
+        resolver = resolvers.get(user_id)
+        if resolver is None:
+            resolver = resolvers[user_id] = cls(db, user_id)
+        return resolver
+
+    def reset(self, kinds: Iterable[str]) -> None:
+        """Zapomene načtená členství (volá permission_cache.invalidate po změně)."""
+        if permission_cache.WORLD in kinds:
+            self._world_roles = None
+        if permission_cache.CAMPAIGN in kinds:
+            self._campaign_roles = None
+
+    # --- Načtení členství ---
+
+    async def world_roles(self) -> Dict[int, WorldRoleEnum]:
+        if self._world_roles is None:
+            cached = await permission_cache.get_roles(self.user_id, permission_cache.WORLD)
+            if cached is not None:
+                self._world_roles = {world_id: WorldRoleEnum(role) for world_id, role in cached.items()}
+            else:
+                self._world_roles = await crud.get_world_roles_for_user(self.db, self.user_id)
+                await permission_cache.set_roles(
+                    self.user_id, permission_cache.WORLD,
+                    {world_id: role.value for world_id, role in self._world_roles.items()},
+                )
+        return self._world_roles
+
+    async def campaign_roles(self) -> Dict[int, CampaignRoleEnum]:
+        if self._campaign_roles is None:
+            cached = await permission_cache.get_roles(self.user_id, permission_cache.CAMPAIGN)
+            if cached is not None:
+                self._campaign_roles = {campaign_id: CampaignRoleEnum(role) for campaign_id, role in cached.items()}
+            else:
+                self._campaign_roles = await crud.get_campaign_roles_for_user(self.db, self.user_id)
+                await permission_cache.set_roles(
+                    self.user_id, permission_cache.CAMPAIGN,
+                    {campaign_id: role.value for campaign_id, role in self._campaign_roles.items()},
+                )
+        return self._campaign_roles
+
+    # --- Kontroly rolí ---
+
+    async def world_role(self, world_id: int) -> Optional[WorldRoleEnum]:
+        return (await self.world_roles()).get(world_id)
+
+    async def is_world_member(self, world_id: int) -> bool:
+        return await self.world_role(world_id) is not None
+
+    async def has_world_role(self, world_id: int, *roles: WorldRoleEnum) -> bool:
+        return await self.world_role(world_id) in roles
+
+    async def is_world_owner(self, world_id: int) -> bool:
+        return await self.has_world_role(world_id, WorldRoleEnum.OWNER)
+
+    async def is_world_manager(self, world_id: int) -> bool:
+        """Owner nebo Admin světa."""
+        return await self.has_world_role(world_id, WorldRoleEnum.OWNER, WorldRoleEnum.ADMIN)
+
+    async def campaign_role(self, campaign_id: int) -> Optional[CampaignRoleEnum]:
+        return (await self.campaign_roles()).get(campaign_id)
+
+    async def is_campaign_member(self, campaign_id: int) -> bool:
+        return await self.campaign_role(campaign_id) is not None
+
+    async def is_campaign_gm(self, campaign_id: int) -> bool:
+        return await self.campaign_role(campaign_id) == CampaignRoleEnum.GM
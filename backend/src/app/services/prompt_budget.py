@@ -0,0 +1,201 @@
+"""Sestavení částí promptu AI generování v rámci tokenového rozpočtu.
+
+Do promptu se nevkládají všechny existující názvy a všechny příklady, ale jen
+ty, které se vejdou do rozpočtu sekce (AI_PROMPT_*_TOKENS), vybrané podle
+lexikální podobnosti ke kontextu (TF-IDF nad slovy bez diakritiky). Bez
+kontextu se názvy porovnávají s názvy příkladů, a když ani ty nejsou, bere se
+pořadí vstupu (u názvů nejnovější první).
+
+Výběr je deterministický (shodné vstupy => shodný prompt) a pro 10k názvů trvá
+jednotky ms: invertovaný index názvů se drží v paměti procesu a po vytvoření
+entity se jen rozšíří, skóre se počítá jen pro názvy, které s dotazem sdílejí
+aspoň jedno slovo, a seznam se prochází jen do naplnění rozpočtu.
+Počet tokenů se odhaduje z délky textu (~4 znaky na token).
+"""
+import json
+import math
+import re
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+_WORD = re.compile(r"\w\w+")
+_VOWELS = frozenset("aeiouy")
+# Dlouhé textové hodnoty příkladů se zkracují, aby jediný příklad nezabral celý rozpočet
+EXAMPLE_VALUE_MAX_CHARS = 1000
+
+
+class PromptSections(NamedTuple):
+    context: str
+    examples: str
+    existing_names: str
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=65536)
+def terms(text: str) -> Tuple[str, ...]:
+    """Slova textu - malá písmena bez diakritiky (kůň = kun), aspoň dva znaky.
+
+    Delším slovům se odřízne koncová samohláska - hrubé sjednocení českých tvarů
+    (hrad/hradu, pivo/piva, hospoda/hospodě).
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return tuple(word[:-1] if len(word) > 3 and word[-1] in _VOWELS else word for word in _WORD.findall(text))
+
+
+class TermIndex:
+    """Invertovaný index slov textů pro TF-IDF; texty lze jen přidávat."""
+
+    def __init__(self, documents: Iterable[str] = ()) -> None:
+        self.size = 0
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.frequencies: List[Counter] = []
+        self.norms: List[float] = []
+        self.extend(documents)
+
+    def extend(self, documents: Iterable[str]) -> None:
+        for document in documents:
+            frequencies = Counter(terms(document))
+            for term in frequencies:
+                self.postings[term].append(self.size)
+            self.frequencies.append(frequencies)
+            self.norms.append(math.sqrt(sum(value * value for value in frequencies.values())))
+            self.size += 1
+
+    def rank(self, query: str) -> List[int]:
+        """Indexy textů podobných dotazu (TF-IDF, kosinová podobnost), nejpodobnější první.
+
+        Texty bez společného slova s dotazem ve výsledku nejsou; shodu skóre
+        rozhoduje pozdější pozice (novější entita), takže pořadí je deterministické.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in Counter(terms(query)).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log((self.size + 1) / (len(postings) + 1)) + 1
+            for index in postings:
+                scores[index] += weight * self.frequencies[index][term] * idf * idf
+        # Norma textu jen z četností - idf se počítá jen pro slova dotazu
+        return sorted(scores, key=lambda index: (-scores[index] / self.norms[index], -index))
+
+
+# Indexy názvů podle seznamu názvů (typicky jeden na svět a typ entity)
+_NAME_INDEXES: "OrderedDict[Tuple[str, ...], TermIndex]" = OrderedDict()
+_NAME_INDEXES_MAX = 16
+
+
+def _name_index(names: Sequence[str]) -> TermIndex:
+    """Index pro seznam názvů; když jen přibyly nové na konci (nová entita), rozšíří se stávající."""
+    key = tuple(names)
+    index = _NAME_INDEXES.get(key)
+    if index is not None:
+        _NAME_INDEXES.move_to_end(key)
+        return index
+    for cached_key in reversed(_NAME_INDEXES):
+        if len(cached_key) <= len(key) and key[:len(cached_key)] == cached_key:
+            index = _NAME_INDEXES.pop(cached_key)
+            index.extend(key[len(cached_key):])
+            break
+    else:
+        index = TermIndex(key)
+    _NAME_INDEXES[key] = index
+    while len(_NAME_INDEXES) > _NAME_INDEXES_MAX:
+        _NAME_INDEXES.popitem(last=False)
+    return index
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def _example_text(example: dict) -> str:
+    return " ".join(str(value) for value in example.values() if isinstance(value, str))
+
+
+def _example_line(example: dict) -> str:
+    shortened = {
+        key: (value[:EXAMPLE_VALUE_MAX_CHARS] + "…" if isinstance(value, str) and len(value) > EXAMPLE_VALUE_MAX_CHARS else value)
+        for key, value in example.items()
+    }
+    # Bez \uXXXX escapů - diakritika by jinak stála několikanásobek tokenů
+    return f"- {json.dumps(shortened, ensure_ascii=False)}"
+
+
+def _fill(lines: Sequence[str], order: Iterable[int], budget: int, skip_oversized: bool = True) -> List[int]:
+    """Vybere řádky v pořadí `order`, dokud se vejdou do rozpočtu.
+
+    S `skip_oversized` se řádek, který se už nevejde, přeskočí a zkouší se další,
+    jinak výběr končí (názvy jsou krátké a je jich hodně).
+    """
+    chosen: List[int] = []
+    used = 0
+    for index in order:
+        cost = estimate_tokens(lines[index]) + 1
+        if used + cost > budget:
+            if skip_oversized:
+                continue
+            break
+        chosen.append(index)
+        used += cost
+    return chosen
+
+
+def build_sections(
+    context: Optional[str],
+    examples: Sequence[dict],
+    existing_names: Sequence[str],
+    context_tokens: Optional[int] = None,
+    example_tokens: Optional[int] = None,
+    name_tokens: Optional[int] = None,
+) -> PromptSections:
+    """Kontext, příklady a existující názvy pro prompt, každé v rámci svého rozpočtu."""
+    context_tokens = settings.AI_PROMPT_CONTEXT_TOKENS if context_tokens is None else context_tokens
+    example_tokens = settings.AI_PROMPT_EXAMPLE_TOKENS if example_tokens is None else example_tokens
+    name_tokens = settings.AI_PROMPT_NAME_TOKENS if name_tokens is None else name_tokens
+
+    context = _truncate(context.strip(), context_tokens) if context and context.strip() else ""
+
+    # Příklady: nejpodobnější kontextu první, zbytek v pořadí, jak je poslal klient
+    ranked = TermIndex(_example_text(example) for example in examples).rank(context) if context else []
+    ranked_set = set(ranked)
+    example_order = ranked + [index for index in range(len(examples)) if index not in ranked_set]
+    example_lines = [_example_line(example) for example in examples]
+    chosen_examples = _fill(example_lines, example_order, example_tokens)
+
+    # Názvy: podobné kontextu (jinak názvům příkladů) nejdřív - s těmi hrozí záměna -, pak nejnovější
+    query = context or " ".join(str(examples[index].get("name") or "") for index in chosen_examples)
+    ranked = _name_index(existing_names).rank(query) if query.strip() and existing_names else []
+    ranked_set = set(ranked)
+    name_order = chain(ranked, (index for index in reversed(range(len(existing_names))) if index not in ranked_set))
+    name_lines = _NameLines(existing_names)
+    chosen_names = _fill(name_lines, name_order, name_tokens, skip_oversized=False)
+    names_text = "\n".join(name_lines[index] for index in chosen_names)
+    omitted = len(existing_names) - len(chosen_names)
+    if omitted:
+        names_text += f"\n(and {omitted} more existing names not listed)"
+
+    return PromptSections(
+        context=context,
+        examples="\n".join(example_lines[index] for index in chosen_examples),
+        existing_names=names_text,
+    )
+
+
+class _NameLines:
+    """Řádky `- název` vytvářené až při čtení (většina názvů se do rozpočtu nevejde)."""
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names = names
+
+    def __getitem__(self, index: int) -> str:
+        return f"- {self.names[index]}"
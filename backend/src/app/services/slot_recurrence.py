@@ -0,0 +1,100 @@
+"""Líné rozvinutí opakovaných slotů do výskytů v časovém okně.
+
+Výskyty se počítají aritmeticky od začátku okna (index prvního dne/týdne, který
+do okna zasahuje), takže cena nezávisí na tom, jak dávno opakování začalo, jen
+na počtu výskytů v okně. Čas dne se drží v časové zóně pravidla - týdenní slot
+v 19:00 zůstane v 19:00 místního času i po změně letního času.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.models.session_slot_recurrence import RecurrenceFrequencyEnum
+
+
+class Occurrence(NamedTuple):
+    recurrence_id: int
+    start: datetime
+    end: datetime
+
+
+def weekdays_from_mask(mask: int) -> List[int]:
+    return [day for day in range(7) if mask >> day & 1]
+
+
+def weekdays_to_mask(days) -> int:
+    mask = 0
+    for day in days:
+        mask |= 1 << day
+    return mask
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite vrací naivní časy - v DB jsou vždy UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _local_start(day: date, at: time, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, at, tzinfo=tz).astimezone(timezone.utc)
+
+
+def _candidate_days(recurrence, first_day: date, from_day: date) -> Iterator[Tuple[int, date]]:
+    """(pořadí výskytu, lokální den) od prvního výskytu, který může ležet v `from_day` a dál."""
+    interval = recurrence.interval
+    if recurrence.frequency == RecurrenceFrequencyEnum.DAILY:
+        step = max(0, -(-(from_day - first_day).days // interval))
+        while True:
+            yield step, first_day + timedelta(days=step * interval)
+            step += 1
+
+    days = weekdays_from_mask(recurrence.weekdays or (1 << first_day.weekday()))
+    week0 = first_day - timedelta(days=first_day.weekday())
+    in_week0 = [day for day in days if day >= first_day.weekday()]
+    week = max(0, (from_day - week0).days // (7 * interval))
+    while True:
+        monday = week0 + timedelta(weeks=week * interval)
+        week_days = in_week0 if week == 0 else days
+        base = 0 if week == 0 else len(in_week0) + (week - 1) * len(days)
+        for position, day in enumerate(week_days):
+            yield base + position, monday + timedelta(days=day)
+        week += 1
+
+
+def expand(recurrence, window_from: datetime, window_to: datetime) -> Iterator[Occurrence]:
+    """Výskyty pravidla, které zasahují do [window_from, window_to), podle začátku.
+
+    `recurrence` je SessionSlotRecurrence (nebo objekt se stejnými atributy).
+    Vynechané dny (`exceptions`), `until` i `count` se uplatní; pořadí pro `count`
+    počítá i vynechané výskyty (jako COUNT a EXDATE v iCalendar).
+    """
+    tz = ZoneInfo(recurrence.timezone)
+    first_local = as_utc(recurrence.first_from).astimezone(tz)
+    first_day, at = first_local.date(), first_local.timetz().replace(tzinfo=None)
+    duration = timedelta(minutes=recurrence.duration_minutes)
+    window_from, window_to = as_utc(window_from), as_utc(window_to)
+    until = as_utc(recurrence.until) if recurrence.until is not None else None
+    skipped = set(recurrence.exceptions or ())
+
+    # Den o jeden dřív/později pokryje posun zóny i výskyt přesahující půlnoc
+    from_day = (window_from - duration).astimezone(tz).date() - timedelta(days=1)
+    last_day = window_to.astimezone(tz).date() + timedelta(days=1)
+    for ordinal, day in _candidate_days(recurrence, first_day, from_day):
+        if day > last_day or (recurrence.count is not None and ordinal >= recurrence.count):
+            return
+        start = _local_start(day, at, tz)
+        if until is not None and start >= until:
+            return
+        if start >= window_to:
+            return
+        if start + duration <= window_from or day.isoformat() in skipped:
+            continue
+        yield Occurrence(recurrence.id, start, start + duration)
+
+
+def find_occurrence(recurrence, start: datetime) -> Optional[Occurrence]:
+    """Výskyt pravidla začínající přesně v `start`, nebo None (není výskytem / je vynechaný)."""
+    start = as_utc(start)
+    for occurrence in expand(recurrence, start, start + timedelta(microseconds=1)):
+        if occurrence.start == start:
+            return occurrence
+    return None
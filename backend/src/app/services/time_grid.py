@@ -0,0 +1,106 @@
+"""Rozdělení časových intervalů do buněk gridu v časové zóně uživatele.
+
+Grid je posloupnost buněk po `cell_minutes` od místní půlnoci každého dne. Buňky
+jdou v reálném čase, takže den přechodu na letní/zimní čas má o hodinu méně/více
+buněk. Intervaly se do buněk nepromítají smyčkou přes buňky: každý (sloučený)
+interval jen přičte +1/-1 na hranice svých buněk (bisect) a počty vzniknou jedním
+průchodem prefixových součtů - O(n log m + m) pro n intervalů a m buněk.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.services.slot_recurrence import as_utc
+
+DEFAULT_TIMEZONE = "UTC"
+
+Interval = Tuple[datetime, datetime]
+
+
+def check_timezone(name: Optional[str]) -> Optional[str]:
+    """Validátor pro schémata - IANA název zóny, nebo ValueError."""
+    if name is not None:
+        try:
+            ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f'Unknown time zone: {name}')
+    return name
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Seřazené intervaly (v UTC) se sloučenými překryvy i navazujícími úseky."""
+    merged: List[Interval] = []
+    for start, end in sorted((as_utc(start), as_utc(end)) for start, end in intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class GridDay(NamedTuple):
+    day: date
+    start: datetime  # místní půlnoc v UTC
+    end: datetime
+    first_cell: int  # index první buňky dne v celém gridu
+    cell_count: int
+
+
+class TimeGrid:
+    """Buňky po `cell_minutes` pro místní dny [first_day, last_day) v zóně `tz`."""
+
+    def __init__(self, tz: ZoneInfo, first_day: date, last_day: date, cell_minutes: int) -> None:
+        self.tz = tz
+        self.cell_minutes = cell_minutes
+        cell = timedelta(minutes=cell_minutes)
+        self.days: List[GridDay] = []
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+        day = first_day
+        day_start = self._midnight(day)
+        while day < last_day:
+            next_day = day + timedelta(days=1)
+            day_end = self._midnight(next_day)
+            first_cell = len(self.starts)
+            cell_start = day_start
+            while cell_start < day_end:
+                # Poslední buňka dne může být kratší (zóny s posunem o 30 minut)
+                cell_end = min(cell_start + cell, day_end)
+                self.starts.append(cell_start)
+                self.ends.append(cell_end)
+                cell_start = cell_end
+            self.days.append(GridDay(day, day_start, day_end, first_cell, len(self.starts) - first_cell))
+            day, day_start = next_day, day_end
+
+    def _midnight(self, day: date) -> datetime:
+        return datetime(day.year, day.month, day.day, tzinfo=self.tz).astimezone(timezone.utc)
+
+    @property
+    def window(self) -> Interval:
+        return self.days[0].start, self.days[-1].end
+
+    def counts(self, groups: Iterable[Iterable[Interval]]) -> List[int]:
+        """Pro každou buňku počet skupin (např. uživatelů), jejichž intervaly ji celou pokrývají.
+
+        Intervaly každé skupiny se nejdřív sloučí - dva navazující intervaly jednoho
+        hráče tak pokryjí i buňku na svém rozhraní a překryvy se nezapočtou dvakrát.
+        """
+        diff = [0] * (len(self.starts) + 1)
+        for intervals in groups:
+            for start, end in merge(intervals):
+                first = bisect_left(self.starts, start)
+                last = bisect_right(self.ends, end)
+                if first < last:
+                    diff[first] += 1
+                    diff[last] -= 1
+        return list(accumulate(diff[:-1]))
+
+    def split(self, values: Sequence) -> List[Tuple[GridDay, Sequence]]:
+        """Hodnoty celého gridu rozdělené po dnech."""
+        return [(day, values[day.first_cell:day.first_cell + day.cell_count]) for day in self.days]
@@ -0,0 +1,87 @@
+import itertools
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Testy běží nad dočasnou SQLite databází bez Redisu (memory:// => cache oprávnění vypnutá,
+# počty dotazů jsou deterministické). Nastavení musí existovat před importem aplikace.
+_DB_PATH = Path(tempfile.mkdtemp(prefix="sesplan-tests-")) / "test.sqlite"
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    REDIS_URL="memory://",
+    PASSWORD_BCRYPT_ROUNDS="4",
+    AI_REQUEST_LIMITS="1000/minute",
+    AUTH_LOGIN_LIMIT="1000/minute",
+    USER_REGISTER_LIMIT="1000/minute",
+    GENERIC_READ_LIMIT="1000/minute",
+    GENERIC_WRITE_LIMIT="1000/minute",
+)
+for key, value in {
+    "SECRET_KEY": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "DOMAIN": "localhost",
+    "GOOGLE_API_KEY": "test",
+    "GEMINI_MODEL_NAME": "gemini-pro",
+}.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+@pytest.fixture(scope="session")
+def client():
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from app.db.session import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    # Bez `with` - lifespan (kontrola revize Alembicu) se v testech nespouští
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def register(client):
+    """Zaregistruje a přihlásí nového uživatele, vrací hlavičky s tokenem."""
+    names = itertools.count()
+
+    def register_user() -> dict:
+        name = f"user{next(names)}"
+        client.post("/V1/users/", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+        token = client.post("/V1/auth/token", data={"username": name, "password": "pw"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.get("/V1/users/me", headers=headers)  # zahřátí cache uživatele
+        return headers
+
+    return register_user
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager, který do seznamu sbírá SQL příkazy poslané async enginem."""
+    from sqlalchemy import event
+
+    from app.db.session import async_engine
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
@@ -0,0 +1,209 @@
+import asyncio
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from limits import parse_many
+
+from app.api.endpoints.generation import GENERATION_LIMIT_SCOPE
+from app.core.config import settings
+from app.core.limiter import limiter
+from app.services import ai_jobs, live_updates
+from app.services.langchain_service import langchain_service
+
+
+def run_workers(jobs_done):
+    """Spustí pool workerů, dokud `jobs_done()` nevrátí True (requesty běží ve vlákně)."""
+    async def scenario():
+        ai_jobs.workers.start(count=2)
+        try:
+            return await asyncio.to_thread(jobs_done)
+        finally:
+            await ai_jobs.workers.close()
+
+    return asyncio.run(scenario())
+
+
+def wait_for_status(client, headers, job_id, statuses=ai_jobs.FINISHED):
+    for _ in range(100):
+        job = client.get(f"/V1/ai/jobs/{job_id}", headers=headers).json()
+        if job["status"] in statuses:
+            return job
+        asyncio.run(asyncio.sleep(0.05))
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+
+def test_generation_job_runs_in_worker(client, register, monkeypatch):
+    owner, other = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "AI"}, headers=owner).json()["id"]
+    assert client.post("/V1/locations/", json={"name": "Hero", "world_id": world_id}, headers=owner).status_code == 200
+    seen = {}
+
+    async def fake_llm(entity_type, existing_entities, existing_names, context=None, on_delta=None):
+        seen.update(entity_type=entity_type, existing_names=existing_names, context=context)
+        return {"name": "Hero", "description": "Generated"}
+
+    monkeypatch.setattr(langchain_service, "generate_entity_data", fake_llm)
+    url = f"/V1/ai/worlds/{world_id}/generate/location/jobs"
+    assert client.post(f"/V1/ai/worlds/{world_id}/generate/dragon/jobs", json={"existing_entities": []}, headers=owner).status_code == 400
+
+    response = client.post(url, json={"existing_entities": [], "context": "dark"}, headers=owner)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued" and job["entity"] is None
+    assert response.headers["location"].endswith(f"/V1/ai/jobs/{job['id']}")
+    assert client.get(f"/V1/ai/jobs/{job['id']}", headers=other).status_code == 404
+
+    job = run_workers(lambda: wait_for_status(client, owner, job["id"]))
+    assert job["status"] == "succeeded", job["error"]
+    assert seen == {"entity_type": "location", "existing_names": ["Hero"], "context": "dark"}
+    # Duplicitní název dostane příponu jako u synchronního generování
+    assert job["entity"]["name"] != "Hero" and job["entity"]["name"].startswith("Hero")
+    assert job["entity"]["world_id"] == world_id
+
+
+def test_active_jobs_are_capped_per_user(client, register, monkeypatch):
+    headers = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Cap"}, headers=headers).json()["id"]
+
+    async def failing_llm(*args, **kwargs):
+        raise ValueError("Could not parse LLM response")
+
+    monkeypatch.setattr(langchain_service, "generate_entity_data", failing_llm)
+    monkeypatch.setattr(ai_jobs.settings, "AI_JOB_MAX_ACTIVE_PER_USER", 1)
+    url = f"/V1/ai/worlds/{world_id}/generate/item/jobs"
+    first = client.post(url, json={"existing_entities": []}, headers=headers)
+    assert first.status_code == 202
+    assert client.post(url, json={"existing_entities": []}, headers=headers).status_code == 429
+
+    job = run_workers(lambda: wait_for_status(client, headers, first.json()["id"]))
+    assert job["status"] == "failed" and job["error"] == "Could not parse LLM response"
+    # Dokončená úloha už místo v limitu nezabírá
+    assert client.post(url, json={"existing_entities": []}, headers=headers).status_code == 202
+    ai_jobs._local_queue.clear()
+
+
+def test_generation_streams_partial_text(client, register, monkeypatch):
+    headers = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Stream"}, headers=headers).json()["id"]
+    output = '```json\n{"name": "Ruby Hall", "tags": [1, "}"], "description": "A hall\\nof \\"red\\" stone"}\n```'
+    # Fake model streamuje výstup po slovech přes skutečný chain.astream
+    monkeypatch.setattr(langchain_service, "_llm", GenericFakeChatModel(messages=iter([AIMessage(content=output)])))
+    job_id = client.post(
+        f"/V1/ai/worlds/{world_id}/generate/organization/jobs", json={"existing_entities": []}, headers=headers
+    ).json()["id"]
+
+    async def scenario():
+        async with live_updates.hub.subscribe(ai_jobs.job_topic(job_id)) as queue:
+            ai_jobs.workers.start(count=1)
+            try:
+                events = []
+                while not events or events[-1].get("status") not in ai_jobs.FINISHED:
+                    events.append(json.loads(await asyncio.wait_for(queue.get(), timeout=5)))
+                return events
+            finally:
+                await ai_jobs.workers.close()
+
+    events = asyncio.run(scenario())
+    assert events[0]["type"] == "status" and events[0]["status"] == "running"
+    assert events[-1]["status"] == "succeeded" and events[-1]["partial"] is None
+    deltas = [event for event in events if event["type"] == "delta"]
+    assert len(deltas) > 2
+    text = {}
+    for delta in deltas:
+        assert delta["offset"] == len(text.get(delta["field"], ""))
+        text[delta["field"]] = text.get(delta["field"], "") + delta["text"]
+    entity = events[-1]["entity"]
+    assert text == {"name": "Ruby Hall", "description": 'A hall\nof "red" stone'}
+    assert (entity["name"], entity["description"]) == (text["name"], text["description"])
+
+
+def test_generation_requires_world_ownership(client, register):
+    owner, member = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "Owned"}, headers=owner).json()["id"]
+    body = {"existing_entities": []}
+    for url in (f"/V1/ai/worlds/{world_id}/generate/item/jobs", f"/V1/ai/worlds/{world_id}/generate/item"):
+        assert client.post(url, json=body, headers=member).status_code == 403
+    assert client.post("/V1/ai/worlds/999999/generate/item/jobs", json=body, headers=member).status_code == 404
+    # Nic se nezařadilo do fronty
+    assert not ai_jobs._local_queue
+
+
+def test_jobs_and_sync_generation_share_the_ai_request_limit(client, register):
+    headers, other = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "Limit"}, headers=headers).json()["id"]
+    other_world_id = client.post("/V1/worlds/", json={"name": "Limit 2"}, headers=other).json()["id"]
+    user_id = client.get("/V1/users/me", headers=headers).json()["id"]
+    # Vyčerpání limitu uživatele (v testech 1000/minute) přímo v úložišti limiteru
+    for item in parse_many(settings.AI_REQUEST_LIMITS):
+        limiter.limiter.hit(item, str(user_id), GENERATION_LIMIT_SCOPE, cost=item.amount)
+
+    body = {"existing_entities": []}
+    jobs_url = f"/V1/ai/worlds/{world_id}/generate/item/jobs"
+    assert client.post(jobs_url, json=body, headers=headers).status_code == 429
+    assert client.post(f"/V1/ai/worlds/{world_id}/generate/item", json=body, headers=headers).status_code == 429
+    # Klíčem je uživatel - jiný uživatel má vlastní limit
+    response = client.post(f"/V1/ai/worlds/{other_world_id}/generate/item/jobs", json=body, headers=other)
+    assert response.status_code == 202
+    ai_jobs._local_queue.clear()
+
+
+def test_cancelled_job_is_requeued_and_releases_its_slot(client, register, monkeypatch):
+    headers = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Cancel"}, headers=headers).json()["id"]
+    user_id = client.get("/V1/users/me", headers=headers).json()["id"]
+    monkeypatch.setattr(ai_jobs.settings, "AI_JOB_MAX_ACTIVE_PER_USER", 1)
+
+    async def hanging_generate(job):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(ai_jobs, "_generate", hanging_generate)
+    url = f"/V1/ai/worlds/{world_id}/generate/item/jobs"
+    job_id = client.post(url, json={"existing_entities": []}, headers=headers).json()["id"]
+    assert client.post(url, json={"existing_entities": []}, headers=headers).status_code == 429
+
+    async def cancel_while_running():
+        assert await ai_jobs._pop(timeout=0) == job_id
+        task = asyncio.create_task(ai_jobs.run_job(job_id))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancel_while_running())
+    job = client.get(f"/V1/ai/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "queued" and list(ai_jobs._local_queue) == [job_id]
+    assert job_id not in ai_jobs._local_active.get(user_id, {})
+    ai_jobs._local_queue.clear()
+
+
+def test_timed_out_job_ignores_late_progress(client, register, monkeypatch):
+    headers = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Late"}, headers=headers).json()["id"]
+    monkeypatch.setattr(ai_jobs.settings, "AI_JOB_TIMEOUT_SECONDS", 0.1)
+    captured, published = {}, []
+
+    async def hanging_llm(entity_type, existing_entities, existing_names, context=None, on_delta=None):
+        captured["on_delta"] = on_delta
+        await asyncio.sleep(60)
+
+    async def publish(topic, event):
+        published.append(event)
+
+    monkeypatch.setattr(langchain_service, "generate_entity_data", hanging_llm)
+    job_id = client.post(
+        f"/V1/ai/worlds/{world_id}/generate/item/jobs", json={"existing_entities": []}, headers=headers
+    ).json()["id"]
+    monkeypatch.setattr(ai_jobs.live_updates.hub, "publish", publish)
+
+    async def scenario():
+        assert await ai_jobs._pop(timeout=0) == job_id
+        await ai_jobs.run_job(job_id)
+        # Sdílené volání LLM (llm_cache) běží dál a ještě posílá náhled
+        await captured["on_delta"]("name", "Late")
+
+    asyncio.run(scenario())
+    job = client.get(f"/V1/ai/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "failed" and job["error"] == "Generation timed out"
+    assert job["partial"] is None
+    assert [event["type"] for event in published] == ["status", "status"]
+    assert published[-1]["status"] == "failed"
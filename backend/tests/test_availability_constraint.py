@@ -0,0 +1,98 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+
+from app import models
+from app.crud.crud_user_availability import _is_overlap_violation, _overlapping
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+@pytest.mark.parametrize(
+    "orig, expected",
+    [
+        (SimpleNamespace(sqlstate="23P01"), True),  # asyncpg
+        (SimpleNamespace(pgcode="23P01"), True),  # psycopg2
+        (SimpleNamespace(sqlstate="23505"), False),  # unique_violation
+        (Exception("overlap"), False),  # SQLite bez SQLSTATE
+    ],
+)
+def test_only_exclusion_violation_is_an_overlap(orig, expected):
+    assert _is_overlap_violation(IntegrityError("INSERT", {}, orig)) is expected
+
+
+def test_exclusion_constraint_is_created_only_on_postgres():
+    table = models.UserAvailability.__table__
+    pg_ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+    assert "CONSTRAINT ex_user_availabilities_no_overlap EXCLUDE USING gist" in pg_ddl
+    assert "tstzrange(available_from, available_to, '[)') WITH &&" in pg_ddl
+    assert "EXCLUDE" not in str(CreateTable(table).compile(dialect=sqlite.dialect()))
+
+
+def test_overlap_predicate_uses_range_operator_on_postgres():
+    def compiled(dialect):
+        db = SimpleNamespace(bind=SimpleNamespace(dialect=dialect))
+        return str(_overlapping(db, T0, T0 + dt.timedelta(hours=1)).compile(dialect=dialect))
+
+    assert "&&" in compiled(postgresql.dialect())
+    sqlite_sql = compiled(sqlite.dialect())
+    assert "&&" not in sqlite_sql and "available_from <" in sqlite_sql and "available_to >" in sqlite_sql
+
+
+@pytest.fixture
+def slot(client, register):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    slot_id = client.post(
+        f"/V1/sessions/{session_id}/slots", json={"slot_from": at(0), "slot_to": at(8)}, headers=gm
+    ).json()["id"]
+    return {"gm": gm, "url": f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities"}
+
+
+def add(client, slot, start, end):
+    return client.put(
+        f"{slot['url']}/me", json={"available_from": at(start), "available_to": at(end)}, headers=slot["gm"]
+    )
+
+
+def stored(client, slot):
+    rows = client.get(slot["url"], headers=slot["gm"]).json()
+    return sorted((row["available_from"][11:16], row["available_to"][11:16]) for row in rows)
+
+
+def test_overlapping_interval_is_rejected_but_touching_one_is_not(client, slot):
+    assert add(client, slot, 1, 3).status_code == 200
+    response = add(client, slot, 2, 4)
+    assert response.status_code == 409 and "overlaps" in response.json()["detail"]
+    # Polouzavřené intervaly [od, do) - navazující interval se nepřekrývá
+    assert add(client, slot, 3, 4).status_code == 200
+    assert add(client, slot, 0, 1).status_code == 200
+    assert add(client, slot, 7, 9).status_code == 400
+    assert stored(client, slot) == [("16:00", "17:00"), ("17:00", "19:00"), ("19:00", "20:00")]
+
+
+def test_interval_delete_removes_only_overlapping_records(client, slot):
+    for start, end in [(0, 1), (2, 3), (5, 6)]:
+        assert add(client, slot, start, end).status_code == 200
+    response = client.delete(
+        f"{slot['url']}/me", params={"time_from": at(0.5), "time_to": at(2)}, headers=slot["gm"]
+    )
+    assert response.status_code == 204
+    # 18:00-19:00 začíná přesně na konci mazaného okna, takže zůstane
+    assert stored(client, slot) == [("18:00", "19:00"), ("21:00", "22:00")]
+
+    params = {"time_from": at(4), "time_to": at(3)}
+    assert client.delete(f"{slot['url']}/me", params=params, headers=slot["gm"]).status_code == 400
+    params = {"time_from": at(-1), "time_to": at(1)}
+    assert client.delete(f"{slot['url']}/me", params=params, headers=slot["gm"]).status_code == 400
+    assert len(stored(client, slot)) == 2
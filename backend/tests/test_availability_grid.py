@@ -0,0 +1,60 @@
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+from app.services.time_grid import TimeGrid
+
+UTC = dt.timezone.utc
+
+
+def utc(day: int, hour: int, minute: int = 0) -> dt.datetime:
+    return dt.datetime(2026, 10, day, hour, minute, tzinfo=UTC)
+
+
+def test_grid_counts_full_cells_in_local_days():
+    grid = TimeGrid(ZoneInfo("Europe/Prague"), dt.date(2026, 10, 24), dt.date(2026, 10, 26), 60)
+    # Den přechodu na zimní čas má 25 hodin
+    assert [day.cell_count for day in grid.days] == [24, 25]
+    assert grid.days[1].start == utc(24, 22)
+
+    counts = grid.counts([
+        # Dva navazující intervaly jednoho hráče pokryjí i buňku na rozhraní, překryv se nepočítá dvakrát
+        [(utc(24, 16, 30), utc(24, 18)), (utc(24, 18), utc(24, 20)), (utc(24, 17), utc(24, 19))],
+        # Začátek uprostřed buňky - ta se nepočítá
+        [(utc(24, 17, 30), utc(24, 19))],
+    ])
+    day, values = grid.split(counts)[0]
+    # 17:00 UTC = 19:00 CEST
+    assert list(values[18:23]) == [0, 1, 2, 1, 0]
+    assert sum(counts) == 4
+
+
+def test_availability_grid_endpoint(client, register):
+    gm, player = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "Grid", "world_id": world_id}, headers=gm).json()["id"]
+    invite = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()
+    assert client.post(f"/V1/invites/{invite['token']}/accept", headers=player).status_code == 200
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    base = f"/V1/sessions/{session_id}"
+    slot_id = client.post(
+        base + "/slots", json={"slot_from": "2026-11-01T16:00:00", "slot_to": "2026-11-01T22:00:00"}, headers=gm
+    ).json()["id"]
+    for headers, start, end in [(gm, 16, 20), (player, 18, 21)]:
+        availability = {"available_from": f"2026-11-01T{start}:00:00", "available_to": f"2026-11-01T{end}:00:00"}
+        assert client.put(f"{base}/slots/{slot_id}/availabilities/me", json=availability, headers=headers).status_code == 200
+
+    assert client.put("/V1/users/me", json={"timezone": "Mars/Olympus"}, headers=player).status_code == 422
+    assert client.put("/V1/users/me", json={"timezone": "Europe/Prague"}, headers=player).json()["timezone"] == "Europe/Prague"
+
+    grid = client.get(base + "/availability-grid", params={"from": "2026-11-01", "to": "2026-11-02"}, headers=player).json()
+    assert grid["timezone"] == "Europe/Prague" and grid["member_count"] == 2
+    day = grid["days"][0]
+    assert day["start"].startswith("2026-10-31T23:00:00") and len(day["counts"]) == 48
+    # 16-22 UTC = 17-23 CET, buňky po 30 minutách od místní půlnoci
+    assert day["in_slot"].index(True) == 34 and sum(day["in_slot"]) == 12
+    assert day["counts"][34:44] == [1, 1, 1, 1, 2, 2, 2, 2, 1, 1]
+    assert day["mine"].index(True) == 38 and sum(day["mine"]) == 6
+
+    utc_grid = client.get(base + "/availability-grid", params={"from": "2026-11-01", "tz": "UTC"}, headers=player).json()
+    assert len(utc_grid["days"]) == 7 and utc_grid["days"][0]["in_slot"].index(True) == 32
+    assert client.get(base + "/availability-grid", params={"from": "2026-11-01", "cell_minutes": 7}, headers=player).status_code == 400
@@ -0,0 +1,111 @@
+import datetime as dt
+
+import pytest
+
+from app.services.availability_overlap import Segment, ranges_with_at_least, sweep
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> dt.datetime:
+    return T0 + dt.timedelta(hours=hours)
+
+
+def test_sweep_splits_by_member_set_and_merges_touching_intervals():
+    segments = sweep(
+        [
+            (at(0), at(2), 1),
+            (at(2), at(4), 1),  # navazující interval stejného hráče => jeden úsek
+            (at(1), at(3), 2),
+            (at(1), at(2), 2),  # překryv u jednoho hráče nevadí
+            (at(5), at(6), 3),
+        ]
+    )
+    assert segments == [
+        Segment(at(0), at(1), frozenset({1})),
+        Segment(at(1), at(3), frozenset({1, 2})),
+        Segment(at(3), at(4), frozenset({1})),
+        Segment(at(5), at(6), frozenset({3})),
+    ]
+    assert ranges_with_at_least(segments, 1) == [(at(0), at(4)), (at(5), at(6))]
+    assert ranges_with_at_least(segments, 2) == [(at(1), at(3))]
+    assert ranges_with_at_least(segments, 3) == []
+
+
+def test_sweep_clips_to_slot_bounds():
+    segments = sweep([(at(-2), at(1), 1), (at(5), at(9), 2), (at(-3), at(-1), 3)], lower=at(0), upper=at(6))
+    assert segments == [Segment(at(0), at(1), frozenset({1})), Segment(at(5), at(6), frozenset({2}))]
+
+
+def hm(value: str) -> str:
+    return value[11:16]
+
+
+@pytest.fixture(scope="module")
+def scene(client, register):
+    gm, player = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    token = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()["token"]
+    assert client.post(f"/V1/invites/{token}/accept", headers=player).status_code == 200
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    slot_id = client.post(
+        f"/V1/sessions/{session_id}/slots",
+        json={"slot_from": at(0).isoformat(), "slot_to": at(6).isoformat()},
+        headers=gm,
+    ).json()["id"]
+    for headers, start, end in [(gm, 0, 4), (player, 2, 6)]:
+        response = client.put(
+            f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities/me",
+            json={"available_from": at(start).isoformat(), "available_to": at(end).isoformat()},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+    return {"gm": gm, "player": player, "session_id": session_id, "slot_id": slot_id}
+
+
+def test_overlap_endpoint_reports_segments_and_quorum_ranges(client, scene):
+    url = f"/V1/sessions/{scene['session_id']}/availability-overlap"
+    overlap = client.get(url, headers=scene["player"]).json()
+    assert overlap["member_count"] == 2 and overlap["quorum"] == 2
+    (slot,) = overlap["slots"]
+    assert slot["slot_id"] == scene["slot_id"] and slot["max_available"] == 2
+    assert [(hm(s["start"]), hm(s["end"]), s["count"], s["meets_quorum"]) for s in slot["segments"]] == [
+        ("16:00", "18:00", 1, False),
+        ("18:00", "20:00", 2, True),
+        ("20:00", "22:00", 1, False),
+    ]
+    assert [(hm(r["start"]), hm(r["end"])) for r in slot["quorum_ranges"]] == [("18:00", "20:00")]
+
+    # min_available filtruje úseky, quorum=1 spojí celý slot do jednoho rozsahu
+    filtered = client.get(url, params={"min_available": 2, "quorum": 1}, headers=scene["gm"]).json()["slots"][0]
+    assert [s["count"] for s in filtered["segments"]] == [2]
+    assert [(hm(r["start"]), hm(r["end"])) for r in filtered["quorum_ranges"]] == [("16:00", "22:00")]
+
+
+def test_overlap_endpoint_requires_campaign_membership(client, scene, register):
+    url = f"/V1/sessions/{scene['session_id']}/availability-overlap"
+    assert client.get(url, headers=register()).status_code == 403
+    assert client.get(url, params={"min_available": 0}, headers=scene["gm"]).status_code == 422
+
+
+@pytest.mark.parametrize(
+    "params, detail",
+    [
+        ({"from": at(0).isoformat(), "to": at(24 * 367).isoformat()}, "must not exceed 366 days"),
+        ({"from": at(6).isoformat(), "to": at(0).isoformat()}, "'to' must be after 'from'"),
+        # Bez začátku se výskyty rozvíjejí od teď
+        ({"to": (dt.datetime.now() + dt.timedelta(days=400)).isoformat()}, "must not exceed 366 days"),
+    ],
+)
+def test_overlap_window_is_bounded(client, scene, params, detail):
+    url = f"/V1/sessions/{scene['session_id']}/availability-overlap"
+    response = client.get(url, params=params, headers=scene["gm"])
+    assert response.status_code == 400 and detail in response.json()["detail"]
+
+
+def test_overlap_window_up_to_the_limit_is_accepted(client, scene):
+    url = f"/V1/sessions/{scene['session_id']}/availability-overlap"
+    params = {"from": at(-1).isoformat(), "to": at(24 * 366 - 1).isoformat()}
+    response = client.get(url, params=params, headers=scene["gm"])
+    assert response.status_code == 200 and len(response.json()["slots"]) == 1
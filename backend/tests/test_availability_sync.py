@@ -0,0 +1,142 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+def interval(start, end, note=None):
+    return {"available_from": at(start), "available_to": at(end), "note": note}
+
+
+@pytest.fixture
+def scene(client, register):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    slot_ids = [
+        client.post(
+            f"/V1/sessions/{session_id}/slots", json={"slot_from": at(day), "slot_to": at(day + 8)}, headers=gm
+        ).json()["id"]
+        for day in (0, 24)
+    ]
+    return {"gm": gm, "session_id": session_id, "slot_ids": slot_ids}
+
+
+def sync(client, scene, slots):
+    return client.put(f"/V1/sessions/{scene['session_id']}/availabilities/me", json={"slots": slots}, headers=scene["gm"])
+
+
+def stored(client, scene, slot_id):
+    response = client.get(f"/V1/sessions/{scene['session_id']}/slots/{slot_id}/availabilities", headers=scene["gm"])
+    return sorted((row["available_from"][11:16], row["available_to"][11:16], row["note"]) for row in response.json())
+
+
+def test_sync_merges_intervals_and_applies_only_the_diff(client, scene):
+    first, second = scene["slot_ids"]
+    response = sync(client, scene, [
+        # Překrývající se a navazující intervaly se sloučí, první poznámka vyhraje
+        {"slot_id": first, "intervals": [interval(2, 3), interval(0, 1, "early"), interval(0.5, 2)]},
+        {"slot_id": second, "intervals": [interval(25, 26)]},
+    ])
+    assert response.status_code == 200, response.text
+    assert {key: response.json()[key] for key in ("created", "updated", "deleted")} == {"created": 2, "updated": 0, "deleted": 0}
+    assert stored(client, scene, first) == [("16:00", "19:00", "early")]
+
+    # Jen změna poznámky, nový interval a vyčištění druhého slotu
+    response = sync(client, scene, [
+        {"slot_id": first, "intervals": [interval(0, 3, "late"), interval(5, 6)]},
+        {"slot_id": second, "intervals": []},
+    ]).json()
+    assert (response["created"], response["updated"], response["deleted"]) == (1, 1, 1)
+    assert stored(client, scene, first) == [("16:00", "19:00", "late"), ("21:00", "22:00", None)]
+    assert stored(client, scene, second) == []
+
+    # Neuvedený slot zůstane beze změny
+    assert sync(client, scene, [{"slot_id": second, "intervals": [interval(24, 25)]}]).json()["deleted"] == 0
+    assert len(stored(client, scene, first)) == 2
+
+
+@pytest.mark.parametrize(
+    "slots, detail",
+    [
+        (lambda ids: [{"slot_id": ids[0], "intervals": [interval(-1, 1)]}], "boundaries"),
+        (lambda ids: [{"slot_id": 999999, "intervals": []}], "does not belong"),
+        (lambda ids: [{"slot_id": ids[0], "intervals": []}, {"slot_id": ids[0], "intervals": []}], "more than once"),
+    ],
+)
+def test_sync_rejects_invalid_requests_without_changes(client, scene, slots, detail):
+    assert sync(client, scene, [{"slot_id": scene["slot_ids"][0], "intervals": [interval(0, 1)]}]).status_code == 200
+    response = sync(client, scene, slots(scene["slot_ids"]))
+    assert response.status_code == 400 and detail in response.json()["detail"]
+    assert stored(client, scene, scene["slot_ids"][0]) == [("16:00", "17:00", None)]
+
+
+@pytest.fixture
+def concurrent_insert(monkeypatch):
+    """Před zápisem synchronizace vloží jiný požadavek překrývající se interval (závod dvou zápisů)."""
+    from app.db.session import engine
+
+    rows = []
+    original_add_all = AsyncSession.add_all
+
+    def add_all(self, instances):
+        if rows:
+            with engine.begin() as conn:
+                conn.execute(insert(models.UserAvailability.__table__), rows)
+            rows.clear()
+        original_add_all(self, instances)
+
+    monkeypatch.setattr(AsyncSession, "add_all", add_all)
+    return rows
+
+
+@pytest.fixture
+def no_overlap_trigger():
+    """Náhrada GiST exclusion constraintu pro SQLite - překryv odmítne databáze (IntegrityError)."""
+    from app.db.session import engine
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER test_no_overlap BEFORE INSERT ON user_availabilities "
+            "WHEN EXISTS (SELECT 1 FROM user_availabilities WHERE user_id = NEW.user_id AND slot_id = NEW.slot_id "
+            "AND available_from < NEW.available_to AND available_to > NEW.available_from) "
+            "BEGIN SELECT RAISE(ABORT, 'overlap'); END"
+        ))
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER test_no_overlap"))
+
+
+def racing_row(client, scene, start, end):
+    user_id = client.get("/V1/users/me", headers=scene["gm"]).json()["id"]
+    return {
+        "user_id": user_id, "slot_id": scene["slot_ids"][0],
+        "available_from": T0 + dt.timedelta(hours=start), "available_to": T0 + dt.timedelta(hours=end),
+    }
+
+
+def test_concurrent_overlap_is_rejected_by_the_constraint(client, scene, concurrent_insert, no_overlap_trigger):
+    assert sync(client, scene, [{"slot_id": scene["slot_ids"][0], "intervals": [interval(0, 1)]}]).status_code == 200
+    concurrent_insert.append(racing_row(client, scene, 2, 4))
+    response = sync(client, scene, [{"slot_id": scene["slot_ids"][0], "intervals": [interval(0, 1), interval(3, 5)]}])
+    assert response.status_code == 409
+    # Celá synchronizace se vrátila - původní interval zůstal, vložil se jen souběžný zápis
+    assert stored(client, scene, scene["slot_ids"][0]) == [("16:00", "17:00", None), ("18:00", "20:00", None)]
+
+
+def test_concurrent_overlap_without_constraint_is_not_detected(client, scene, concurrent_insert):
+    # Bez constraintu (SQLite) synchronizace závod nepozná - proto ho v Postgresu hlídá databáze
+    concurrent_insert.append(racing_row(client, scene, 2, 4))
+    response = sync(client, scene, [{"slot_id": scene["slot_ids"][0], "intervals": [interval(3, 5)]}])
+    assert response.status_code == 200
+    assert stored(client, scene, scene["slot_ids"][0]) == [("18:00", "20:00", None), ("19:00", "21:00", None)]
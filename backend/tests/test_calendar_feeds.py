@@ -0,0 +1,119 @@
+import datetime as dt
+
+from jose import jwt
+from sqlalchemy import update
+
+from app import models
+from app.core.security import (
+    ALGORITHM, CALENDAR_FEED_CLAIM, SECRET_KEY, create_calendar_feed_token, decode_calendar_feed_token,
+)
+from app.services import calendar_feed
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+def feed_path(url: str) -> str:
+    return url.replace("http://testserver", "")
+
+
+def test_feed_conditional_get(client, register, count_queries):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "Feed", "world_id": world_id}, headers=gm).json()["id"]
+    session_id = client.post(
+        "/V1/sessions/", json={"title": "S", "campaign_id": campaign_id, "date_time": at(1)}, headers=gm
+    ).json()["id"]
+    client.post(f"/V1/sessions/{session_id}/slots", json={"slot_from": at(0), "slot_to": at(6)}, headers=gm)
+
+    links = client.get("/V1/users/me/calendar/feeds", headers=gm).json()
+    url = feed_path(links["campaign_feed_urls"][str(campaign_id)])
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == calendar_feed.MEDIA_TYPE
+    assert response.text.startswith("BEGIN:VCALENDAR\r\n") and "X-WR-CALNAME:Feed" in response.text
+    assert response.text.count("BEGIN:VEVENT") == 2
+
+    etag = response.headers["etag"]
+    # Bez Redisu (členství i validátory) se dotazy provedou - 304 ušetří jen vykreslení;
+    # verze tokenu, členství a data feedu
+    with count_queries() as statements:
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert len(statements) == 3
+    assert client.get(url, headers={"If-Modified-Since": response.headers["last-modified"]}).status_code == 304
+
+    client.put(f"/V1/sessions/{session_id}", json={"title": "S2"}, headers=gm)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_feed_token_is_not_an_access_token(client, register):
+    user = register()
+    url = feed_path(client.get("/V1/users/me/calendar/feeds", headers=user).json()["user_feed_url"])
+    token = url.split("token=")[1]
+    assert client.get(url).status_code == 200
+    assert client.get("/V1/calendar/feed.ics?token=invalid").status_code == 401
+    assert client.get("/V1/users/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_rotating_feed_links_revokes_the_old_ones(client, register):
+    user = register()
+    old = client.get("/V1/users/me/calendar/feeds", headers=user).json()
+    # Opakované čtení vrací stále stejný odkaz
+    assert client.get("/V1/users/me/calendar/feeds", headers=user).json() == old
+
+    response = client.post("/V1/users/me/calendar/feeds/rotate", headers=user)
+    assert response.status_code == 200
+    new = response.json()
+    assert new["user_feed_url"] != old["user_feed_url"]
+    assert client.get(feed_path(old["user_feed_url"])).status_code == 401
+    assert client.get(feed_path(new["user_feed_url"])).status_code == 200
+    assert client.get("/V1/users/me/calendar/feeds", headers=user).json() == new
+    assert client.post("/V1/users/me/calendar/feeds/rotate").status_code == 401
+
+
+def test_feed_links_use_the_stored_version_not_the_cached_user(client, register):
+    from app.db.session import engine
+
+    user = register()
+    old = client.get("/V1/users/me/calendar/feeds", headers=user).json()
+    user_id = client.get("/V1/users/me", headers=user).json()["id"]
+    # Rotace v jiném workeru - cache uživatele v tomto procesu o ní neví
+    with engine.begin() as conn:
+        conn.execute(update(models.User).where(models.User.id == user_id).values(calendar_feed_version=5))
+    new = client.get("/V1/users/me/calendar/feeds", headers=user).json()
+    assert new != old
+    assert client.get(feed_path(new["user_feed_url"])).status_code == 200
+    assert client.get(feed_path(old["user_feed_url"])).status_code == 401
+
+
+def test_feed_token_version_must_match(client, register):
+    user = register()
+    user_id = client.get("/V1/users/me", headers=user).json()["id"]
+    # Token bez verze (vydaný před zavedením rotace) platí jako verze 0
+    legacy = jwt.encode({CALENDAR_FEED_CLAIM: user_id}, SECRET_KEY, algorithm=ALGORITHM)
+    assert decode_calendar_feed_token(legacy) == (user_id, 0)
+    assert client.get(f"/V1/calendar/feed.ics?token={legacy}").status_code == 200
+    future = create_calendar_feed_token(user_id, 1)
+    assert client.get(f"/V1/calendar/feed.ics?token={future}").status_code == 401
+    unknown_user = create_calendar_feed_token(999999, 0)
+    assert client.get(f"/V1/calendar/feed.ics?token={unknown_user}").status_code == 401
+
+
+def test_fold_keeps_utf8_characters_whole():
+    line = "DESCRIPTION:" + "čárka " * 30
+    folded = calendar_feed._fold(line)
+    parts = folded.rstrip("\r\n").split("\r\n")
+    assert all(len(part.encode()) <= 75 for part in parts)
+    assert "".join(part[1:] if i else part for i, part in enumerate(parts)) == line
+
+
+def test_if_modified_since_ignored_when_etag_sent():
+    validators = calendar_feed.FeedValidators('"a"', dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc))
+    headers = {"if-none-match": '"b"', "if-modified-since": "Fri, 02 Jan 2026 00:00:00 GMT"}
+    assert not calendar_feed.is_not_modified(headers, validators)
+    assert calendar_feed.is_not_modified({"if-modified-since": headers["if-modified-since"]}, validators)
+    assert calendar_feed.is_not_modified({"if-none-match": 'W/"a", "c"'}, validators)
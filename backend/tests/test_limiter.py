@@ -0,0 +1,48 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from app.auth.auth import get_current_user
+from app.core.limiter import get_limiter_key, limiter
+
+
+@pytest.fixture(scope="module")
+def limited_client(client):
+    """Aplikace s endpointem omezeným na 2 požadavky za minutu (sdílí DB i limiter s hlavní aplikací)."""
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    # slowapi registruje limity podle jména funkce - aplikace se proto vytváří jen jednou
+    path = "/limited"
+
+    @app.get(path)
+    @limiter.limit("2/minute")
+    async def limited(request: Request, current_user=Depends(get_current_user)):
+        return {"key": get_limiter_key(request)}
+
+    @app.get(path + "/anonymous")
+    @limiter.limit("2/minute")
+    async def anonymous(request: Request):
+        return {"key": get_limiter_key(request)}
+
+    return TestClient(app), path
+
+
+def test_limit_is_enforced_per_user(limited_client, register):
+    test_client, path = limited_client
+    alice, bob = register(), register()
+
+    responses = [test_client.get(path, headers=alice) for _ in range(3)]
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    # Klíčem je id uživatele, ne IP - druhý uživatel ze stejné adresy má vlastní limit
+    assert responses[0].json()["key"].isdigit()
+    assert test_client.get(path, headers=bob).status_code == 200
+
+
+def test_anonymous_requests_are_keyed_by_address(limited_client):
+    test_client, path = limited_client
+    codes = [test_client.get(path + "/anonymous").status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
@@ -0,0 +1,64 @@
+import asyncio
+import datetime as dt
+import json
+
+from app.services import live_updates
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+def test_writes_publish_session_events(client, register):
+    gm, player, outsider = register(), register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "Live", "world_id": world_id}, headers=gm).json()["id"]
+    invite = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()
+    assert client.post(f"/V1/invites/{invite['token']}/accept", headers=player).status_code == 200
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    base = f"/V1/sessions/{session_id}"
+    assert client.get(base + "/events", headers=outsider).status_code == 403
+
+    def writes():
+        slot_id = client.post(base + "/slots", json={"slot_from": at(0), "slot_to": at(6)}, headers=gm).json()["id"]
+        client.put(
+            f"{base}/slots/{slot_id}/availabilities/me",
+            json={"available_from": at(0), "available_to": at(2)}, headers=player,
+        )
+        client.put(
+            base + "/availabilities/me",
+            json={"slots": [{"slot_id": slot_id, "intervals": [{"available_from": at(1), "available_to": at(3)}]}]},
+            headers=player,
+        )
+        client.delete(f"{base}/slots/{slot_id}/availabilities/me", params={"time_from": at(0), "time_to": at(6)}, headers=player)
+        client.delete(f"{base}/slots/{slot_id}", headers=gm)
+        return slot_id
+
+    async def scenario():
+        # Bez Redisu (REDIS_URL=memory://) se události doručují posluchačům v procesu
+        async with live_updates.hub.subscribe(live_updates.session_topic(session_id)) as queue:
+            slot_id = await asyncio.to_thread(writes)
+            return slot_id, [json.loads(queue.get_nowait()) for _ in range(queue.qsize())]
+
+    slot_id, events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == [
+        "slot.created", "availability.created", "availability.replaced", "availability.deleted", "slot.deleted",
+    ]
+    assert all(event["session_id"] == session_id for event in events)
+    assert events[0]["slot"]["id"] == slot_id
+    replaced = events[2]
+    assert [(a["available_from"], a["available_to"]) for a in replaced["availabilities"]] == [(at(1), at(3))]
+    assert events[3]["availability_ids"] == [replaced["availabilities"][0]["id"]]
+
+
+def test_slow_subscriber_gets_resync():
+    async def scenario():
+        hub = live_updates.LiveHub()
+        async with hub.subscribe("session:1") as queue:
+            for i in range(live_updates.settings.LIVE_UPDATES_QUEUE_SIZE + 1):
+                await hub.publish("session:1", {"type": "slot.deleted", "slot_id": i})
+            return [json.loads(queue.get_nowait())["type"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == ["resync"]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.services import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    llm_cache._local.clear()
+    yield
+    llm_cache._local.clear()
+
+
+def test_concurrent_identical_calls_share_one_request():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return '{"name": "Hrad"}'
+
+    async def scenario():
+        key = llm_cache.cache_key("prompt", model="m", temperature=0.7)
+        first, second = await asyncio.gather(llm_cache.get_or_call(key, call), llm_cache.get_or_call(key, call))
+        # Další volání už jde z cache
+        third = await llm_cache.get_or_call(key, call)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first == ('{"name": "Hrad"}', True)
+    assert second == third == ('{"name": "Hrad"}', False)
+    # Jiné nastavení modelu = jiný klíč
+    assert llm_cache.cache_key("prompt", model="m", temperature=0.2) != llm_cache.cache_key("prompt", model="m", temperature=0.7)
+
+
+def test_failed_call_is_shared_but_not_cached():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("bad JSON")
+
+    async def scenario():
+        key = llm_cache.cache_key("prompt")
+        results = await asyncio.gather(
+            llm_cache.get_or_call(key, failing), llm_cache.get_or_call(key, failing), return_exceptions=True,
+        )
+        return results, await llm_cache.get(key)
+
+    results, cached = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cached is None
+
+
+def test_hung_call_times_out_for_everyone_and_is_not_shared_afterwards(monkeypatch):
+    monkeypatch.setattr(llm_cache.settings, "LLM_INFLIGHT_LOCK_SECONDS", 0.05)
+
+    async def hanging():
+        await asyncio.sleep(60)
+
+    async def working():
+        return "ok"
+
+    async def scenario():
+        key = llm_cache.cache_key("hung prompt")
+        results = await asyncio.gather(
+            llm_cache.get_or_call(key, hanging), llm_cache.get_or_call(key, hanging), return_exceptions=True,
+        )
+        await asyncio.sleep(0)
+        # Zaseknutá úloha už mezi běžícími není - další volání jde znovu do LLM
+        assert key not in llm_cache._inflight
+        return results, await llm_cache.get_or_call(key, working)
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert retried == ("ok", True)
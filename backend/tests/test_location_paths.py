@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import select, update
+
+from app import models
+from app.db.location_paths import rebuild_location_paths
+
+
+@pytest.fixture
+def world(client, register):
+    """Kontinent > Království > Hrad, Moře; meč leží na hradě, kotva v moři."""
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Paths"}, headers=gm).json()["id"]
+
+    def add(name, parent=None):
+        response = client.post(
+            "/V1/locations/", json={"name": name, "world_id": world_id, "parent_location_id": parent}, headers=gm
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    ids = {"Kontinent": add("Kontinent"), "Moře": add("Moře")}
+    ids["Království"] = add("Království", ids["Kontinent"])
+    ids["Hrad"] = add("Hrad", ids["Království"])
+    for item, location in [("Meč", "Hrad"), ("Kotva", "Moře")]:
+        response = client.post(
+            "/V1/items/", json={"name": item, "world_id": world_id, "location_id": ids[location]}, headers=gm
+        )
+        assert response.status_code == 201, response.text
+        ids[item] = response.json()["id"]
+    return {"gm": gm, "world_id": world_id, "ids": ids}
+
+
+def paths(world_id):
+    from app.db.session import engine
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(models.Location.name, models.Location.path, models.Location.depth).where(models.Location.world_id == world_id)
+        )
+        return {name: (path, depth) for name, path, depth in rows}
+
+
+def breadcrumb(client, world, name):
+    response = client.get(f"/V1/locations/{world['ids'][name]}/breadcrumb", headers=world["gm"])
+    assert response.status_code == 200, response.text
+    return [node["name"] for node in response.json()]
+
+
+def items_within(client, world, name):
+    response = client.get(
+        "/V1/items/",
+        params={"world_id": world["world_id"], "location_id": world["ids"][name], "include_sublocations": True},
+        headers=world["gm"],
+    )
+    assert response.status_code == 200, response.text
+    return sorted(item["name"] for item in response.json())
+
+
+def test_paths_are_set_on_create_and_rewritten_on_move(client, world):
+    ids = world["ids"]
+    assert paths(world["world_id"])["Hrad"] == (f"/{ids['Kontinent']}/{ids['Království']}/{ids['Hrad']}/", 2)
+    assert breadcrumb(client, world, "Hrad") == ["Kontinent", "Království", "Hrad"]
+    assert items_within(client, world, "Kontinent") == ["Meč"]
+
+    # Přesun Království pod Moře přepíše cesty celého podstromu
+    response = client.put(f"/V1/locations/{ids['Království']}", json={"parent_location_id": ids["Moře"]}, headers=world["gm"])
+    assert response.status_code == 200 and response.json()["depth"] == 1
+    assert paths(world["world_id"])["Hrad"] == (f"/{ids['Moře']}/{ids['Království']}/{ids['Hrad']}/", 2)
+    assert breadcrumb(client, world, "Hrad") == ["Moře", "Království", "Hrad"]
+    assert items_within(client, world, "Moře") == ["Kotva", "Meč"]
+    assert items_within(client, world, "Kontinent") == []
+
+
+def test_delete_removes_subtree_and_unlinks_items(client, world):
+    ids = world["ids"]
+    assert client.delete(f"/V1/locations/{ids['Království']}", headers=world["gm"]).status_code == 200
+    assert set(paths(world["world_id"])) == {"Kontinent", "Moře"}
+    assert client.get(f"/V1/locations/{ids['Hrad']}", headers=world["gm"]).status_code == 404
+    sword = client.get(f"/V1/items/{ids['Meč']}", headers=world["gm"]).json()
+    assert sword["location_id"] is None
+
+
+def test_rebuild_restores_paths_and_queries_work_without_them(client, world):
+    from app.db.session import engine
+
+    expected = paths(world["world_id"])
+    with engine.begin() as conn:
+        conn.execute(update(models.Location).where(models.Location.world_id == world["world_id"]).values(path=None, depth=None))
+    # Bez cest se použijí rekurzivní CTE se stejným výsledkem
+    assert breadcrumb(client, world, "Hrad") == ["Kontinent", "Království", "Hrad"]
+    assert items_within(client, world, "Kontinent") == ["Meč"]
+
+    with engine.begin() as conn:
+        assert rebuild_location_paths(conn, world_id=world["world_id"]) == 4
+    assert paths(world["world_id"]) == expected
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import update
+
+from app import models
+
+
+def names(nodes):
+    return [(node["name"], node["depth"], names(node["children"])) for node in nodes]
+
+
+@pytest.fixture
+def world(client, register):
+    """Svět se stromem lokací: Kontinent > Království > (Město, Hrad), Moře."""
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Tree"}, headers=gm).json()["id"]
+
+    def add(name, parent=None):
+        response = client.post(
+            "/V1/locations/", json={"name": name, "world_id": world_id, "parent_location_id": parent}, headers=gm
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    ids = {"Moře": add("Moře"), "Kontinent": add("Kontinent")}
+    ids["Království"] = add("Království", ids["Kontinent"])
+    ids["Město"] = add("Město", ids["Království"])
+    ids["Hrad"] = add("Hrad", ids["Království"])
+    return {"gm": gm, "world_id": world_id, "ids": ids}
+
+
+def clear_paths(world_id):
+    """Zahodí materializované cesty - dotazy pak jdou přes rekurzivní CTE."""
+    from app.db.session import engine
+
+    with engine.begin() as conn:
+        conn.execute(update(models.Location).where(models.Location.world_id == world_id).values(path=None, depth=None))
+
+
+def test_world_tree_is_nested_and_sorted_by_name(client, world):
+    tree = client.get("/V1/locations/tree", params={"world_id": world["world_id"]}, headers=world["gm"]).json()
+    assert names(tree) == [
+        ("Kontinent", 0, [("Království", 1, [("Hrad", 2, []), ("Město", 2, [])])]),
+        ("Moře", 0, []),
+    ]
+    shallow = client.get(
+        "/V1/locations/tree", params={"world_id": world["world_id"], "max_depth": 1}, headers=world["gm"]
+    ).json()
+    assert names(shallow) == [("Kontinent", 0, [("Království", 1, [])]), ("Moře", 0, [])]
+
+
+def test_subtree_depth_is_relative_to_its_root(client, world):
+    subtree = client.get(f"/V1/locations/{world['ids']['Království']}/subtree", headers=world["gm"]).json()
+    assert names([subtree]) == [("Království", 0, [("Hrad", 1, []), ("Město", 1, [])])]
+    assert subtree["parent_location_id"] == world["ids"]["Kontinent"]
+    assert client.get("/V1/locations/999999/subtree", headers=world["gm"]).status_code == 404
+
+
+def test_tree_requires_world_membership(client, world, register):
+    stranger = register()
+    assert client.get("/V1/locations/tree", params={"world_id": world["world_id"]}, headers=stranger).status_code == 403
+    assert client.get(f"/V1/locations/{world['ids']['Hrad']}/subtree", headers=stranger).status_code == 403
+
+
+@pytest.mark.parametrize("with_paths", [True, False])
+def test_reparenting_under_own_descendant_is_rejected(client, world, with_paths):
+    if not with_paths:
+        clear_paths(world["world_id"])
+    ids = world["ids"]
+    response = client.put(
+        f"/V1/locations/{ids['Kontinent']}", json={"parent_location_id": ids["Hrad"]}, headers=world["gm"]
+    )
+    assert response.status_code == 400
+    assert "descendants" in response.json()["detail"]
+    # Přesun mimo vlastní podstrom projde
+    response = client.put(f"/V1/locations/{ids['Hrad']}", json={"parent_location_id": ids["Moře"]}, headers=world["gm"])
+    assert response.status_code == 200, response.text
+    subtree = client.get(f"/V1/locations/{ids['Moře']}/subtree", headers=world["gm"]).json()
+    assert names([subtree]) == [("Moře", 0, [("Hrad", 1, [])])]
@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.config import settings
+
+PATHS = ["/V1/metrics/db-pool", "/V1/metrics/password-hashing", "/V1/metrics/startup"]
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_metrics_are_disabled_without_a_configured_token(client, register, monkeypatch, path):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get(path).status_code == 404
+    # Ani přihlášený uživatel metriky nevidí
+    assert client.get(path, headers=register()).status_code == 404
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_metrics_require_the_internal_token(client, register, monkeypatch, path):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"X-Metrics-Token": "wrong"}).status_code == 401
+    assert client.get(path, headers=register()).status_code == 401
+    assert client.get(path, headers={"X-Metrics-Token": "s3cret"}).status_code == 200
+
+
+def test_password_hashing_metrics_report_the_pool(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    metrics = client.get("/V1/metrics/password-hashing", headers={"X-Metrics-Token": "s3cret"}).json()
+    assert metrics["bcrypt_rounds"] == settings.PASSWORD_BCRYPT_ROUNDS and metrics["in_flight"] == 0
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.config import settings
+from app.db import migrate
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def legacy_database(tmp_path, monkeypatch):
+    """Databáze ve stavu, jaký vytvářel create_all před zavedením Alembicu (bez alembic_version)."""
+    url = f"sqlite:///{tmp_path / 'legacy.sqlite'}"
+    engine = create_engine(url)
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.setattr(settings, "ALEMBIC_CONFIG", str(BACKEND_DIR / "alembic.ini"))
+    monkeypatch.setattr(migrate, "engine", engine)
+
+    from alembic import command
+
+    # Výchozí revize + dorovnání na modely z doby create_all
+    command.upgrade(migrate.alembic_config(), "7c1e4a9d2b36")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+    yield engine
+    engine.dispose()
+
+
+def test_legacy_database_is_upgraded_from_baseline(legacy_database):
+    columns = lambda table: {column["name"] for column in inspect(legacy_database).get_columns(table)}
+    assert "path" not in columns("locations")
+
+    migrate.upgrade_to_head()
+
+    inspector = inspect(legacy_database)
+    assert {"path", "depth"} <= columns("locations")
+    assert {"timezone", "calendar_feed_version"} <= columns("users")
+    assert "recurrence_id" in columns("session_slots")
+    assert "session_slot_recurrences" in inspector.get_table_names()
+    assert "ix_session_slots_session_id_slot_from_slot_to" in {ix["name"] for ix in inspector.get_indexes("session_slots")}
+    with legacy_database.connect() as conn:
+        assert {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))} == migrate.head_revisions()
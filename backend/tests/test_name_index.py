@@ -0,0 +1,29 @@
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services import name_index
+
+
+def world_names(entity_type, world_id):
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return await name_index.get_names(db, entity_type, world_id)
+
+    return asyncio.run(load())
+
+
+def test_names_follow_entity_writes(client, register, count_queries):
+    headers = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Names"}, headers=headers).json()["id"]
+    ids = [
+        client.post("/V1/characters/", json={"name": name, "world_id": world_id}, headers=headers).json()["id"]
+        for name in ("Ada", "Bo", "Cid")
+    ]
+    client.put(f"/V1/characters/{ids[1]}", json={"name": "Bob"}, headers=headers)
+    client.delete(f"/V1/characters/{ids[2]}", headers=headers)
+
+    with count_queries() as statements:
+        assert world_names(name_index.CHARACTER, world_id) == ["Ada", "Bob"]
+    # Bez Redisu jeden dotaz jen na id a název - žádné ORM objekty ani tagy
+    assert len(statements) == 1 and "tag" not in statements[0].lower()
+    assert world_names(name_index.ITEM, world_id) == []
@@ -0,0 +1,124 @@
+import base64
+import datetime as dt
+import json
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app import crud, models
+
+NEXT = "X-Next-Cursor"
+
+
+@pytest.fixture(scope="module")
+def world(client, register):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Paging"}, headers=gm).json()["id"]
+    # Shodné názvy - pořadí mezi nimi určuje až id
+    for name in ["Cecil", "Bára", "Adam", "Bára", "Bára", "Dana", "Adam"]:
+        response = client.post("/V1/characters/", json={"name": name, "world_id": world_id}, headers=gm)
+        assert response.status_code == 200, response.text
+    return {"gm": gm, "world_id": world_id}
+
+
+def collect(client, url, headers, limit):
+    """Projde všechny stránky přes cursor; vrací stránky (seznamy id)."""
+    pages, cursor = [], None
+    for _ in range(20):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT)
+        if cursor is None:
+            return pages
+    pytest.fail(f"Cursor pagination does not end: {pages}")
+
+
+def test_cursor_pages_match_full_list_including_ties(client, world):
+    url = f"/V1/worlds/{world['world_id']}/characters/"
+    full = client.get(url, headers=world["gm"]).json()
+    assert [c["name"] for c in full] == ["Adam", "Adam", "Bára", "Bára", "Bára", "Cecil", "Dana"]
+    # Stránka končí uprostřed shodných názvů - další musí navázat podle id
+    pages = collect(client, url, world["gm"], limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == [c["id"] for c in full]
+    # Stejný výsledek přes sparse fieldset (projekce)
+    response = client.get(url, params={"limit": 3, "fields": "id,name"}, headers=world["gm"])
+    assert [row["id"] for row in response.json()] == pages[0]
+    assert response.headers[NEXT] == client.get(url, params={"limit": 3}, headers=world["gm"]).headers[NEXT]
+
+
+def test_last_full_page_yields_empty_page_without_cursor(client, world):
+    url = f"/V1/worlds/{world['world_id']}/characters/"
+    pages = collect(client, url, world["gm"], limit=7)
+    assert [len(page) for page in pages] == [7, 0]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        base64.urlsafe_b64encode(b"{broken json").decode(),
+        # Cursor jiného seznamu
+        base64.urlsafe_b64encode(json.dumps({"o": "items", "v": [1]}).encode()).decode(),
+        # Jiný počet hodnot
+        base64.urlsafe_b64encode(json.dumps({"o": "characters", "v": ["Adam"]}).encode()).decode(),
+    ],
+)
+def test_invalid_cursor_is_rejected(client, world, cursor):
+    response = client.get(
+        f"/V1/worlds/{world['world_id']}/characters/", params={"cursor": cursor}, headers=world["gm"]
+    )
+    assert response.status_code == 400
+
+
+def test_session_cursor_keeps_unscheduled_sessions_last(client, register):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    dates = [None, "2026-03-01T18:00:00", None, "2026-05-01T18:00:00", "2026-03-01T18:00:00"]
+    ids = [
+        client.post(
+            "/V1/sessions/", json={"title": f"S{i}", "campaign_id": campaign_id, "date_time": date}, headers=gm
+        ).json()["id"]
+        for i, date in enumerate(dates)
+    ]
+    # Shodné created_at (zapsané přes SQLAlchemy - server_default v SQLite ukládá jiný formát
+    # řetězce než parametry dotazu) - mezi sezeními se stejným termínem rozhoduje id
+    from app.db.session import engine
+
+    with engine.begin() as conn:
+        conn.execute(
+            update(models.Session)
+            .where(models.Session.id.in_(ids))
+            .values(created_at=dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc))
+        )
+    url = f"/V1/sessions/by_campaign/{campaign_id}"
+    full = [row["id"] for row in client.get(url, headers=gm).json()]
+    # Od nejnovějšího termínu, sezení bez termínu na konci; shody rozhoduje novější záznam
+    assert full == [ids[3], ids[4], ids[1], ids[2], ids[0]]
+    assert sum(collect(client, url, gm, limit=2), []) == full
+
+
+def test_not_null_orders_compile_to_seekable_row_comparison():
+    compiled = lambda order, values: str(order.after(values).compile(dialect=postgresql.dialect()))
+    assert compiled(crud.CHARACTER_ORDER, ["Adam", 3]) == (
+        "(characters.name, characters.id) > (%(param_1)s::VARCHAR, %(param_2)s::INTEGER)"
+    )
+    assert "IS NULL" not in compiled(crud.JOURNAL_ENTRY_ORDER, ["2026-01-01T00:00:00", 3])
+    # NULL datum v cursoru (NULLS LAST): zbývají jen další NULL podle (created_at, id)
+    unscheduled = compiled(crud.SESSION_ORDER, [None, "2026-01-01T00:00:00", 3])
+    assert "sessions.date_time IS NULL" in unscheduled and "IS NOT NULL" not in unscheduled
+    assert "(sessions.created_at, sessions.id) <" in unscheduled
+    # S datem: starší termíny, sezení bez termínu a shoda dořešená n-ticí (created_at, id)
+    scheduled = compiled(crud.SESSION_ORDER, ["2026-01-01T00:00:00", "2026-01-01T00:00:00", 3])
+    assert scheduled.startswith("sessions.date_time < ") and "OR sessions.date_time IS NULL OR" in scheduled
+
+
+def test_session_index_matches_the_session_order():
+    (index,) = [ix for ix in models.Session.__table__.indexes if ix.name.endswith("_date_time_created_at_id")]
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "(campaign_id, date_time DESC NULLS LAST, created_at DESC, id DESC)" in ddl
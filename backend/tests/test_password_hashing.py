@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.password_hashing import PasswordHasher, PasswordHasherBusy
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_finishes():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(timeout=5)
+        return "hash"
+
+    async def scenario():
+        running = asyncio.create_task(hasher._run(slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        queued = asyncio.create_task(hasher._run(slow_hash))
+        await asyncio.sleep(0)
+        assert hasher.snapshot()["in_flight"] == 2
+
+        # Zrušená čekající úloha se v executoru nespustí - místo se uvolní hned
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert hasher.snapshot()["in_flight"] == 1
+
+        # Zrušený request s běžícím bcryptem drží místo, dokud výpočet nedoběhne
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        assert hasher.snapshot()["in_flight"] == 1
+        hasher.max_queue = 0
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._run(slow_hash)
+
+        release.set()
+        for _ in range(100):
+            if hasher.snapshot()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        snapshot = hasher.snapshot()
+        assert (snapshot["in_flight"], snapshot["completed"], snapshot["rejected"]) == (0, 2, 1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        hasher.shutdown()
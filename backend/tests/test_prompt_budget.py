@@ -0,0 +1,44 @@
+from app.services import prompt_budget
+from app.services.prompt_budget import TermIndex, build_sections, estimate_tokens
+
+
+def test_rank_prefers_rare_shared_terms_without_diacritics():
+    index = TermIndex(["Stará hospoda", "Hrad Kůň", "Hospoda U Koně", "Kovárna", "Stará kovárna"])
+    # Bez diakritiky a koncové samohlásky (kůň = kun, hradu = hrad); vzácná slova váží víc,
+    # shodné skóre rozhoduje novější text, nepodobné texty ve výsledku nejsou
+    assert index.rank("Stará hospoda u hradu kun") == [1, 0, 4, 2]
+    assert index.rank("les") == []
+
+
+def test_sections_fit_budget_and_prefer_relevant_names():
+    names = [f"Vesnice {i}" for i in range(5000)] + ["Temný hrad", "Hradní věž"]
+    sections = build_sections("Výprava na temný hrad", [], names, name_tokens=50)
+    lines = sections.existing_names.splitlines()
+    assert lines[0] == "- Temný hrad"
+    # Zbytek rozpočtu zaplní nejnovější názvy, nevešlé jen spočítá
+    assert lines[1:3] == ["- Hradní věž", "- Vesnice 4999"]
+    assert lines[-1] == f"(and {len(names) - len(lines) + 1} more existing names not listed)"
+    assert estimate_tokens("\n".join(lines[:-1])) <= 50
+    assert build_sections("Výprava na temný hrad", [], list(names), name_tokens=50) == sections
+
+
+def test_examples_ranked_by_context_and_truncated():
+    examples = [
+        {"name": "Kovář", "description": "Kove meče"},
+        {"name": "Rybář", "description": "x" * 5000},
+        {"name": "Hostinský", "description": "Vaří pivo v hospodě"},
+    ]
+    sections = build_sections("Hospoda plná piva", examples, [], example_tokens=40)
+    assert sections.examples.splitlines()[0].startswith('- {"name": "Hostinsk')
+    assert "Rybář" not in sections.examples and "Kovář" in sections.examples
+    # Bez kontextu se názvy řadí podle názvů vybraných příkladů, pak od nejnovějších
+    names = ["Kovář Jan", "Mlýn", "Kovárna"]
+    assert build_sections(None, examples[:1], names).existing_names.splitlines() == ["- Kovář Jan", "- Kovárna", "- Mlýn"]
+
+
+def test_name_index_is_extended_for_appended_names():
+    names = [f"Jeskyně {i}" for i in range(100)]
+    first = prompt_budget._name_index(names)
+    extended = prompt_budget._name_index(names + ["Jeskyně draka"])
+    assert extended is first and first.size == 101
+    assert extended.rank("drak jeskyně")[0] == 100
@@ -0,0 +1,102 @@
+"""Počty SQL příkazů na endpoint.
+
+Vztahy sezení -> sloty -> dostupnosti jsou `lazy="raise_on_sql"`; každý dotaz si
+načítání volí sám. Tyto testy hlídají, že se do endpointů nevrátí N+1 ani
+zbytečné načítání slotů a dostupností tam, kde stačí samotný řádek.
+"""
+import datetime as dt
+
+import pytest
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+@pytest.fixture(scope="module")
+def scene(client, register):
+    gm, player = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    token = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()["token"]
+    assert client.post(f"/V1/invites/{token}/accept", headers=player).status_code == 200
+    session_id = client.post(
+        "/V1/sessions/", json={"title": "S", "campaign_id": campaign_id, "date_time": at(1)}, headers=gm
+    ).json()["id"]
+    slot_ids = [
+        client.post(
+            f"/V1/sessions/{session_id}/slots", json={"slot_from": at(d), "slot_to": at(d + 6)}, headers=gm
+        ).json()["id"]
+        for d in (0, 24, 48)
+    ]
+    # Několik dostupností na slot a uživatele, aby se N+1 projevilo na počtu dotazů
+    for headers in (gm, player):
+        for slot_id, day in zip(slot_ids, (0, 24, 48)):
+            for start in (0, 2, 4):
+                r = client.put(
+                    f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities/me",
+                    json={"available_from": at(day + start), "available_to": at(day + start + 1)},
+                    headers=headers,
+                )
+                assert r.status_code == 200, r.text
+    return {"gm": gm, "player": player, "session_id": session_id, "slot_ids": slot_ids}
+
+
+def measure(client, count_queries, method, url, headers, **kwargs):
+    with count_queries() as statements:
+        response = client.request(method, url, headers=headers, **kwargs)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+@pytest.mark.parametrize(
+    "url, params, expected",
+    [
+        ("/V1/sessions/{session_id}", None, 3),
+        ("/V1/sessions/{session_id}/slots", None, 5),
+        ("/V1/sessions/{session_id}/availabilities", None, 4),
+        ("/V1/sessions/{session_id}/slots/{slot_id}/availabilities", None, 5),
+        ("/V1/sessions/{session_id}/availability-overlap", None, 6),
+        ("/V1/sessions/{session_id}/recommended-times", {"duration_minutes": 60}, 6),
+        ("/V1/sessions/{session_id}/availability-grid", {"from": "2026-11-01"}, 6),
+        ("/V1/users/me/calendar", {"from": at(-24), "to": at(96)}, 1),
+    ],
+)
+def test_read_endpoint_query_counts(client, count_queries, scene, url, params, expected):
+    url = url.format(session_id=scene["session_id"], slot_id=scene["slot_ids"][0])
+    statements = measure(client, count_queries, "GET", url, scene["player"], params=params)
+    assert len(statements) == expected, statements
+
+
+def test_set_availability_query_count(client, count_queries, scene):
+    session_id, slot_id = scene["session_id"], scene["slot_ids"][1]
+    statements = measure(
+        client, count_queries, "PUT", f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities/me",
+        scene["player"], json={"available_from": at(29), "available_to": at(30)},
+    )
+    assert len(statements) == 6, statements
+
+
+def test_sync_availabilities_query_count(client, count_queries, scene):
+    session_id, slot_ids = scene["session_id"], scene["slot_ids"]
+    body = {"slots": [
+        {"slot_id": slot_id, "intervals": [{"available_from": at(day + 1), "available_to": at(day + 3)}]}
+        for slot_id, day in zip(slot_ids, (0, 24, 48))
+    ]}
+    statements = measure(
+        client, count_queries, "PUT", f"/V1/sessions/{session_id}/availabilities/me", scene["gm"], json=body
+    )
+    # Vkládání je jeden INSERT na nový interval (3 sloty => 3)
+    assert len(statements) == 10, statements
+
+
+def test_session_update_does_not_load_slots(client, count_queries, scene):
+    session_id = scene["session_id"]
+    statements = measure(
+        client, count_queries, "PUT", f"/V1/sessions/{session_id}", scene["gm"], json={"title": "S2"}
+    )
+    loaded = " ".join(statements)
+    assert "FROM session_slots" not in loaded and "FROM user_availabilities" not in loaded, statements
+    assert len(statements) == 5, statements
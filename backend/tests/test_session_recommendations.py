@@ -0,0 +1,113 @@
+import datetime as dt
+
+import pytest
+
+from app.services.availability_overlap import rank_windows, sweep
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> dt.datetime:
+    return T0 + dt.timedelta(hours=hours)
+
+
+def test_rank_windows_prefers_most_attendees_and_skips_overlapping_duplicates():
+    segments = sweep([(at(0), at(4), 1), (at(2), at(6), 2), (at(1), at(3), 3)])
+    windows = rank_windows([(10, segments)], duration=dt.timedelta(hours=1), top_k=3)
+    assert [(w.start, w.end, sorted(w.user_ids)) for w in windows] == [
+        (at(2), at(3), [1, 2, 3]),
+        (at(1), at(2), [1, 3]),
+        (at(3), at(4), [1, 2]),
+    ]
+    # Okna se stejnými účastníky se nepřekrývají - 16:00 i 16:30 s hráčem 1 dá jen jedno
+    solo = sweep([(at(0), at(3), 1)])
+    assert [w.start for w in rank_windows([(10, solo)], dt.timedelta(hours=1), top_k=5)] == [at(0), at(2)]
+
+
+def test_rank_windows_respects_duration_accept_and_slot_gaps():
+    first = sweep([(at(0), at(1), 1)])
+    second = sweep([(at(10), at(13), 1), (at(11), at(13), 2)])
+    # Hodina a půl se vejde jen do druhého slotu
+    windows = rank_windows([(1, first), (2, second)], duration=dt.timedelta(minutes=90), top_k=5)
+    assert [(w.slot_id, w.start, sorted(w.user_ids)) for w in windows] == [
+        (2, at(11), [1, 2]),
+        (2, at(10), [1]),
+    ]
+    only_with_2 = rank_windows([(2, second)], dt.timedelta(minutes=90), 5, accept=lambda ids: 2 in ids)
+    assert [(w.start, sorted(w.user_ids)) for w in only_with_2] == [(at(11), [1, 2])]
+
+
+def hm(value: str) -> str:
+    return value[11:16]
+
+
+@pytest.fixture(scope="module")
+def scene(client, register):
+    gm, alice, bob = register(), register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "C", "world_id": world_id}, headers=gm).json()["id"]
+    for player in (alice, bob):
+        token = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()["token"]
+        assert client.post(f"/V1/invites/{token}/accept", headers=player).status_code == 200
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    slot_id = client.post(
+        f"/V1/sessions/{session_id}/slots",
+        json={"slot_from": at(0).isoformat(), "slot_to": at(8).isoformat()},
+        headers=gm,
+    ).json()["id"]
+    # GM 16-20, Alice 18-24, Bob 17-19 a 21-24
+    for headers, start, end in [(gm, 0, 4), (alice, 2, 8), (bob, 1, 3), (bob, 5, 8)]:
+        response = client.put(
+            f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities/me",
+            json={"available_from": at(start).isoformat(), "available_to": at(end).isoformat()},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+    ids = {name: client.get("/V1/users/me", headers=h).json()["id"] for name, h in [("gm", gm), ("alice", alice), ("bob", bob)]}
+    return {"gm": gm, "session_id": session_id, "slot_id": slot_id, "ids": ids}
+
+
+def options(client, scene, **params):
+    response = client.get(f"/V1/sessions/{scene['session_id']}/recommended-times", params=params, headers=scene["gm"])
+    assert response.status_code == 200, response.text
+    return response.json()["options"]
+
+
+def test_best_option_has_everyone_and_reports_missing_members(client, scene):
+    ids = scene["ids"]
+    best, *rest = options(client, scene, duration_minutes=60)
+    assert (hm(best["start"]), hm(best["end"])) == ("18:00", "19:00")
+    assert best["attendee_count"] == 3 and best["player_count"] == 2 and best["gm_attends"]
+    assert best["missing_user_ids"] == []
+    assert all(option["gm_attends"] for option in rest)
+    # Na dvě hodiny vydrží jen dvojice - při shodě vyhrává dřívější začátek (GM a Bob 17-19)
+    two_hours = options(client, scene, duration_minutes=120, top_k=2)
+    assert [(hm(o["start"]), sorted(o["user_ids"])) for o in two_hours] == [
+        ("17:00", sorted([ids["gm"], ids["bob"]])),
+        ("18:00", sorted([ids["gm"], ids["alice"]])),
+    ]
+    assert two_hours[0]["missing_user_ids"] == [ids["alice"]]
+
+
+def test_gm_requirement_and_min_players_filter_options(client, scene):
+    ids = scene["ids"]
+    # Bez GM: po 20:00 zůstanou Alice a Bob
+    late = options(client, scene, duration_minutes=180, gm_required=False, min_players=2)
+    assert [(hm(o["start"]), o["gm_attends"], sorted(o["user_ids"])) for o in late] == [
+        ("21:00", False, sorted([ids["alice"], ids["bob"]]))
+    ]
+    assert options(client, scene, duration_minutes=180, min_players=2) == []
+    response = client.get(
+        f"/V1/sessions/{scene['session_id']}/recommended-times", params={"duration_minutes": 5}, headers=scene["gm"]
+    )
+    assert response.status_code == 422
+
+
+def test_recommendation_window_is_bounded(client, scene):
+    url = f"/V1/sessions/{scene['session_id']}/recommended-times"
+    too_long = {"duration_minutes": 60, "from": at(0).isoformat(), "to": at(24 * 367).isoformat()}
+    assert client.get(url, params=too_long, headers=scene["gm"]).status_code == 400
+    open_start = {"duration_minutes": 60, "to": (dt.datetime.now() + dt.timedelta(days=400)).isoformat()}
+    assert client.get(url, params=open_start, headers=scene["gm"]).status_code == 400
+    week = {"duration_minutes": 60, "from": at(0).isoformat(), "to": at(24 * 7).isoformat()}
+    assert [hm(o["start"]) for o in options(client, scene, **week)][:1] == ["18:00"]
@@ -0,0 +1,78 @@
+import datetime as dt
+from types import SimpleNamespace
+
+from app.models.session_slot_recurrence import RecurrenceFrequencyEnum
+from app.services import slot_recurrence
+
+UTC = dt.timezone.utc
+
+
+def rule(**fields):
+    values = dict(
+        id=1, frequency=RecurrenceFrequencyEnum.WEEKLY, interval=1, weekdays=None,
+        first_from=dt.datetime(2026, 10, 7, 17, 0, tzinfo=UTC), duration_minutes=180,
+        timezone="Europe/Prague", until=None, count=None, exceptions=[],
+    )
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def starts(recurrence, window_from, window_to):
+    return [o.start for o in slot_recurrence.expand(recurrence, window_from, window_to)]
+
+
+def test_weekly_keeps_local_time_across_dst():
+    recurrence = rule(weekdays=slot_recurrence.weekdays_to_mask([2]))
+    result = starts(recurrence, dt.datetime(2026, 10, 20, tzinfo=UTC), dt.datetime(2026, 11, 1, tzinfo=UTC))
+    # 19:00 v Praze: CEST (UTC+2) a po 25. 10. CET (UTC+1)
+    assert result == [dt.datetime(2026, 10, 21, 17, tzinfo=UTC), dt.datetime(2026, 10, 28, 18, tzinfo=UTC)]
+
+
+def test_count_includes_skipped_occurrences_and_window_is_arithmetic():
+    recurrence = rule(
+        frequency=RecurrenceFrequencyEnum.DAILY, interval=2, count=5, exceptions=["2026-10-09"], timezone="UTC",
+    )
+    result = starts(recurrence, dt.datetime(2026, 1, 1, tzinfo=UTC), dt.datetime(2027, 1, 1, tzinfo=UTC))
+    assert [d.day for d in result] == [7, 11, 13, 15]
+    # Okno daleko za koncem pravidla bez `count` nic neprochází od začátku
+    endless = rule(frequency=RecurrenceFrequencyEnum.DAILY, timezone="UTC")
+    far = dt.datetime(2126, 10, 7, tzinfo=UTC)
+    assert starts(endless, far, far + dt.timedelta(days=2)) == [far.replace(hour=17), far.replace(day=8, hour=17)]
+    assert slot_recurrence.find_occurrence(endless, far.replace(hour=18)) is None
+
+
+def test_recurrence_occurrences_and_materialize(client, register):
+    gm, player = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    campaign_id = client.post("/V1/campaigns/", json={"name": "Rec", "world_id": world_id}, headers=gm).json()["id"]
+    invite = client.post(f"/V1/campaigns/{campaign_id}/invites/", json={}, headers=gm).json()
+    assert client.post(f"/V1/invites/{invite['token']}/accept", headers=player).status_code == 200
+    session_id = client.post("/V1/sessions/", json={"title": "S", "campaign_id": campaign_id}, headers=gm).json()["id"]
+    base = f"/V1/sessions/{session_id}"
+
+    body = {
+        "frequency": "weekly", "weekdays": [2, 4], "first_from": "2026-10-07T17:00:00Z",
+        "duration_minutes": 180, "timezone": "Europe/Prague", "exceptions": ["2026-10-16"],
+    }
+    assert client.post(base + "/slot-recurrences", json=body, headers=player).status_code == 403
+    created = client.post(base + "/slot-recurrences", json=body, headers=gm)
+    assert created.status_code == 201 and created.json()["weekdays"] == [2, 4]
+    recurrence_id = created.json()["id"]
+
+    window = {"from": "2026-10-05T00:00:00Z", "to": "2026-10-19T00:00:00Z"}
+    occurrences = client.get(base + "/slot-occurrences", params=window, headers=player).json()
+    assert [o["slot_from"][:10] for o in occurrences] == ["2026-10-07", "2026-10-09", "2026-10-14"]
+    assert all(o["slot_id"] is None and o["recurrence_id"] == recurrence_id for o in occurrences)
+
+    url = f"{base}/slot-recurrences/{recurrence_id}/occurrences"
+    first = client.post(url, json={"slot_from": occurrences[0]["slot_from"]}, headers=player)
+    assert first.status_code == 201
+    again = client.post(url, json={"slot_from": occurrences[0]["slot_from"]}, headers=gm)
+    assert again.status_code == 200 and again.json()["id"] == first.json()["id"]
+    assert client.post(url, json={"slot_from": "2026-10-16T17:00:00Z"}, headers=player).status_code == 400
+
+    overlap = client.get(base + "/availability-overlap", params=window, headers=player).json()["slots"]
+    assert [s["slot_id"] for s in overlap] == [first.json()["id"], None, None]
+
+    assert client.delete(f"{base}/slot-recurrences/{recurrence_id}", headers=gm).status_code == 200
+    assert client.get(base + "/slots", headers=gm).json() == []
@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def world(client, register):
+    gm = register()
+    world_id = client.post("/V1/worlds/", json={"name": "Sparse"}, headers=gm).json()["id"]
+    for name in ["Věž", "Brána", "Alej"]:
+        response = client.post("/V1/locations/", json={"name": name, "description": f"Popis {name}", "world_id": world_id}, headers=gm)
+        assert response.status_code == 200, response.text
+    for name in ["Meč", "Amulet"]:
+        response = client.post("/V1/items/", json={"name": name, "description": "x", "world_id": world_id}, headers=gm)
+        assert response.status_code == 201, response.text
+    client.post("/V1/characters/", json={"name": "Hrdina", "description": "dlouhý popis", "world_id": world_id}, headers=gm)
+    return {"gm": gm, "world_id": world_id}
+
+
+def test_sparse_locations_return_only_requested_columns_in_list_order(client, world):
+    params = {"world_id": world["world_id"]}
+    full = client.get("/V1/locations/", params=params, headers=world["gm"]).json()
+    sparse = client.get("/V1/locations/", params={**params, "fields": "name, description,name"}, headers=world["gm"]).json()
+    # id je vždy, duplicity a mezery v seznamu polí nevadí
+    assert sparse == [{"id": row["id"], "name": row["name"], "description": row["description"]} for row in full]
+    assert [row["name"] for row in sparse] == ["Alej", "Brána", "Věž"]
+
+
+def test_sparse_items_and_characters(client, world):
+    items = client.get(
+        "/V1/items/", params={"world_id": world["world_id"], "fields": "name"}, headers=world["gm"]
+    ).json()
+    assert [set(row) for row in items] == [{"id", "name"}] * 2
+    assert [row["name"] for row in items] == ["Meč", "Amulet"]  # items se řadí podle id
+
+    characters = client.get(
+        f"/V1/worlds/{world['world_id']}/characters/", params={"fields": "name"}, headers=world["gm"]
+    ).json()
+    assert [row["name"] for row in characters] == ["Hrdina"] and set(characters[0]) == {"id", "name"}
+    simple = client.get(f"/V1/worlds/{world['world_id']}/characters_simple", headers=world["gm"]).json()
+    assert simple == [{"id": characters[0]["id"], "name": "Hrdina"}]
+
+
+@pytest.mark.parametrize("fields", ["tags", "name,password_hash", "path"])
+def test_fields_outside_response_schema_are_rejected(client, world, fields):
+    # Relace, cizí sloupce ani interní sloupce modelu (materializovaná cesta) vybrat nejde
+    response = client.get(
+        "/V1/locations/", params={"world_id": world["world_id"], "fields": fields}, headers=world["gm"]
+    )
+    assert response.status_code == 400
+    assert "Unknown fields" in response.json()["detail"]
@@ -0,0 +1,102 @@
+import datetime as dt
+
+import pytest
+
+T0 = dt.datetime(2026, 11, 1, 16, 0)
+
+
+def at(hours: float) -> str:
+    return (T0 + dt.timedelta(hours=hours)).isoformat()
+
+
+def hm(value: str) -> str:
+    return value[11:16]
+
+
+@pytest.fixture(scope="module")
+def scene(client, register):
+    """Hráč je v kampani Hlavní, ale ne v kampani Cizí; okno je 1. až 3. listopadu."""
+    gm, player = register(), register()
+    world_id = client.post("/V1/worlds/", json={"name": "W"}, headers=gm).json()["id"]
+    main_id = client.post("/V1/campaigns/", json={"name": "Hlavní", "world_id": world_id}, headers=gm).json()["id"]
+    other_id = client.post("/V1/campaigns/", json={"name": "Cizí", "world_id": world_id}, headers=gm).json()["id"]
+    token = client.post(f"/V1/campaigns/{main_id}/invites/", json={}, headers=gm).json()["token"]
+    assert client.post(f"/V1/invites/{token}/accept", headers=player).status_code == 200
+
+    def session(title, campaign_id, date_time=None):
+        body = {"title": title, "campaign_id": campaign_id, "date_time": date_time}
+        return client.post("/V1/sessions/", json=body, headers=gm).json()["id"]
+
+    def slot(session_id, start, end):
+        response = client.post(
+            f"/V1/sessions/{session_id}/slots", json={"slot_from": at(start), "slot_to": at(end)}, headers=gm
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    def available(headers, session_id, slot_id, start, end, note=None):
+        response = client.put(
+            f"/V1/sessions/{session_id}/slots/{slot_id}/availabilities/me",
+            json={"available_from": at(start), "available_to": at(end), "note": note},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+
+    ids = {
+        "planned": session("Naplánované", main_id),
+        "fixed": session("Pevný termín", main_id, at(26)),
+        "later": session("Později", main_id, at(24 * 30)),
+        "foreign": session("Cizí sezení", other_id),
+    }
+    ids["first"] = slot(ids["planned"], 0, 8)
+    ids["second"] = slot(ids["planned"], 24, 32)
+    slot(ids["planned"], 24 * 10, 24 * 10 + 4)  # mimo okno
+    slot(ids["foreign"], 0, 8)
+    available(player, ids["planned"], ids["first"], 4, 6, "po práci")
+    available(player, ids["planned"], ids["first"], 1, 2)
+    available(gm, ids["planned"], ids["first"], 0, 8)
+    return {"gm": gm, "player": player, "ids": ids}
+
+
+def calendar(client, headers, start=-1, end=48):
+    return client.get("/V1/users/me/calendar", params={"from": at(start), "to": at(end)}, headers=headers)
+
+
+def test_calendar_lists_own_campaign_sessions_with_slots_and_own_availability(client, scene):
+    ids = scene["ids"]
+    response = calendar(client, scene["player"])
+    assert response.status_code == 200, response.text
+    sessions = {session["id"]: session for session in response.json()["sessions"]}
+    # Cizí kampaň chybí, sezení bez slotů jen s termínem v okně
+    assert set(sessions) == {ids["planned"], ids["fixed"]}
+    assert sessions[ids["fixed"]]["slots"] == [] and sessions[ids["fixed"]]["campaign_name"] == "Hlavní"
+
+    first, second = sessions[ids["planned"]]["slots"]
+    assert (first["id"], second["id"]) == (ids["first"], ids["second"])
+    # Jen vlastní dostupnosti (ne GM), seřazené podle začátku
+    assert [(hm(a["available_from"]), hm(a["available_to"]), a["note"]) for a in first["my_availability"]] == [
+        ("17:00", "18:00", None),
+        ("20:00", "22:00", "po práci"),
+    ]
+    assert second["my_availability"] == []
+
+
+def test_calendar_window_selects_overlapping_slots(client, scene):
+    ids = scene["ids"]
+    # Okno začíná přesně na konci prvního slotu, zasáhne tedy jen druhý
+    sessions = calendar(client, scene["player"], start=8, end=25).json()["sessions"]
+    assert [(s["id"], [slot["id"] for slot in s["slots"]]) for s in sessions] == [(ids["planned"], [ids["second"]])]
+    assert [s["id"] for s in calendar(client, scene["gm"], start=-1, end=1).json()["sessions"]] == sorted(
+        [ids["planned"], ids["foreign"]]
+    )
+
+
+@pytest.mark.parametrize("start, end", [(5, 5), (5, 1), (0, 24 * 367)])
+def test_calendar_rejects_invalid_windows(client, scene, start, end):
+    response = calendar(client, scene["player"], start=start, end=end)
+    assert response.status_code == 400
+
+
+def test_calendar_requires_window_and_authentication(client, scene):
+    assert client.get("/V1/users/me/calendar", params={"from": at(0)}, headers=scene["player"]).status_code == 422
+    assert client.get("/V1/users/me/calendar", params={"from": at(0), "to": at(1)}).status_code == 401
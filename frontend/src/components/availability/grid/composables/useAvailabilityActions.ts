@@ -1,6 +1,7 @@
 import { ref } from 'vue';
 import * as availabilityApi from '@/services/api/sessionAvailability';
 import { TIME_INCREMENT } from './useGridData';
+import type { UserAvailability } from '@/types/user_availability';
 
 export function useAvailabilityActions() {
   const error = ref('');
@@ -75,8 +76,29 @@ export function useAvailabilityActions() {
     }
   }
 
-  // Zpracování výběru více buněk
-  async function processSelection(selection: Set<string>, isAdding: boolean, slotId: number, sessionId: number) {
+  // Odečtení vybraných intervalů od stávajících (rozdělí interval, pokud výběr leží uvnitř)
+  function subtractIntervals<T extends { start: Date; end: Date }>(base: T[], removed: { start: Date; end: Date }[]): T[] {
+    let result = base;
+    for (const cut of removed) {
+      result = result.flatMap(interval => {
+        if (cut.end <= interval.start || cut.start >= interval.end) return [interval];
+        const parts: T[] = [];
+        if (interval.start < cut.start) parts.push({ ...interval, end: cut.start });
+        if (cut.end < interval.end) parts.push({ ...interval, start: cut.end });
+        return parts;
+      });
+    }
+    return result;
+  }
+
+  // Zpracování výběru více buněk - celý výběr se uloží jedním požadavkem
+  async function processSelection(
+    selection: Set<string>,
+    isAdding: boolean,
+    slotId: number,
+    sessionId: number,
+    currentIntervals: UserAvailability[]
+  ) {
     if (selection.size === 0) return false;
     
     isProcessing.value = true;
@@ -84,6 +106,7 @@ export function useAvailabilityActions() {
     
     try {
       // Vybraná data - organizovaná podle dnů
+      const selectedIntervals: { start: Date; end: Date }[] = [];
       const selectionByDay = new Map<string, string[]>();
       
       // Roztřídění podle data
@@ -178,38 +201,29 @@ export function useAvailabilityActions() {
           intervals.push({ start: currentStart, end: currentEnd });
         }
         
-        // Pro každý interval zpracujeme dle režimu (přidání/odebrání)
-        for (const interval of intervals) {
-          if (isAdding) {
-            // Přidání nového intervalu
-            try {
-              await availabilityApi.setMyAvailability(
-                sessionId, 
-                slotId,
-                {
-                  available_from: interval.start.toISOString(),
-                  available_to: interval.end.toISOString(),
-                  note: null
-                }
-              );
-            } catch (e: any) {
-              // Pokud dojde k chybě překryvu (409), ignorujeme ji a pokračujeme dál
-              if (e.response?.status !== 409) {
-                throw e; // Ostatní chyby přeposíláme dál
-              }
-            }
-          } else {
-            // Přímo použijeme novou funkci API pro mazání v časovém intervalu
-            await availabilityApi.deleteMyAvailability(
-              sessionId, 
-              slotId,
-              interval.start.toISOString(),
-              interval.end.toISOString()
-            );
-          }
-        }
+        selectedIntervals.push(...intervals);
       }
-      
+
+      // Požadovaná množina intervalů slotu = stávající +/- výběr; server ji sloučí
+      // a rozdíl uloží v jedné transakci
+      const current = currentIntervals.map(a => ({
+        start: new Date(a.available_from),
+        end: new Date(a.available_to),
+        note: a.note ?? null
+      }));
+      const desired = isAdding
+        ? [...current, ...selectedIntervals.map(i => ({ ...i, note: null }))]
+        : subtractIntervals(current, selectedIntervals);
+
+      await availabilityApi.syncMyAvailabilities(sessionId, [{
+        slot_id: slotId,
+        intervals: desired.map(i => ({
+          available_from: i.start.toISOString(),
+          available_to: i.end.toISOString(),
+          note: i.note
+        }))
+      }]);
+
       // Aktualizujeme zobrazení
       showSuccessMessage(isAdding ? 'Dostupnost byla úspěšně uložena' : 'Dostupnost byla úspěšně odstraněna');
       return true;
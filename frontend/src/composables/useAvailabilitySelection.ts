@@ -1,6 +1,7 @@
 import { ref, type Ref } from 'vue';
 import { startOfDay, addMinutes, parseISO, isWithinInterval, isEqual, compareAsc } from 'date-fns';
 import type { Availability, AvailabilityCreate } from '@/types/availability';
+import type { AvailabilityGridDay } from '@/types/user_availability';
 
 export function useAvailabilitySelection(myAvailabilities: Ref<Availability[]>, slotDurationMinutes: number = 30) {
 
@@ -125,6 +126,22 @@ export function useAvailabilitySelection(myAvailabilities: Ref<Availability[]>,
         selectedSlots.value = newSelectedSlots;
     }
 
+    // Výběr rovnou z gridu spočteného API (/availability-grid) - bez procházení intervalů
+    // buňku po buňce; cell_minutes gridu musí odpovídat slotDurationMinutes
+    function updateSelectedSlotsFromGrid(days: AvailabilityGridDay[]) {
+        const newSelectedSlots = new Set<string>();
+        for (const day of days) {
+            const dayStart = parseISO(day.start);
+            day.mine.forEach((isMine, index) => {
+                if (isMine) {
+                    const minutes = index * slotDurationMinutes;
+                    newSelectedSlots.add(`${addMinutes(dayStart, minutes).toISOString().split('.')[0]}Z_${minutes}`);
+                }
+            });
+        }
+        selectedSlots.value = newSelectedSlots;
+    }
+
     // Initial population
     updateSelectedSlotsFromMyAvailabilities(myAvailabilities.value);
 
@@ -192,6 +209,7 @@ export function useAvailabilitySelection(myAvailabilities: Ref<Availability[]>,
         updateSelection,
         endSelection,
         updateSelectedSlotsFromMyAvailabilities, // Expose if needed externally
+        updateSelectedSlotsFromGrid,
         calculateAvailabilityBlocks,
         getSlotKey, // Expose for use in the parent component (e.g., for :isSelected)
         clearLocalSelection
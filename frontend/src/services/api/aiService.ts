@@ -1,5 +1,6 @@
 import { api } from '../auth.service'; // Importujeme sdílenou instanci z auth.service
 import type { AxiosResponse } from 'axios';
+import type { AIJob, AIJobEvent } from '@/types/ai';
 
 // Define types for the request body and response (can be refined later)
 // Consider creating specific types in @/types/ai.ts if needed
@@ -11,25 +12,109 @@ interface GenerateEntityPayload {
 // The response type depends on the generated entity, using 'any' for now
 type GenerateEntityResponse = any;
 
+// Interval dotazování na stav úlohy (ms)
+const JOB_POLL_INTERVAL = 1000;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 export const aiService = {
     /**
-     * Generates a new entity using the AI backend.
+     * Queues generation of a new entity; the result is picked up via getGenerationJob.
      * @param worldId - The ID of the world context.
      * @param entityType - The type of entity to generate (e.g., 'character', 'location').
      * @param payload - The request body containing examples and context.
-     * @returns The newly generated entity data.
+     * @returns The queued job.
      */
-    generateEntity(
+    submitGenerationJob(
         worldId: number,
         entityType: string,
         payload: GenerateEntityPayload
-    ): Promise<GenerateEntityResponse> {
-        // Use the correct API base path if needed (assuming '/api/v1' is handled by 'api' instance)
-        return api.post<GenerateEntityResponse>(
-            `/V1/ai/worlds/${worldId}/generate/${entityType}`,
+    ): Promise<AIJob> {
+        return api.post<AIJob>(
+            `/V1/ai/worlds/${worldId}/generate/${entityType}/jobs`,
             payload
-        ).then((response: AxiosResponse<GenerateEntityResponse>) => response.data);
+        ).then((response: AxiosResponse<AIJob>) => response.data);
+    },
+
+    getGenerationJob(jobId: string): Promise<AIJob> {
+        return api.get<AIJob>(`/V1/ai/jobs/${jobId}`).then((response: AxiosResponse<AIJob>) => response.data);
+    },
+
+    /**
+     * Streams job events (status + generated text deltas) until the job finishes.
+     * Uses fetch instead of EventSource, which cannot send the Authorization header.
+     */
+    async streamGenerationJob(
+        jobId: string,
+        onEvent: (event: AIJobEvent) => void,
+        signal?: AbortSignal
+    ): Promise<void> {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${api.defaults.baseURL}/V1/ai/jobs/${jobId}/events`, {
+            headers: { Accept: 'text/event-stream', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+            signal,
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`Generation job events request failed with status ${response.status}`);
+        }
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) return;
+            buffer += value;
+            // Zprávy jsou oddělené prázdným řádkem; komentáře (": ping") a retry se přeskočí
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const data = message.split('\n').filter(line => line.startsWith('data: ')).map(line => line.slice(6)).join('\n');
+                if (data) {
+                    onEvent(JSON.parse(data) as AIJobEvent);
+                }
+            }
+        }
+    },
+
+    /**
+     * Generates a new entity using the AI backend (submits a job and waits for it).
+     * @param worldId - The ID of the world context.
+     * @param entityType - The type of entity to generate (e.g., 'character', 'location').
+     * @param payload - The request body containing examples and context.
+     * @param onPartial - Optional; receives the text generated so far (streamed instead of polling).
+     * @returns The newly generated entity data.
+     */
+    async generateEntity(
+        worldId: number,
+        entityType: string,
+        payload: GenerateEntityPayload,
+        onPartial?: (partial: Record<string, string>) => void
+    ): Promise<GenerateEntityResponse> {
+        let job = await aiService.submitGenerationJob(worldId, entityType, payload);
+        if (onPartial) {
+            let partial: Record<string, string> = {};
+            await aiService.streamGenerationJob(job.id, event => {
+                if (event.type === 'status') {
+                    job = event;
+                    partial = { ...(event.partial ?? {}) };
+                } else {
+                    // Delta, kterou už obsahuje stav (`partial`), se jen přepíše stejným textem
+                    const current = partial[event.field] ?? '';
+                    if (event.offset > current.length) return;
+                    partial = { ...partial, [event.field]: current.slice(0, event.offset) + event.text };
+                }
+                onPartial(partial);
+            });
+        }
+        while (job.status === 'queued' || job.status === 'running') {
+            await sleep(JOB_POLL_INTERVAL);
+            job = await aiService.getGenerationJob(job.id);
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Generation failed');
+        }
+        return job.entity;
     }
 
     // TODO: Add function for summarizeSession if needed
-}; 
\ No newline at end of file
+};
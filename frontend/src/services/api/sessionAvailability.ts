@@ -1,6 +1,9 @@
 import { api } from '../auth.service';
-import type { SessionSlot, SessionSlotCreate, SessionSlotUpdate } from '@/types/session_slot';
-import type { UserAvailability, UserAvailabilityCreateUpdate } from '@/types/user_availability';
+import type {
+    SessionSlot, SessionSlotCreate, SessionSlotUpdate,
+    SessionSlotRecurrence, SessionSlotRecurrenceCreate, SessionSlotRecurrenceUpdate, SlotOccurrence,
+} from '@/types/session_slot';
+import type { UserAvailability, UserAvailabilityCreateUpdate, SessionAvailabilityOverlap, SessionAvailabilityGrid, SessionLiveEvent, SessionTimeRecommendations, SlotAvailabilitySet, UserAvailabilitySyncResult } from '@/types/user_availability';
 
 const BASE_URL = '/V1/sessions';
 
@@ -40,6 +43,76 @@ export const deleteSlot = async (sessionId: number, slotId: number): Promise<Ses
     return response.data; // Return the deleted slot data
 };
 
+// --- Slot Recurrence Endpoints ---
+
+/**
+ * Create a recurring slot (daily/weekly rule). Occurrences are expanded by the API per window.
+ */
+export const createSlotRecurrence = async (
+    sessionId: number,
+    recurrenceData: SessionSlotRecurrenceCreate
+): Promise<SessionSlotRecurrence> => {
+    const response = await api.post<SessionSlotRecurrence>(`${BASE_URL}/${sessionId}/slot-recurrences`, recurrenceData);
+    return response.data;
+};
+
+/**
+ * Get all recurring slots of a session.
+ */
+export const getSlotRecurrences = async (sessionId: number): Promise<SessionSlotRecurrence[]> => {
+    const response = await api.get<SessionSlotRecurrence[]>(`${BASE_URL}/${sessionId}/slot-recurrences`);
+    return response.data;
+};
+
+/**
+ * Update a recurring slot (e.g. add skipped dates to `exceptions`).
+ */
+export const updateSlotRecurrence = async (
+    sessionId: number,
+    recurrenceId: number,
+    recurrenceData: SessionSlotRecurrenceUpdate
+): Promise<SessionSlotRecurrence> => {
+    const response = await api.put<SessionSlotRecurrence>(
+        `${BASE_URL}/${sessionId}/slot-recurrences/${recurrenceId}`,
+        recurrenceData
+    );
+    return response.data;
+};
+
+/**
+ * Delete a recurring slot including its materialized occurrences.
+ */
+export const deleteSlotRecurrence = async (sessionId: number, recurrenceId: number): Promise<SessionSlotRecurrence> => {
+    const response = await api.delete<SessionSlotRecurrence>(`${BASE_URL}/${sessionId}/slot-recurrences/${recurrenceId}`);
+    return response.data;
+};
+
+/**
+ * Get slots and expanded recurring occurrences in a time window (max. 366 days).
+ * Výskyty bez slotu mají slot_id null - před zadáním dostupnosti je potřeba je zhmotnit.
+ */
+export const getSlotOccurrences = async (sessionId: number, from: string, to: string): Promise<SlotOccurrence[]> => {
+    const response = await api.get<SlotOccurrence[]>(`${BASE_URL}/${sessionId}/slot-occurrences`, {
+        params: { from, to },
+    });
+    return response.data;
+};
+
+/**
+ * Get or create the slot for one occurrence of a recurring slot (so availability can be set for it).
+ */
+export const materializeSlotOccurrence = async (
+    sessionId: number,
+    recurrenceId: number,
+    slotFrom: string
+): Promise<SessionSlot> => {
+    const response = await api.post<SessionSlot>(
+        `${BASE_URL}/${sessionId}/slot-recurrences/${recurrenceId}/occurrences`,
+        { slot_from: slotFrom }
+    );
+    return response.data;
+};
+
 // --- User Availability Endpoints --- 
 
 /**
@@ -84,6 +157,21 @@ export const deleteMyAvailability = async (
     // No content returned on success (204)
 };
 
+/**
+ * Replace the current user's availability in the listed slots with the given intervals.
+ * Překryvy a navazující intervaly sloučí server; sloty mimo seznam zůstanou beze změny.
+ */
+export const syncMyAvailabilities = async (
+    sessionId: number,
+    slots: SlotAvailabilitySet[]
+): Promise<UserAvailabilitySyncResult> => {
+    const response = await api.put<UserAvailabilitySyncResult>(
+        `${BASE_URL}/${sessionId}/availabilities/me`,
+        { slots }
+    );
+    return response.data;
+};
+
 /**
  * Get all user availabilities for a specific slot.
  */
@@ -106,4 +194,116 @@ export const getSlotAvailabilities = async (
 export const getAllSessionAvailabilities = async (sessionId: number): Promise<UserAvailability[]> => {
     const response = await api.get<UserAvailability[]>(`${BASE_URL}/${sessionId}/availabilities`);
     return response.data;
-}; 
\ No newline at end of file
+}; 
+
+/**
+ * Get precomputed availability overlaps (N-of-M members) for all slots of a session.
+ * @param minAvailable Vrátí jen úseky s alespoň tolika dostupnými členy
+ * @param quorum Počet členů potřebný pro hratelný rozsah (výchozí: všichni)
+ * @param window Časové okno (ISO), pro které se rozvinou opakované sloty (výchozí: 28 dní od teď)
+ */
+export const getAvailabilityOverlap = async (
+    sessionId: number,
+    minAvailable: number = 1,
+    quorum?: number,
+    window?: { from: string; to: string }
+): Promise<SessionAvailabilityOverlap> => {
+    const params: Record<string, number | string> = { min_available: minAvailable };
+    if (quorum !== undefined) {
+        params.quorum = quorum;
+    }
+    if (window) {
+        params.from = window.from;
+        params.to = window.to;
+    }
+    const response = await api.get<SessionAvailabilityOverlap>(
+        `${BASE_URL}/${sessionId}/availability-overlap`,
+        { params }
+    );
+    return response.data;
+};
+
+/**
+ * Get the best start times for a session of the given length across all slots.
+ * @param durationMinutes Délka plánovaného sezení v minutách
+ * @param options topK - počet návrhů, gmRequired - GM musí být dostupný, minPlayers - minimum hráčů
+ */
+export const getRecommendedTimes = async (
+    sessionId: number,
+    durationMinutes: number,
+    options: { topK?: number; gmRequired?: boolean; minPlayers?: number } = {}
+): Promise<SessionTimeRecommendations> => {
+    const response = await api.get<SessionTimeRecommendations>(
+        `${BASE_URL}/${sessionId}/recommended-times`,
+        {
+            params: {
+                duration_minutes: durationMinutes,
+                top_k: options.topK,
+                gm_required: options.gmRequired,
+                min_players: options.minPlayers,
+            },
+        }
+    );
+    return response.data;
+};
+
+/**
+ * Get session availability bucketed into cells per local day (computed by the API).
+ * @param dayFrom První místní den (YYYY-MM-DD)
+ * @param options dayTo - den po posledním (výchozí 7 dní), cellMinutes - délka buňky, timeZone - IANA zóna (výchozí: zóna uživatele)
+ */
+export const getAvailabilityGrid = async (
+    sessionId: number,
+    dayFrom: string,
+    options: { dayTo?: string; cellMinutes?: number; timeZone?: string } = {}
+): Promise<SessionAvailabilityGrid> => {
+    const response = await api.get<SessionAvailabilityGrid>(
+        `${BASE_URL}/${sessionId}/availability-grid`,
+        {
+            params: {
+                from: dayFrom,
+                to: options.dayTo,
+                cell_minutes: options.cellMinutes,
+                tz: options.timeZone,
+            },
+        }
+    );
+    return response.data;
+};
+
+/**
+ * Subscribe to live changes of a session (Server-Sent Events).
+ * EventSource neumí poslat Authorization hlavičku, proto se stream čte přes fetch.
+ * Resolves when the stream ends; abort the signal to unsubscribe.
+ */
+export const subscribeToSessionEvents = async (
+    sessionId: number,
+    onEvent: (event: SessionLiveEvent) => void,
+    signal: AbortSignal
+): Promise<void> => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${api.defaults.baseURL}${BASE_URL}/${sessionId}/events`, {
+        headers: { Accept: 'text/event-stream', ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+        signal,
+    });
+    if (!response.ok || !response.body) {
+        throw new Error(`Session events request failed with status ${response.status}`);
+    }
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += value;
+        // Zprávy jsou oddělené prázdným řádkem; komentáře (": ping") a retry se přeskočí
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const data = message.split('\n').filter(line => line.startsWith('data: ')).map(line => line.slice(6)).join('\n');
+            if (data) {
+                onEvent(JSON.parse(data) as SessionLiveEvent);
+            }
+        }
+    }
+};
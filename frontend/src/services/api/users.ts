@@ -1,5 +1,6 @@
 import { api } from '../auth.service';
 import type { User, UserUpdate, ChangePasswordPayload } from '@/types/user'; // Přidán import ChangePasswordPayload
+import type { UserCalendar, CalendarFeedLinks } from '@/types/calendar';
 
 const BASE_URL = '/V1/users';
 const ME_URL = '/V1/users/me'; // URL pro aktuálního uživatele
@@ -13,6 +14,32 @@ export const getUserMe = async (): Promise<User> => {
     return response.data;
 };
 
+/**
+ * Fetches sessions, slots and own availability across all of the user's campaigns
+ * for a time window (max. 366 days) in one request.
+ */
+export const getMyCalendar = async (from: string, to: string): Promise<UserCalendar> => {
+    const response = await api.get<UserCalendar>(`${ME_URL}/calendar`, { params: { from, to } });
+    return response.data;
+};
+
+/**
+ * Fetches iCalendar feed URLs (personal and per campaign) for subscribing
+ * in an external calendar client. The URLs contain an access token.
+ */
+export const getMyCalendarFeeds = async (): Promise<CalendarFeedLinks> => {
+    const response = await api.get<CalendarFeedLinks>(`${ME_URL}/calendar/feeds`);
+    return response.data;
+};
+
+/**
+ * Revokes all previously issued calendar feed URLs and returns new ones.
+ */
+export const rotateMyCalendarFeeds = async (): Promise<CalendarFeedLinks> => {
+    const response = await api.post<CalendarFeedLinks>(`${ME_URL}/calendar/feeds/rotate`);
+    return response.data;
+};
+
 /**
  * Updates the currently logged-in user's data.
  * Requires authentication.
@@ -0,0 +1,22 @@
+// Úloha AI generování entity (POST /ai/worlds/{id}/generate/{type}/jobs)
+export type AIJobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface AIJob {
+  id: string;
+  status: AIJobStatus;
+  world_id: number;
+  entity_type: string;
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+  /** Text generated so far (name/description) while the job runs */
+  partial?: Record<string, string> | null;
+  /** Created entity (Character/Location/Organization/Item) once the job succeeded */
+  entity?: Record<string, any> | null;
+  error?: string | null;
+}
+
+// Události streamu /ai/jobs/{id}/events
+export type AIJobEvent =
+  | ({ type: 'status' } & AIJob)
+  | { type: 'delta'; field: string; offset: number; text: string };
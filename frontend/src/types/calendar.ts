@@ -0,0 +1,39 @@
+/**
+ * User's calendar across all of their campaigns (GET /users/me/calendar).
+ * All datetimes are ISO 8601 strings.
+ */
+export interface CalendarAvailability {
+  id: number;
+  available_from: string;
+  available_to: string;
+  note?: string | null;
+}
+
+export interface CalendarSlot {
+  id: number;
+  slot_from: string;
+  slot_to: string;
+  note?: string | null;
+  my_availability: CalendarAvailability[];
+}
+
+export interface CalendarSession {
+  id: number;
+  title: string;
+  campaign_id: number;
+  campaign_name: string;
+  date_time?: string | null;
+  slots: CalendarSlot[];
+}
+
+export interface UserCalendar {
+  window_from: string;
+  window_to: string;
+  sessions: CalendarSession[];
+}
+
+// Odkazy na iCalendar feedy (token je součástí URL)
+export interface CalendarFeedLinks {
+  user_feed_url: string;
+  campaign_feed_urls: Record<number, string>;
+}
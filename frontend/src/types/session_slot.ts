@@ -32,5 +32,50 @@ export interface SessionSlot extends SessionSlotBase {
   session_id: number;
   created_at: string; // ISO 8601 datetime string
   updated_at: string; // ISO 8601 datetime string
+  recurrence_id?: number | null; // Zhmotněný výskyt opakovaného slotu
   user_availabilities: UserAvailability[]; // Embed user availabilities
+}
+
+export type RecurrenceFrequency = 'daily' | 'weekly';
+
+/**
+ * Recurring slot rule - occurrences are expanded by the API per time window.
+ */
+export interface SessionSlotRecurrenceBase {
+  frequency: RecurrenceFrequency;
+  interval?: number; // Every N days/weeks (default 1)
+  weekdays?: number[] | null; // Weekly only: 0 = Monday ... 6 = Sunday
+  first_from: string; // ISO 8601 datetime string
+  duration_minutes: number;
+  timezone?: string; // IANA time zone (default UTC)
+  until?: string | null;
+  count?: number | null;
+  exceptions?: string[]; // Local dates (YYYY-MM-DD) of skipped occurrences
+  note?: string | null;
+}
+
+export interface SessionSlotRecurrenceCreate extends SessionSlotRecurrenceBase {}
+
+export type SessionSlotRecurrenceUpdate = Partial<SessionSlotRecurrenceBase>;
+
+export interface SessionSlotRecurrence extends SessionSlotRecurrenceBase {
+  id: number;
+  session_id: number;
+  interval: number;
+  timezone: string;
+  exceptions: string[];
+  created_at: string;
+  updated_at: string;
+}
+
+/**
+ * A slot or an expanded occurrence of a recurring slot in a time window.
+ * slot_id is null until the occurrence is materialized.
+ */
+export interface SlotOccurrence {
+  slot_id: number | null;
+  recurrence_id: number | null;
+  slot_from: string;
+  slot_to: string;
+  note?: string | null;
 } 
\ No newline at end of file
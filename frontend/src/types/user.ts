@@ -4,6 +4,7 @@ export interface User {
     email: string;
     first_name?: string | null;
     last_name?: string | null;
+    timezone?: string | null; // IANA time zone for the availability grid (null = UTC)
     // Add other relevant fields if needed, e.g., created_at
 }
 
@@ -24,6 +25,7 @@ export interface UserSimple {
 export interface UserUpdate {
   first_name?: string | null;
   last_name?: string | null;
+  timezone?: string | null;
   // Add other fields that can be updated
 } 
 
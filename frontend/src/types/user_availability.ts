@@ -24,4 +24,123 @@ export interface UserAvailability extends UserAvailabilityBase {
   user: UserSimple; // Embed simplified user info
   created_at: string; // ISO 8601 datetime string
   updated_at: string; // ISO 8601 datetime string
-} 
\ No newline at end of file
+} 
+/**
+ * Whole desired interval set of the current user for one slot (batch sync).
+ */
+export interface SlotAvailabilitySet {
+  slot_id: number;
+  intervals: UserAvailabilityCreateUpdate[];
+}
+
+export interface UserAvailabilitySyncResult {
+  created: number;
+  updated: number;
+  deleted: number;
+  availabilities: UserAvailability[];
+}
+
+/**
+ * Time range of a slot (ISO 8601 datetime strings).
+ */
+export interface AvailabilityTimeRange {
+  start: string;
+  end: string;
+}
+
+/**
+ * Part of a slot with the same set of available members (precomputed by the backend).
+ */
+export interface AvailabilitySegment extends AvailabilityTimeRange {
+  count: number;
+  user_ids: number[];
+  meets_quorum: boolean;
+}
+
+export interface SlotAvailabilityOverlap {
+  slot_id: number | null; // null = nezhmotněný výskyt opakovaného slotu
+  recurrence_id?: number | null;
+  slot_from: string;
+  slot_to: string;
+  max_available: number;
+  segments: AvailabilitySegment[];
+  quorum_ranges: AvailabilityTimeRange[];
+}
+
+/**
+ * N-of-M availability overlaps for all slots of a session.
+ */
+export interface SessionAvailabilityOverlap {
+  session_id: number;
+  member_count: number;
+  quorum: number;
+  min_available: number;
+  slots: SlotAvailabilityOverlap[];
+}
+
+/**
+ * Recommended start time of a session (members available for the whole duration).
+ */
+export interface SessionTimeOption extends AvailabilityTimeRange {
+  slot_id: number;
+  attendee_count: number;
+  player_count: number;
+  gm_attends: boolean;
+  user_ids: number[];
+  missing_user_ids: number[];
+}
+
+export interface SessionTimeRecommendations {
+  session_id: number;
+  duration_minutes: number;
+  member_count: number;
+  options: SessionTimeOption[];
+}
+
+/**
+ * One local day of the availability grid. Cell i starts at start + i * cell_minutes
+ * (real time, so DST change days have one hour of cells less/more).
+ */
+export interface AvailabilityGridDay {
+  date: string; // YYYY-MM-DD in the grid's time zone
+  start: string; // Local midnight as ISO 8601 (UTC)
+  end: string;
+  counts: number[]; // Players and GM available for the whole cell
+  mine: boolean[]; // Cell is within the current user's availability
+  in_slot: boolean[]; // Cell is within a slot (or a recurring occurrence)
+}
+
+/**
+ * Session availability bucketed into cells per local day in the caller's time zone.
+ */
+export interface SessionAvailabilityGrid {
+  session_id: number;
+  timezone: string;
+  cell_minutes: number;
+  member_count: number;
+  days: AvailabilityGridDay[];
+}
+
+/**
+ * Availability interval as sent in live session events (without user/slot details).
+ */
+export interface LiveAvailability {
+  id: number;
+  available_from: string;
+  available_to: string;
+  note?: string | null;
+}
+
+/**
+ * Live change of a session pushed over Server-Sent Events (GET /sessions/{id}/events).
+ * After `resync` (or a reconnect) the client should reload the session state.
+ */
+export type SessionLiveEvent = { session_id: number } & (
+  | { type: 'slot.created' | 'slot.updated'; slot: { id: number; slot_from: string; slot_to: string; note?: string | null; recurrence_id?: number | null } }
+  | { type: 'slot.deleted'; slot_id: number }
+  | { type: 'availability.created'; slot_id: number; user_id: number; availability: LiveAvailability }
+  | { type: 'availability.deleted'; slot_id: number; user_id: number; availability_ids: number[] }
+  | { type: 'availability.replaced'; slot_id: number; user_id: number; availabilities: LiveAvailability[] }
+  | { type: 'recurrence.created' | 'recurrence.updated' | 'recurrence.deleted'; recurrence_id: number }
+  | { type: 'resync' }
+);